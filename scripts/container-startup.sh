@@ -1,12 +1,36 @@
 #!/bin/bash
 set -e
 
+pids=()
+
+# Background jobs (stats refreshes, cache bumps) are queued in PostgreSQL;
+# every container runs a worker and they share the queue via SKIP LOCKED.
+if [ "${RUN_JOB_WORKER:-1}" = "1" ]; then
+    echo "Starting background job worker..."
+    python manage.py run_worker &
+    pids+=($!)
+fi
+
 echo "Starting Django Server with Gunicorn..."
 
 # Optimize workers and threads for your container's CPU allocation
-exec gunicorn tcf_core.wsgi:application \
+gunicorn tcf_core.wsgi:application \
     --bind 0.0.0.0:80 \
     --workers 3 \
     --threads 2 \
     --log-level "info" \
-    --timeout 120
+    --timeout 120 &
+pids+=($!)
+
+# Pass stop signals on so both processes shut down cleanly.
+trap 'kill -TERM "${pids[@]}" 2>/dev/null' TERM INT
+
+# If either process exits, stop the other and exit with its status, so the
+# container is replaced instead of serving without a job worker.
+set +e
+wait -n
+status=$?
+echo "A supervised process exited (status $status); stopping the container."
+kill -TERM "${pids[@]}" 2>/dev/null
+wait
+exit "$status"
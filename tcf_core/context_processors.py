@@ -1,14 +1,18 @@
 """Inject extra context to TCF templates."""
 
 from django.conf import settings
+from django.utils.functional import SimpleLazyObject
 
-from tcf_website.models import Semester
+from tcf_website.semesters import SemesterRegistry
 
 
 def base(request):
-    """Inject user + latest semester info."""
+    """Inject user + latest semester info.
+
+    LATEST_SEMESTER is lazy: templates that never render it cost nothing.
+    """
     return {
         "DEBUG": settings.DEBUG,
         "USER": request.user,
-        "LATEST_SEMESTER": Semester.latest(),
+        "LATEST_SEMESTER": SimpleLazyObject(SemesterRegistry.latest),
     }
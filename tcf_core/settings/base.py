@@ -50,6 +50,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "tcf_core.settings.sql_timing_middleware.SQLTimingMiddleware",
     "django.middleware.gzip.GZipMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "tcf_core.settings.health_check_middleware.HealthCheckMiddleware",
@@ -184,3 +185,18 @@ DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
 
 # Toxicity threshold for filtering reviews
 TOXICITY_THRESHOLD = 74
+
+# Per-worker memory budget for the in-memory search autocomplete index
+AUTOCOMPLETE_INDEX_MAX_BYTES = env.int(
+    "AUTOCOMPLETE_INDEX_MAX_BYTES", default=64 * 1024 * 1024
+)
+
+# Run background jobs (tcf_website.jobs) as soon as they are enqueued instead
+# of leaving them to run_worker. Production runs a worker and turns this off.
+JOBS_EAGER = env.bool("JOBS_EAGER", default=True)
+
+# Per-request JSON log line and Server-Timing header with query count and
+# DB/template time (SQLTimingMiddleware); requests slower than
+# SQL_TIMING_SLOW_MS also log their SQL.
+SQL_TIMING_ENABLED = env.bool("SQL_TIMING_ENABLED", default=True)
+SQL_TIMING_SLOW_MS = env.int("SQL_TIMING_SLOW_MS", default=500)
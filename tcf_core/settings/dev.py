@@ -29,11 +29,14 @@ DEBUG = not _ci
 # commands invalidate a different cache instance than the web server sees.
 CACHALOT_ENABLED = False
 
+# The debug toolbar shows per-request SQL locally; keep test output quiet.
+SQL_TIMING_ENABLED = env.bool("SQL_TIMING_ENABLED", default=False)
+
 if not _ci:
     INSTALLED_APPS = INSTALLED_APPS + ["debug_toolbar"]
     MIDDLEWARE = (
-        MIDDLEWARE[:2]
+        MIDDLEWARE[:3]
         + ["debug_toolbar.middleware.DebugToolbarMiddleware"]
-        + MIDDLEWARE[2:]
+        + MIDDLEWARE[3:]
     )
     DEBUG_TOOLBAR_CONFIG = {"SHOW_TOOLBAR_CALLBACK": lambda r: True}
@@ -65,6 +65,10 @@ SESSION_CACHE_ALIAS = "default"
 
 CACHALOT_TIMEOUT = 60 * 60 * 24 * 7  # 1 week
 
+# Stats refreshes and cache bumps go to the job queue; container-startup.sh
+# runs the worker next to gunicorn and stops the container if either exits.
+JOBS_EAGER = env.bool("JOBS_EAGER", default=False)
+
 # Security
 CSRF_TRUSTED_ORIGINS = [
     "https://thecourseforum.com",
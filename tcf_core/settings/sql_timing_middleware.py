@@ -0,0 +1,186 @@
+"""Middleware measuring the database, template and cachalot cost of each request."""
+
+import json
+import sys
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import connection
+from django.template.backends.django import Template
+
+# Stats of the request being handled by this thread/task; None outside one.
+_CURRENT: ContextVar["RequestStats | None"] = ContextVar("request_stats", default=None)
+
+# Grouped statements listed in the log line of a slow request.
+SLOW_SQL_LIMIT = 10
+SQL_PREVIEW_CHARS = 500
+
+
+class RequestStats:
+    """Counters for one request, filled in by the wrappers below."""
+
+    __slots__ = (
+        "queries",
+        "db_time",
+        "template_time",
+        "template_depth",
+        "cache_hits",
+        "cache_misses",
+        "statements",
+    )
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # SQL text -> [executions, seconds]; only the string reference is kept.
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook: time every statement."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += elapsed
+            entry = self.statements.get(sql)
+            if entry is None:
+                self.statements[sql] = [1, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+
+    def slowest_statements(self, limit=SLOW_SQL_LIMIT):
+        """Statements with the most total time, with how often they ran."""
+        ranked = sorted(self.statements.items(), key=lambda item: -item[1][1])
+        return [
+            {
+                "sql": sql[:SQL_PREVIEW_CHARS],
+                "count": count,
+                "ms": round(seconds * 1000, 2),
+            }
+            for sql, (count, seconds) in ranked[:limit]
+        ]
+
+
+def _time_template_render(render):
+    """Wrap the template backend's ``render``; nested renders count once."""
+
+    @wraps(render)
+    def inner(self, *args, **kwargs):
+        stats = _CURRENT.get()
+        if stats is None:
+            return render(self, *args, **kwargs)
+        stats.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            stats.template_depth -= 1
+            if not stats.template_depth:
+                stats.template_time += time.perf_counter() - started
+
+    inner.request_stats = True
+    return inner
+
+
+def _count_cachalot_lookups(lookup):
+    """Wrap cachalot's cache lookup: a miss is a lookup that runs the query."""
+
+    @wraps(lookup)
+    def inner(execute_query_func, *args, **kwargs):
+        stats = _CURRENT.get()
+        if stats is None:
+            return lookup(execute_query_func, *args, **kwargs)
+        missed = False
+
+        def execute():
+            nonlocal missed
+            missed = True
+            return execute_query_func()
+
+        result = lookup(execute, *args, **kwargs)
+        if missed:
+            stats.cache_misses += 1
+        else:
+            stats.cache_hits += 1
+        return result
+
+    inner.request_stats = True
+    return inner
+
+
+def _install_wrappers():
+    if not getattr(Template.render, "request_stats", False):
+        Template.render = _time_template_render(Template.render)
+    try:
+        from cachalot import monkey_patch
+    except ImportError:
+        return
+    lookup = getattr(monkey_patch, "_get_result_or_execute_query", None)
+    if lookup is not None and not getattr(lookup, "request_stats", False):
+        monkey_patch._get_result_or_execute_query = _count_cachalot_lookups(lookup)
+
+
+class SQLTimingMiddleware:
+    """Logs one JSON line per request with its query count and DB/template time.
+
+    Also sets a ``Server-Timing`` header. Requests slower than
+    ``settings.SQL_TIMING_SLOW_MS`` get their statements (grouped by SQL
+    text, slowest first) in the log line as well.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "SQL_TIMING_ENABLED", True)
+        self.slow_ms = getattr(settings, "SQL_TIMING_SLOW_MS", 500)
+        if self.enabled:
+            _install_wrappers()
+
+    def __call__(self, request):
+        if not self.enabled or request.path == "/health":
+            return self.get_response(request)
+        stats = RequestStats()
+        token = _CURRENT.set(stats)
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(stats):
+                response = self.get_response(request)
+        finally:
+            _CURRENT.reset(token)
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = stats.db_time * 1000
+        template_ms = stats.template_time * 1000
+
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={db_ms:.1f};desc="{stats.queries} queries"',
+                f"tpl;dur={template_ms:.1f}",
+                f'cache;desc="{stats.cache_hits} hits, {stats.cache_misses} misses"',
+                f"total;dur={total_ms:.1f}",
+            ]
+        )
+        line = {
+            "level": "INFO",
+            "type": "request",
+            "path": request.path,
+            "method": request.method,
+            "status": response.status_code,
+            "duration_ms": round(total_ms, 1),
+            "db_queries": stats.queries,
+            "db_ms": round(db_ms, 1),
+            "template_ms": round(template_ms, 1),
+            "cache_hits": stats.cache_hits,
+            "cache_misses": stats.cache_misses,
+        }
+        if total_ms >= self.slow_ms:
+            line["slow_sql"] = stats.slowest_statements()
+        print(json.dumps(line), file=sys.stdout)
+        return response
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tcf_core.settings.prod")
 
 application = get_wsgi_application()
+
+# Build the search autocomplete index before the first keystroke needs it.
+from tcf_website.search.autocomplete import AutocompleteIndex  # noqa: E402
+
+AutocompleteIndex.warm_in_background()
@@ -122,6 +122,22 @@ class CourseInstructorGradeAdmin(admin.ModelAdmin):
     search_fields = ["instructor__first_name", "instructor__last_name"]
 
 
+class SemesterGradeAdmin(admin.ModelAdmin):
+    list_filter = ["semester"]
+    search_fields = ["mnemonic", "number", "first_name", "last_name"]
+
+
+class EnrollmentSnapshotAdmin(admin.ModelAdmin):
+    list_filter = ["semester", "resolution"]
+    raw_id_fields = ["section", "course"]
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ["name", "status", "attempts", "run_at", "dedupe_key"]
+    list_filter = ["status", "name"]
+    ordering = ["run_at"]
+
+
 class ClubAdmin(admin.ModelAdmin):
     ordering = ["name"]
     search_fields = ["name"]
@@ -142,7 +158,10 @@ admin.site.register(Subdepartment, SubdepartmentAdmin)
 admin.site.register(Semester, SemesterAdmin)
 admin.site.register(CourseGrade, CourseGradeAdmin)
 admin.site.register(CourseInstructorGrade, CourseInstructorGradeAdmin)
+admin.site.register(SemesterGrade, SemesterGradeAdmin)
+admin.site.register(EnrollmentSnapshot, EnrollmentSnapshotAdmin)
 admin.site.register(SectionTime, SectionTimeAdmin)
 admin.site.register(Club, ClubAdmin)
 admin.site.register(ClubCategory, ClubCategoryAdmin)
 admin.site.register(ReviewLLMSummary)
+admin.site.register(Job, JobAdmin)
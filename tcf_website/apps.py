@@ -7,3 +7,16 @@ class TcfWebsiteConfig(AppConfig):
     """TCF Django Web Application Configuration."""
 
     name = "tcf_website"
+
+    def ready(self):
+        from .search.autocomplete import connect_signals as connect_autocomplete_signals
+        from .search.trigram import connect_signals as connect_trigram_signals
+        from .semesters import connect_signals as connect_semester_signals
+        from .stats.signals import connect_signals as connect_stats_signals
+        from .votes import connect_signals as connect_vote_signals
+
+        connect_autocomplete_signals()
+        connect_semester_signals()
+        connect_stats_signals()
+        connect_trigram_signals()
+        connect_vote_signals()
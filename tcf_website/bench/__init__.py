@@ -0,0 +1,26 @@
+"""Synthetic data and view benchmarks for performance work."""
+
+from .runner import (
+    Probe,
+    ProbeResult,
+    build_report,
+    compare,
+    default_probes,
+    percentile,
+    run_probe,
+    run_probes,
+)
+from .synthetic import CatalogSize, SyntheticCatalog
+
+__all__ = [
+    "CatalogSize",
+    "Probe",
+    "ProbeResult",
+    "SyntheticCatalog",
+    "build_report",
+    "compare",
+    "default_probes",
+    "percentile",
+    "run_probe",
+    "run_probes",
+]
@@ -0,0 +1,275 @@
+"""Latency and query-count benchmark of the hot views (``benchmark_views``).
+
+``default_probes`` picks representative targets from whatever is loaded
+(the most reviewed course and pair, the largest department, the user with
+the most schedules in the newest term, ...), so the same probe list works
+on a synthetic catalog and on a restored production dump. ``run_probes``
+requests each one through Django's test client, in process, and records the
+p50/p95 latency and the number of queries of every request. ``compare``
+diffs two such reports, e.g. a baseline saved on ``main`` and a branch.
+"""
+
+import statistics
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import (
+    Course,
+    CourseInstructorStats,
+    CourseStats,
+    Department,
+    Instructor,
+    Review,
+    Schedule,
+    Section,
+    Semester,
+    User,
+    Vote,
+)
+
+# Report format version; bump when the JSON layout changes.
+REPORT_VERSION = 1
+
+# p95 regressions smaller than this are noise on any machine.
+MIN_REGRESSION_MS = 2.0
+
+
+@dataclass(frozen=True)
+class Probe:
+    """One request to time: a named GET, optionally as XHR or logged in."""
+
+    name: str
+    url: str
+    ajax: bool = False
+    user_id: int | None = None
+
+
+@dataclass
+class ProbeResult:
+    """Timings of one probe over every measured run."""
+
+    name: str
+    url: str
+    status: int
+    p50_ms: float
+    p95_ms: float
+    mean_ms: float
+    queries: int
+    timings_ms: list[float] = field(repr=False)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (``pct`` in 0-100)."""
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def default_probes() -> list[Probe]:
+    """Probes for the hot views, aimed at the busiest rows in the database.
+
+    Views whose target does not exist (e.g. no schedules yet) are left out.
+    """
+    probes = []
+    course_stats = (
+        CourseStats.objects.select_related("course__subdepartment")
+        .order_by("-review_count", "course_id")
+        .first()
+    )
+    if course_stats is not None:
+        course = course_stats.course
+        mnemonic = course.subdepartment.mnemonic
+        probes += [
+            Probe("search_code", f"{reverse('search')}?q={mnemonic}+{course.number}"),
+            Probe(
+                "search_title",
+                f"{reverse('search')}?q={course.title.split()[-1].lower()}",
+            ),
+            Probe(
+                "autocomplete",
+                f"{reverse('search')}?q={course.title[:4].lower()}",
+                ajax=True,
+            ),
+            Probe("course", reverse("course", args=[mnemonic, course.number])),
+        ]
+
+    latest = Semester.objects.order_by("-number").first()
+    if latest is not None and course_stats is not None:
+        probes += [
+            Probe(
+                "browse_search",
+                f"{reverse('browse')}?semester={latest.pk}"
+                f"&subject={mnemonic}&sort=rating_desc",
+            ),
+            Probe(
+                "browse_advanced",
+                f"{reverse('browse')}?semester={latest.pk}&min_gpa=3"
+                "&days=TUE&days=THU&open_sections=on",
+            ),
+        ]
+
+    pair = CourseInstructorStats.objects.order_by(
+        "-num_reviews", "course_id", "instructor_id"
+    ).first()
+    if pair is not None:
+        probes += [
+            Probe(
+                "course_instructor",
+                reverse("course_instructor", args=[pair.course_id, pair.instructor_id]),
+            ),
+            Probe("instructor", reverse("instructor", args=[pair.instructor_id])),
+        ]
+
+    department = (
+        Department.objects.annotate(courses=Count("subdepartment__course"))
+        .order_by("-courses", "pk")
+        .first()
+    )
+    if department is not None:
+        probes.append(Probe("department", reverse("department", args=[department.pk])))
+
+    if latest is not None:
+        busiest = (
+            Schedule.objects.filter(semester=latest)
+            .values("user_id")
+            .annotate(n=Count("*"))
+            .order_by("-n", "user_id")
+            .first()
+        )
+        if busiest is not None:
+            probes.append(
+                Probe(
+                    "schedule_builder",
+                    f"{reverse('schedule')}?semester={latest.pk}",
+                    user_id=busiest["user_id"],
+                )
+            )
+    return probes
+
+
+def _client(probe: Probe) -> Client:
+    client = Client()
+    if probe.user_id is not None:
+        client.force_login(User.objects.get(pk=probe.user_id))
+    return client
+
+
+def run_probe(probe: Probe, *, repeat: int = 20, warmup: int = 2) -> ProbeResult:
+    """Request ``probe`` ``warmup`` times untimed, then ``repeat`` times timed."""
+    client = _client(probe)
+    headers = {"X-Requested-With": "XMLHttpRequest"} if probe.ajax else {}
+    timings, queries = [], []
+    status = 0
+    for run in range(warmup + repeat):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(probe.url, headers=headers)
+            elapsed = (time.perf_counter() - started) * 1000
+        status = response.status_code
+        if run >= warmup:
+            timings.append(elapsed)
+            queries.append(len(captured))
+    return ProbeResult(
+        name=probe.name,
+        url=probe.url,
+        status=status,
+        p50_ms=round(percentile(timings, 50), 2),
+        p95_ms=round(percentile(timings, 95), 2),
+        mean_ms=round(statistics.fmean(timings), 2),
+        queries=max(queries),
+        timings_ms=[round(t, 3) for t in timings],
+    )
+
+
+def run_probes(probes: list[Probe], *, repeat: int = 20, warmup: int = 2, log=None):
+    """``run_probe`` for each probe, in the test client's ``testserver`` host.
+
+    The SQL timing middleware is switched off so its log line is not part
+    of the measurement.
+    """
+    log = log or (lambda result: None)
+    results = []
+    with override_settings(
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+        SQL_TIMING_ENABLED=False,
+    ):
+        for probe in probes:
+            result = run_probe(probe, repeat=repeat, warmup=warmup)
+            log(result)
+            results.append(result)
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(results: list[ProbeResult], *, repeat: int, warmup: int) -> dict:
+    """JSON-serializable report of ``results`` with the data set's size."""
+    return {
+        "version": REPORT_VERSION,
+        "created": timezone.now().isoformat(),
+        "commit": _git_commit(),
+        "debug": settings.DEBUG,
+        "repeat": repeat,
+        "warmup": warmup,
+        "rows": {
+            model._meta.model_name: model.objects.count()
+            for model in (Course, Section, Instructor, Review, Vote, Schedule)
+        },
+        "views": {
+            result.name: {
+                key: value for key, value in asdict(result).items() if key != "name"
+            }
+            for result in results
+        },
+    }
+
+
+def compare(baseline: dict, current: dict, *, tolerance: float = 0.2):
+    """Lines describing each view's change, and the regressions among them.
+
+    A view regresses when its query count grows or its p95 grows by more
+    than ``tolerance`` (a fraction) and by at least ``MIN_REGRESSION_MS``.
+    """
+    lines, regressions = [], []
+    for name, now in current["views"].items():
+        before = baseline["views"].get(name)
+        if before is None:
+            lines.append(f"{name:<18} new")
+            continue
+        change = now["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        line = (
+            f"{name:<18} p95 {before['p95_ms']:8.1f} -> {now['p95_ms']:8.1f} ms "
+            f"({change:+.0%})  queries {before['queries']} -> {now['queries']}"
+        )
+        slower = (
+            change > tolerance and now["p95_ms"] - before["p95_ms"] >= MIN_REGRESSION_MS
+        )
+        if slower or now["queries"] > before["queries"]:
+            regressions.append(name)
+            line += "  REGRESSION"
+        lines.append(line)
+    for name in baseline["views"].keys() - current["views"].keys():
+        lines.append(f"{name:<18} missing")
+    if baseline.get("rows") != current.get("rows"):
+        lines.append("warning: the reports were taken on different data sets")
+    return lines, regressions
@@ -0,0 +1,1175 @@
+"""Seeded synthetic catalog for load and benchmark testing (``generate_synthetic_catalog``).
+
+``SyntheticCatalog`` fills an empty database with a production-shaped data
+set. Every value comes from one ``random.Random(seed)``, so the same seed and
+sizes always give the same catalog. The shape mimics the real data:
+
+* course popularity is log-normal, so a few courses have many sections,
+  reviews and votes while most have a handful;
+* courses live for a span of terms, summer terms are about a fifth of the
+  size of fall and spring, and reviews lean towards recent terms;
+* ratings are drawn around a per-pair quality and a per-course difficulty,
+  so averages differ between pairs the way they do in production;
+* votes go mostly to reviews with text, with a heavy tail.
+
+Sections are written as Lou's List CSVs and loaded with ``SemesterLoader``,
+so courses, sections, meeting times, occupancy and instructors go through
+the same code as a real term. Users, reviews, votes, schedules and grade
+facts are bulk-inserted; then grades are rolled up and the stats read
+models rebuilt.
+"""
+
+import csv
+import math
+import os
+import random
+import tempfile
+import uuid
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields, replace
+from datetime import UTC, datetime, timedelta
+from itertools import accumulate
+from typing import cast
+
+from cachalot.api import invalidate
+from django.db import transaction
+from django.utils import timezone
+
+from ..ingest import SemesterLoader, roll_up_grades, upsert_semester_grades
+from ..ingest.grades import GRADE_COUNT_FIELDS, GRADE_WEIGHTS
+from ..models import (
+    Course,
+    CourseInstructorGrade,
+    Department,
+    Instructor,
+    Review,
+    Schedule,
+    ScheduledCourse,
+    School,
+    Section,
+    Semester,
+    SemesterGrade,
+    Subdepartment,
+    User,
+    Vote,
+)
+from ..search.autocomplete import AutocompleteIndex
+from ..semesters import SemesterRegistry
+from ..stats import refresh_course_stats, refresh_pair_stats
+
+BATCH_SIZE = 2000
+REVIEW_CHUNK = 20_000
+
+# Chronological order of the terms generated for each year.
+SEASONS = ("SPRING", "SUMMER", "FALL")
+# Relative number of sections offered per season.
+SEASON_WEIGHTS = {"SPRING": 1.0, "SUMMER": 0.2, "FALL": 1.0}
+# (month, day) after which a term's reviews start coming in.
+SEASON_ENDS = {"SPRING": (5, 10), "SUMMER": (8, 10), "FALL": (12, 15)}
+# Schedules are made for this many of the newest fall/spring terms.
+SCHEDULE_TERMS = 4
+
+# The browse page features these two schools by name.
+SCHOOLS = (
+    ("College of Arts & Sciences", 10),
+    ("School of Engineering & Applied Science", 4),
+    ("McIntire School of Commerce", 1),
+    ("School of Education and Human Development", 1),
+    ("School of Nursing", 1),
+    ("School of Architecture", 1),
+    ("Frank Batten School of Leadership and Public Policy", 1),
+    ("School of Data Science", 1),
+    ("School of Continuing and Professional Studies", 1),
+)
+
+SUBJECTS = (
+    ("Computer Science", "CS"),
+    ("Mathematics", "MATH"),
+    ("Economics", "ECON"),
+    ("Chemistry", "CHEM"),
+    ("Physics", "PHYS"),
+    ("Biology", "BIOL"),
+    ("Psychology", "PSYC"),
+    ("History", "HIST"),
+    ("English", "ENWR"),
+    ("Philosophy", "PHIL"),
+    ("Statistics", "STAT"),
+    ("Sociology", "SOC"),
+    ("Politics", "PLAP"),
+    ("Religious Studies", "RELG"),
+    ("Music", "MUSI"),
+    ("Drama", "DRAM"),
+    ("Art History", "ARTH"),
+    ("Astronomy", "ASTR"),
+    ("Anthropology", "ANTH"),
+    ("Linguistics", "LING"),
+    ("Spanish", "SPAN"),
+    ("French", "FREN"),
+    ("German", "GERM"),
+    ("Chinese", "CHIN"),
+    ("Japanese", "JAPN"),
+    ("Environmental Sciences", "EVSC"),
+    ("Systems Engineering", "SYS"),
+    ("Electrical Engineering", "ECE"),
+    ("Mechanical Engineering", "MAE"),
+    ("Biomedical Engineering", "BME"),
+    ("Civil Engineering", "CE"),
+    ("Commerce", "COMM"),
+    ("Education", "EDLF"),
+    ("Nursing", "NURS"),
+    ("Architecture", "ARCH"),
+    ("Public Policy", "LPPP"),
+    ("Data Science", "DS"),
+    ("Media Studies", "MDST"),
+    ("Global Studies", "GLOB"),
+    ("Cognitive Science", "COGS"),
+)
+SUBJECT_QUALIFIERS = ("Applied", "Advanced", "Comparative", "Experimental", "Modern")
+
+DISCIPLINES = (
+    "Artistic, Interpretive, & Philosophical Inquiry",
+    "Chemical, Mathematical, & Physical Universe",
+    "Cultures & Societies of the World",
+    "Historical Perspectives",
+    "Living Systems",
+    "Social & Economic Systems",
+    "Quantification, Computation, & Data Analysis",
+    "Writing Requirement",
+    "Second Writing Requirement",
+    "Non-Western Perspectives",
+)
+
+TITLE_PREFIXES = (
+    "Introduction to",
+    "Foundations of",
+    "Topics in",
+    "Seminar in",
+    "Advanced",
+    "Principles of",
+    "Methods in",
+    "Theory of",
+    "Research in",
+    "Special Topics in",
+)
+TITLE_TOPICS = (
+    "Algorithms",
+    "Data Structures",
+    "Linear Algebra",
+    "Probability",
+    "Microeconomics",
+    "Macroeconomics",
+    "Organic Chemistry",
+    "Quantum Mechanics",
+    "Genetics",
+    "Cognition",
+    "Ethics",
+    "Modern Europe",
+    "American Politics",
+    "World Religions",
+    "Music Theory",
+    "Acting",
+    "Renaissance Art",
+    "Cosmology",
+    "Fieldwork",
+    "Syntax",
+    "Literature",
+    "Climate Systems",
+    "Signals and Systems",
+    "Thermodynamics",
+    "Biomechanics",
+    "Structural Analysis",
+    "Financial Accounting",
+    "Learning Design",
+    "Health Assessment",
+    "Urban Design",
+    "Policy Analysis",
+    "Machine Learning",
+    "Digital Media",
+    "Human Rights",
+    "Neuroscience",
+    "Numerical Methods",
+    "Operating Systems",
+    "Databases",
+    "Statistics",
+    "Writing",
+)
+
+FIRST_NAMES = [
+    "James",
+    "Mary",
+    "Robert",
+    "Patricia",
+    "John",
+    "Jennifer",
+    "Michael",
+    "Linda",
+    "David",
+    "Elizabeth",
+    "William",
+    "Barbara",
+    "Richard",
+    "Susan",
+    "Joseph",
+    "Jessica",
+    "Thomas",
+    "Sarah",
+    "Charles",
+    "Karen",
+    "Christopher",
+    "Lisa",
+    "Daniel",
+    "Nancy",
+    "Matthew",
+    "Betty",
+    "Anthony",
+    "Sandra",
+    "Mark",
+    "Margaret",
+    "Donald",
+    "Ashley",
+    "Steven",
+    "Kimberly",
+    "Andrew",
+    "Emily",
+    "Paul",
+    "Donna",
+    "Joshua",
+    "Michelle",
+    "Kenneth",
+    "Carol",
+    "Kevin",
+    "Amanda",
+    "Brian",
+    "Melissa",
+    "George",
+    "Deborah",
+    "Timothy",
+    "Stephanie",
+    "Ronald",
+    "Rebecca",
+    "Jason",
+    "Sharon",
+    "Edward",
+    "Laura",
+    "Jeffrey",
+    "Cynthia",
+    "Ryan",
+    "Amy",
+    "Jacob",
+    "Kathleen",
+    "Gary",
+    "Angela",
+    "Nicholas",
+    "Shirley",
+    "Eric",
+    "Brenda",
+    "Jonathan",
+    "Emma",
+    "Stephen",
+    "Anna",
+    "Larry",
+    "Pamela",
+    "Justin",
+    "Nicole",
+    "Scott",
+    "Samantha",
+    "Brandon",
+    "Katherine",
+    "Wei",
+    "Priya",
+    "Hiroshi",
+    "Fatima",
+    "Olga",
+    "Mateo",
+]
+LAST_NAMES = [
+    "Smith",
+    "Johnson",
+    "Williams",
+    "Brown",
+    "Jones",
+    "Garcia",
+    "Miller",
+    "Davis",
+    "Rodriguez",
+    "Martinez",
+    "Hernandez",
+    "Lopez",
+    "Gonzalez",
+    "Wilson",
+    "Anderson",
+    "Thomas",
+    "Taylor",
+    "Moore",
+    "Jackson",
+    "Martin",
+    "Lee",
+    "Perez",
+    "Thompson",
+    "White",
+    "Harris",
+    "Sanchez",
+    "Clark",
+    "Ramirez",
+    "Lewis",
+    "Robinson",
+    "Walker",
+    "Young",
+    "Allen",
+    "King",
+    "Wright",
+    "Scott",
+    "Torres",
+    "Nguyen",
+    "Hill",
+    "Flores",
+    "Green",
+    "Adams",
+    "Nelson",
+    "Baker",
+    "Hall",
+    "Rivera",
+    "Campbell",
+    "Mitchell",
+    "Carter",
+    "Roberts",
+    "Gomez",
+    "Phillips",
+    "Evans",
+    "Turner",
+    "Diaz",
+    "Parker",
+    "Cruz",
+    "Edwards",
+    "Collins",
+    "Reyes",
+    "Stewart",
+    "Morris",
+    "Morales",
+    "Murphy",
+    "Cook",
+    "Rogers",
+    "Gutierrez",
+    "Ortiz",
+    "Morgan",
+    "Cooper",
+    "Peterson",
+    "Bailey",
+    "Reed",
+    "Kelly",
+    "Howard",
+    "Ramos",
+    "Kim",
+    "Cox",
+    "Ward",
+    "Richardson",
+    "Watson",
+    "Brooks",
+    "Chavez",
+    "Wood",
+    "James",
+    "Bennett",
+    "Gray",
+    "Mendoza",
+    "Ruiz",
+    "Hughes",
+    "Price",
+    "Alvarez",
+    "Castillo",
+    "Sanders",
+    "Patel",
+    "Myers",
+    "Long",
+    "Ross",
+    "Foster",
+    "Jimenez",
+    "Powell",
+    "Jenkins",
+    "Perry",
+    "Russell",
+    "Sullivan",
+    "Bell",
+    "Coleman",
+    "Butler",
+    "Henderson",
+    "Barnes",
+    "Gonzales",
+    "Fisher",
+    "Vasquez",
+    "Simmons",
+    "Romero",
+    "Jordan",
+    "Patterson",
+    "Alexander",
+    "Hamilton",
+    "Graham",
+    "Reynolds",
+    "Griffin",
+    "Wallace",
+    "Moreno",
+    "West",
+    "Cole",
+    "Hayes",
+]
+
+REVIEW_OPENERS = (
+    "Great class overall.",
+    "This course was a lot of work.",
+    "Honestly one of the best classes I have taken.",
+    "Not what I expected.",
+    "Solid course if you keep up with the material.",
+    "The professor clearly cares about the students.",
+    "Lectures were hard to follow at times.",
+    "I took this to fulfill a requirement and ended up enjoying it.",
+)
+REVIEW_SENTENCES = (
+    "The exams were fair and closely matched the homework.",
+    "Office hours were incredibly helpful.",
+    "Weekly problem sets took around five hours.",
+    "Readings were long but the discussions made up for it.",
+    "Grading was harsh on the papers.",
+    "The group project was the most useful part of the course.",
+    "Attendance was not required but the quizzes were in class.",
+    "Lecture slides were posted, so the textbook was optional.",
+    "The curve at the end helped a lot.",
+    "Start the final project early.",
+    "TAs were responsive on the discussion board.",
+    "The pace picked up a lot after midterms.",
+    "Labs were tedious but taught practical skills.",
+    "Expect a cumulative final.",
+)
+REVIEW_CLOSERS = (
+    "Would recommend.",
+    "Take it with this professor if you can.",
+    "I would not take it again.",
+    "Worth it for majors.",
+    "Fine as an elective.",
+)
+
+SCHEDULE_NAMES = ("Plan A", "Plan B", "Backup", "Final", "Ideal", "Realistic")
+
+# section_type -> (weight, [(days, minutes)], units)
+SECTION_KINDS = {
+    "LEC": (6, [("MoWeFr", 50), ("TuTh", 75), ("MoWe", 75)], ("3", "3", "4", "1 - 3")),
+    "DIS": (2, [("Mo", 50), ("Tu", 50), ("We", 50), ("Th", 50), ("Fr", 50)], ("0",)),
+    "LAB": (1, [("Tu", 170), ("We", 170), ("Th", 170)], ("1",)),
+    "SEM": (1, [("Mo", 150), ("Tu", 150), ("We", 150), ("Th", 150)], ("3",)),
+}
+
+_CSV_COLUMNS = (
+    "ClassNumber",
+    "Mnemonic",
+    "Number",
+    "Section",
+    "Type",
+    "Units",
+    "Instructor1",
+    "Instructor2",
+    "Days1",
+    "Title",
+    "Topic",
+    "Description",
+    "Disciplines",
+    "Cost",
+)
+
+
+@dataclass(frozen=True)
+class CatalogSize:
+    """Row counts to generate; the defaults are roughly production scale."""
+
+    semesters: int = 60
+    courses: int = 20_000
+    sections: int = 150_000
+    instructors: int = 8_000
+    users: int = 40_000
+    reviews: int = 500_000
+    votes: int = 1_000_000
+    schedules: int = 50_000
+
+    def scaled(self, factor: float) -> "CatalogSize":
+        """Every count but ``semesters`` times ``factor`` (at least 1)."""
+        return replace(
+            self,
+            **{
+                f.name: max(1, round(getattr(self, f.name) * factor))
+                for f in fields(self)
+                if f.name != "semesters"
+            },
+        )
+
+
+@dataclass
+class _Subject:
+    name: str
+    mnemonic: str
+    school: int
+    instructors: list[str] = field(default_factory=list)
+
+
+@dataclass
+class _Course:
+    subject: _Subject
+    number: int
+    title: str
+    description: str
+    disciplines: str
+    weight: float
+    first_term: int
+    last_term: int
+    instructors: list[str]
+    kind: str
+    difficulty: float
+    gpa: float
+
+
+def _clamp(value: float, low: int, high: int) -> int:
+    return max(low, min(high, round(value)))
+
+
+def _clock(value: datetime) -> str:
+    """Lou's List time, e.g. ``9:30am``."""
+    return value.strftime("%I:%M%p").lstrip("0").lower()
+
+
+@contextmanager
+def _explicit_timestamps(model, *names):
+    """Let ``bulk_create`` keep the given ``auto_now``/``auto_now_add`` values."""
+    saved = []
+    for name in names:
+        field = model._meta.get_field(name)
+        saved.append((field, field.auto_now, field.auto_now_add))
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _batched(items: list, size: int = BATCH_SIZE) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class SyntheticCatalog:
+    """Generates a seeded catalog of ``size`` into the (empty) database."""
+
+    def __init__(
+        self,
+        size: CatalogSize,
+        *,
+        seed: int = 0,
+        end_year: int | None = None,
+        log=None,
+    ):
+        self.size = size
+        self.rng = random.Random(seed)
+        self.end_year = end_year or timezone.now().year
+        self.log = log or (lambda message: None)
+        self.counts = Counter()
+        self.terms = self._terms()
+
+    def generate(self, *, workers: int = 1) -> Counter:
+        """Write every table; returns the number of rows created per kind."""
+        subjects, courses = self._plan_catalog()
+        self._write_organization(subjects)
+        self._load_sections(courses, workers)
+        self._write_instructor_departments(subjects)
+        self._set_enrollment()
+        self._create_users()
+        self._create_reviews(courses)
+        self._create_schedules()
+        self._create_grades(courses)
+        self._refresh_stats()
+        invalidate()
+        SemesterRegistry.invalidate()
+        AutocompleteIndex.invalidate()
+        return self.counts
+
+    # --- Plan ------------------------------------------------------------------
+
+    def _terms(self) -> list[tuple[int, str]]:
+        """The ``size.semesters`` newest (year, season) terms ending with fall."""
+        terms = [
+            (year, season)
+            for year in range(self.end_year - self.size.semesters, self.end_year + 1)
+            for season in SEASONS
+        ]
+        return terms[-self.size.semesters :]
+
+    def _subjects(self) -> list[_Subject]:
+        count = max(4, round(self.size.courses / 100))
+        school_weights = [weight for _, weight in SCHOOLS]
+        subjects = []
+        mnemonics = set()
+        for i in range(count):
+            name, mnemonic = SUBJECTS[i % len(SUBJECTS)]
+            if i >= len(SUBJECTS):
+                qualifier = SUBJECT_QUALIFIERS[(i // len(SUBJECTS) - 1) % 5]
+                name = f"{qualifier} {name}"
+                mnemonic += qualifier[0]
+            while mnemonic in mnemonics:
+                mnemonic += "X"
+            mnemonics.add(mnemonic)
+            school = self.rng.choices(range(len(SCHOOLS)), school_weights)[0]
+            # Keep both featured schools populated even at tiny scales.
+            if i < 2:
+                school = i
+            subjects.append(_Subject(name, mnemonic, school))
+        return subjects
+
+    def _instructor_names(self) -> list[str]:
+        """``size.instructors`` distinct "First Last" names."""
+        first, last = len(FIRST_NAMES), len(LAST_NAMES)
+        picks = self.rng.sample(range(first * last * (last + 1)), self.size.instructors)
+        names = []
+        for i in picks:
+            surname = LAST_NAMES[(i // first) % last]
+            if i >= first * last:
+                surname += f"-{LAST_NAMES[i // (first * last) - 1]}"
+            names.append(f"{FIRST_NAMES[i % first]} {surname}")
+        return names
+
+    def _plan_catalog(self) -> tuple[list[_Subject], list[_Course]]:
+        rng = self.rng
+        subjects = self._subjects()
+        # Subject sizes are skewed too: a few large departments, many small.
+        subject_weights = [rng.lognormvariate(0, 0.7) for _ in subjects]
+
+        names = self._instructor_names()
+        for name, subject in zip(
+            names,
+            rng.choices(subjects, subject_weights, k=len(names)),
+            strict=True,
+        ):
+            subject.instructors.append(name)
+
+        last = len(self.terms) - 1
+        kinds = list(SECTION_KINDS)
+        kind_weights = [SECTION_KINDS[kind][0] for kind in kinds]
+        numbers = defaultdict(set)
+        courses = []
+        for subject in rng.choices(subjects, subject_weights, k=self.size.courses):
+            while True:
+                level = rng.choices((1, 2, 3, 4, 5, 6, 7, 8), (3, 4, 4, 3, 2, 1, 1, 1))
+                number = level[0] * 1000 + rng.randrange(10, 1000)
+                if number not in numbers[subject.mnemonic]:
+                    break
+            numbers[subject.mnemonic].add(number)
+            topic = rng.choice(TITLE_TOPICS)
+            title = f"{rng.choice(TITLE_PREFIXES)} {topic}"
+            first_term = 0 if rng.random() < 0.5 else rng.randrange(last + 1)
+            last_term = last if rng.random() < 0.7 else rng.randint(first_term, last)
+            pool = subject.instructors or names
+            courses.append(
+                _Course(
+                    subject=subject,
+                    number=number,
+                    title=title,
+                    description=(
+                        f"A study of {topic.lower()} for students of "
+                        f"{subject.name.lower()}, with an emphasis on "
+                        f"{rng.choice(TITLE_TOPICS).lower()}."
+                    ),
+                    disciplines="$".join(
+                        rng.sample(DISCIPLINES, rng.choices((0, 1, 2), (5, 4, 1))[0])
+                    ),
+                    weight=rng.lognormvariate(0, 1.0),
+                    first_term=first_term,
+                    last_term=last_term,
+                    instructors=rng.sample(pool, min(len(pool), rng.randint(1, 4))),
+                    kind=rng.choices(kinds, kind_weights)[0],
+                    difficulty=rng.gauss(3.0, 0.8),
+                    gpa=min(4.0, max(2.0, rng.gauss(3.35, 0.3))),
+                )
+            )
+        return subjects, courses
+
+    def _offerings(self, courses: list[_Course]) -> dict[int, list[_Course]]:
+        """Term index -> one entry per section, every course offered at least once."""
+        rng = self.rng
+        offerings = defaultdict(list)
+
+        def add(course):
+            while True:
+                term = rng.randint(course.first_term, course.last_term)
+                season = self.terms[term][1]
+                if rng.random() < SEASON_WEIGHTS[season]:
+                    offerings[term].append(course)
+                    return
+
+        for course in courses:
+            add(course)
+        extra = max(0, self.size.sections - len(courses))
+        for course in rng.choices(
+            courses, [course.weight for course in courses], k=extra
+        ):
+            add(course)
+        return offerings
+
+    # --- Catalog ---------------------------------------------------------------
+
+    def _write_organization(self, subjects: list[_Subject]) -> None:
+        schools = School.objects.bulk_create([School(name=name) for name, _ in SCHOOLS])
+        departments = Department.objects.bulk_create(
+            [
+                Department(name=subject.name, school=schools[subject.school])
+                for subject in subjects
+            ]
+        )
+        Subdepartment.objects.bulk_create(
+            [
+                Subdepartment(
+                    name=subject.name,
+                    mnemonic=subject.mnemonic,
+                    department=department,
+                )
+                for subject, department in zip(subjects, departments, strict=True)
+            ]
+        )
+        self.counts["departments"] = len(departments)
+        self.log(f"Created {len(schools)} schools and {len(departments)} departments")
+
+    def _write_term_csv(self, path: str, sections: list[_Course]) -> None:
+        rng = self.rng
+        per_course = Counter()
+        with open(path, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(_CSV_COLUMNS)
+            for class_number, course in enumerate(sections, start=10000):
+                key = (course.subject.mnemonic, course.number)
+                per_course[key] += 1
+                # Lecture courses with several sections add discussions.
+                kind = course.kind
+                if kind == "LEC" and per_course[key] > 1 and rng.random() < 0.5:
+                    kind = "DIS"
+                _, meetings, units = SECTION_KINDS[kind]
+                days, minutes = rng.choice(meetings)
+                start = datetime(2000, 1, 1, rng.randrange(8, 18), rng.choice((0, 30)))
+                end = start + timedelta(minutes=minutes)
+                if rng.random() < 0.04:
+                    instructors = ["Staff", ""]
+                else:
+                    instructors = rng.sample(
+                        course.instructors,
+                        min(len(course.instructors), rng.choices((1, 2), (19, 1))[0]),
+                    )
+                    instructors += [""] * (2 - len(instructors))
+                writer.writerow(
+                    (
+                        class_number,
+                        course.subject.mnemonic,
+                        course.number,
+                        f"{per_course[key]:03}",
+                        kind,
+                        rng.choice(units),
+                        *instructors,
+                        f"{days} {_clock(start)} - {_clock(end)}",
+                        course.title,
+                        "",
+                        course.description,
+                        course.disciplines,
+                        "",
+                    )
+                )
+
+    def _load_sections(self, courses: list[_Course], workers: int) -> None:
+        offerings = self._offerings(courses)
+        with tempfile.TemporaryDirectory(prefix="synthetic-catalog-") as directory:
+            files = []
+            for index, (year, season) in enumerate(self.terms):
+                sections = offerings.get(index, [])
+                self.rng.shuffle(sections)
+                path = os.path.join(directory, f"{year}_{season.lower()}.csv")
+                self._write_term_csv(path, sections)
+                files.append((path, year, season))
+            batch = SemesterLoader().load_many(files, workers=workers)
+        self.counts["semesters"] = len(batch.terms)
+        self.counts["courses"] = Course.objects.count()
+        self.counts["sections"] = sum(term.sections for term in batch.terms)
+        self.counts["instructors"] = Instructor.objects.count()
+        self.log(
+            f"Loaded {self.counts['sections']} sections of "
+            f"{self.counts['courses']} courses: {batch.timing()}"
+        )
+
+    def _write_instructor_departments(self, subjects: list[_Subject]) -> None:
+        departments = dict(
+            Subdepartment.objects.values_list("mnemonic", "department_id")
+        )
+        instructors = {
+            f"{first} {last}": pk
+            for pk, first, last in Instructor.objects.values_list(
+                "pk", "first_name", "last_name"
+            )
+        }
+        through = Instructor.departments.through
+        through.objects.bulk_create(
+            [
+                through(
+                    instructor_id=instructors[name],
+                    department_id=departments[subject.mnemonic],
+                )
+                for subject in subjects
+                for name in subject.instructors
+                if name in instructors
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+    def _set_enrollment(self) -> None:
+        """Enrollment numbers for the newest term, as ``fetch_enrollment`` would."""
+        latest = Semester.objects.order_by("-number").first()
+        sections = list(
+            Section.objects.filter(semester=latest)
+            .only("id", "section_type")
+            .order_by("id")
+        )
+        for section in sections:
+            limit = self.rng.choice(
+                (200, 150, 100) if section.section_type == "LEC" else (20, 25, 30)
+            )
+            section.enrollment_limit = limit
+            section.enrollment_taken = min(
+                limit, round(limit * self.rng.uniform(0.4, 1.2))
+            )
+        Section.objects.bulk_update(
+            sections, ["enrollment_taken", "enrollment_limit"], batch_size=BATCH_SIZE
+        )
+
+    # --- Activity --------------------------------------------------------------
+
+    def _create_users(self) -> None:
+        users = [
+            User(
+                username=f"synthetic{i}",
+                computing_id=f"syn{i}",
+                email=f"syn{i}@example.com",
+                password="!",
+                graduation_year=self.end_year + self.rng.randint(0, 4),
+            )
+            for i in range(self.size.users)
+        ]
+        with transaction.atomic():
+            for batch in _batched(users):
+                User.objects.bulk_create(batch)
+        self.user_ids = [user.pk for user in users]
+        self.counts["users"] = len(users)
+        self.log(f"Created {len(users)} users")
+
+    def _section_rows(self, semesters=None) -> list[dict]:
+        """Sections (optionally of ``semesters``) with their instructor ids."""
+        sections = Section.objects.order_by("pk")
+        links = Section.instructors.through.objects.order_by(
+            "section_id", "instructor_id"
+        )
+        if semesters is not None:
+            sections = sections.filter(semester__in=semesters)
+            links = links.filter(section__semester__in=semesters)
+        rows = {
+            row["id"]: {**row, "instructors": []}
+            for row in sections.values(
+                "id", "semester_id", "course_id", "section_times", "units_max"
+            )
+        }
+        for section_id, instructor_id in links.values_list(
+            "section_id", "instructor_id"
+        ):
+            rows[section_id]["instructors"].append(instructor_id)
+        return list(rows.values())
+
+    @staticmethod
+    def _term_end(semester: Semester) -> datetime:
+        month, day = SEASON_ENDS[semester.season]
+        return datetime(semester.year, month, day, tzinfo=UTC)
+
+    def _review_created(self, semester: Semester) -> datetime:
+        """Most reviews come in during the weeks after the term ends."""
+        end = self._term_end(semester)
+        created = end + timedelta(seconds=self.rng.expovariate(1 / (60 * 86400)))
+        now = timezone.now()
+        if created > now:
+            created = end + (now - end) * self.rng.random()
+        return created
+
+    def _review_text(self) -> str:
+        rng = self.rng
+        if rng.random() < 0.25:
+            return ""
+        body = rng.sample(REVIEW_SENTENCES, rng.randint(0, 5))
+        return " ".join([rng.choice(REVIEW_OPENERS), *body, rng.choice(REVIEW_CLOSERS)])
+
+    def _create_reviews(self, courses: list[_Course]) -> None:
+        rng = self.rng
+        semesters = Semester.objects.in_bulk()
+        order = {
+            pk: i
+            for i, pk in enumerate(
+                sorted(semesters, key=lambda pk: semesters[pk].number)
+            )
+        }
+        course_ids = {
+            (mnemonic, number): pk
+            for pk, mnemonic, number in Course.objects.values_list(
+                "pk", "subdepartment__mnemonic", "number"
+            )
+        }
+        plan = {course_ids[c.subject.mnemonic, c.number]: c for c in courses}
+        staff = Instructor.objects.filter(first_name="", last_name="Staff").first()
+
+        # Popular courses draw more reviews per section, recent terms more
+        # than old ones; terms still in progress have none yet.
+        now = timezone.now()
+        candidates, weights = [], []
+        for row in self._section_rows():
+            teaching = [
+                pk for pk in row["instructors"] if pk != getattr(staff, "pk", None)
+            ]
+            if not teaching or self._term_end(semesters[row["semester_id"]]) > now:
+                continue
+            recency = 0.2 + order[row["semester_id"]] / max(len(order) - 1, 1)
+            candidates.append((row["course_id"], teaching, row["semester_id"]))
+            weights.append(math.sqrt(plan[row["course_id"]].weight) * recency**2)
+
+        if not candidates:
+            return
+        quality = {}
+        created = voted = 0
+        total = self.size.reviews
+        cumulative = list(accumulate(weights))
+        for start in range(0, total, REVIEW_CHUNK):
+            count = min(REVIEW_CHUNK, total - start)
+            reviews = []
+            for course_id, teaching, semester_id in rng.choices(
+                candidates, cum_weights=cumulative, k=count
+            ):
+                instructor_id = rng.choice(teaching)
+                course = plan[course_id]
+                q = quality.setdefault((course_id, instructor_id), rng.gauss(3.8, 0.6))
+                difficulty = _clamp(rng.gauss(course.difficulty, 0.7), 1, 5)
+                amounts = [
+                    min(20, int(rng.expovariate(1 / mean)))
+                    for mean in (1.5, 0.8, 0.6, 1 + course.difficulty)
+                ]
+                when = self._review_created(semesters[semester_id])
+                edited = rng.random() < 0.05
+                reviews.append(
+                    Review(
+                        text=self._review_text(),
+                        user_id=rng.choice(self.user_ids),
+                        course_id=course_id,
+                        instructor_id=instructor_id,
+                        semester_id=semester_id,
+                        instructor_rating=_clamp(rng.gauss(q, 0.8), 1, 5),
+                        difficulty=difficulty,
+                        recommendability=_clamp(
+                            rng.gauss(q - 0.3 * (difficulty - 3), 0.9), 1, 5
+                        ),
+                        enjoyability=_clamp(rng.gauss(q - 0.2, 0.9), 1, 5),
+                        hours_per_week=min(80, sum(amounts)),
+                        amount_reading=amounts[0],
+                        amount_writing=amounts[1],
+                        amount_group=amounts[2],
+                        amount_homework=amounts[3],
+                        toxicity_rating=min(100, int(rng.expovariate(1 / 8))),
+                        hidden=rng.random() < 0.005,
+                        created=when,
+                        modified=when + timedelta(days=rng.randint(1, 90))
+                        if edited
+                        else when,
+                    )
+                )
+            votes_wanted = round(self.size.votes * (start + count) / total) - round(
+                self.size.votes * start / total
+            )
+            votes = self._draw_votes(reviews, votes_wanted)
+            with (
+                transaction.atomic(),
+                _explicit_timestamps(Review, "created", "modified"),
+            ):
+                Review.objects.bulk_create(reviews, batch_size=BATCH_SIZE)
+                Vote.objects.bulk_create(votes, batch_size=BATCH_SIZE)
+            created += len(reviews)
+            voted += len(votes)
+            self.log(f"Created {created}/{total} reviews, {voted} votes")
+        self.counts["reviews"] = created
+        self.counts["votes"] = voted
+
+    def _draw_votes(self, reviews: list[Review], count: int) -> list[Vote]:
+        """``count`` votes spread over ``reviews`` (heavy-tailed, text-first),
+        with each review's vote counters set to match."""
+        rng = self.rng
+        weights = [
+            rng.lognormvariate(0, 1.2) * (1.0 if review.text else 0.15)
+            for review in reviews
+        ]
+        ratings = [cast(int, review.instructor_rating) for review in reviews]
+        voters = defaultdict(set)
+        ups = [0] * len(reviews)
+        downs = [0] * len(reviews)
+        votes = []
+        for i in rng.choices(range(len(reviews)), weights, k=count):
+            review = reviews[i]
+            used = voters[i]
+            used.add(review.user_id)
+            for _ in range(10):
+                user_id = rng.choice(self.user_ids)
+                if user_id not in used:
+                    break
+            else:
+                continue
+            used.add(user_id)
+            value = 1 if rng.random() < 0.45 + 0.1 * ratings[i] else -1
+            if value > 0:
+                ups[i] += 1
+            else:
+                downs[i] += 1
+            votes.append(Vote(value=value, user_id=user_id, review=review))
+        for review, up, down in zip(reviews, ups, downs, strict=True):
+            review.upvote_count = up
+            review.downvote_count = down
+            review.net_votes = up - down
+        return votes
+
+    def _create_schedules(self) -> None:
+        rng = self.rng
+        recent = list(
+            Semester.objects.exclude(season="SUMMER").order_by("-number")[
+                :SCHEDULE_TERMS
+            ]
+        )
+        by_term = defaultdict(list)
+        for row in self._section_rows(recent):
+            if row["instructors"]:
+                by_term[row["semester_id"]].append(row)
+        terms = [semester.pk for semester in recent if by_term[semester.pk]]
+        if not terms:
+            return
+        # Most schedules are for the newest term; a few users make many.
+        term_weights = [0.6, 0.25, 0.1, 0.05][: len(terms)]
+        user_weights = [rng.lognormvariate(0, 1.0) for _ in self.user_ids]
+        schedules = [
+            Schedule(
+                name=rng.choice(SCHEDULE_NAMES),
+                user_id=user_id,
+                semester_id=rng.choices(terms, term_weights)[0],
+                share_token=uuid.UUID(int=rng.getrandbits(128), version=4)
+                if rng.random() < 0.05
+                else None,
+            )
+            for user_id in rng.choices(
+                self.user_ids, user_weights, k=self.size.schedules
+            )
+        ]
+        scheduled = 0
+        with transaction.atomic():
+            for batch in _batched(schedules):
+                Schedule.objects.bulk_create(batch)
+                entries = []
+                for schedule in batch:
+                    sections = by_term[schedule.semester_id]
+                    for row in rng.sample(
+                        sections, min(len(sections), rng.randint(3, 6))
+                    ):
+                        entries.append(
+                            ScheduledCourse(
+                                schedule=schedule,
+                                section_id=row["id"],
+                                instructor_id=rng.choice(row["instructors"]),
+                                time=row["section_times"],
+                                enrolled_units=row["units_max"] or 3,
+                            )
+                        )
+                ScheduledCourse.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+                scheduled += len(entries)
+        self.counts["schedules"] = len(schedules)
+        self.counts["scheduled_courses"] = scheduled
+        self.log(f"Created {len(schedules)} schedules with {scheduled} courses")
+
+    def _create_grades(self, courses: list[_Course]) -> None:
+        """Grade facts for 80% of past course/instructor terms, then the rollups."""
+        rng = self.rng
+        semesters = list(Semester.objects.order_by("number"))
+        gpa = {
+            (course.subject.mnemonic, course.number): course.gpa for course in courses
+        }
+        course_keys = {
+            pk: (mnemonic, number)
+            for pk, mnemonic, number in Course.objects.values_list(
+                "pk", "subdepartment__mnemonic", "number"
+            )
+        }
+        names = {
+            pk: (first, last)
+            for pk, first, last in Instructor.objects.exclude(
+                first_name=""
+            ).values_list("pk", "first_name", "last_name")
+        }
+        enrolled = defaultdict(int)
+        for row in self._section_rows(semesters[:-1]):
+            for instructor_id in row["instructors"]:
+                if instructor_id in names:
+                    key = (row["semester_id"], row["course_id"], instructor_id)
+                    enrolled[key] += max(5, round(rng.lognormvariate(3.2, 0.7)))
+
+        facts = defaultdict(list)
+        offsets = {}
+        for (semester_id, course_id, instructor_id), total in enrolled.items():
+            if rng.random() >= 0.8:
+                continue
+            mnemonic, number = course_keys[course_id]
+            center = gpa[mnemonic, number] + offsets.setdefault(
+                instructor_id, rng.gauss(0, 0.15)
+            )
+            shares = [math.exp(-((w - center) ** 2) / 0.4) for w in GRADE_WEIGHTS]
+            counts = [round(total * share / sum(shares)) for share in shares]
+            graded = sum(counts) or 1
+            redacted = rng.random() < 0.1
+            first, last = names[instructor_id]
+            facts[semester_id].append(
+                SemesterGrade(
+                    mnemonic=mnemonic,
+                    number=number,
+                    first_name=first,
+                    last_name=last,
+                    course_id=course_id,
+                    instructor_id=instructor_id,
+                    total_enrolled=sum(counts),
+                    average=None
+                    if redacted
+                    else sum(c * w for c, w in zip(counts, GRADE_WEIGHTS, strict=True))
+                    / graded,
+                    gpa_enrolled=0 if redacted else sum(counts),
+                    **dict(zip(GRADE_COUNT_FIELDS, counts, strict=True)),
+                )
+            )
+        with transaction.atomic():
+            for semester in semesters:
+                if facts[semester.pk]:
+                    upsert_semester_grades(semester, facts[semester.pk])
+            roll_up_grades()
+        self.counts["grade_facts"] = sum(len(rows) for rows in facts.values())
+        self.log(f"Created {self.counts['grade_facts']} grade facts")
+
+    def _refresh_stats(self) -> None:
+        course_ids = list(Course.objects.order_by("pk").values_list("pk", flat=True))
+        pairs = set(
+            Review.objects.filter(course__isnull=False, instructor__isnull=False)
+            .values_list("course_id", "instructor_id")
+            .distinct()
+        )
+        pairs.update(
+            CourseInstructorGrade.objects.filter(
+                course__isnull=False, instructor__isnull=False
+            )
+            .values_list("course_id", "instructor_id")
+            .distinct()
+        )
+        for batch in _batched(course_ids):
+            refresh_course_stats(batch)
+        for batch in _batched(sorted(pairs)):
+            refresh_pair_stats(batch)
+        self.log(f"Rebuilt stats for {len(course_ids)} courses and {len(pairs)} pairs")
@@ -0,0 +1,37 @@
+"""SIS enrollment: the class search client, the continuous poller and history."""
+
+from .history import (
+    FillPoint,
+    compact_history,
+    compact_snapshots,
+    course_fill_curve,
+    record_snapshots,
+    section_fill_curve,
+)
+from .poller import EnrollmentPoller, PollRound, PollSchedule
+from .sis import (
+    API_URL,
+    ENROLLMENT_FIELDS,
+    enrollment_values,
+    fetch_class,
+    fetch_one,
+    fetch_subject,
+)
+
+__all__ = [
+    "API_URL",
+    "ENROLLMENT_FIELDS",
+    "EnrollmentPoller",
+    "FillPoint",
+    "PollRound",
+    "PollSchedule",
+    "compact_history",
+    "compact_snapshots",
+    "course_fill_curve",
+    "enrollment_values",
+    "fetch_class",
+    "fetch_one",
+    "fetch_subject",
+    "record_snapshots",
+    "section_fill_curve",
+]
@@ -0,0 +1,218 @@
+"""Append-only enrollment history (``EnrollmentSnapshot``) and fill curves.
+
+``record_snapshots`` is called with every batch of numbers fetched from SIS
+and appends a row only for sections whose numbers differ from their latest
+snapshot, so the table grows with actual enrollment changes rather than with
+polling frequency. A section's history is a step function: each snapshot
+holds until the next one.
+
+Old terms are thinned by ``compact_history``: the newest terms stay raw,
+the next ones keep the last snapshot of every hour, and older ones the last
+snapshot of every day. Rows carry their semester, SIS section number and
+course, so a section or course curve is one range scan on
+``(semester, sis_section_number, taken_at)`` or ``(course, semester,
+taken_at)``, and history outlives the Section rows a reload recreates.
+"""
+
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models import EnrollmentSnapshot, Section, Semester
+from .sis import ENROLLMENT_FIELDS
+
+CHUNK_SIZE = 5000
+Resolution = EnrollmentSnapshot.Resolution
+
+# Latest snapshot of each section, plus what a new snapshot needs to carry.
+_LATEST_SQL = """
+SELECT s.id, s.course_id, s.semester_id, s.sis_section_number,
+    last.id IS NOT NULL, {last_fields}
+FROM {sections} s
+LEFT JOIN LATERAL (
+    SELECT e.id, {fields}
+    FROM {snapshots} e
+    WHERE e.semester_id = s.semester_id
+        AND e.sis_section_number = s.sis_section_number
+    ORDER BY e.taken_at DESC
+    LIMIT 1
+) last ON TRUE
+WHERE s.id = ANY(%s)
+"""
+
+# Rows of ``semester`` finer than ``resolution`` that are not the last of
+# their section's hour/day bucket.
+_THIN_SQL = """
+DELETE FROM {snapshots} WHERE id IN (
+    SELECT id FROM (
+        SELECT id, row_number() OVER (
+            PARTITION BY sis_section_number,
+                date_trunc(%(unit)s, taken_at AT TIME ZONE %(tz)s)
+            ORDER BY taken_at DESC, id DESC
+        ) AS rank
+        FROM {snapshots}
+        WHERE semester_id = %(semester)s AND resolution < %(resolution)s
+    ) ranked
+    WHERE rank > 1
+)
+"""
+
+_BUCKETS = {Resolution.HOURLY: "hour", Resolution.DAILY: "day"}
+
+
+class FillPoint(NamedTuple):
+    """Enrollment numbers from ``taken_at`` until the next point."""
+
+    taken_at: object
+    enrollment_taken: int
+    enrollment_limit: int
+    waitlist_taken: int
+    waitlist_limit: int
+
+
+def _latest_sql() -> str:
+    quote = connection.ops.quote_name
+    return _LATEST_SQL.format(
+        sections=quote(Section._meta.db_table),
+        snapshots=quote(EnrollmentSnapshot._meta.db_table),
+        fields=", ".join(f"e.{quote(f)}" for f in ENROLLMENT_FIELDS),
+        last_fields=", ".join(f"last.{quote(f)}" for f in ENROLLMENT_FIELDS),
+    )
+
+
+def record_snapshots(rows, taken_at=None) -> int:
+    """Append snapshots for ``(section_id, values)`` pairs that changed.
+
+    ``values`` maps ``ENROLLMENT_FIELDS`` to the numbers just fetched.
+    Sections without history always get a first snapshot. Returns the number
+    of rows written.
+    """
+    values_by_section = {pk: values for pk, values in rows}
+    taken_at = taken_at or timezone.now()
+    sql = _latest_sql()
+    ids = list(values_by_section)
+    created = []
+    for start in range(0, len(ids), CHUNK_SIZE):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [ids[start : start + CHUNK_SIZE]])
+            latest = cursor.fetchall()
+        for pk, course_id, semester_id, sis_number, has_history, *last in latest:
+            values = values_by_section[pk]
+            current = [values[field] for field in ENROLLMENT_FIELDS]
+            if has_history and current == last:
+                continue
+            created.append(
+                EnrollmentSnapshot(
+                    section_id=pk,
+                    course_id=course_id,
+                    semester_id=semester_id,
+                    sis_section_number=sis_number,
+                    taken_at=taken_at,
+                    **values,
+                )
+            )
+    EnrollmentSnapshot.objects.bulk_create(created, batch_size=CHUNK_SIZE)
+    return len(created)
+
+
+def compact_snapshots(semester, resolution) -> int:
+    """Thin ``semester`` to the last snapshot per section and hour/day.
+
+    Returns the number of rows removed.
+    """
+    snapshots = connection.ops.quote_name(EnrollmentSnapshot._meta.db_table)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                _THIN_SQL.format(snapshots=snapshots),
+                {
+                    "unit": _BUCKETS[resolution],
+                    "tz": settings.TIME_ZONE,
+                    "semester": semester.pk,
+                    "resolution": resolution,
+                },
+            )
+            removed = cursor.rowcount
+        EnrollmentSnapshot.objects.filter(
+            semester=semester, resolution__lt=resolution
+        ).update(resolution=resolution)
+    return removed
+
+
+def compact_history(raw_terms: int = 2, hourly_terms: int = 2) -> dict:
+    """Apply the retention policy to every semester with history.
+
+    The newest ``raw_terms`` semesters are left alone, the next
+    ``hourly_terms`` are thinned to hourly snapshots, and older ones to daily.
+    Returns ``{semester: rows removed}`` for the semesters that were thinned.
+    """
+    with_history = EnrollmentSnapshot.objects.values("semester_id").distinct()
+    semesters = Semester.objects.filter(pk__in=with_history).order_by("-number")
+    latest = Semester.objects.order_by("-number").values_list("pk", flat=True)
+    rank = {pk: i for i, pk in enumerate(latest)}
+    removed = {}
+    for semester in semesters:
+        age = rank[semester.pk]
+        if age < raw_terms:
+            continue
+        resolution = (
+            Resolution.HOURLY if age < raw_terms + hourly_terms else Resolution.DAILY
+        )
+        removed[semester] = compact_snapshots(semester, resolution)
+    return removed
+
+
+def section_fill_curve(section_id) -> list[FillPoint]:
+    """History of one section, oldest first."""
+    key = (
+        Section.objects.filter(pk=section_id)
+        .values_list("semester_id", "sis_section_number")
+        .first()
+    )
+    if key is None:
+        return []
+    semester_id, sis_number = key
+    return [
+        FillPoint(*row)
+        for row in EnrollmentSnapshot.objects.filter(
+            semester_id=semester_id, sis_section_number=sis_number
+        )
+        .order_by("taken_at")
+        .values_list("taken_at", *ENROLLMENT_FIELDS)
+    ]
+
+
+def course_fill_curve(course_id, semester_id, section_ids=None) -> list[FillPoint]:
+    """Summed history of a course's sections in a semester, oldest first.
+
+    ``section_ids`` restricts the sum (e.g. to one instructor's sections).
+    Each section contributes its latest numbers at every point; blank
+    numbers count as zero.
+    """
+    rows = (
+        EnrollmentSnapshot.objects.filter(course_id=course_id, semester_id=semester_id)
+        .order_by("taken_at")
+        .values_list("taken_at", "sis_section_number", *ENROLLMENT_FIELDS)
+    )
+    if section_ids is not None:
+        rows = rows.filter(
+            sis_section_number__in=Section.objects.filter(
+                pk__in=section_ids, semester_id=semester_id
+            ).values("sis_section_number")
+        )
+
+    current = {}
+    totals = [0] * len(ENROLLMENT_FIELDS)
+    curve = []
+    for taken_at, sis_number, *values in rows:
+        values = [value or 0 for value in values]
+        previous = current.get(sis_number, [0] * len(values))
+        totals = [t + v - p for t, v, p in zip(totals, values, previous, strict=True)]
+        current[sis_number] = values
+        if curve and curve[-1].taken_at == taken_at:
+            curve[-1] = FillPoint(taken_at, *totals)
+        else:
+            curve.append(FillPoint(taken_at, *totals))
+    return curve
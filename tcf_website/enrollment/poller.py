@@ -0,0 +1,228 @@
+"""Continuous enrollment polling with per-section priorities.
+
+Instead of re-fetching every section of a term on each run, the poller keeps
+a heap of ``(due, sis_section_number)`` and polls a section again after an
+interval that depends on how close it is to filling: waitlisted and near-full
+sections every ``min_interval``, empty ones every ``max_interval``, and large
+sections at half their fill-based interval. A section whose numbers just
+changed is polled again sooner.
+
+Sections are tracked by SIS section number and their rows looked up again
+each round, since a replace-mode ``load_semester`` recreates a term's
+sections under new primary keys. Every ``resync_interval`` seconds the term
+is rechecked for sections a reload added; removed ones drop out when due.
+
+Concurrency is adapted to the server (additive increase, multiplicative
+decrease): a round that sees 429s or HTML throttle pages halves the number of
+in-flight requests and pauses; a clean round adds one. Only sections whose
+numbers changed are written, and cachalot is only invalidated when something
+was. Every fetched value is passed to ``record_snapshots`` for the history.
+"""
+
+import heapq
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from cachalot.api import invalidate
+
+from ..models import Section
+from .history import record_snapshots
+from .sis import ENROLLMENT_FIELDS
+
+# Sections at or above this fill ratio are polled at ``min_interval``.
+NEAR_FULL = 0.9
+# Sections with at least this many students enrolled count as popular.
+POPULAR = 100
+# Sections fetched per worker in one round.
+PER_WORKER = 4
+BATCH_SIZE = 500
+MAX_PAUSE = 60.0
+RESYNC_INTERVAL = 300.0
+
+
+@dataclass(frozen=True)
+class PollSchedule:
+    """How often a section is polled, in seconds, given its current numbers."""
+
+    min_interval: float = 60.0
+    max_interval: float = 3600.0
+
+    def interval(self, values: dict, changed: bool = False) -> float:
+        """Seconds until a section with enrollment ``values`` is polled again."""
+        taken = values["enrollment_taken"] or 0
+        limit = values["enrollment_limit"] or 0
+        if values["waitlist_taken"] or (limit and taken >= NEAR_FULL * limit):
+            return self.min_interval
+        if not limit:
+            interval = self.max_interval
+        else:
+            fill = min(taken / limit, 1.0)
+            interval = (
+                self.max_interval - (self.max_interval - self.min_interval) * fill
+            )
+        if taken >= POPULAR:
+            interval /= 2
+        if changed:
+            interval /= 2
+        return max(self.min_interval, interval)
+
+
+@dataclass
+class PollRound:
+    """Outcome of one ``EnrollmentPoller.poll_once()`` call."""
+
+    polled: int = 0
+    changed: int = 0
+    throttled: int = 0
+    failed: int = 0
+    concurrency: int = 0
+
+    def summary(self) -> str:
+        """One-line report for command output."""
+        return (
+            f"polled {self.polled}, changed {self.changed}, "
+            f"throttled {self.throttled}, failed {self.failed}, "
+            f"concurrency {self.concurrency}"
+        )
+
+
+class EnrollmentPoller:
+    """Polls one semester's sections by priority and writes only changes.
+
+    ``fetch(sis_section_number)`` returns ``(values, throttled)`` as
+    ``sis.fetch_class`` does; it is called from worker threads and must not
+    touch the database.
+    """
+
+    def __init__(
+        self,
+        semester,
+        fetch,
+        *,
+        schedule: PollSchedule | None = None,
+        max_workers: int = 15,
+        resync_interval: float = RESYNC_INTERVAL,
+        clock=time.monotonic,
+    ):
+        self.semester = semester
+        self.fetch = fetch
+        self.schedule = schedule or PollSchedule()
+        self.max_workers = max_workers
+        self.concurrency = max(1, max_workers // 2)
+        self.clock = clock
+        self.pause = 0.0
+        self.resync_interval = resync_interval
+        # SIS section numbers currently queued
+        self.sections: set[int] = set()
+        self.queue: list[tuple[float, float, int]] = []
+        self._sync(clock())
+
+    def _sync(self, now: float) -> None:
+        """Queue the term's sections that are not queued yet, all due ``now``."""
+        rows = Section.objects.filter(semester=self.semester).values_list(
+            "sis_section_number", *ENROLLMENT_FIELDS
+        )
+        for sis_number, *values in rows:
+            if sis_number in self.sections:
+                continue
+            self.sections.add(sis_number)
+            # Shorter intervals (hotter sections) go first.
+            interval = self.schedule.interval(
+                dict(zip(ENROLLMENT_FIELDS, values, strict=True))
+            )
+            heapq.heappush(self.queue, (now, interval, sis_number))
+        self.next_sync = now + self.resync_interval
+
+    def _current(self, sis_numbers: list[int]) -> dict[int, tuple[int, dict]]:
+        """``sis_section_number -> (pk, stored values)`` of the term's sections."""
+        rows = Section.objects.filter(
+            semester=self.semester, sis_section_number__in=sis_numbers
+        ).values_list("pk", "sis_section_number", *ENROLLMENT_FIELDS)
+        return {
+            sis_number: (pk, dict(zip(ENROLLMENT_FIELDS, values, strict=True)))
+            for pk, sis_number, *values in rows
+        }
+
+    def next_due(self) -> float | None:
+        """Clock time the next section is due, or None if nothing is queued."""
+        return self.queue[0][0] if self.queue else None
+
+    def _due(self, now: float) -> list[int]:
+        batch = []
+        limit = self.concurrency * PER_WORKER
+        while self.queue and self.queue[0][0] <= now and len(batch) < limit:
+            batch.append(heapq.heappop(self.queue)[2])
+        return batch
+
+    def _schedule(self, sis_number: int, due: float, interval: float) -> None:
+        heapq.heappush(self.queue, (due, interval, sis_number))
+
+    def poll_once(self) -> PollRound:
+        """Fetch every due section (up to one round's worth) and write changes."""
+        now = self.clock()
+        if now >= self.next_sync:
+            self._sync(now)
+        batch = self._due(now)
+        result = PollRound(polled=len(batch), concurrency=self.concurrency)
+        if not batch:
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            responses = list(pool.map(self.fetch, batch))
+
+        current_rows = self._current(batch)
+        changed, fetched = [], []
+        for sis_number, (values, throttled) in zip(batch, responses, strict=True):
+            if sis_number not in current_rows:
+                # Removed from the term; a later sync queues it if it returns.
+                self.sections.discard(sis_number)
+                continue
+            pk, current = current_rows[sis_number]
+            if values is None:
+                if throttled:
+                    result.throttled += 1
+                else:
+                    result.failed += 1
+                # Retry throttled and failed sections at the fastest rate
+                interval = self.schedule.interval(current)
+                self._schedule(sis_number, now + self.schedule.min_interval, interval)
+                continue
+            fetched.append((pk, values))
+            is_changed = values != current
+            if is_changed:
+                changed.append(Section(pk=pk, **values))
+            interval = self.schedule.interval(values, changed=is_changed)
+            self._schedule(sis_number, now + interval, interval)
+
+        if changed:
+            result.changed = Section.objects.bulk_update(
+                changed, ENROLLMENT_FIELDS, batch_size=BATCH_SIZE
+            )
+            invalidate(Section)
+        record_snapshots(fetched)
+
+        if result.throttled:
+            self.concurrency = max(1, self.concurrency // 2)
+            self.pause = min(MAX_PAUSE, max(1.0, self.pause * 2))
+        else:
+            self.concurrency = min(self.max_workers, self.concurrency + 1)
+            self.pause = 0.0
+        return result
+
+    def run(self, rounds: int | None = None, sleep=time.sleep, on_round=None):
+        """Poll until interrupted (or for ``rounds`` rounds that polled something)."""
+        done = 0
+        while rounds is None or done < rounds:
+            result = self.poll_once()
+            if result.polled:
+                done += 1
+                if on_round is not None:
+                    on_round(result)
+            if self.pause:
+                sleep(self.pause)
+            elif not result.polled:
+                next_due = self.next_due()
+                if next_due is None:
+                    return
+                sleep(max(0.0, min(next_due - self.clock(), MAX_PAUSE)))
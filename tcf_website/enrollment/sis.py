@@ -0,0 +1,114 @@
+"""Client for the SIS class search endpoint used for enrollment numbers."""
+
+import requests
+
+API_URL = (
+    "https://sisuva.admin.virginia.edu/psc/ihprd/UVSS/SA/s/"
+    "WEBLIB_HCX_CM.H_CLASS_SEARCH.FieldFormula.IScript_ClassSearch"
+)
+TIMEOUT = 30
+ENROLLMENT_FIELDS = [
+    "enrollment_taken",
+    "enrollment_limit",
+    "waitlist_taken",
+    "waitlist_limit",
+]
+
+
+def enrollment_values(cls):
+    """Section enrollment fields from one class of a class search response."""
+    return {
+        "enrollment_taken": cls.get("enrollment_total", 0),
+        "enrollment_limit": cls.get("class_capacity", 0),
+        "waitlist_taken": cls.get("wait_tot", 0),
+        "waitlist_limit": cls.get("wait_cap", 0),
+    }
+
+
+def request_classes(session, params, api_url=API_URL):
+    """``(data, throttled)`` for one class search request. Never raises.
+
+    ``data`` is the response dict, or None if the request failed;
+    ``throttled`` is True when it failed because the server is shedding load.
+    """
+    try:
+        resp = session.get(
+            api_url, params={"institution": "UVA01", **params}, timeout=TIMEOUT
+        )
+    except requests.exceptions.RetryError:
+        # urllib3 gave up retrying 429s/5xx
+        return None, True
+    except requests.RequestException:
+        return None, False
+
+    if resp.status_code == 429:
+        return None, True
+    try:
+        resp.raise_for_status()
+    except requests.RequestException:
+        return None, False
+
+    # Server returns HTML login pages under load instead of 429s
+    if "json" not in resp.headers.get("Content-Type", ""):
+        return None, True
+
+    try:
+        data = resp.json()
+    except ValueError:
+        return None, False
+    return (data if isinstance(data, dict) else None), False
+
+
+def search(session, params, api_url=API_URL):
+    """Class search response as a dict, or None if the request failed."""
+    return request_classes(session, params, api_url)[0]
+
+
+def fetch_subject(session, term, subject, api_url=API_URL):
+    """Enrollment of every class listed for ``subject``, keyed by class number.
+
+    Walks the subject's pages until ``pageCount``; a page that fails to load
+    ends the walk, and its classes are left to the per-class fallback.
+    """
+    found = {}
+    page, page_count = 1, 1
+    while page <= page_count:
+        data = search(
+            session, {"term": term, "subject": subject, "page": page}, api_url
+        )
+        if data is None:
+            break
+        for cls in data.get("classes") or []:
+            try:
+                found[int(cls["class_nbr"])] = enrollment_values(cls)
+            except (KeyError, TypeError, ValueError):
+                continue
+        try:
+            page_count = int(data.get("pageCount", page))
+        except (TypeError, ValueError):
+            break
+        page += 1
+    return found
+
+
+def fetch_class(session, term, class_nbr, api_url=API_URL):
+    """``(values, throttled)`` for one class; ``values`` is None on failure."""
+    data, throttled = request_classes(
+        session, {"term": term, "page": 1, "class_nbr": class_nbr}, api_url
+    )
+    classes = data.get("classes") if data else None
+    if not classes:
+        return None, throttled
+    return enrollment_values(classes[0]), False
+
+
+def fetch_one(session, term, section, api_url=API_URL):
+    """Fetch enrollment for a single section. Returns the section if
+    updated, None otherwise. Never raises."""
+    values, _ = fetch_class(session, term, section.sis_section_number, api_url)
+    if values is None:
+        return None
+
+    for field, value in values.items():
+        setattr(section, field, value)
+    return section
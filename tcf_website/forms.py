@@ -2,8 +2,8 @@
 
 from django import forms
 
-from .models import ClubCategory, Discipline, School, Semester, Subdepartment
-from .utils import recent_semesters
+from .models import ClubCategory, Discipline, School, Subdepartment
+from .semesters import SemesterRegistry
 
 
 class AdvancedSearchForm(forms.Form):
@@ -55,10 +55,10 @@ class AdvancedSearchForm(forms.Form):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        latest = Semester.latest()
-        semesters = recent_semesters()
+        semesters = SemesterRegistry.snapshot()
+        latest = semesters.latest
         self.fields["semester"].choices = [("", "Any")] + [
-            (s.pk, str(s)) for s in semesters
+            (s.pk, str(s)) for s in semesters.recent
         ]
         if latest is not None:
             self.fields["semester"].initial = latest.pk
@@ -0,0 +1,33 @@
+"""Bulk ingestion of SIS/Lou's List catalog and grade data."""
+
+from .columnar import is_fresh, is_table, read_table, source_meta, write_table
+from .grades import roll_up_grades, upsert_semester_grades
+from .pool import parallel_map, peak_rss
+from .semester import (
+    BatchResult,
+    LoadResult,
+    ParsedTerm,
+    SemesterLoader,
+    convert_term,
+    parse_term,
+    semester_number,
+)
+
+__all__ = [
+    "BatchResult",
+    "LoadResult",
+    "ParsedTerm",
+    "SemesterLoader",
+    "convert_term",
+    "is_fresh",
+    "is_table",
+    "parallel_map",
+    "parse_term",
+    "peak_rss",
+    "read_table",
+    "roll_up_grades",
+    "semester_number",
+    "source_meta",
+    "upsert_semester_grades",
+    "write_table",
+]
@@ -0,0 +1,187 @@
+"""Typed column store for semester and grade data.
+
+A table is a directory with one ``.npy`` file per column plus ``table.json``
+describing them. Numeric and boolean columns keep their narrow dtype and are
+opened with ``mmap_mode="r"``, so loading one reads only the pages used.
+String columns are dictionary-encoded: an integer code per row (``-1`` for
+missing) plus the distinct values, stored once as UTF-8. Titles,
+descriptions and instructor names repeat across sections, so this is also
+what keeps tables small; no general-purpose compression is applied because
+it would rule out memory mapping.
+
+Columns need not share a length, so a list per row is stored as an
+``offsets`` column (rows + 1) next to flat value columns.
+
+``source`` records the size and mtime of the file a table was converted
+from; ``is_fresh`` tells loaders whether they can use the table instead.
+"""
+
+import json
+import os
+import shutil
+import uuid
+from collections.abc import Iterable
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+META_FILE = "table.json"
+
+
+def _code_dtype(size: int):
+    for dtype in (np.int8, np.int16, np.int32):
+        if size < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def encode_strings(values: Iterable) -> tuple[np.ndarray, list[str]]:
+    """``(codes, dictionary)`` for strings; None/NaN get code -1."""
+    dictionary: dict[str, int] = {}
+    codes = []
+    for value in values:
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            codes.append(-1)
+        else:
+            codes.append(dictionary.setdefault(str(value), len(dictionary)))
+    return np.asarray(codes, dtype=_code_dtype(len(dictionary))), list(dictionary)
+
+
+class StringColumn:
+    """Dictionary-encoded strings: ``codes`` per row and the distinct ``values``."""
+
+    def __init__(self, codes: np.ndarray, values: list[str]):
+        self.codes = codes
+        self.values = values
+
+    def __len__(self):
+        return len(self.codes)
+
+    def decoded(self) -> list:
+        """Python list of the column's strings (None where missing)."""
+        lookup = [*self.values, None]
+        return [lookup[code] for code in self.codes.tolist()]
+
+    def to_series(self) -> pd.Series:
+        """Object-dtype series with NaN where missing, like ``read_csv``."""
+        return pd.Series(
+            pd.Categorical.from_codes(self.codes.astype(np.int64), self.values),
+            dtype=object,
+        )
+
+
+def write_table(path: str, columns: dict, *, meta: dict | None = None) -> None:
+    """Write ``columns`` (name -> numpy array, or sequence of str/None) to ``path``.
+
+    Sequences that are not numpy arrays, and object arrays, are stored as
+    string columns. The table is written beside ``path`` and swapped in: the
+    previous table is renamed aside, the new one renamed into place, and only
+    then is the old one deleted. ``path`` is never partly written, though it
+    is briefly absent between the two renames.
+    """
+    base = f"{path.rstrip(os.sep)}.{uuid.uuid4().hex}"
+    tmp, old = f"{base}.tmp", f"{base}.old"
+    os.makedirs(tmp)
+    schema = {}
+    try:
+        for name, column in columns.items():
+            if isinstance(column, np.ndarray) and column.dtype != object:
+                np.save(os.path.join(tmp, f"{name}.npy"), column)
+                schema[name] = {"kind": "array", "length": len(column)}
+                continue
+            codes, values = encode_strings(column)
+            np.save(os.path.join(tmp, f"{name}.codes.npy"), codes)
+            blob = [value.encode() for value in values]
+            offsets = np.zeros(len(blob) + 1, dtype=np.int64)
+            np.cumsum([len(b) for b in blob], out=offsets[1:])
+            np.save(os.path.join(tmp, f"{name}.offsets.npy"), offsets)
+            with open(os.path.join(tmp, f"{name}.strings"), "wb") as file:
+                file.write(b"".join(blob))
+            schema[name] = {"kind": "strings", "length": len(codes)}
+        with open(os.path.join(tmp, META_FILE), "w", encoding="utf-8") as file:
+            json.dump(
+                {"version": FORMAT_VERSION, "columns": schema, **(meta or {})}, file
+            )
+        if os.path.isdir(path):
+            os.replace(path, old)
+        try:
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.isdir(old):
+                os.replace(old, path)
+            raise
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    shutil.rmtree(old, ignore_errors=True)
+
+
+class Table:
+    """A table written by ``write_table``; columns are loaded on access."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as file:
+            self.meta = json.load(file)
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported table version")
+        self.columns = self.meta["columns"]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __getitem__(self, name: str):
+        kind = self.columns[name]["kind"]
+        if kind == "array":
+            return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+        codes = np.load(os.path.join(self.path, f"{name}.codes.npy"), mmap_mode="r")
+        offsets = np.load(os.path.join(self.path, f"{name}.offsets.npy")).tolist()
+        with open(os.path.join(self.path, f"{name}.strings"), "rb") as file:
+            blob = file.read()
+        values = [
+            blob[start:end].decode()
+            for start, end in zip(offsets, offsets[1:], strict=False)
+        ]
+        return StringColumn(codes, values)
+
+    def to_frame(self, names: Iterable[str] | None = None) -> pd.DataFrame:
+        """DataFrame of the named (default: all) equal-length columns."""
+        frame = {}
+        for name in names or self.columns:
+            column = self[name]
+            frame[name] = (
+                column.to_series()
+                if isinstance(column, StringColumn)
+                else np.asarray(column)
+            )
+        return pd.DataFrame(frame)
+
+
+def read_table(path: str) -> Table:
+    """Open the table at ``path``."""
+    return Table(path)
+
+
+def is_table(path: str) -> bool:
+    """True if ``path`` holds a table."""
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+def source_meta(source: str) -> dict:
+    """``meta`` recording the file a table was converted from."""
+    stat = os.stat(source)
+    return {"source": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}}
+
+
+def is_fresh(table_path: str, source: str) -> bool:
+    """True if the table at ``table_path`` was converted from ``source`` as it is now."""
+    if not is_table(table_path):
+        return False
+    if not os.path.exists(source):
+        return True
+    try:
+        recorded = read_table(table_path).meta.get("source")
+    except ValueError:
+        return False
+    return recorded == source_meta(source)["source"]
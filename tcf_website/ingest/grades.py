@@ -0,0 +1,166 @@
+"""Per-semester grade facts (``SemesterGrade``) and the tables rolled up from them.
+
+``load_grades`` upserts each term it reads into ``SemesterGrade`` and then
+rebuilds the cross-semester ``CourseGrade``/``CourseInstructorGrade`` rows of
+just the courses that term touched, one ``INSERT ... SELECT`` per table.
+Loading a new term no longer means re-aggregating every semester, and
+reloading one replaces its facts instead of duplicating aggregate rows.
+"""
+
+from collections.abc import Iterable
+
+from django.db import connection
+
+from ..models import CourseGrade, CourseInstructorGrade, SemesterGrade
+from .semester import BATCH_SIZE
+
+# Grade-point weights for computing an approximate average from the breakdown.
+# Used when UVA redacts "Course GPA" but still provides distribution counts.
+#
+# DFW weight (1.3, equivalent to D+) is derived empirically: across 13k+ rows
+# where UVA provided both the GPA and the breakdown, testing every weight from
+# 0.0 to 2.0 shows 1.3 minimises the median absolute error (0.040 vs 0.048 at 0.0).
+# No fixed weight can be perfect because the DFW bucket mixes D, F, and W
+# grades whose proportions vary per course, but 1.3 is the best single value.
+GRADE_WEIGHTS = [4.0, 4.0, 3.7, 3.3, 3.0, 2.7, 2.3, 2.0, 1.7, 1.3]
+
+GRADE_COUNT_FIELDS = (
+    "a_plus",
+    "a",
+    "a_minus",
+    "b_plus",
+    "b",
+    "b_minus",
+    "c_plus",
+    "c",
+    "c_minus",
+    "dfw",
+)
+
+_FACT_KEY = ("mnemonic", "number", "first_name", "last_name")
+_FACT_FIELDS = (
+    "course",
+    "instructor",
+    *GRADE_COUNT_FIELDS,
+    "total_enrolled",
+    "average",
+    "gpa_enrolled",
+)
+
+# Rebuilds the rollup rows in scope from the facts in scope and returns the
+# keys of every row removed or added (for the stats refresh).
+_ROLLUP_SQL = """
+WITH removed AS (
+    DELETE FROM {target} WHERE {scope} RETURNING {keys}
+), added AS (
+    INSERT INTO {target} ({keys}, {counts}, total_enrolled, average)
+    SELECT {fact_keys}, {sums}, SUM(total_enrolled), {average}
+    FROM {facts}
+    WHERE {scope}
+    GROUP BY {group}
+    ORDER BY {group}
+    RETURNING {keys}
+)
+SELECT {keys} FROM removed UNION SELECT {keys} FROM added
+"""
+
+# The enrollment-weighted GPA of the terms that reported one; otherwise the
+# grade-count breakdown weighted by GRADE_WEIGHTS (NULL if nobody enrolled).
+_AVERAGE_SQL = """COALESCE(
+    SUM(average * gpa_enrolled)
+        / NULLIF(SUM(gpa_enrolled) FILTER (WHERE average IS NOT NULL), 0),
+    ({breakdown}) / NULLIF(SUM(total_enrolled), 0)
+)"""
+
+
+def upsert_semester_grades(semester, facts: list[SemesterGrade]) -> set[int | None]:
+    """Make ``facts`` the grade rows of ``semester``.
+
+    Rows already loaded for the same course and instructor are updated in
+    place, new ones are inserted and the term's rows missing from ``facts``
+    are deleted. Returns the course ids (None for unknown courses) whose
+    facts were written or deleted.
+    """
+    existing = {
+        row[:4]: row[4:]
+        for row in SemesterGrade.objects.filter(semester=semester).values_list(
+            *_FACT_KEY, "pk", "course_id"
+        )
+    }
+    for fact in facts:
+        fact.semester = semester
+    SemesterGrade.objects.bulk_create(
+        facts,
+        update_conflicts=True,
+        unique_fields=["semester", *_FACT_KEY],
+        update_fields=list(_FACT_FIELDS),
+        batch_size=BATCH_SIZE,
+    )
+
+    loaded = {tuple(getattr(fact, field) for field in _FACT_KEY) for fact in facts}
+    stale = [value for key, value in existing.items() if key not in loaded]
+    for start in range(0, len(stale), BATCH_SIZE):
+        batch = stale[start : start + BATCH_SIZE]
+        SemesterGrade.objects.filter(pk__in=[pk for pk, _ in batch]).delete()
+    return {fact.course_id for fact in facts} | {course_id for _, course_id in stale}
+
+
+def roll_up_grades(
+    course_ids: Iterable[int | None] | None = None,
+) -> tuple[set[int | None], set[tuple[int | None, int | None]]]:
+    """Rebuild ``CourseGrade``/``CourseInstructorGrade`` from ``SemesterGrade``.
+
+    Only rows of ``course_ids`` (plus every row of an unknown course) are
+    rebuilt; None rebuilds everything. Course rows are grouped by mnemonic
+    and number, instructor rows by mnemonic, number and instructor name.
+
+    Returns the course ids and (course_id, instructor_id) pairs whose rows
+    were removed or added.
+    """
+    if course_ids is None:
+        scope, params = "TRUE", {}
+    else:
+        known = sorted({pk for pk in course_ids if pk is not None})
+        scope = "(course_id = ANY(%(courses)s) OR course_id IS NULL)"
+        params = {"courses": known}
+
+    courses = {
+        course_id
+        for (course_id,) in _roll_up(
+            CourseGrade, ["course_id"], ["mnemonic", "number"], scope, params
+        )
+    }
+    pairs = set(
+        _roll_up(
+            CourseInstructorGrade,
+            ["course_id", "instructor_id"],
+            list(_FACT_KEY),
+            scope,
+            params,
+        )
+    )
+    return courses, pairs
+
+
+def _roll_up(model, keys: list[str], group: list[str], scope: str, params: dict):
+    quote = connection.ops.quote_name
+    breakdown = " + ".join(
+        f"{weight} * SUM({field})"
+        for weight, field in zip(GRADE_WEIGHTS, GRADE_COUNT_FIELDS, strict=True)
+    )
+    sql = _ROLLUP_SQL.format(
+        target=quote(model._meta.db_table),
+        facts=quote(SemesterGrade._meta.db_table),
+        scope=scope,
+        keys=", ".join(keys),
+        # Course and instructor ids are the same across a group's rows once
+        # known; MAX skips the terms loaded before they were.
+        fact_keys=", ".join(f"MAX({key})" for key in keys),
+        counts=", ".join(GRADE_COUNT_FIELDS),
+        sums=", ".join(f"SUM({field})" for field in GRADE_COUNT_FIELDS),
+        average=_AVERAGE_SQL.format(breakdown=breakdown),
+        group=", ".join(group),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
@@ -0,0 +1,37 @@
+"""Process pool for the CPU-bound parse step of bulk loads."""
+
+import multiprocessing
+import resource
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+
+
+def parallel_map(func: Callable, items: Iterable, workers: int = 1) -> list:
+    """``[func(item) for item in items]``, spread over ``workers`` processes.
+
+    Results keep the order of ``items`` whatever order workers finish in, so
+    a reduce over them is deterministic. ``func`` must be a module-level
+    function; workers are spawned (not forked, so no database connection or
+    thread is inherited) and set Django up before running it. With one
+    worker everything runs in this process.
+    """
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(items)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=django.setup,
+    ) as pool:
+        return list(pool.map(func, items))
+
+
+def peak_rss() -> int:
+    """Peak resident memory in bytes of this process or any finished worker."""
+    # ru_maxrss is in kilobytes on Linux
+    return 1024 * max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
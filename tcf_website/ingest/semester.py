@@ -0,0 +1,977 @@
+"""Set-based loader for Lou's List semester CSVs (``load_semester``).
+
+The old loader walked the CSV row by row with a ``get``/``get_or_create``/
+``save`` for every subdepartment, course, discipline, instructor, section and
+meeting time: tens of thousands of round trips per term. ``SemesterLoader``
+instead
+
+1. parses each CSV in fixed-size pandas chunks and merges its rows per course
+   and per section without touching the database (``parse_term``; several
+   files are parsed in a process pool),
+2. resolves the parsed terms, in file order, against lookup dicts preloaded
+   from the database (new subdepartments, disciplines, instructors and
+   courses are staged in memory),
+3. writes each table with ``bulk_create``/``bulk_update`` in batches, all in
+   one transaction.
+
+Row semantics match the old loader: a course takes the title/description of
+its newest term, blank course fields are filled in, the last row listing
+disciplines sets the course's disciplines, and duplicate section numbers
+merge into one section with every listed instructor.
+
+By default a term's sections are deleted and rewritten, which cascades to the
+``ScheduledCourse`` rows pointing at them. With ``reconcile=True`` sections
+are matched on their SIS number instead: new ones are inserted, vanished ones
+deleted, and existing ones rewritten only when the digest of their CSV
+content (``Section.source_hash``) changed, so schedules and enrollment
+numbers survive a mid-term refresh.
+"""
+
+import hashlib
+import math
+import operator
+import re
+import time
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from datetime import time as dt_time
+from functools import reduce
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+from django.db.models import Q
+
+from ..models import (
+    Course,
+    Department,
+    Discipline,
+    Instructor,
+    School,
+    Section,
+    SectionTime,
+    Semester,
+    Subdepartment,
+)
+from ..schedule.calendar import section_occupancy
+from .columnar import is_table, read_table, source_meta, write_table
+from .pool import parallel_map
+
+CHUNK_SIZE = 2000
+BATCH_SIZE = 2000
+
+# Section columns written from the CSV, with the value a missing cell gets.
+SECTION_DEFAULTS = {
+    "topic": "",
+    "units": "",
+    "units_min": 0,
+    "units_max": 0,
+    "section_type": "",
+    "section_times": "",
+    "cost": "",
+}
+
+SEASON_CODES = {"FALL": 8, "SUMMER": 6, "SPRING": 2, "JANUARY": 1}
+
+_REQUIRED_COLUMNS = ["Mnemonic", "ClassNumber", "Number", "Section"]
+_INSTRUCTOR_COLUMNS = ["Instructor1", "Instructor2", "Instructor3", "Instructor4"]
+_DAYS_COLUMNS = ["Days1", "Days2", "Days3", "Days4"]
+_OPTIONAL_COLUMNS = [
+    "Units",
+    "Title",
+    "Topic",
+    "Description",
+    "Disciplines",
+    "Cost",
+    "Type",
+    *_INSTRUCTOR_COLUMNS,
+    *_DAYS_COLUMNS,
+]
+_STAFF_NAMES = {"Staff", "Faculty Staff", "Faculty"}
+
+# (first_name, last_name); STAFF is the "Staff" placeholder instructor.
+InstructorKey = tuple[str, str]
+STAFF: InstructorKey = ("", "Staff")
+
+
+def semester_number(year: int, season: str) -> int:
+    """SIS term number, e.g. (2024, "FALL") -> 1248."""
+    return int(f"1{str(year)[-2:]}{SEASON_CODES[season]}")
+
+
+def parse_units(raw) -> tuple[int, int]:
+    """Whole credits (min, max) from CSV Units; (0, 0) if missing or unparseable."""
+    if raw is None or (isinstance(raw, float) and math.isnan(raw)):
+        return 0, 0
+    try:
+        if pd.isna(raw):
+            return 0, 0
+    except (TypeError, ValueError):
+        pass
+    s = str(raw).strip()
+    if not s or s.lower() == "nan":
+        return 0, 0
+    for ch in ("\u2013", "\u2014", "\u2212"):
+        s = s.replace(ch, "-")
+
+    parts = re.split(r"\s*-\s*", s, maxsplit=1)
+    if len(parts) == 2:
+        try:
+            lo = int(round(float(parts[0].strip())))
+            hi = int(round(float(parts[1].strip())))
+            return min(lo, hi), max(lo, hi)
+        except ValueError:
+            pass
+    try:
+        n = int(round(float(s)))
+        return n, n
+    except ValueError:
+        pass
+
+    nums = re.findall(r"\d+\.?\d*|\.\d+", s)
+    if len(nums) >= 2:
+        try:
+            lo = int(round(float(nums[0])))
+            hi = int(round(float(nums[1])))
+            return min(lo, hi), max(lo, hi)
+        except ValueError:
+            pass
+    if len(nums) == 1:
+        try:
+            n = int(round(float(nums[0])))
+            return n, n
+        except ValueError:
+            pass
+    return 0, 0
+
+
+def parse_section_times(section_times: str) -> list[dict]:
+    """SectionTime field dicts from "MoWe 9:00am - 9:50am,..." (bad blocks skipped)."""
+    times = []
+    for time_block in section_times.split(","):
+        if not time_block.strip():
+            continue
+        try:
+            days_part, time_part = time_block.strip().split(" ", 1)
+            start_time, end_time = time_part.split(" - ")
+            times.append(
+                {
+                    "monday": "Mo" in days_part,
+                    "tuesday": "Tu" in days_part,
+                    "wednesday": "We" in days_part,
+                    "thursday": "Th" in days_part,
+                    "friday": "Fr" in days_part,
+                    "start_time": datetime.strptime(start_time, "%I:%M%p").time(),
+                    "end_time": datetime.strptime(end_time, "%I:%M%p").time(),
+                }
+            )
+        except (ValueError, IndexError):
+            continue
+    return times
+
+
+def parse_instructor_names(names: Iterable[str]) -> set[InstructorKey]:
+    """Instructor keys for one row's Instructor1-4 cells (``{STAFF}`` if none)."""
+    keys = set()
+    # In some old data files, multiple professors are in a single column
+    for cell in names:
+        for name in cell.split(","):
+            name = name.strip()
+            if not name:
+                continue
+            if name in _STAFF_NAMES:
+                keys.add(STAFF)
+            else:
+                parts = name.split()
+                keys.add((parts[0], parts[-1]))
+    return keys or {STAFF}
+
+
+def _text(value) -> str | None:
+    """CSV cell as a string, or None when it is blank."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value
+
+
+def _batched(items: list, size: int = BATCH_SIZE) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+# (mnemonic, number)
+CourseKey = tuple[str, int]
+
+
+@dataclass
+class CourseRows:
+    """What a term's rows say about one course, in the order they listed it."""
+
+    # The first row's title/description: a newer term overwrites with these.
+    first_title: str | None
+    first_description: str | None
+    # First non-blank values among all rows: used to fill in blanks.
+    title: str | None
+    description: str | None
+    # Discipline names from the last row that listed any.
+    disciplines: list[str] | None = None
+
+
+@dataclass
+class SectionDraft:
+    """A section resolved in memory, written once every chunk has been read."""
+
+    course_key: CourseKey
+    fields: dict
+    instructors: set[InstructorKey]
+    times: list[dict]
+
+
+@dataclass
+class ParsedTerm:
+    """One CSV parsed and merged without touching the database.
+
+    Built by ``parse_term``, possibly in a worker process.
+    """
+
+    path: str
+    year: int
+    season: str
+    rows: int = 0
+    skipped_rows: int = 0
+    courses: dict[CourseKey, CourseRows] = field(default_factory=dict)
+    sections: dict[int, SectionDraft] = field(default_factory=dict)
+    # In order of first appearance, so new instructors are created deterministically.
+    instructors: dict[InstructorKey, None] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+def _read_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    reader = pd.read_csv(
+        path,
+        dtype=str,
+        chunksize=chunk_size,
+        usecols=lambda column: column in {*_REQUIRED_COLUMNS, *_OPTIONAL_COLUMNS},
+    )
+    for chunk in reader:
+        for column in _OPTIONAL_COLUMNS:
+            if column not in chunk:
+                chunk[column] = None
+        yield chunk
+
+
+class RowFields(NamedTuple):
+    """One usable CSV row, parsed: what ``_merge_row`` needs from it."""
+
+    course_key: CourseKey
+    sis_number: int
+    title: str | None
+    description: str | None
+    # None when the row lists no disciplines.
+    disciplines: list[str] | None
+    # Section fields the row sets (blank cells left out).
+    values: dict
+    instructors: set[InstructorKey]
+    times: list[dict]
+
+
+def _csv_rows(path: str, chunk_size: int) -> Iterator[tuple[int, list[RowFields]]]:
+    """``(rows read, usable rows parsed)`` for each chunk of a semester CSV."""
+    for chunk in _read_chunks(path, chunk_size):
+        total = len(chunk)
+        chunk = chunk.dropna(subset=_REQUIRED_COLUMNS)
+        chunk = chunk.assign(
+            Number=chunk["Number"].str.replace(r"[^0-9]", "", regex=True),
+            ClassNumber=pd.to_numeric(chunk["ClassNumber"], errors="coerce"),
+        )
+        chunk = chunk[(chunk["Number"] != "") & chunk["ClassNumber"].notna()]
+        yield total, [_row_fields(row) for row in chunk.itertuples(index=False)]
+
+
+def _row_fields(row) -> RowFields:
+    instructors = parse_instructor_names(
+        name for name in (getattr(row, c) for c in _INSTRUCTOR_COLUMNS) if _text(name)
+    )
+    disciplines = _text(row.Disciplines)
+    units = _text(row.Units)
+    units_min, units_max = parse_units(units)
+    section_times = "".join(
+        f"{days}," for days in (getattr(row, c) for c in _DAYS_COLUMNS) if _text(days)
+    )
+    values = {
+        "topic": _text(row.Topic),
+        "units": units,
+        "units_min": units_min,
+        "units_max": units_max,
+        "section_type": _text(row.Type),
+        "section_times": section_times,
+        "cost": _text(row.Cost),
+    }
+    return RowFields(
+        course_key=(row.Mnemonic, int(row.Number)),
+        sis_number=int(row.ClassNumber),
+        title=_text(row.Title),
+        description=_text(row.Description),
+        disciplines=_split_disciplines(disciplines) if disciplines else None,
+        values={key: value for key, value in values.items() if value is not None},
+        instructors=instructors,
+        times=parse_section_times(section_times),
+    )
+
+
+def _split_disciplines(disciplines: str) -> list[str]:
+    return [name.strip() for name in disciplines.split("$") if name.strip()]
+
+
+def parse_term(
+    path: str, year: int, season: str, chunk_size: int = CHUNK_SIZE
+) -> ParsedTerm:
+    """Read, clean and merge the rows of one semester CSV or columnar table."""
+    started = time.perf_counter()
+    term = ParsedTerm(path, year, season)
+    if is_table(path):
+        table = read_table(path)
+        term.rows = table.meta["rows"]
+        term.skipped_rows = table.meta["skipped_rows"]
+        for fields in _table_rows(table):
+            _merge_row(term, fields)
+    else:
+        for total, rows in _csv_rows(path, chunk_size):
+            term.rows += total
+            term.skipped_rows += total - len(rows)
+            for fields in rows:
+                _merge_row(term, fields)
+    term.seconds = time.perf_counter() - started
+    return term
+
+
+def _merge_row(term: ParsedTerm, fields: RowFields) -> None:
+    term.instructors.update(dict.fromkeys(sorted(fields.instructors)))
+    _merge_course_row(term, fields)
+    _merge_section_row(term, fields)
+
+
+def _merge_course_row(term: ParsedTerm, fields: RowFields) -> None:
+    title, description = fields.title, fields.description
+    course = term.courses.get(fields.course_key)
+    if course is None:
+        course = term.courses[fields.course_key] = CourseRows(
+            title, description, title, description
+        )
+    course.title = course.title or title
+    course.description = course.description or description
+
+    if fields.disciplines is not None:
+        course.disciplines = list(fields.disciplines)
+
+
+def _merge_section_row(term: ParsedTerm, fields: RowFields) -> None:
+    draft = term.sections.get(fields.sis_number)
+    if draft is None:
+        term.sections[fields.sis_number] = SectionDraft(
+            fields.course_key,
+            dict(fields.values),
+            set(fields.instructors),
+            fields.times,
+        )
+        return
+    # A repeated section number updates the section and adds its instructors.
+    draft.course_key = fields.course_key
+    draft.fields.update(fields.values)
+    draft.instructors |= fields.instructors
+    draft.times = fields.times
+
+
+# Section fields stored as string columns in a term table.
+_TABLE_TEXT_FIELDS = ["topic", "units", "section_type", "section_times", "cost"]
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday"]
+
+
+def convert_term(csv_path: str, table_path: str, chunk_size: int = CHUNK_SIZE) -> int:
+    """Write a semester CSV as a columnar table (see ``ingest.columnar``).
+
+    Rows are cleaned and parsed exactly as ``parse_term`` does for the CSV;
+    units, meeting times and instructor names are stored already parsed, as
+    typed columns. Returns the number of usable rows.
+    """
+    columns = defaultdict(list)
+    instructor_offsets, time_offsets = [0], [0]
+    rows = skipped_rows = 0
+    for total, parsed in _csv_rows(csv_path, chunk_size):
+        rows += total
+        skipped_rows += total - len(parsed)
+        for fields in parsed:
+            columns["mnemonic"].append(fields.course_key[0])
+            columns["number"].append(fields.course_key[1])
+            columns["class_number"].append(fields.sis_number)
+            columns["title"].append(fields.title)
+            columns["description"].append(fields.description)
+            columns["disciplines"].append(
+                None if fields.disciplines is None else "$".join(fields.disciplines)
+            )
+            for name in _TABLE_TEXT_FIELDS:
+                columns[name].append(fields.values.get(name))
+            columns["units_min"].append(fields.values["units_min"])
+            columns["units_max"].append(fields.values["units_max"])
+            for first, last in sorted(fields.instructors):
+                columns["instructor_first"].append(first)
+                columns["instructor_last"].append(last)
+            instructor_offsets.append(len(columns["instructor_last"]))
+            for block in fields.times:
+                columns["time_days"].append(
+                    sum(1 << i for i, day in enumerate(_WEEKDAYS) if block[day])
+                )
+                columns["time_start"].append(_minutes(block["start_time"]))
+                columns["time_end"].append(_minutes(block["end_time"]))
+            time_offsets.append(len(columns["time_days"]))
+
+    typed = {
+        "number": np.int32,
+        "class_number": np.int32,
+        "units_min": np.int16,
+        "units_max": np.int16,
+        "time_days": np.uint8,
+        "time_start": np.int16,
+        "time_end": np.int16,
+    }
+    table = {
+        name: np.asarray(columns[name], dtype=typed[name])
+        if name in typed
+        else columns[name]
+        for name in (
+            "mnemonic",
+            "number",
+            "class_number",
+            "title",
+            "description",
+            "disciplines",
+            *_TABLE_TEXT_FIELDS,
+            "units_min",
+            "units_max",
+            "instructor_first",
+            "instructor_last",
+            "time_days",
+            "time_start",
+            "time_end",
+        )
+    }
+    table["instructor_offsets"] = np.asarray(instructor_offsets, dtype=np.int32)
+    table["time_offsets"] = np.asarray(time_offsets, dtype=np.int32)
+    write_table(
+        table_path,
+        table,
+        meta={"rows": rows, "skipped_rows": skipped_rows, **source_meta(csv_path)},
+    )
+    return len(columns["class_number"])
+
+
+def _minutes(value: dt_time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def _table_rows(table) -> Iterator[RowFields]:
+    """``RowFields`` of a table written by ``convert_term``, in row order."""
+    text = {name: table[name].decoded() for name in _TABLE_TEXT_FIELDS}
+    disciplines = table["disciplines"]
+    split = [
+        _split_disciplines(value) if value else None for value in disciplines.values
+    ]
+    discipline_codes = disciplines.codes.tolist()
+    first_names = table["instructor_first"].decoded()
+    last_names = table["instructor_last"].decoded()
+    instructor_offsets = table["instructor_offsets"].tolist()
+    time_days = table["time_days"].tolist()
+    time_start = table["time_start"].tolist()
+    time_end = table["time_end"].tolist()
+    time_offsets = table["time_offsets"].tolist()
+    # Meeting times repeat a lot: build each distinct block once.
+    blocks = {}
+
+    def block(i):
+        key = (time_days[i], time_start[i], time_end[i])
+        if key not in blocks:
+            days, start, end = key
+            blocks[key] = {
+                **{day: bool(days & (1 << n)) for n, day in enumerate(_WEEKDAYS)},
+                "start_time": dt_time(start // 60, start % 60),
+                "end_time": dt_time(end // 60, end % 60),
+            }
+        return dict(blocks[key])
+
+    rows = zip(
+        table["mnemonic"].decoded(),
+        table["number"].tolist(),
+        table["class_number"].tolist(),
+        table["title"].decoded(),
+        table["description"].decoded(),
+        discipline_codes,
+        table["units_min"].tolist(),
+        table["units_max"].tolist(),
+        strict=True,
+    )
+    for i, (
+        mnemonic,
+        number,
+        sis_number,
+        title,
+        description,
+        code,
+        lo,
+        hi,
+    ) in enumerate(rows):
+        values = {name: text[name][i] for name in _TABLE_TEXT_FIELDS}
+        values = {key: value for key, value in values.items() if value is not None}
+        values["units_min"], values["units_max"] = lo, hi
+        instructors = {
+            (first_names[j], last_names[j])
+            for j in range(instructor_offsets[i], instructor_offsets[i + 1])
+        }
+        yield RowFields(
+            course_key=(mnemonic, number),
+            sis_number=sis_number,
+            title=title,
+            description=description,
+            disciplines=None if code < 0 else split[code],
+            values=values,
+            instructors=instructors,
+            times=[block(j) for j in range(time_offsets[i], time_offsets[i + 1])],
+        )
+
+
+def _parse_term_args(args: tuple) -> ParsedTerm:
+    return parse_term(*args)
+
+
+@dataclass
+class LoadResult:
+    """What one semester file contributed to a load, and how fast."""
+
+    semester: Semester
+    rows: int = 0
+    skipped_rows: int = 0
+    sections: int = 0
+    section_times: int = 0
+    courses_created: int = 0
+    courses_updated: int = 0
+    instructors_created: int = 0
+    # Reconcile diff; in replace mode every section counts as inserted.
+    sections_inserted: int = 0
+    sections_updated: int = 0
+    sections_deleted: int = 0
+    sections_unchanged: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.semester}: {self.rows} rows -> {self.sections} sections, "
+            f"{self.section_times} meeting times, "
+            f"{self.courses_created} new / {self.courses_updated} updated courses, "
+            f"{self.instructors_created} new instructors "
+            f"in {self.seconds:.1f}s ({self.rows_per_second:,.0f} rows/s)"
+        )
+
+    def diff(self) -> str:
+        return (
+            f"{self.sections_inserted} inserted, {self.sections_updated} updated, "
+            f"{self.sections_deleted} deleted, {self.sections_unchanged} unchanged"
+        )
+
+
+@dataclass
+class BatchResult:
+    """Per-file results and per-stage wall time of ``SemesterLoader.load_many``."""
+
+    terms: list[LoadResult]
+    # "parse", "resolve" and "write" -> seconds
+    stages: dict[str, float] = field(default_factory=dict)
+
+    def timing(self) -> str:
+        rows = sum(term.rows for term in self.terms)
+        seconds = sum(self.stages.values())
+        rate = rows / seconds if seconds else 0.0
+        stages = ", ".join(f"{name} {sec:.1f}s" for name, sec in self.stages.items())
+        return f"{len(self.terms)} files, {rows} rows: {stages} ({rate:,.0f} rows/s)"
+
+
+@dataclass
+class _TermState:
+    """A parsed term and the semester it is being loaded into."""
+
+    parsed: ParsedTerm
+    semester: Semester
+    result: LoadResult
+
+
+@dataclass
+class _BatchState:
+    """Everything resolved so far across the terms of one load."""
+
+    terms: list[_TermState] = field(default_factory=list)
+    # Unsaved courses have pk None
+    courses: dict[CourseKey, Course] = field(default_factory=dict)
+    dirty_courses: set[CourseKey] = field(default_factory=set)
+    course_disciplines: dict[CourseKey, list[str]] = field(default_factory=dict)
+
+
+class SemesterLoader:
+    """Loads Lou's List CSV files into the catalog tables."""
+
+    def __init__(self, *, chunk_size: int = CHUNK_SIZE, reconcile=False, log=None):
+        self.chunk_size = chunk_size
+        self.reconcile = reconcile
+        self.log = log or (lambda message: None)
+        unknown_school, _ = School.objects.get_or_create(name="Miscellaneous")
+        self.unknown_department, _ = Department.objects.get_or_create(
+            name="Miscellaneous", school=unknown_school
+        )
+        self.staff, _ = Instructor.objects.get_or_create(last_name="Staff")
+        self.subdepartments = {
+            s.mnemonic: s for s in Subdepartment.objects.order_by("-pk")
+        }
+        self.disciplines = dict(Discipline.objects.values_list("name", "pk"))
+        # Oldest row wins when names are duplicated, like get_or_create's .get().
+        self.instructors: dict[InstructorKey, int | None] = {}
+        for pk, first, last in Instructor.objects.order_by("-pk").values_list(
+            "pk", "first_name", "last_name"
+        ):
+            self.instructors[(first, last)] = pk
+        self.instructors[STAFF] = self.staff.pk
+
+    def load(self, path: str, year: int, season: str) -> LoadResult:
+        """Load ``path`` as the sections of ``year``/``season``.
+
+        Replaces the term's sections, or reconciles them when the loader was
+        created with ``reconcile=True``.
+        """
+        started = time.perf_counter()
+        (result,) = self.load_many([(path, year, season)]).terms
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def load_many(
+        self, files: Iterable[tuple[str, int, str]], *, workers: int = 1
+    ) -> BatchResult:
+        """Load several ``(path, year, season)`` files as if one after another.
+
+        Files are parsed by up to ``workers`` processes, merged in the given
+        order, then written in one transaction. Each term's ``seconds`` is
+        its parse time.
+        """
+        batch = BatchResult(terms=[])
+
+        started = time.perf_counter()
+        parsed_terms = parallel_map(
+            _parse_term_args,
+            [(path, year, season, self.chunk_size) for path, year, season in files],
+            workers,
+        )
+        batch.stages["parse"] = time.perf_counter() - started
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            state = _BatchState()
+            for parsed in parsed_terms:
+                term = self._resolve_term(state, parsed)
+                batch.terms.append(term.result)
+            batch.stages["resolve"] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            self._write(state)
+            batch.stages["write"] = time.perf_counter() - started
+        return batch
+
+    # --- Resolution ------------------------------------------------------------
+
+    def _resolve_term(self, state: _BatchState, parsed: ParsedTerm) -> _TermState:
+        semester, _ = Semester.objects.get_or_create(
+            year=parsed.year,
+            season=parsed.season,
+            number=semester_number(parsed.year, parsed.season),
+        )
+        result = LoadResult(
+            semester,
+            rows=parsed.rows,
+            skipped_rows=parsed.skipped_rows,
+            seconds=parsed.seconds,
+        )
+        term = _TermState(parsed, semester, result)
+        state.terms.append(term)
+
+        for key in parsed.instructors:
+            if key not in self.instructors:
+                self.instructors[key] = None
+                result.instructors_created += 1
+        self._stage_subdepartments({mnemonic for mnemonic, _ in parsed.courses})
+        self._preload_courses(state, parsed.courses.keys())
+        for key, rows in parsed.courses.items():
+            self._resolve_course(state, term, key, rows)
+        return term
+
+    def _stage_subdepartments(self, mnemonics: set[str]) -> None:
+        missing = [
+            Subdepartment(mnemonic=m, department=self.unknown_department)
+            for m in sorted(mnemonics - self.subdepartments.keys())
+        ]
+        for subdepartment in Subdepartment.objects.bulk_create(missing):
+            self.subdepartments[subdepartment.mnemonic] = subdepartment
+
+    def _preload_courses(self, state: _BatchState, keys: Iterable[CourseKey]) -> None:
+        """Fetch the term's existing courses that are not cached yet (one query)."""
+        wanted = set(keys) - state.courses.keys()
+        if not wanted:
+            return
+        mnemonics = {
+            self.subdepartments[mnemonic].pk: mnemonic for mnemonic, _ in wanted
+        }
+        for course in Course.objects.filter(
+            subdepartment_id__in=mnemonics, number__in={key[1] for key in wanted}
+        ).select_related("semester_last_taught"):
+            key = (mnemonics[course.subdepartment_id], course.number)
+            if key in wanted:
+                state.courses.setdefault(key, course)
+
+    def _resolve_course(
+        self, state: _BatchState, term: _TermState, key: CourseKey, rows: CourseRows
+    ) -> None:
+        semester = term.semester
+        course = state.courses.get(key)
+        if course is None:
+            subdepartment = self.subdepartments[key[0]]
+            course = Course(
+                subdepartment=subdepartment,
+                number=key[1],
+                title=rows.first_title or "",
+                description=rows.first_description or "",
+                semester_last_taught=semester,
+                combined_mnemonic_number=f"{subdepartment.mnemonic} {key[1]}".strip(),
+            )
+            state.courses[key] = course
+            term.result.courses_created += 1
+
+        before = (course.title, course.description, course.semester_last_taught_id)
+        # The first row may take over a course from an older term; any later
+        # row only fills in blanks, so the first non-blank values stand in
+        # for all of them.
+        for title, description in (
+            (rows.first_title, rows.first_description),
+            (rows.title, rows.description),
+        ):
+            # fill in blank info
+            if not course.description and description:
+                course.description = description
+            if not course.title and title:
+                course.title = title
+            # update with new info if possible
+            if semester.is_after(course.semester_last_taught):
+                course.semester_last_taught = semester
+                if description:
+                    course.description = description
+                if title:
+                    course.title = title
+        after = (course.title, course.description, course.semester_last_taught_id)
+        if course.pk is not None and before != after:
+            state.dirty_courses.add(key)
+            term.result.courses_updated += 1
+
+        if rows.disciplines is not None:
+            state.course_disciplines[key] = rows.disciplines
+
+    # --- Writing ---------------------------------------------------------------
+
+    def _write(self, state: _BatchState) -> None:
+        self._write_instructors()
+        self._write_disciplines(state)
+
+        new_courses = [c for c in state.courses.values() if c.pk is None]
+        Course.objects.bulk_create(new_courses, batch_size=BATCH_SIZE)
+        Course.objects.bulk_update(
+            [state.courses[key] for key in state.dirty_courses],
+            ["title", "description", "semester_last_taught"],
+            batch_size=BATCH_SIZE,
+        )
+        self._write_course_disciplines(state)
+
+        for term in state.terms:
+            sections = term.parsed.sections
+            if self.reconcile:
+                self._reconcile_sections(state, term)
+            else:
+                self.log(f"Deleting existing sections for {term.semester}...")
+                Section.objects.filter(semester=term.semester).delete()
+                inserted = self._insert_sections(state, term, sections)
+                term.result.sections_inserted = len(inserted)
+            term.result.sections = len(sections)
+            term.result.section_times = sum(
+                len(draft.times) for draft in sections.values()
+            )
+
+    def _write_instructors(self) -> None:
+        missing = [key for key, pk in self.instructors.items() if pk is None]
+        created = Instructor.objects.bulk_create(
+            [
+                Instructor(
+                    first_name=first,
+                    last_name=last,
+                    full_name=f"{first} {last}".strip(),
+                )
+                for first, last in missing
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        for instructor in created:
+            self.instructors[(instructor.first_name, instructor.last_name)] = (
+                instructor.pk
+            )
+
+    def _write_disciplines(self, state: _BatchState) -> None:
+        names = {
+            name for listed in state.course_disciplines.values() for name in listed
+        }
+        missing = sorted(names - self.disciplines.keys())
+        for discipline in Discipline.objects.bulk_create(
+            [Discipline(name=name) for name in missing], batch_size=BATCH_SIZE
+        ):
+            self.disciplines[discipline.name] = discipline.pk
+
+    def _write_course_disciplines(self, state: _BatchState) -> None:
+        """``course.disciplines.set(...)`` for every course that listed some."""
+        through = Course.disciplines.through
+        wanted = {
+            state.courses[key].pk: {self.disciplines[name] for name in names}
+            for key, names in state.course_disciplines.items()
+        }
+        current: dict[int, set[int]] = {}
+        for course_id, discipline_id in through.objects.filter(
+            course_id__in=wanted
+        ).values_list("course_id", "discipline_id"):
+            current.setdefault(course_id, set()).add(discipline_id)
+
+        stale = [
+            Q(course_id=course_id, discipline_id=discipline_id)
+            for course_id, have in current.items()
+            for discipline_id in have - wanted[course_id]
+        ]
+        for batch in _batched(stale, 500):
+            through.objects.filter(reduce(operator.or_, batch)).delete()
+        through.objects.bulk_create(
+            [
+                through(course_id=course_id, discipline_id=discipline_id)
+                for course_id, want in wanted.items()
+                for discipline_id in sorted(want - current.get(course_id, set()))
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+    def _section(
+        self, state: _BatchState, term: _TermState, sis_number: int, draft
+    ) -> Section:
+        """Unsaved ``Section`` for ``draft`` with its occupancy and source hash."""
+        fields = {**SECTION_DEFAULTS, **draft.fields}
+        course = state.courses[draft.course_key]
+        instructor_ids = sorted(self.instructors[key] for key in draft.instructors)
+        section = Section(
+            sis_section_number=sis_number,
+            semester=term.semester,
+            course=course,
+            **fields,
+        )
+        # Conflict checks AND these bitmaps instead of re-parsing the times
+        section.weekly_occupancy = section_occupancy(
+            [SectionTime(**values) for values in draft.times], section.section_times
+        )
+        content = repr(
+            (
+                course.pk,
+                sorted(fields.items()),
+                instructor_ids,
+                [sorted(values.items()) for values in draft.times],
+            )
+        )
+        section.source_hash = hashlib.md5(
+            content.encode(), usedforsecurity=False
+        ).hexdigest()
+        return section
+
+    def _reconcile_sections(self, state: _BatchState, term: _TermState) -> None:
+        """Insert, update and delete only the sections whose content changed."""
+        result = term.result
+        drafts = term.parsed.sections
+        existing = {
+            sis_number: (pk, source_hash)
+            for pk, sis_number, source_hash in Section.objects.filter(
+                semester=term.semester
+            ).values_list("pk", "sis_section_number", "source_hash")
+        }
+
+        stale_ids = [
+            pk for sis_number, (pk, _) in existing.items() if sis_number not in drafts
+        ]
+        for batch in _batched(stale_ids):
+            Section.objects.filter(pk__in=batch).delete()
+        result.sections_deleted = len(stale_ids)
+
+        new_drafts = {}
+        changed = []
+        for sis_number, draft in drafts.items():
+            if sis_number not in existing:
+                new_drafts[sis_number] = draft
+                continue
+            section = self._section(state, term, sis_number, draft)
+            section.pk, source_hash = existing[sis_number]
+            if section.source_hash == source_hash:
+                result.sections_unchanged += 1
+            else:
+                changed.append((section, draft))
+
+        sections = [section for section, _ in changed]
+        Section.objects.bulk_update(
+            sections,
+            ["course", *SECTION_DEFAULTS, "weekly_occupancy", "source_hash"],
+            batch_size=BATCH_SIZE,
+        )
+        for batch in _batched([section.pk for section in sections]):
+            Section.instructors.through.objects.filter(section_id__in=batch).delete()
+            SectionTime.objects.filter(section_id__in=batch).delete()
+        self._write_section_children(changed)
+        result.sections_updated = len(changed)
+
+        inserted = self._insert_sections(state, term, new_drafts)
+        result.sections_inserted = len(inserted)
+
+    def _insert_sections(
+        self, state: _BatchState, term: _TermState, drafts: dict[int, SectionDraft]
+    ) -> list[Section]:
+        sections = [
+            self._section(state, term, sis_number, draft)
+            for sis_number, draft in drafts.items()
+        ]
+        Section.objects.bulk_create(sections, batch_size=BATCH_SIZE)
+        self._write_section_children(list(zip(sections, drafts.values(), strict=True)))
+        return sections
+
+    def _write_section_children(
+        self, sections: list[tuple[Section, SectionDraft]]
+    ) -> None:
+        """Instructor links and meeting times of freshly written sections."""
+        through = Section.instructors.through
+        through.objects.bulk_create(
+            [
+                through(section_id=section.pk, instructor_id=self.instructors[key])
+                for section, draft in sections
+                for key in sorted(draft.instructors)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        section_times = [
+            SectionTime(section=section, **values)
+            for section, draft in sections
+            for values in draft.times
+        ]
+        SectionTime.objects.bulk_create(section_times, batch_size=BATCH_SIZE)
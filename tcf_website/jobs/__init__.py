@@ -0,0 +1,25 @@
+"""Background job queue on PostgreSQL, run by the ``run_worker`` command."""
+
+from .queue import (
+    BatchResult,
+    backoff,
+    claim,
+    enqueue,
+    enqueue_many,
+    get_handler,
+    register,
+    register_invalidation,
+    run_batch,
+)
+
+__all__ = [
+    "BatchResult",
+    "backoff",
+    "claim",
+    "enqueue",
+    "enqueue_many",
+    "get_handler",
+    "register",
+    "register_invalidation",
+    "run_batch",
+]
@@ -0,0 +1,235 @@
+"""Background jobs stored in PostgreSQL (``Job`` rows); no broker needed.
+
+``enqueue``/``enqueue_many`` insert rows in the caller's transaction, so a job
+exists exactly when the write that needed it commits. ``dedupe_key`` (a
+format string over the payload) collapses repeat requests: while a job with
+the same key is still queued, further ones are dropped.
+
+``run_batch`` claims due jobs with ``FOR UPDATE SKIP LOCKED``, so any number
+of ``run_worker`` processes can share the queue. Claimed jobs of the same
+name run as one handler call, which lets stats refreshes stay batched; if
+that call fails, the jobs are run again one at a time so only the ones that
+fail on their own are charged with it. A failed job is retried with
+exponential backoff until ``max_attempts``. A worker that dies mid-job leaves
+it RUNNING until ``LEASE`` expires, after which it is claimed again, or
+marked FAILED if that was its last attempt. Handlers must therefore be
+idempotent.
+
+With ``settings.JOBS_EAGER`` (the default outside production) enqueueing
+runs the handler inline instead.
+"""
+
+import logging
+from collections.abc import Callable, Iterable
+from datetime import timedelta
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Job
+
+logger = logging.getLogger(__name__)
+
+LEASE = timedelta(minutes=10)
+BACKOFF_BASE = timedelta(seconds=30)
+MAX_BACKOFF = timedelta(hours=1)
+MAX_ATTEMPTS = 5
+
+# Job name -> function taking the payloads of every claimed job of that name.
+_HANDLERS: dict[str, Callable[[list[dict]], None]] = {}
+
+
+def register(name: str):
+    """Decorator registering a handler for jobs called ``name``."""
+
+    def decorator(func):
+        _HANDLERS[name] = func
+        return func
+
+    return decorator
+
+
+def register_invalidation(name: str, invalidate: Callable[[], None]) -> None:
+    """Register ``name`` as a job that calls ``invalidate()`` once per batch.
+
+    For cache version bumps queued by bulk loads, which skip the model
+    signals that normally trigger them; payloads are ignored.
+    """
+    register(name)(lambda payloads: invalidate())
+
+
+def get_handler(name: str) -> Callable[[list[dict]], None]:
+    """The handler registered for ``name``; LookupError if there is none."""
+    try:
+        return _HANDLERS[name]
+    except KeyError:
+        raise LookupError(f"No job handler registered for {name!r}") from None
+
+
+def enqueue_many(
+    name: str,
+    payloads: Iterable[dict],
+    *,
+    dedupe_key: str | None = None,
+    delay: timedelta = timedelta(),
+    max_attempts: int = MAX_ATTEMPTS,
+) -> int:
+    """Queue one ``name`` job per payload; returns how many were requested.
+
+    ``dedupe_key`` is formatted with each payload, e.g.
+    ``"stats.courses:{course_id}"``.
+    """
+    payloads = list(payloads)
+    if not payloads:
+        return 0
+    if settings.JOBS_EAGER:
+        get_handler(name)(payloads)
+        return len(payloads)
+    run_at = timezone.now() + delay
+    Job.objects.bulk_create(
+        [
+            Job(
+                name=name,
+                payload=payload,
+                dedupe_key=dedupe_key.format(**payload) if dedupe_key else None,
+                run_at=run_at,
+                max_attempts=max_attempts,
+            )
+            for payload in payloads
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    return len(payloads)
+
+
+def enqueue(name: str, payload: dict | None = None, **kwargs) -> int:
+    """Queue a single job; see ``enqueue_many``."""
+    return enqueue_many(name, [payload or {}], **kwargs)
+
+
+_CLAIM_SQL = """
+WITH due AS (
+    SELECT id
+    FROM tcf_website_job
+    WHERE status IN (%(queued)s, %(running)s)
+      AND run_at <= %(now)s
+      AND (%(names)s::text[] IS NULL OR name = ANY(%(names)s::text[]))
+    ORDER BY run_at, id
+    LIMIT %(limit)s
+    FOR UPDATE SKIP LOCKED
+)
+UPDATE tcf_website_job AS job
+SET status = %(running)s, attempts = job.attempts + 1, run_at = %(lease_until)s
+FROM due
+WHERE job.id = due.id
+RETURNING job.id
+"""
+
+
+def claim(limit: int, *, names: list[str] | None = None, lease=LEASE) -> list[Job]:
+    """Mark up to ``limit`` due jobs RUNNING for ``lease`` and return them.
+
+    Jobs whose lease ran out on their last attempt are marked FAILED instead.
+    """
+    now = timezone.now()
+    lost = Job.objects.filter(
+        status=Job.Status.RUNNING, run_at__lte=now, attempts__gte=F("max_attempts")
+    )
+    if names is not None:
+        lost = lost.filter(name__in=names)
+    with transaction.atomic(), connection.cursor() as cursor:
+        expired = lost.update(
+            status=Job.Status.FAILED, last_error="Lease expired on the last attempt"
+        )
+        if expired:
+            logger.error("%d job(s) failed: lease expired on the last attempt", expired)
+        cursor.execute(
+            _CLAIM_SQL,
+            {
+                "queued": Job.Status.QUEUED,
+                "running": Job.Status.RUNNING,
+                "now": now,
+                "names": names,
+                "limit": limit,
+                "lease_until": now + lease,
+            },
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+    return list(Job.objects.filter(pk__in=ids).order_by("run_at", "id"))
+
+
+def backoff(attempts: int) -> timedelta:
+    """Delay before retrying a job that has failed ``attempts`` times."""
+    return min(BACKOFF_BASE * 2 ** max(attempts - 1, 0), MAX_BACKOFF)
+
+
+def _fail(job: Job, error: str) -> bool:
+    """Requeue ``job`` after backoff, or mark it FAILED; True if it will retry."""
+    if job.attempts >= job.max_attempts:
+        Job.objects.filter(pk=job.pk).update(status=Job.Status.FAILED, last_error=error)
+        return False
+    try:
+        with transaction.atomic():
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.Status.QUEUED,
+                run_at=timezone.now() + backoff(job.attempts),
+                last_error=error,
+            )
+    except IntegrityError:
+        # A job with the same dedupe key was queued meanwhile and covers this one.
+        Job.objects.filter(pk=job.pk).delete()
+    return True
+
+
+class BatchResult(NamedTuple):
+    """Outcome of one ``run_batch``."""
+
+    done: int
+    retried: int
+    failed: int
+
+
+def _run_jobs(name: str, jobs: list[Job]) -> None:
+    """Run ``jobs`` as one handler call and delete them, all or nothing."""
+    with transaction.atomic():
+        get_handler(name)([job.payload for job in jobs])
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+
+
+def run_batch(limit: int = 100, *, names: list[str] | None = None) -> BatchResult:
+    """Claim up to ``limit`` due jobs, run them grouped by name, record results."""
+    groups: dict[str, list[Job]] = {}
+    for job in claim(limit, names=names):
+        groups.setdefault(job.name, []).append(job)
+    done = retried = failed = 0
+    for name, jobs in groups.items():
+        failures: list[tuple[Job, Exception]] = []
+        try:
+            _run_jobs(name, jobs)
+        except Exception as exc:
+            if len(jobs) == 1:
+                failures.append((jobs[0], exc))
+            else:
+                logger.warning(
+                    "Job %s failed for %d jobs; running them one at a time",
+                    name,
+                    len(jobs),
+                    exc_info=True,
+                )
+                for job in jobs:
+                    try:
+                        _run_jobs(name, [job])
+                    except Exception as job_exc:
+                        failures.append((job, job_exc))
+        done += len(jobs) - len(failures)
+        for job, exc in failures:
+            logger.error("Job %s #%s failed", name, job.pk, exc_info=exc)
+            if _fail(job, f"{type(exc).__name__}: {exc}"):
+                retried += 1
+            else:
+                failed += 1
+    return BatchResult(done, retried, failed)
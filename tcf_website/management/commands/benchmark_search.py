@@ -0,0 +1,113 @@
+"""Compare trigram search plans and latency with and without the ``%`` prefilter.
+
+For each search term and each searched column set (courses, instructors,
+clubs) this runs ``EXPLAIN (ANALYZE, FORMAT JSON)`` on the old form (score
+every row with ``similarity()`` and filter on the score) and on the current
+form (``%`` candidate filter from the ``gin_trgm_ops`` indexes, then score).
+Run it against a production-sized database (e.g. a restored dump) for
+meaningful numbers; on a near-empty database the planner prefers seq scans.
+
+Usage:
+  python manage.py benchmark_search
+  python manage.py benchmark_search --term "CS 2150" --term algorithms --repeat 5
+"""
+
+import json
+import statistics
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.management.base import BaseCommand
+from django.db.models import FloatField
+from django.db.models.functions import Greatest
+
+from tcf_website.models import Club, Course, Instructor
+from tcf_website.search.trigram import trigram_match_any
+
+DEFAULT_TERMS = ("CS 2150", "algorithms", "intro to programming", "smith", "dance")
+
+# label -> (model, trigram-indexed columns, threshold used by the search view)
+TARGETS = {
+    "courses": (Course, ("combined_mnemonic_number", "title"), 0.15),
+    "instructors": (Instructor, ("first_name", "last_name", "full_name"), 0.5),
+    "clubs": (Club, ("combined_name",), 0.15),
+}
+
+
+def _score(fields, term):
+    scores = [TrigramSimilarity(name, term) for name in fields]
+    if len(scores) == 1:
+        return scores[0]
+    return Greatest(*scores, output_field=FloatField())
+
+
+def _querysets(model, fields, threshold, term):
+    legacy = (
+        model.objects.annotate(score=_score(fields, term))
+        .filter(score__gte=threshold)
+        .order_by("-score")
+    )
+    indexed = (
+        model.objects.filter(trigram_match_any(fields, term))
+        .annotate(score=_score(fields, term))
+        .filter(score__gte=threshold)
+        .order_by("-score")
+    )
+    return legacy, indexed
+
+
+def _scan_nodes(plan) -> set[str]:
+    """Node types that read a table (Seq Scan, Bitmap Index Scan, ...)."""
+    nodes = set()
+    if "Scan" in plan["Node Type"]:
+        nodes.add(plan["Node Type"])
+    for child in plan.get("Plans", ()):
+        nodes |= _scan_nodes(child)
+    return nodes
+
+
+def _measure(queryset, repeat):
+    timings = []
+    for _ in range(repeat):
+        plan = json.loads(queryset.explain(analyze=True, format="json"))[0]
+        timings.append(plan["Execution Time"])
+    return statistics.median(timings), plan["Plan"]
+
+
+class Command(BaseCommand):
+    help = "Benchmark index-assisted trigram search against full-scan scoring"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--term",
+            action="append",
+            dest="terms",
+            help="Search term (repeatable); defaults to a fixed sample",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Runs per query; the median execution time is reported",
+        )
+
+    def handle(self, *args, **options):
+        terms = options["terms"] or DEFAULT_TERMS
+        repeat = max(1, options["repeat"])
+
+        for label, (model, _, _) in TARGETS.items():
+            self.stdout.write(f"{label}: {model.objects.count()} rows")
+
+        for term in terms:
+            self.stdout.write(f"\n{term!r}")
+            for label, (model, fields, threshold) in TARGETS.items():
+                legacy, indexed = _querysets(model, fields, threshold, term)
+                legacy_ms, legacy_plan = _measure(legacy, repeat)
+                indexed_ms, indexed_plan = _measure(indexed, repeat)
+                speedup = legacy_ms / indexed_ms if indexed_ms else float("inf")
+                self.stdout.write(
+                    f"  {label:<12} rows={indexed_plan['Actual Rows']:<6} "
+                    f"scan {legacy_ms:8.2f} ms -> index {indexed_ms:8.2f} ms "
+                    f"({speedup:.1f}x)  "
+                    f"[{', '.join(sorted(_scan_nodes(legacy_plan)))}] -> "
+                    f"[{', '.join(sorted(_scan_nodes(indexed_plan)))}]"
+                )
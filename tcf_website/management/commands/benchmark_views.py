@@ -0,0 +1,102 @@
+"""Time the hot views and record p50/p95 latency and query counts as JSON.
+
+Requests search and autocomplete, browse (advanced search), course,
+course_instructor, instructor, department and the schedule builder in
+process through the test client (see ``tcf_website.bench.runner``). Run it
+on a large data set (``generate_synthetic_catalog`` or a restored dump) with
+DEBUG off, since the debug toolbar dominates timings otherwise; reports
+record both the data set's row counts and DEBUG.
+
+Usage:
+  # Save a baseline
+  python manage.py benchmark_views --output bench/main.json
+
+  # Compare the working tree with it; exit non-zero on regressions
+  python manage.py benchmark_views --compare bench/main.json --fail-on-regression
+
+  # A subset, more runs
+  python manage.py benchmark_views --only course --only search_code --repeat 50
+"""
+
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tcf_website.bench import build_report, compare, default_probes, run_probes
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the hot views and writes or compares a JSON baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat", type=int, default=20, help="Timed requests per view"
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=2, help="Untimed requests per view first"
+        )
+        parser.add_argument(
+            "--only",
+            action="append",
+            help="Only run this view (repeatable), e.g. course or schedule_builder",
+        )
+        parser.add_argument("--output", help="Write the report to this JSON file")
+        parser.add_argument("--compare", help="Baseline JSON report to compare with")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Allowed p95 growth before a view counts as regressed (default: 0.2)",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error if --compare finds a regression",
+        )
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stderr.write(
+                "warning: DEBUG is on; timings include the debug toolbar."
+            )
+        probes = default_probes()
+        if options["only"]:
+            unknown = set(options["only"]) - {probe.name for probe in probes}
+            if unknown:
+                raise CommandError(f"Unknown or unavailable view(s): {sorted(unknown)}")
+            probes = [probe for probe in probes if probe.name in options["only"]]
+        if not probes:
+            raise CommandError("Nothing to benchmark; load some data first.")
+
+        repeat = max(1, options["repeat"])
+        warmup = max(0, options["warmup"])
+
+        def log(result):
+            self.stdout.write(
+                f"{result.name:<18} {result.status}  p50 {result.p50_ms:8.1f} ms  "
+                f"p95 {result.p95_ms:8.1f} ms  {result.queries:4} queries"
+            )
+
+        results = run_probes(probes, repeat=repeat, warmup=warmup, log=log)
+        report = build_report(results, repeat=repeat, warmup=warmup)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(f"Wrote {options['output']}")
+
+        failed = [result.name for result in results if result.status != 200]
+        if failed:
+            raise CommandError(f"Non-200 responses from: {', '.join(failed)}")
+
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as handle:
+                baseline = json.load(handle)
+            lines, regressions = compare(
+                baseline, report, tolerance=options["tolerance"]
+            )
+            self.stdout.write(f"\nCompared with {options['compare']}:")
+            for line in lines:
+                self.stdout.write(line)
+            if regressions and options["fail_on_regression"]:
+                raise CommandError(f"Regressed: {', '.join(regressions)}")
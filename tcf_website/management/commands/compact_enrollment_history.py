@@ -0,0 +1,42 @@
+"""Thin the enrollment history of past terms.
+
+The newest terms keep every snapshot; the next ones keep the last snapshot of
+each section per hour, and older ones per day (see
+``tcf_website.enrollment.history``).
+
+Usage:
+  python manage.py compact_enrollment_history
+  python manage.py compact_enrollment_history --raw-terms 1 --hourly-terms 3
+"""
+
+from django.core.management.base import BaseCommand
+
+from tcf_website.enrollment import compact_history
+
+
+class Command(BaseCommand):
+    """Management command: downsample EnrollmentSnapshot rows of old terms."""
+
+    help = "Downsample enrollment history of past terms to hourly/daily snapshots"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--raw-terms",
+            type=int,
+            default=2,
+            help="Newest terms to keep at full resolution",
+        )
+        parser.add_argument(
+            "--hourly-terms",
+            type=int,
+            default=2,
+            help="Terms after those to keep at hourly resolution; older are daily",
+        )
+
+    def handle(self, *args, **options):
+        removed = compact_history(
+            raw_terms=options["raw_terms"], hourly_terms=options["hourly_terms"]
+        )
+        for semester, count in removed.items():
+            self.stdout.write(f"{semester}: removed {count} snapshots")
+        self.stdout.write(f"Removed {sum(removed.values())} snapshots in total")
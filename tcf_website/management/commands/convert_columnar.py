@@ -0,0 +1,88 @@
+"""Convert the semester and grade CSV archives to columnar tables.
+
+load_semester and load_grades read a term's table instead of its CSV when
+the table is up to date, which skips CSV parsing (and, for semesters, the
+parsing of units, meeting times and instructor names) on every load.
+fetch_data writes the table for the terms it fetches; this command covers
+the rest of the archive.
+
+Usage:
+  python manage.py convert_columnar            # convert new or changed CSVs
+  python manage.py convert_columnar --force    # convert everything
+"""
+
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from tcf_website.ingest import convert_term, is_fresh
+
+from . import load_grades, load_semester
+
+
+def _size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(
+        os.path.getsize(os.path.join(root, file))
+        for root, _, files in os.walk(path)
+        for file in files
+    )
+
+
+class Command(BaseCommand):
+    """Management command: write columnar copies of the data CSVs."""
+
+    help = "Converts semester and grade CSVs to columnar tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Convert CSVs whose table is already up to date too",
+        )
+        parser.add_argument(
+            "--only",
+            choices=["semesters", "grades"],
+            help="Convert only one of the archives",
+        )
+
+    def handle(self, *args, **options):
+        archives = {
+            "semesters": (
+                load_semester.DATA_DIR,
+                load_semester.COLUMNAR_DIR,
+                convert_term,
+            ),
+            "grades": (
+                load_grades.DATA_DIR,
+                load_grades.COLUMNAR_DIR,
+                load_grades.convert_grade_file,
+            ),
+        }
+        for name, (data_dir, columnar_dir, convert) in archives.items():
+            if options["only"] not in (None, name):
+                continue
+            os.makedirs(columnar_dir, exist_ok=True)
+            started = time.perf_counter()
+            converted = csv_bytes = table_bytes = 0
+            for file in sorted(os.listdir(data_dir)):
+                if file[0] in (".", "~") or not file.endswith(".csv"):
+                    continue
+                path = os.path.join(data_dir, file)
+                table = os.path.join(columnar_dir, file.removesuffix(".csv"))
+                if not options["force"] and is_fresh(table, path):
+                    continue
+                rows = convert(path, table)
+                converted += 1
+                csv_bytes += _size(path)
+                table_bytes += _size(table)
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"{file}: {rows} rows")
+            self.stdout.write(
+                f"{name}: converted {converted} files in "
+                f"{time.perf_counter() - started:.1f}s "
+                f"({csv_bytes / 2**20:.1f} MB of CSV -> "
+                f"{table_bytes / 2**20:.1f} MB)"
+            )
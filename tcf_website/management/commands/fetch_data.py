@@ -6,6 +6,10 @@ docker exec -it tcf_django python manage.py fetch_data "<year>_<season>"
 
 Example:
 docker exec -it tcf_django python manage.py fetch_data "2023_spring"
+
+Responses are cached under semester_data/cache/<term>/, so a re-run only
+requests the details of classes whose listing changed. After a failure,
+add --resume to skip the listing pages that already finished.
 """
 
 # Classes intended stream finds each department, from there make a query to find each class in the department,
@@ -13,9 +17,14 @@ docker exec -it tcf_django python manage.py fetch_data "2023_spring"
 # using the course_nbr variable. Then this data is written to a csv.
 
 import csv
+import hashlib
 import json
 import os
+import threading
 from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
 
 import backoff
 
@@ -23,9 +32,11 @@ import backoff
 # example call url
 # -https://sisuva.admin.virginia.edu/psc/ihprd/UVSS/SA/s/WEBLIB_HCX_CM.H_CLASS_SEARCH.FieldFormula.IScript_ClassDetails?institution=UVA01&term=1242&class_nbr=16634&
 import requests
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from tqdm import tqdm
 
+from tcf_website.ingest import convert_term
+
 # url to find all courses in department for a semester to update semester Replace 1228 with the appropriate term.
 # The formula is "1" + [2 digit year] + [2 for Spring, 8 for Fall]. So, 1228 is Fall 2022.
 # todo find out which is used for j term/summer probably 0,4, or 6?
@@ -36,6 +47,120 @@ from tqdm import tqdm
 
 session = requests.session()
 TIMEOUT = 300
+PAGE_WORKERS = 10
+API_URL = (
+    "https://sisuva.admin.virginia.edu/psc/ihprd/UVSS/SA/s/"
+    "WEBLIB_HCX_CM.H_CLASS_SEARCH.FieldFormula"
+)
+
+
+class ResponseCache:
+    """On-disk cache of one term's SIS class details, with crawl progress.
+
+    Responses are stored content-addressed (``objects/<sha256>.json``);
+    ``manifest.json`` maps each class number to the hash of its entry in the
+    class search listing and of its details response, and records which
+    listing pages are done. A class whose listing entry hashes the same as
+    last time is not requested again.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.root / "manifest.json"
+        self.lock = threading.Lock()
+        self.manifest: dict[str, Any]
+        try:
+            with open(self.manifest_path, encoding="utf-8") as file:
+                self.manifest = json.load(file)
+        except (FileNotFoundError, ValueError):
+            self.manifest = {"page_count": None, "pages": {}, "classes": {}}
+
+    @staticmethod
+    def digest(data) -> str:
+        """Content hash of a JSON-compatible value."""
+        encoded = json.dumps(data, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def _write(self, path, data):
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(tmp, path)
+
+    def put(self, data) -> str:
+        """Store a response and return its hash."""
+        digest = self.digest(data)
+        path = self.objects / f"{digest}.json"
+        if not path.exists():
+            self._write(path, data)
+        return digest
+
+    def get(self, digest):
+        """Stored response with hash ``digest``."""
+        with open(self.objects / f"{digest}.json", encoding="utf-8") as file:
+            return json.load(file)
+
+    def lookup(self, class_nbr, listing_digest) -> str | None:
+        """Hash of the cached details of a class if its listing is unchanged."""
+        entry = self.manifest["classes"].get(str(class_nbr))
+        if entry is None or entry["listing"] != listing_digest:
+            return None
+        if not (self.objects / f"{entry['details']}.json").exists():
+            return None
+        return entry["details"]
+
+    def remember(self, class_nbr, listing_digest, details_digest):
+        """Record the details fetched for a class listing."""
+        with self.lock:
+            self.manifest["classes"][str(class_nbr)] = {
+                "listing": listing_digest,
+                "details": details_digest,
+            }
+
+    def start(self, page_count, resume):
+        """Begin a crawl, keeping finished pages only when resuming the same crawl."""
+        with self.lock:
+            if not resume or self.manifest["page_count"] != page_count:
+                self.manifest["pages"] = {}
+            self.manifest["page_count"] = page_count
+            self.save()
+
+    def pending_pages(self) -> list[int]:
+        """Listing pages not finished yet."""
+        done = self.manifest["pages"]
+        return [
+            page
+            for page in range(1, self.manifest["page_count"] + 1)
+            if str(page) not in done
+        ]
+
+    def complete_page(self, page, class_numbers):
+        """Checkpoint a page whose classes are all cached."""
+        with self.lock:
+            self.manifest["pages"][str(page)] = class_numbers
+            self.save()
+
+    def save(self):
+        self._write(self.manifest_path, self.manifest)
+
+    def details(self):
+        """``(class_nbr, details)`` of every class, in listing order."""
+        for page in range(1, self.manifest["page_count"] + 1):
+            for class_nbr in self.manifest["pages"][str(page)]:
+                entry = self.manifest["classes"][str(class_nbr)]
+                yield class_nbr, self.get(entry["details"])
+
+
+@dataclass
+class PageResult:
+    """Outcome of crawling one listing page."""
+
+    page: int
+    complete: bool = False
+    fetched: int = 0
+    cached: int = 0
 
 
 @backoff.on_exception(
@@ -43,59 +168,120 @@ TIMEOUT = 300
     (requests.exceptions.Timeout, requests.exceptions.ConnectionError),
     max_tries=5,
 )
-def retrieve_and_write_semester_courses(csv_path, sem_code, pages=None):
-    """
-    input: semester using the formula  "1" + [2 digit year] + [2 for Spring, 8 for Fall]. So, 1228 is Fall 2022.
-    output: list of dictionaries where each dictionary is all a course's information for the csv writing
-    functionality: connects with sis API and looks at each class. It finds each course's course-number then passes it to compile_course_data
-     which returns a dictionary of all of a course's information, which is added to a list containing the course info for all classes.
-     This is done using a page by page approach where all the courses are analyzed one page at a time.
-    """
-    semester_url = (
-        f"https://sisuva.admin.virginia.edu/psc/ihprd/UVSS/SA/s/"
-        f"WEBLIB_HCX_CM.H_CLASS_SEARCH.FieldFormula.IScript_ClassSearch?"
-        f"institution=UVA01&term={sem_code}&page="
-    )
+def _get_json(url, params):
+    response = session.get(url, params=params, timeout=TIMEOUT)
+    return json.loads(response.text)
+
 
-    # Extract total number of pages from the first page
+def get_json(url, params):
+    """Decoded JSON response, or None if the request failed."""
     try:
-        response = session.get(semester_url, timeout=TIMEOUT)
-        page_data = json.loads(response.text)
-        total_pages = int(page_data["pageCount"])
-    except requests.exceptions.RequestException as e:
-        print(f"An error occurred: {e}")
-
-    print(f"Total pages: {total_pages}")
-
-    for page in tqdm(range(1, total_pages + 1)):
-        # print(f"\nFetching page {page}...")
-        all_classes = []
-        page_url = semester_url + str(page)
-        try:
-            response = session.get(page_url, timeout=TIMEOUT)
-            page_data = json.loads(response.text)
-        except requests.exceptions.RequestException as e:
-            print(f"An error occurred: {e}")
-            break
+        return _get_json(url, params)
+    except (requests.exceptions.RequestException, ValueError):
+        return None
 
-        if not page_data:
-            break
 
-        requests_to_make = [
-            (course["class_nbr"], sem_code) for course in page_data["classes"]
-        ]
+def fetch_page(cache, sem_code, page, api_url=API_URL):
+    """Fetch one listing page and the details of its new or changed classes.
 
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            all_classes = executor.map(
-                lambda params: compile_course_data(*params),
-                requests_to_make,
-            )
+    The page is checkpointed only when every class on it is cached, so a
+    resumed crawl retries it otherwise.
+    """
+    result = PageResult(page)
+    data = get_json(
+        f"{api_url}.IScript_ClassSearch",
+        {"institution": "UVA01", "term": sem_code, "page": page},
+    )
+    if not data or "classes" not in data:
+        return result
+
+    class_numbers = []
+    complete = True
+    for listing in data["classes"]:
+        class_nbr = listing["class_nbr"]
+        listing_digest = cache.digest(listing)
+        if cache.lookup(class_nbr, listing_digest) is not None:
+            result.cached += 1
+        else:
+            details = fetch_class_details(class_nbr, sem_code, api_url)
+            result.fetched += 1
+            if details is None:
+                complete = False
+                continue
+            cache.remember(class_nbr, listing_digest, cache.put(details))
+        class_numbers.append(class_nbr)
+
+    if complete:
+        cache.complete_page(page, class_numbers)
+    result.complete = complete
+    return result
+
+
+def retrieve_and_write_semester_courses(
+    csv_path, sem_code, cache_dir=None, resume=False, api_url=API_URL
+):
+    """
+    input: semester using the formula  "1" + [2 digit year] + [2 for Spring, 8 for Fall]. So, 1228 is Fall 2022.
+    output: list of page results (None if the listing could not be read); the CSV at ``csv_path`` is replaced once every page is fetched.
+    functionality: walks the class search listing pages concurrently and fetches the details of each
+     class that is new or whose listing changed since the last crawl (see ResponseCache). With ``resume``,
+     pages finished by an interrupted crawl are skipped. The CSV is only written when all pages are done,
+     so a failed crawl leaves the previous file in place.
+    """
+    cache = ResponseCache(cache_dir or os.path.join(CACHE_DIR, str(sem_code)))
 
-        all_classes = list(filter(lambda x: x is not None, all_classes))
+    first = get_json(
+        f"{api_url}.IScript_ClassSearch",
+        {"institution": "UVA01", "term": sem_code, "page": 1},
+    )
+    if not first or "pageCount" not in first:
+        print("Could not read the number of pages.")
+        return None
+    total_pages = int(first["pageCount"])
+    cache.start(total_pages, resume)
+    pages = cache.pending_pages()
+    print(f"Total pages: {total_pages} ({total_pages - len(pages)} already done)")
+
+    with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+        results = list(
+            tqdm(
+                executor.map(
+                    lambda page: fetch_page(cache, sem_code, page, api_url), pages
+                ),
+                total=len(pages),
+            )
+        )
 
-        write_to_csv(csv_path, all_classes)
+    fetched = sum(result.fetched for result in results)
+    cached = sum(result.cached for result in results)
+    print(f"Class details: {fetched} requested, {cached} unchanged")
+    failed = [result.page for result in results if not result.complete]
+    if failed:
+        print(f"{len(failed)} pages incomplete; rerun with --resume to finish them.")
+        return results
+
+    all_classes = [
+        row
+        for row in (class_row(nbr, data) for nbr, data in cache.details())
+        if row is not None
+    ]
+    tmp_path = f"{csv_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    if all_classes:
+        write_to_csv(tmp_path, all_classes)
+        os.replace(tmp_path, csv_path)
 
     print("Data fetching complete.")
+    return results
+
+
+def fetch_class_details(course_number, sem_code, api_url=API_URL):
+    """Class details response, or None if the request failed."""
+    return get_json(
+        f"{api_url}.IScript_ClassDetails",
+        {"institution": "UVA01", "term": sem_code, "class_nbr": course_number},
+    )
 
 
 def compile_course_data(course_number, sem_code):
@@ -106,18 +292,17 @@ def compile_course_data(course_number, sem_code):
     :param sem_code: The semester code.
     :return: Dictionary containing course information.
     """
-    url = (
-        f"https://sisuva.admin.virginia.edu/psc/ihprd/UVSS/SA/s/"
-        f"WEBLIB_HCX_CM.H_CLASS_SEARCH.FieldFormula.IScript_ClassDetails?"
-        f"institution=UVA01&term={sem_code}&class_nbr={course_number}"
-    )
+    return class_row(course_number, fetch_class_details(course_number, sem_code))
 
-    try:
-        response = session.get(url, timeout=TIMEOUT)
-    except requests.exceptions.RequestException:
-        return None
 
-    data = json.loads(response.text)
+def class_row(course_number, data):
+    """
+    CSV row for a class details response.
+
+    :param course_number: The course number.
+    :param data: Class details response.
+    :return: Dictionary containing course information, or None for an empty response.
+    """
     if not data:
         return None
 
@@ -225,6 +410,8 @@ def write_to_csv(csv_path, course_list):
 
 SEASON_NUMBERS = {"fall": 8, "summer": 6, "spring": 2, "january": 1}
 COURSE_DATA_DIR = "tcf_website/management/commands/semester_data/csv/"
+CACHE_DIR = "tcf_website/management/commands/semester_data/cache/"
+COLUMNAR_DIR = "tcf_website/management/commands/semester_data/columnar/"
 
 
 # test SIS data against Lous List data
@@ -269,6 +456,20 @@ class Command(BaseCommand):
             type=str,
             help="Semester in format: <year>_<season> (e.g., 2024_spring)",
         )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Skip listing pages finished by an interrupted run",
+        )
+        parser.add_argument(
+            "--cache-dir",
+            help=f"Response cache for this term (default: {CACHE_DIR}<term>/)",
+        )
+        parser.add_argument(
+            "--api-url",
+            default=API_URL,
+            help="SIS class search script prefix (e.g. a local stub server)",
+        )
 
     def handle(self, *args, **options):
         semester = options["semester"]
@@ -293,10 +494,23 @@ class Command(BaseCommand):
         filename = f"{year}_{season}.csv"
         csv_path = os.path.join(COURSE_DATA_DIR, filename)
 
-        if os.path.exists(csv_path):
-            os.remove(csv_path)
         os.makedirs(os.path.dirname(csv_path), exist_ok=True)
-        retrieve_and_write_semester_courses(csv_path, sem_code)
+        results = retrieve_and_write_semester_courses(
+            csv_path,
+            sem_code,
+            cache_dir=options["cache_dir"],
+            resume=options["resume"],
+            api_url=options["api_url"],
+        )
+        if results is None or not all(result.complete for result in results):
+            raise CommandError(f"Fetching {year} {season} did not finish")
+        if not os.path.exists(csv_path):
+            self.stdout.write(
+                f"No classes listed for {year} {season}; nothing to convert."
+            )
+            return
+        # Units, meeting times and instructors are parsed once, here
+        convert_term(csv_path, os.path.join(COLUMNAR_DIR, f"{year}_{season}"))
         self.stdout.write(
             self.style.SUCCESS(f"Successfully fetched data for {year} {season}")
         )
@@ -1,80 +1,52 @@
 """
 Fetch enrollment data from UVA SIS API.
 
+Sections are updated a subject page at a time from the class search listing
+(one request covers a whole page of classes); only sections missing from
+every listing are fetched one class at a time.
+
+With ``--poll`` the command keeps running instead, re-polling sections by
+priority (see ``tcf_website.enrollment.poller``).
+
 Usage:
     python manage.py fetch_enrollment
     python manage.py fetch_enrollment --semester 1268
+    python manage.py fetch_enrollment --poll --min-interval 60 --max-interval 3600
 """
 
 import time
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 
-import requests
 from cachalot.api import invalidate
 from django.core.management.base import BaseCommand
 from tqdm import tqdm
 
+from tcf_website.enrollment import (
+    API_URL,
+    ENROLLMENT_FIELDS,
+    EnrollmentPoller,
+    PollSchedule,
+    fetch_class,
+    fetch_one,
+    fetch_subject,
+    record_snapshots,
+)
 from tcf_website.management.http import requests_session_with_pool_and_retries
 from tcf_website.models import Section, Semester
 
-API_URL = (
-    "https://sisuva.admin.virginia.edu/psc/ihprd/UVSS/SA/s/"
-    "WEBLIB_HCX_CM.H_CLASS_SEARCH.FieldFormula.IScript_ClassSearch"
-)
-TIMEOUT = 30
 WORKERS = 15
-ENROLLMENT_FIELDS = [
-    "enrollment_taken",
-    "enrollment_limit",
-    "waitlist_taken",
-    "waitlist_limit",
-]
+BATCH_SIZE = 500
 
 
-def create_session():
+def create_session(status_forcelist=(429, 500, 502, 503, 504)):
     """Single retry layer with exponential backoff (1s, 2s, 4s, 8s)."""
     return requests_session_with_pool_and_retries(
         workers=WORKERS,
-        status_forcelist=[429, 500, 502, 503, 504],
+        status_forcelist=list(status_forcelist),
     )
 
 
-def fetch_one(session, term, section):
-    """Fetch enrollment for a single section. Returns the section if
-    updated, None otherwise. Never raises."""
-    try:
-        resp = session.get(
-            API_URL,
-            params={
-                "institution": "UVA01",
-                "term": term,
-                "page": 1,
-                "class_nbr": section.sis_section_number,
-            },
-            timeout=TIMEOUT,
-        )
-        resp.raise_for_status()
-
-        # Server returns HTML login pages under load instead of 429s
-        if "json" not in resp.headers.get("Content-Type", ""):
-            return None
-
-        data = resp.json()
-        classes = data.get("classes")
-        if not classes:
-            return None
-
-        cls = classes[0]
-        section.enrollment_taken = cls.get("enrollment_total", 0)
-        section.enrollment_limit = cls.get("class_capacity", 0)
-        section.waitlist_taken = cls.get("wait_tot", 0)
-        section.waitlist_limit = cls.get("wait_cap", 0)
-        return section
-
-    except (requests.RequestException, ValueError, KeyError):
-        return None
-
-
 class Command(BaseCommand):
     """Management command: bulk-fetch SIS enrollment for all sections in a semester."""
 
@@ -84,59 +56,160 @@ class Command(BaseCommand):
         parser.add_argument(
             "--semester", help='Semester number, e.g. "1268". Defaults to latest.'
         )
+        parser.add_argument(
+            "--api-url",
+            default=API_URL,
+            help="Class search endpoint (e.g. a local stub server for testing)",
+        )
+        parser.add_argument(
+            "--poll",
+            action="store_true",
+            help="Keep polling sections by priority, writing only changes",
+        )
+        parser.add_argument(
+            "--min-interval",
+            type=float,
+            default=PollSchedule.min_interval,
+            help="Seconds between polls of full or waitlisted sections (--poll)",
+        )
+        parser.add_argument(
+            "--max-interval",
+            type=float,
+            default=PollSchedule.max_interval,
+            help="Seconds between polls of empty sections (--poll)",
+        )
+        parser.add_argument(
+            "--rounds",
+            type=int,
+            help="Stop after this many polling rounds (--poll; default: run forever)",
+        )
 
     def handle(self, *args, **options):
         start = time.time()
+        api_url = options["api_url"]
 
         semester = (
             Semester.objects.get(number=options["semester"])
             if options["semester"]
             else Semester.latest()
         )
-        sections = list(Section.objects.filter(semester=semester))
+        if options["poll"]:
+            self.poll(semester, options)
+            return
+
+        # Only the ids are needed: updates are written with bulk_update
+        rows = Section.objects.filter(semester=semester).values_list(
+            "pk", "sis_section_number", "course__subdepartment__mnemonic"
+        )
+        pending = {sis_number: pk for pk, sis_number, _ in rows}
+        subjects = sorted({subject for _, _, subject in rows})
+        total = len(pending)
         self.stdout.write(
-            f"Fetching enrollment for {semester} ({len(sections)} sections)"
+            f"Fetching enrollment for {semester} ({total} sections, "
+            f"{len(subjects)} subjects)"
         )
 
         session = create_session()
         term = semester.number
+        self.batch = []
+        self.updated = 0
 
-        # ── Fetch all sections concurrently ──
-        def _fetch(section):
-            return fetch_one(session, term, section)
-
+        # ── Walk subject listings concurrently, writing as pages arrive ──
         with ThreadPoolExecutor(max_workers=WORKERS) as pool:
-            results = list(
-                tqdm(
-                    pool.map(_fetch, sections),
-                    total=len(sections),
-                    desc="Fetching",
-                )
-            )
-
-        updated = [s for s in results if s is not None]
-        failed_sections = [
-            s for s, r in zip(sections, results, strict=True) if r is None
-        ]
-
-        # ── Retry failures once ──
-        if failed_sections:
-            self.stdout.write(f"Retrying {len(failed_sections)} failed sections...")
+            futures = [
+                pool.submit(fetch_subject, session, term, subject, api_url)
+                for subject in subjects
+            ]
+            for future in tqdm(
+                as_completed(futures),
+                total=len(futures),
+                desc="Subjects",
+                file=self.stderr,
+            ):
+                for sis_number, values in future.result().items():
+                    pk = pending.pop(sis_number, None)
+                    if pk is not None:
+                        self.queue(Section(pk=pk, **values))
+        from_listings = self.updated + len(self.batch)
+
+        # ── Fall back to per-class requests for misses, retrying once ──
+        for attempt in ("Fetching", "Retrying"):
+            if not pending:
+                break
+            self.stdout.write(f"{attempt} {len(pending)} sections one by one...")
+            misses = [
+                Section(pk=pk, sis_section_number=sis_number)
+                for sis_number, pk in pending.items()
+            ]
             with ThreadPoolExecutor(max_workers=WORKERS) as pool:
-                retries = list(
+                results = list(
                     tqdm(
-                        pool.map(_fetch, failed_sections),
-                        total=len(failed_sections),
-                        desc="Retrying",
+                        pool.map(
+                            lambda section: fetch_one(session, term, section, api_url),
+                            misses,
+                        ),
+                        total=len(misses),
+                        desc=attempt,
+                        file=self.stderr,
                     )
                 )
-            updated.extend(s for s in retries if s is not None)
+            for section in results:
+                if section is not None:
+                    del pending[section.sis_section_number]
+                    self.queue(section)
 
-        # ── Single bulk DB write ──
-        Section.objects.bulk_update(updated, ENROLLMENT_FIELDS, batch_size=500)
+        self.flush()
         invalidate(Section)
 
         elapsed = time.time() - start
         self.stdout.write(
-            f"\nUpdated {len(updated)}/{len(sections)} sections in {elapsed:.1f}s"
+            f"\nUpdated {self.updated}/{total} sections in {elapsed:.1f}s "
+            f"({from_listings} from subject listings, "
+            f"{self.updated - from_listings} one by one)"
+        )
+
+    def queue(self, section):
+        """Add an updated section to the next bulk_update batch."""
+        self.batch.append(section)
+        if len(self.batch) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        Section.objects.bulk_update(self.batch, ENROLLMENT_FIELDS)
+        record_snapshots(
+            (
+                section.pk,
+                {field: getattr(section, field) for field in ENROLLMENT_FIELDS},
+            )
+            for section in self.batch
+        )
+        self.updated += len(self.batch)
+        self.batch = []
+
+    def poll(self, semester, options):
+        """Run the priority poller until interrupted or ``--rounds`` is reached."""
+        # Leave 429s to the poller, which slows down instead of retrying
+        session = create_session(status_forcelist=(500, 502, 503, 504))
+        poller = EnrollmentPoller(
+            semester,
+            partial(
+                fetch_class,
+                session,
+                semester.number,
+                api_url=options["api_url"],
+            ),
+            schedule=PollSchedule(options["min_interval"], options["max_interval"]),
+            max_workers=WORKERS,
         )
+        self.stdout.write(
+            f"Polling enrollment for {semester} ({len(poller.sections)} sections)"
+        )
+
+        def report(result):
+            if result.changed or result.throttled or options["verbosity"] > 1:
+                self.stdout.write(result.summary())
+
+        try:
+            poller.run(rounds=options["rounds"], on_round=report)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped polling.")
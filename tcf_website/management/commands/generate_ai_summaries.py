@@ -1,53 +1,45 @@
 """
 Generate AI review summaries for course–instructor pairs via OpenRouter.
 
+Only pairs whose summary is missing or stale are sent: a summary is stale when
+the pair's reviews changed since it was written or it is older than
+--max-age-days. --limit is the number of API calls to spend; the stalest,
+most-read pairs go first (see ``tcf_website.review.summaries.plan_refresh``).
+
 Usage:
     python manage.py generate_ai_summaries --model openai/gpt-4o-mini
     python manage.py generate_ai_summaries --model ... --semester 2024_spring --dry-run
+    python manage.py generate_ai_summaries --report   # count current/stale pairs
 """
 
-import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
 
 import requests
 from django.conf import settings
-from django.core.exceptions import ObjectDoesNotExist
 from django.core.management.base import BaseCommand, CommandError
-from django.db import DatabaseError
-from django.db.models import Count, Exists, F, OuterRef
+from django.db.models import Exists, OuterRef
 from tqdm import tqdm
 
 from tcf_website.management.http import requests_session_with_pool_and_retries
-from tcf_website.models import Course, Instructor, Review, ReviewLLMSummary, Semester
+from tcf_website.models import ReviewLLMSummary, Semester
+from tcf_website.review.summaries import (
+    MAX_SUMMARY_AGE,
+    SummaryWriter,
+    TokenBucket,
+    build_messages,
+    plan_refresh,
+    prefetch_pairs,
+    summary_candidates,
+)
 
 OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
 TIMEOUT = 60
-MAX_REVIEW_CHARS = 1000
-MIN_REVIEW_COUNT = 5  # minimum number of reviews to create summary
-MAX_REVIEW_COUNT = 50  # maximum number of reviews to include in the prompt
-# OpenRouter ~20 requests/minute (not 20 concurrent): space starts across all threads.
+# OpenRouter ~20 requests/minute (not 20 concurrent): pace starts across all threads.
 REQUESTS_PER_MINUTE = 20
-MIN_REQUEST_INTERVAL = 60.0 / REQUESTS_PER_MINUTE
 WORKERS = 20
 
-_OPENROUTER_LOCK = threading.Lock()
-_OPENROUTER_NEXT_SLOT_MONO = [
-    0.0
-]  # next allowed start (list: update without ``global``)
-
-
-def _wait_openrouter_slot():
-    """Block until this thread may start a request (shared across worker threads)."""
-    with _OPENROUTER_LOCK:
-        now = time.monotonic()
-        nxt = _OPENROUTER_NEXT_SLOT_MONO[0]
-        if now < nxt:
-            time.sleep(nxt - now)
-            now = time.monotonic()
-        _OPENROUTER_NEXT_SLOT_MONO[0] = now + MIN_REQUEST_INTERVAL
-
 
 def create_session():
     """Shared pool and retries for transient 5xx."""
@@ -79,37 +71,6 @@ def _resolve_semester(raw):
         raise CommandError(f"Unknown semester: {raw}") from exc
 
 
-def _build_messages(course, instructor, reviews):
-    bullets = []
-    for r in reviews:
-        text = (r.text or "").strip()[:MAX_REVIEW_CHARS]
-        bullets.append(
-            f"- ({r.semester.season} {r.semester.year},"
-            f" {r.instructor_rating}/5 instructor, {r.difficulty}/5 difficulty,"
-            f" {r.recommendability}/5 recommend): {text}"
-        )
-    return [
-        {
-            "role": "system",
-            "content": (
-                "You summarize university course reviews into clear, honest guidance. "
-                "Write 3-5 sentences. Do not use headings or bullet points. "
-                "Do not restate the course or instructor name. Do not invent details."
-                "Match the tone and style of the reviews. Get straight to the point."
-                f"Today's date is {datetime.now().strftime('%B %d, %Y')}."
-            ),
-        },
-        {
-            "role": "user",
-            "content": (
-                f"Course: {course.code()} — {course.title}\n"
-                f"Instructor: {instructor.full_name}\n\n"
-                "Summarize these student reviews:\n" + "\n".join(bullets)
-            ),
-        },
-    ]
-
-
 def _summary_text_from_openrouter_response(response):
     """Parse chat completion body; return stripped summary text or None."""
     response.raise_for_status()
@@ -130,30 +91,15 @@ def _summary_text_from_openrouter_response(response):
     return text or None
 
 
-def summarize_one(session, row, model_id, dry_run):
-    """Summarize one pair. Returns (kind, message) or None on failure. Never raises."""
-    try:
-        course = Course.objects.get(pk=row["course_id"])
-        instructor = Instructor.objects.get(pk=row["instructor_id"])
-
-        if dry_run:
-            return (
-                "dry_run",
-                f"[DRY RUN] {course.code()} / {instructor.full_name} "
-                f"({row['review_count']} reviews)",
-            )
-
-        reviews = list(
-            Review.objects.filter(course=course, instructor=instructor)
-            .exclude(text="")
-            .filter(hidden=False, toxicity_rating__lt=settings.TOXICITY_THRESHOLD)
-            .order_by("-created")[:MAX_REVIEW_COUNT]
-        )
-        messages = _build_messages(course, instructor, reviews)
+def request_summary(session, api_url, model_id, messages, bucket):
+    """POST one prompt once ``bucket`` allows; return the summary text or None.
 
-        _wait_openrouter_slot()
+    Never raises and never touches the database, so it is safe in worker threads.
+    """
+    try:
+        bucket.acquire()
         response = session.post(
-            OPENROUTER_URL,
+            api_url,
             headers={
                 "Authorization": f"Bearer {settings.OPENROUTER_API_KEY}",
                 "Content-Type": "application/json",
@@ -161,34 +107,8 @@ def summarize_one(session, row, model_id, dry_run):
             json={"model": model_id, "messages": messages},
             timeout=TIMEOUT,
         )
-        summary_text = _summary_text_from_openrouter_response(response)
-        if not summary_text:
-            return None
-
-        ReviewLLMSummary.objects.update_or_create(
-            course=course,
-            instructor=instructor,
-            defaults={
-                "summary_text": summary_text,
-                "model_id": model_id,
-                "source_review_count": len(reviews),
-            },
-        )
-
-        return (
-            "saved",
-            f"Saved: {course.code()} / {instructor.full_name} ({len(reviews)} reviews)",
-        )
-    except (
-        requests.RequestException,
-        ValueError,
-        KeyError,
-        TypeError,
-        IndexError,
-        AttributeError,
-        DatabaseError,
-        ObjectDoesNotExist,
-    ):
+        return _summary_text_from_openrouter_response(response)
+    except (requests.RequestException, ValueError, AttributeError):
         return None
 
 
@@ -200,7 +120,29 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument("--model", help="OpenRouter model ID (required)")
         parser.add_argument(
-            "--limit", type=int, default=500, help="Max pairs to process (default: 500)"
+            "--limit",
+            type=int,
+            default=500,
+            help="Max pairs to process, i.e. API calls to spend (default: 500)",
+        )
+        parser.add_argument(
+            "--max-age-days",
+            type=int,
+            default=MAX_SUMMARY_AGE.days,
+            help=(
+                "Regenerate summaries older than this even if their reviews are "
+                f"unchanged (default: {MAX_SUMMARY_AGE.days})"
+            ),
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Also regenerate pairs whose summary is current",
+        )
+        parser.add_argument(
+            "--report",
+            action="store_true",
+            help="Only print how many pairs are current, stale or missing",
         )
         parser.add_argument(
             "--missing-only",
@@ -223,21 +165,63 @@ class Command(BaseCommand):
             dest="dry_run",
             help="Print what would be processed without calling the API",
         )
+        parser.add_argument(
+            "--requests-per-minute",
+            type=float,
+            default=REQUESTS_PER_MINUTE,
+            help=f"API request rate across all workers (default: {REQUESTS_PER_MINUTE})",
+        )
+        parser.add_argument(
+            "--api-url",
+            default=OPENROUTER_URL,
+            help="Chat completions endpoint (default: OpenRouter)",
+        )
 
-    def _run_summaries_parallel(self, pairs, model_id, dry_run):
-        session = create_session()
-
-        def _summarize(row):
-            return summarize_one(session, row, model_id, dry_run)
+    def _run_summaries_parallel(self, contexts, model_id, options):
+        """Prompt for every prefetched pair; return (kind, message) or None per pair."""
+        if options["dry_run"]:
+            return [
+                None
+                if context is None
+                else (
+                    "dry_run",
+                    f"[DRY RUN] {context.label()} ({context.review_count} reviews)",
+                )
+                for context in contexts
+            ]
 
+        session = create_session()
+        bucket = TokenBucket(options["requests_per_minute"] / 60)
+        writer = SummaryWriter(model_id)
+        results = [None] * len(contexts)
         with ThreadPoolExecutor(max_workers=WORKERS) as pool:
-            return list(
-                tqdm(
-                    pool.map(_summarize, pairs),
-                    total=len(pairs),
-                    desc="Summaries",
+            futures = {
+                pool.submit(
+                    request_summary,
+                    session,
+                    options["api_url"],
+                    model_id,
+                    build_messages(context.course, context.instructor, context.reviews),
+                    bucket,
+                ): i
+                for i, context in enumerate(contexts)
+                if context is not None
+            }
+            for future in tqdm(
+                as_completed(futures), total=len(futures), desc="Summaries"
+            ):
+                i = futures[future]
+                summary_text = future.result()
+                if not summary_text:
+                    continue
+                context = contexts[i]
+                writer.add(context, summary_text)
+                results[i] = (
+                    "saved",
+                    f"Saved: {context.label()} ({len(context.reviews)} reviews)",
                 )
-            )
+        writer.flush()
+        return results
 
     def _report_pair_results(self, pairs, results):
         error_count = 0
@@ -261,6 +245,10 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         start = time.time()
 
+        if options["report"]:
+            self._get_pairs(options)
+            return
+
         model_id = options["model"]
         if not model_id:
             raise CommandError(
@@ -276,7 +264,8 @@ class Command(BaseCommand):
 
         self.stdout.write(f"Processing {len(pairs)} pair(s)...")
 
-        results = self._run_summaries_parallel(pairs, model_id, options["dry_run"])
+        contexts = prefetch_pairs(pairs)
+        results = self._run_summaries_parallel(contexts, model_id, options)
         error_count = self._report_pair_results(pairs, results)
 
         elapsed = time.time() - start
@@ -287,20 +276,8 @@ class Command(BaseCommand):
             raise CommandError(f"{error_count} pair(s) failed.")
 
     def _get_pairs(self, options):
-        semester = _resolve_semester(options["semester"])
-        qs = Review.objects.exclude(text="").filter(
-            hidden=False, toxicity_rating__lt=settings.TOXICITY_THRESHOLD
-        )
-        if semester is not None:
-            qs = qs.filter(
-                course__section__semester=semester,
-                course__section__instructors=F("instructor_id"),
-            )
-        qs = (
-            qs.values("course_id", "instructor_id")
-            .annotate(review_count=Count("id", distinct=True))
-            .filter(review_count__gte=MIN_REVIEW_COUNT)
-        )
+        """Stalest, most-read pairs up to ``--limit``; prints the freshness report."""
+        qs = summary_candidates(_resolve_semester(options["semester"]))
         if options["missing_only"]:
             qs = qs.annotate(
                 _has_summary=Exists(
@@ -310,5 +287,15 @@ class Command(BaseCommand):
                     )
                 )
             ).filter(_has_summary=False)
-        qs = qs.order_by("-review_count")[: options["limit"]]
-        return list(qs)
+        pairs, report = plan_refresh(
+            qs,
+            options["limit"],
+            max_age=timedelta(days=options["max_age_days"]),
+            force=options["force"],
+        )
+        total = sum(report.values())
+        self.stdout.write(
+            f"{report['current']}/{total} pair(s) current, "
+            f"{report['stale']} stale, {report['missing']} missing"
+        )
+        return pairs
@@ -0,0 +1,92 @@
+"""Fill an empty database with a seeded, production-sized synthetic catalog.
+
+Generates semesters, schools, departments, courses, sections, instructors,
+users, reviews, votes, schedules and grades with production-like skew (see
+``tcf_website.bench.synthetic``), then rebuilds the stats read models. The
+same ``--seed`` and sizes always produce the same data, so benchmark runs on
+different commits are comparable. Refuses to run on a database that already
+has courses.
+
+Usage:
+  # ~60 semesters, 20k courses, 150k sections, 500k reviews, 1M votes, 50k schedules
+  python manage.py generate_synthetic_catalog
+
+  # A tenth of that, with a different seed
+  python manage.py generate_synthetic_catalog --scale 0.1 --seed 7
+
+  # Override single counts
+  python manage.py generate_synthetic_catalog --scale 0.1 --reviews 200000
+"""
+
+import time
+from dataclasses import fields, replace
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tcf_website.bench import CatalogSize, SyntheticCatalog
+from tcf_website.models import Course
+
+
+class Command(BaseCommand):
+    help = "Generates a seeded synthetic catalog for load and benchmark testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Multiplier for every count but --semesters (default: 1)",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed (default: 0)"
+        )
+        parser.add_argument(
+            "--end-year",
+            type=int,
+            help="Year of the newest (fall) term; defaults to the current year",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processes parsing the generated semester files",
+        )
+        defaults = CatalogSize()
+        for f in fields(CatalogSize):
+            parser.add_argument(
+                f"--{f.name}",
+                type=int,
+                help=f"Number of {f.name} (default: {getattr(defaults, f.name)}"
+                + (")" if f.name == "semesters" else " times --scale)"),
+            )
+
+    def handle(self, *args, **options):
+        if Course.objects.exists():
+            raise CommandError(
+                "The database already has courses; run this on an empty database."
+            )
+        if options["scale"] <= 0:
+            raise CommandError("--scale must be positive.")
+        size = CatalogSize().scaled(options["scale"])
+        size = replace(
+            size,
+            **{
+                f.name: options[f.name]
+                for f in fields(CatalogSize)
+                if options[f.name] is not None
+            },
+        )
+
+        started = time.perf_counter()
+        counts = SyntheticCatalog(
+            size,
+            seed=options["seed"],
+            end_year=options["end_year"],
+            log=lambda message: self.stdout.write(message),
+        ).generate(workers=options["workers"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                ", ".join(f"{n} {kind}" for kind, n in counts.items())
+                + f" in {time.perf_counter() - started:.0f}s"
+            )
+        )
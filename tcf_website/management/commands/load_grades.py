@@ -3,40 +3,223 @@ Loads grade data from CSV files into database
 """
 
 import os
-import re
+import time
 
 import numpy as np
 import pandas as pd
 from cachalot.api import invalidate
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from tqdm import tqdm
 
-from tcf_website.models import Course, CourseGrade, CourseInstructorGrade, Instructor
+from tcf_website.ingest import (
+    is_fresh,
+    is_table,
+    parallel_map,
+    peak_rss,
+    read_table,
+    roll_up_grades,
+    semester_number,
+    source_meta,
+    upsert_semester_grades,
+    write_table,
+)
+from tcf_website.models import (
+    Course,
+    CourseGrade,
+    CourseInstructorGrade,
+    CourseInstructorStats,
+    CourseStats,
+    Instructor,
+    Semester,
+    SemesterGrade,
+)
+from tcf_website.stats import (
+    deferred_course_stats,
+    mark_course_stats_dirty,
+    mark_pair_stats_dirty,
+)
 
 # Location of our grade data CSVs
 DATA_DIR = "tcf_website/management/commands/grade_data/csv/"
+# Columnar copies of the parsed CSVs (see tcf_website.ingest.columnar)
+COLUMNAR_DIR = "tcf_website/management/commands/grade_data/columnar/"
 
-# Grade-point weights for computing an approximate average from the breakdown.
-# Used when UVA redacts "Course GPA" but still provides distribution counts.
-#
-# DFW weight (1.3, equivalent to D+) is derived empirically: across 13k+ rows
-# where UVA provided both the GPA and the breakdown, testing every weight from
-# 0.0 to 2.0 shows 1.3 minimises the median absolute error (0.040 vs 0.048 at 0.0).
-# No fixed weight can be perfect because the DFW bucket mixes D, F, and W
-# grades whose proportions vary per course, but 1.3 is the best single value.
-_GRADE_WEIGHTS = [4.0, 4.0, 3.7, 3.3, 3.0, 2.7, 2.3, 2.0, 1.7, 1.3]
 
+def clean_grade_data(df):
+    """Cleans data.
+    Because of FERPA redactions (see wiki for details), there are 3 types of usable rows:
+    1. Contains both average/total enrolled and distribution (counts of A, B, C, etc.)
+    2. Contains only average/total enrolled, with distribution deleted
+    3. Contains only distribution, with no average.
 
-def _average_from_breakdown(counts, total_enrolled):
-    """Compute weighted GPA from grade-count list [A+, A, A-, B+, …, DFW].
+    The only case we drop is when there is no data in any relevant column.
+    """
+    df.replace("-", np.NaN, inplace=True)
+
+    df.dropna(
+        how="all",
+        subset=[
+            "A+",
+            "A",
+            "A-",
+            "B+",
+            "B",
+            "B-",
+            "C+",
+            "C",
+            "C-",
+            "DFW",
+            "# of Students",
+            "Course GPA",
+        ],
+        inplace=True,
+    )
+
+    df.fillna(0, inplace=True)
+
+    # Not quite sure how much data this actually applies to,
+    # as UVA data is much more reliable than the old VAGrades data
+    # Filter out data with missing instructor (represented by ...)
+    return df[df["Primary Instructor Name"] != "..."]
+
+
+# CSV grade columns and the CourseGrade/CourseInstructorGrade fields they fill
+_COUNT_COLUMNS = {
+    "A+": "a_plus",
+    "A": "a",
+    "A-": "a_minus",
+    "B+": "b_plus",
+    "B": "b",
+    "B-": "b_minus",
+    "C+": "c_plus",
+    "C": "c",
+    "C-": "c_minus",
+    "DFW": "dfw",
+}
+_COUNT_FIELDS = list(_COUNT_COLUMNS.values())
+
+# One SemesterGrade row per term, course and instructor
+FACT_KEY = ["term", "subdepartment", "number", "first_name", "last_name"]
 
-    Returns None if total_enrolled is 0 (no students to average over).
+
+def parse_grade_file(path):
+    """Cleans one grade CSV and parses it into a frame with one row per section:
+    term, subdepartment, number, first_name, last_name, the grade counts,
+    total_enrolled and average (0 when redacted).
+
+    Runs in a worker process when loading with --workers.
     """
-    if not total_enrolled:
-        return None
-    return (
-        sum(c * w for c, w in zip(counts, _GRADE_WEIGHTS, strict=True)) / total_enrolled
+    # Some exports start with a byte order mark or spell the header "TermDesc"
+    df = pd.read_csv(path, encoding="utf-8-sig").rename(
+        columns={"TermDesc": "Term Desc"}
+    )
+    df = clean_grade_data(df)
+
+    # Columns are processed left to right, with one exception
+
+    # Key assumption: names are in the format `LAST,FIRST MIDDLE`
+    names = df["Primary Instructor Name"].astype(str)
+    parts = names.str.split(",")
+    malformed = parts.str.len() != 2
+    if malformed.any():
+        # Script should stop if name that doesn't fit this pattern is given
+        raise ValueError(
+            f"{names[malformed].iloc[0]} doesn't meet our assumption "
+            f"about instructor name format."
+        )
+    last_name, first_and_middle = parts.str[0], parts.str[1]
+    first_name = first_and_middle.str.split(" ").str[0]
+    first_name = first_name.mask(
+        (last_name == "Hott") & (first_and_middle == "John Robert"), "Robbie"
+    ).mask((last_name == "Nguyen") & (first_and_middle == "Nhat H"), "Rich")
+
+    grades = pd.DataFrame(
+        {
+            # e.g. "2023 Fall"
+            "term": df["Term Desc"],
+            "subdepartment": df["Subject"],
+            # 'Class Section' column is unused
+            "number": df["Catalog Number"]
+            .astype(str)
+            .str.replace("[^0-9]", "", regex=True)
+            .astype(int),
+            # 'Class Title' is unused: grades are kept per course, not per title
+            "first_name": first_name,
+            "last_name": last_name,
+        }
+    )
+    for column, field in _COUNT_COLUMNS.items():
+        grades[field] = pd.to_numeric(df[column]).astype(int)
+
+    # With no redactions, tracking these aggregate data would be unnecessary, but
+    # we need these because DFW is vague and small class distributions are deleted.
+    # We also need to handle the edge case where these fields are empty, which
+    # clean_grade_data() fills as 0.
+    grades["total_enrolled"] = np.maximum(
+        pd.to_numeric(df["# of Students"]).astype(int),
+        grades[_COUNT_FIELDS].sum(axis=1),
+    )
+    grades["average"] = pd.to_numeric(df["Course GPA"]).astype(float)
+    return grades.reset_index(drop=True)
+
+
+# Column dtypes of a parsed grade table; the rest are strings
+_GRADE_DTYPES = {
+    "number": np.int32,
+    **dict.fromkeys(_COUNT_FIELDS, np.int32),
+    "total_enrolled": np.int32,
+    "average": np.float64,
+}
+
+
+def convert_grade_file(path, table_path):
+    """Writes the parse_grade_file() frame of a grade CSV as a columnar table."""
+    grades = parse_grade_file(path)
+    write_table(
+        table_path,
+        {
+            column: grades[column].to_numpy(dtype=_GRADE_DTYPES.get(column, object))
+            for column in grades.columns
+        },
+        meta=source_meta(path),
     )
+    return len(grades)
+
+
+def load_grade_file(path):
+    """parse_grade_file() frame of a grade CSV or of its columnar table."""
+    if not is_table(path):
+        return parse_grade_file(path)
+    grades = read_table(path).to_frame()
+    return grades.astype(
+        {column: int for column in _GRADE_DTYPES if column != "average"}
+    )
+
+
+def semester_grade_facts(grades):
+    """Combines the sections in ``grades`` per ``FACT_KEY``.
+
+    Grade counts and enrollment are summed; ``average`` is the
+    enrollment-weighted GPA of the sections that report one (NaN if none
+    do) and ``gpa_enrolled`` its weight.
+    """
+    reported = grades["average"] > 0
+    grades = grades.assign(
+        gpa_enrolled=grades["total_enrolled"].where(reported, 0),
+        gpa_points=(grades["average"] * grades["total_enrolled"]).where(reported, 0.0),
+    )
+    facts = (
+        grades.groupby(FACT_KEY, sort=False)[
+            [*_COUNT_FIELDS, "total_enrolled", "gpa_enrolled", "gpa_points"]
+        ]
+        .sum()
+        .reset_index()
+    )
+    facts["average"] = (facts["gpa_points"] / facts["gpa_enrolled"]).where(
+        facts["gpa_enrolled"] > 0
+    )
+    return facts.drop(columns="gpa_points")
 
 
 class Command(BaseCommand):
@@ -74,9 +257,6 @@ class Command(BaseCommand):
         # Whether to suppress tqdm
         self.suppress_tqdm = False
 
-        self.course_grades = {}
-        self.course_instructor_grades = {}
-
     def add_arguments(self, parser):
         """Standard Django function implementation - defines command-line parameters"""
         # The only required argument at the moment
@@ -99,6 +279,19 @@ class Command(BaseCommand):
             help="Suppress the tqdm loading bars",
         )
 
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processes parsing grade CSVs in parallel",
+        )
+
+        parser.add_argument(
+            "--csv-only",
+            action="store_true",
+            help="Ignore columnar tables and parse the CSVs",
+        )
+
         parser.add_argument(
             "--log-missing-instructors",
             action="store_true",
@@ -114,257 +307,103 @@ class Command(BaseCommand):
             print("Step 1: Fetch Course and Instructor data for later use")
         semester = options["semester"]
         if semester == "ALL_DANGEROUS":
-            # ALL_DANGEROUS removes all existing data
-            CourseGrade.objects.all().delete()
-            CourseInstructorGrade.objects.all().delete()
-
             # Loads every data CSV file in /grade_data/csv with exceptions
-            for file in sorted(os.listdir(DATA_DIR)):
-                if self.verbosity == 3:
-                    print("Loading data from", file)
-                # Ignore temp files (start with '~' on Windows, '.' otherwise) and test data
-                if file[0] not in (".", "~") and ".csv" in file:
-                    self.load_semester_file(file)
+            # Ignore temp files (start with '~' on Windows, '.' otherwise)
+            # and test data
+            files = [
+                file
+                for file in sorted(os.listdir(DATA_DIR))
+                if file[0] not in (".", "~") and ".csv" in file
+            ]
         else:
-            self.load_semester_file(f"{semester.lower()}.csv")
-        self.load_dict_into_models()
-
-    def clean(self, df):
-        """Cleans data.
-        Because of FERPA redactions (see wiki for details), there are 3 types of usable rows:
-        1. Contains both average/total enrolled and distribution (counts of A, B, C, etc.)
-        2. Contains only average/total enrolled, with distribution deleted
-        3. Contains only distribution, with no average.
-
-        The only case we drop is when there is no data in any relevant column.
-        """
-        df.replace("-", np.NaN, inplace=True)
-
-        df.dropna(
-            how="all",
-            subset=[
-                "A+",
-                "A",
-                "A-",
-                "B+",
-                "B",
-                "B-",
-                "C+",
-                "C",
-                "C-",
-                "DFW",
-                "# of Students",
-                "Course GPA",
-            ],
-            inplace=True,
-        )
-
-        df.fillna(0, inplace=True)
-
-        # Not quite sure how much data this actually applies to,
-        # as UVA data is much more reliable than the old VAGrades data
-        # Filter out data with missing instructor (represented by ...)
-        return df[df["Primary Instructor Name"] != "..."]
-
-    def load_semester_file(self, file):
-        """Given a file name, cleans + loads its data into the global grade data dicts."""
-        df = self.clean(pd.read_csv(os.path.join(DATA_DIR, file)))
+            files = [f"{semester.lower()}.csv"]
+
+        # Files are parsed (possibly in parallel), combined per term into
+        # SemesterGrade facts, and the cross-semester tables rolled up from those.
+        stages = {}
+        started = time.perf_counter()
+        paths = [self.grade_file(file, options["csv_only"]) for file in files]
+        parsed_files = parallel_map(load_grade_file, paths, options["workers"])
+        stages["parse"] = time.perf_counter() - started
         if self.verbosity > 0:
-            print(f"Found {df.size} sections in {file}")
-
-        for _, row in tqdm(
-            df.iterrows(), total=df.shape[0], disable=self.suppress_tqdm
-        ):
-            if self.verbosity == 3:
-                print(str(row).encode("ascii", "ignore").decode("ascii"))
-            self.load_row_into_dict(row)
-        if self.verbosity > 0:
-            print(f"Done loading {file}")
-
-    def load_row_into_dict(self, row):
-        """
-        Loads data from a given row into the global dicts
-        course_grades and course_instructor_grades
-        """
-        # Columns are processed left to right, with one exception
-
-        # 'Term Desc' column is unused because we only care about aggregate across semesters
-        # Might want to display semester-by-semester metrics too? Would have to change this
-
-        subdepartment = row["Subject"]
-        # `Catalog Number` is handled with all other numerical data in the try block below
-
-        title = row["Class Title"]
-        # Key assumption: names are in the format `LAST,FIRST MIDDLE`
-        try:
-            last_name, first_and_middle = row["Primary Instructor Name"].split(",")
-            first_name = first_and_middle.split(" ")[0]
-
-            if last_name == "Hott" and first_and_middle == "John Robert":
-                first_name = "Robbie"
-            elif last_name == "Nguyen" and first_and_middle == "Nhat H":
-                first_name = "Rich"
-        except ValueError as e:
-            # Script should stop if name that doesn't fit this pattern is given
+            for file, grades in zip(files, parsed_files, strict=True):
+                print(f"Found {len(grades)} sections in {file}")
+
+        started = time.perf_counter()
+        facts = semester_grade_facts(pd.concat(parsed_files, ignore_index=True))
+        stages["aggregate"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        # Course/pair stats are refreshed once, after all grades are written
+        with transaction.atomic(), deferred_course_stats():
+            if semester == "ALL_DANGEROUS":
+                # ALL_DANGEROUS removes all existing data
+                SemesterGrade.objects.all().delete()
+            touched = set()
+            terms = facts.groupby("term", sort=False)
+            for term, term_facts in tqdm(terms, disable=self.suppress_tqdm):
+                if self.verbosity > 0:
+                    print(f"Step 2: Upsert {len(term_facts)} {term} grade rows")
+                touched |= upsert_semester_grades(
+                    self.semester(term),
+                    [self.semester_grade(row) for row in term_facts.itertuples()],
+                )
             if self.verbosity > 0:
-                print(f"full name is {row['Primary Instructor Name']}")
-            raise ValueError(
-                f"{row['Primary Instructor Name']} doesn't meet our assumption "
-                f"about instructor name format."
-            ) from e
-
-        # 'Class Section' column is unused
-        try:
-            number = int(re.sub("[^0-9]", "", str(row["Catalog Number"])))
-
-            semester_grades: list[int | float] = [
-                int(x)
-                for x in [
-                    row["A+"],
-                    row["A"],
-                    row["A-"],
-                    row["B+"],
-                    row["B"],
-                    row["B-"],
-                    row["C+"],
-                    row["C"],
-                    row["C-"],
-                    row["DFW"],
-                ]
-            ]
-
-            # With no redactions, tracking these aggregate data would be unnecessary, but
-            # we need these because DFW is vague and small class distributions are deleted.
-            # We also need to handle the edge case where these fields are empty, which
-            # clean() fills as 0.
-            average = float(row["Course GPA"])
-            total_enrolled = max(int(row["# of Students"]), sum(semester_grades))
-
-            # Add aggregate stats to end of array
-            semester_grades.append(total_enrolled)
-            semester_grades.append(average)
-
-        except (TypeError, ValueError) as e:
-            if self.verbosity > 0:
-                print(row)
-                print(e)
-            raise e
-        # No error casting values to float/int, so continue
-        # Identifiers are tuple keys to grade data dictionaries
-        course_identifier = (subdepartment, number, title)
-        course_instructor_identifier = (
-            subdepartment,
-            number,
-            first_name,
-            last_name,
+                print("Step 3: Roll up CourseGrade and CourseInstructorGrade")
+            course_ids, pairs = roll_up_grades(
+                None if semester == "ALL_DANGEROUS" else touched
+            )
+            # The rollup is raw SQL, so flag the affected courses explicitly
+            mark_course_stats_dirty(course_ids)
+            mark_pair_stats_dirty(pairs)
+        invalidate(
+            SemesterGrade,
+            CourseGrade,
+            CourseInstructorGrade,
+            CourseStats,
+            CourseInstructorStats,
         )
+        stages["write"] = time.perf_counter() - started
 
-        # Helper function because we basically do the same thing twice
-        def add_entry(data_dict, identifier):
-            # Load this semester into dictionary
-            if identifier in data_dict:
-                # Average needs to be computed separately instead of incrementing
-                prev_data = data_dict[identifier]
-                prev_total_enrolled = prev_data[-2]
-                prev_average = prev_data[-1]
-
-                # If both are not zero, then update with weighted formula
-                if prev_average and average:
-                    new_average = (
-                        prev_average * prev_total_enrolled + average * total_enrolled
-                    ) / (prev_total_enrolled + total_enrolled)
-                    data_dict[identifier][-1] = new_average
-                # If only old average is zero, then set it to new average
-                elif average:
-                    data_dict[identifier][-1] = average
-                # Any situation where new average is None, do nothing to average
-                # The distribution itself can be incremented normally in all cases
-                data_dict[identifier][-2] += total_enrolled
-                for i in range(len(semester_grades) - 2):
-                    data_dict[identifier][i] += semester_grades[i]
-            else:
-                data_dict[identifier] = semester_grades.copy()
-
-        add_entry(self.course_grades, course_identifier)
-        add_entry(self.course_instructor_grades, course_instructor_identifier)
-
-    def load_dict_into_models(self):
-        """Converts dictionaries to real instances of CourseGrade and CourseInstructorGrade.
-
-        Given a course or course-instructor pair and its corresponding grade distribution,
-        calculates weighted GPA average and total enrolled students and then uses all of those
-        as parameters to create new CourseGrade and CourseInstructorGrade instances.
-        """
         if self.verbosity > 0:
-            print("Step 2: Bulk-create CourseGrade instances")
-
-        # Load course_grades data from dicts and create model instances
-        unsaved_cg_instances = []
-        for row in tqdm(self.course_grades, disable=self.suppress_tqdm):
-            course_grade_params = self.set_grade_params(row, is_instructor_grade=False)
-            unsaved_cg_instance = CourseGrade(**course_grade_params)
-            unsaved_cg_instances.append(unsaved_cg_instance)
-
-        # bulk_create is much more efficient than creating them separately
-        CourseGrade.objects.bulk_create(unsaved_cg_instances)
-        invalidate(CourseGrade)
-        if self.verbosity > 0:
-            print("Done creating CourseGrade instances")
-            print("Step 3: Bulk-create CourseInstructorGrade instances")
-
-        # Load course_instructor_grades data from dicts and create model instances
-        unsaved_cig_instances = []
-        for row in tqdm(self.course_instructor_grades, disable=self.suppress_tqdm):
-            course_instructor_grade_params = self.set_grade_params(
-                row, is_instructor_grade=True
-            )
-            unsaved_cig_instance = CourseInstructorGrade(
-                **course_instructor_grade_params
+            columnar = sum(is_table(path) for path in paths)
+            print(
+                f"Loaded {len(files)} files ({columnar} columnar): "
+                + ", ".join(f"{name} {sec:.1f}s" for name, sec in stages.items())
+                + f"; peak RSS {peak_rss() / 2**20:.0f} MB"
             )
-            unsaved_cig_instances.append(unsaved_cig_instance)
-        CourseInstructorGrade.objects.bulk_create(unsaved_cig_instances)
-        invalidate(CourseInstructorGrade)
-        if self.verbosity > 0:
-            print("Done creating CourseInstructorGrade instances")
-
-    def set_grade_params(self, row, is_instructor_grade):
-        """Creates dict of params to be used as parameters
-        in creating CourseGrade/CourseInstructorGrade instances.
-        Helper function for load_dict_into_models()"""
-        if is_instructor_grade:
-            data = self.course_instructor_grades[row]
-        else:
-            data = self.course_grades[row]
-
-        counts = data[:10]  # [A+, A, A-, B+, B, B-, C+, C, C-, DFW]
-        total_enrolled = data[10]
-        stored_average = data[11]
-
-        # Use the stored average when available; otherwise approximate from the
-        # grade-count breakdown (UVA redacts "Course GPA" for some small sections
-        # under FERPA, but still provides the distribution).
-        average = (
-            stored_average
-            if stored_average > 0
-            else _average_from_breakdown(counts, total_enrolled)
-        )
-
-        course_grade_params = {
-            "course_id": self.courses.get(row[:2]),
-            "a_plus": counts[0],
-            "a": counts[1],
-            "a_minus": counts[2],
-            "b_plus": counts[3],
-            "b": counts[4],
-            "b_minus": counts[5],
-            "c_plus": counts[6],
-            "c": counts[7],
-            "c_minus": counts[8],
-            "dfw": counts[9],
-            "total_enrolled": total_enrolled,
-            "average": average,
-        }
 
-        if is_instructor_grade:
-            course_grade_params["instructor_id"] = self.instructors.get(row[2:])
-        return course_grade_params
+    @staticmethod
+    def grade_file(file, csv_only=False):
+        """Path of a grade CSV, or of its columnar table if that is up to date."""
+        path = os.path.join(DATA_DIR, file)
+        table = os.path.join(COLUMNAR_DIR, file.removesuffix(".csv"))
+        if not csv_only and is_fresh(table, path):
+            return table
+        return path
+
+    def semester(self, term):
+        """Semester for a grade data term such as "2023 Fall"."""
+        year, season = term.split()
+        semester, _ = Semester.objects.get_or_create(
+            year=int(year),
+            season=season.upper(),
+            number=semester_number(int(year), season.upper()),
+        )
+        return semester
+
+    def semester_grade(self, row):
+        """Unsaved SemesterGrade for a row of semester_grade_facts()."""
+        number = int(row.number)
+        return SemesterGrade(
+            mnemonic=row.subdepartment,
+            number=number,
+            first_name=row.first_name,
+            last_name=row.last_name,
+            course_id=self.courses.get((row.subdepartment, number)),
+            instructor_id=self.instructors.get((row.first_name, row.last_name)),
+            **{field: int(getattr(row, field)) for field in _COUNT_FIELDS},
+            total_enrolled=int(row.total_enrolled),
+            gpa_enrolled=int(row.gpa_enrolled),
+            average=None if np.isnan(row.average) else float(row.average),
+        )
@@ -8,6 +8,7 @@ from django.conf import settings
 from django.core.management.base import BaseCommand
 
 from tcf_website.models import Course, Instructor, Review, Semester, Subdepartment, User
+from tcf_website.stats import deferred_course_stats
 
 DATA_DIR = "tcf_website/management/commands/review_drives/"
 
@@ -84,7 +85,9 @@ class Command(BaseCommand):
             )
 
         print("Starting file upload...")
-        create_reviews(verbose, f"{year}_{season}.csv", semester, dummy_account)
+        # Refresh course stats once for the whole drive rather than per review
+        with deferred_course_stats():
+            create_reviews(verbose, f"{year}_{season}.csv", semester, dummy_account)
 
 
 def create_reviews(verbose, filename, semester, dummy_account):
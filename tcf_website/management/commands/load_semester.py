@@ -1,24 +1,18 @@
-import math
 import os
-import re
-from datetime import datetime
 
-import pandas as pd
-from django.core.exceptions import ObjectDoesNotExist
 from django.core.management.base import BaseCommand
 from tqdm import tqdm
 
-from tcf_website.models import (
-    Course,
-    Department,
-    Discipline,
-    Instructor,
-    School,
-    Section,
-    SectionTime,
-    Semester,
-    Subdepartment,
-)
+from tcf_website import semesters
+from tcf_website.ingest import SemesterLoader, is_fresh, is_table, peak_rss
+from tcf_website.ingest.semester import CHUNK_SIZE
+from tcf_website.jobs import enqueue
+from tcf_website.models import Section
+from tcf_website.search import autocomplete
+
+DATA_DIR = "tcf_website/management/commands/semester_data/csv/"
+# Columnar copies of the CSVs (see tcf_website.ingest.columnar)
+COLUMNAR_DIR = "tcf_website/management/commands/semester_data/columnar/"
 
 
 class Command(BaseCommand):
@@ -39,23 +33,67 @@ class Command(BaseCommand):
             type=str,
         )
 
+        parser.add_argument(
+            "--data-dir",
+            default=DATA_DIR,
+            help="Directory holding the <year>_<season>.csv files",
+        )
+        parser.add_argument(
+            "--columnar-dir",
+            default=COLUMNAR_DIR,
+            help="Directory holding columnar <year>_<season> tables, used instead "
+            "of CSVs they are up to date with (see convert_columnar)",
+        )
+        parser.add_argument(
+            "--csv-only",
+            action="store_true",
+            help="Ignore columnar tables and parse the CSVs",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="CSV rows parsed at a time",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processes parsing CSV files in parallel (ALL_DANGEROUS only)",
+        )
+        parser.add_argument(
+            "--reconcile",
+            action="store_true",
+            help="Update sections in place (keeping saved schedules) instead of "
+            "deleting and recreating the semester's sections",
+        )
+
     def handle(self, *args, **options):
 
         self.verbose = options["verbose"]
-
-        self.UNKNOWN_SCHOOL, _ = School.objects.get_or_create(name="Miscellaneous")
-        self.UNKNOWN_DEPT, _ = Department.objects.get_or_create(
-            name="Miscellaneous", school=self.UNKNOWN_SCHOOL
+        self.data_dir = options["data_dir"]
+        self.columnar_dir = None if options["csv_only"] else options["columnar_dir"]
+        self.loader = SemesterLoader(
+            chunk_size=options["chunk_size"],
+            reconcile=options["reconcile"],
+            log=self.stdout.write if self.verbose else None,
         )
-        self.STAFF, _ = Instructor.objects.get_or_create(last_name="Staff")
-
-        self.data_dir = "tcf_website/management/commands/semester_data/csv/"
 
         semester = options["semester"]
 
         if semester == "ALL_DANGEROUS":
-            for file in sorted(os.listdir(self.data_dir)):
-                self.load_semester_file(file)
+            files = [
+                self.semester_file(file.removesuffix(".csv"))
+                for file in sorted(os.listdir(self.data_dir))
+                # Ignore temp files (start with '~' on Windows, '.' otherwise)
+                if file[0] not in (".", "~") and file.endswith(".csv")
+            ]
+            batch = self.loader.load_many(files, workers=options["workers"])
+            for result in batch.terms:
+                self.report(result)
+            columnar = sum(is_table(path) for path, _, _ in files)
+            self.stdout.write(f"{batch.timing()}; {columnar} columnar")
+            self.stdout.write(f"Peak RSS: {peak_rss() / 2**20:.0f} MB")
         elif semester == "FIX_LAST_TAUGHT_SEMESTERS":
             # This should be done automatically when loading a semester,
             # but run this command if you notice that it hasn't been done.
@@ -66,361 +104,34 @@ class Command(BaseCommand):
                     section.course.save()
                     section.save()
         else:
-            self.load_semester_file(f"{semester.lower()}.csv")
-
-        print("Completed. Hooray!")
-
-    def clean(self, df):
-        return df.dropna(subset=["Mnemonic", "ClassNumber", "Number", "Section"])
-
-    def load_semester_file(self, file):
-        year, semester = file.split(".")[0].split("_")
-        year = int(year)
-        season = semester.upper()
-
-        print(year, season)
-
-        df = self.clean(pd.read_csv(os.path.join(self.data_dir, file)))
-
-        print(f"{df.size} sections")
-
-        semester = self.load_semester(year, season)
-
-        print(f"Deleting existing sections for {semester}...")
-        Section.objects.filter(semester=semester).delete()
-        print(f"Loading new data for {semester}...")
-
-        for _, row in tqdm(df.iterrows(), total=df.shape[0]):
-            # print(row)
-            self.load_section_row(semester, row)
-            # break
-
-    def load_semester(self, year, season):
-        year_code = str(year)[-2:]
-        season_code = {"FALL": 8, "SUMMER": 6, "SPRING": 2, "JANUARY": 1}[season]
-        semester_code = int(f"1{year_code}{season_code}")
-
-        sem, created = Semester.objects.get_or_create(
-            year=year,
-            season=season,
-            number=semester_code,
-        )
-
-        if self.verbose:
-            if created:
-                print(f"Created {sem}")
-            else:
-                print(f"Retrieved {sem}")
-
-        return sem
-
-    def load_section_row(self, semester, row):
-        try:
-            mnemonic = row["Mnemonic"]  # may NOT be missing
-            sis_number = row["ClassNumber"]  # may NOT be missing
-            # strip out non-numeric characters.
-            # may NOT be missing
-            course_number = re.sub("[^0-9]", "", str(row["Number"]))
-
-            units = row["Units"]  # may be empty/nan
-            units_min, units_max = self.parse_section_catalog_units(units)
-            title = row["Title"]  # may be empty/nan
-            topic = row["Topic"]  # may be empty/nan
-            description = row["Description"]  # may be empty/nan
-            disciplines = row["Disciplines"]  # may be empty/nan (Need to split on "$")
-            cost = row["Cost"]  # may be empty/nan
-            section_type = row["Type"]  # may be empty/nan
-
-            # may include staff, may be empty
-            instructor_names = (
-                row[["Instructor1", "Instructor2", "Instructor3", "Instructor4"]]
-                .dropna()
-                .array
+            self.report(self.loader.load(*self.semester_file(semester.lower())))
+            self.stdout.write(f"Peak RSS: {peak_rss() / 2**20:.0f} MB")
+
+        # Web workers rebuild their semester snapshot and search index on
+        # their next request (bulk writes skip the model signals).
+        for job in (semesters.INVALIDATE_JOB, autocomplete.INVALIDATE_JOB):
+            enqueue(job, dedupe_key=job)
+        self.stdout.write("Completed. Hooray!")
+
+    def semester_file(self, term):
+        """``(path, year, season)`` for a term named ``<year>_<season>``.
+
+        The term's columnar table is used if it is up to date with its CSV.
+        """
+        year, season = term.split("_")
+        path = os.path.join(self.data_dir, f"{term}.csv")
+        if self.columnar_dir:
+            table = os.path.join(self.columnar_dir, term)
+            if is_fresh(table, path):
+                path = table
+        return path, int(year), season.upper()
+
+    def report(self, result):
+        self.stdout.write(result.summary())
+        if self.loader.reconcile:
+            self.stdout.write(f"Sections: {result.diff()}")
+        if result.skipped_rows:
+            self.stdout.write(
+                f"Skipped {result.skipped_rows} rows missing a mnemonic, "
+                "class number, course number or section."
             )
-
-            times = row[["Days1", "Days2", "Days3", "Days4"]].dropna().array
-
-            section_times = ""
-            for i in range(len(times)):
-                section_times += str(times[i]) + ","
-
-        except TypeError as e:
-            print(row)
-            print(e)
-            raise e
-
-        sd = self.load_subdepartment(mnemonic)
-        course = self.load_course(
-            title, description, disciplines, semester, sd, course_number
-        )
-        instructors = self.load_instructors(instructor_names)
-        self.load_section(
-            sis_number,
-            instructors,
-            semester,
-            course,
-            topic,
-            units,
-            units_min,
-            units_max,
-            section_type,
-            section_times,
-            cost,
-        )
-
-    def load_subdepartment(self, mnemonic):
-
-        try:
-            sd = Subdepartment.objects.get(
-                mnemonic=mnemonic,
-            )
-            if self.verbose:
-                print(f"Retrieved {sd}")
-        except ObjectDoesNotExist:  # no SD
-            sd = Subdepartment(mnemonic=mnemonic, department=self.UNKNOWN_DEPT)
-            sd.save()
-            if self.verbose:
-                print(f"Created {sd}")
-        return sd
-
-    # TODO: how to handle special topics courses?
-    # topic: section topic
-    # description: course description!
-    def load_course(
-        self, title, description, disciplines, semester, subdepartment, number
-    ):
-
-        params = {}
-        fields = {"title", "description", "subdepartment", "number"}
-        for k, v in locals().items():
-            if k in fields and not pd.isnull(v):
-                params[k] = v
-
-        try:
-            course = Course.objects.get(subdepartment=subdepartment, number=number)
-            if self.verbose:
-                print(f"Retrieved {course}")
-        except ObjectDoesNotExist:
-            # create new Course with title, description, subdepartment, number
-            course = Course(**params)
-            course.semester_last_taught = semester
-            course.save()
-            if self.verbose:
-                print(f"Created {course}")
-
-        # fill in blank info
-        if not pd.isnull(disciplines):
-            attrs = []
-            for attr in disciplines.split("$"):
-                attr = attr.strip()
-                if not attr:
-                    continue
-                try:
-                    attribute = Discipline.objects.get(name=attr)
-                except ObjectDoesNotExist:
-                    attribute = Discipline(name=attr)
-                    attribute.save()
-                attrs.append(attribute)
-            course.disciplines.set(attrs)
-        if not course.description and not pd.isnull(description):
-            course.description = description
-        if not course.title and not pd.isnull(title):
-            course.description = title
-        # update with new info if possible
-        if semester.is_after(course.semester_last_taught):
-            course.semester_last_taught = semester
-            if not pd.isnull(description):
-                course.description = description
-            if not pd.isnull(title):
-                course.title = title
-        course.save()
-
-        return course
-
-    def load_instructors(self, instructor_names):
-        if not instructor_names:
-            return [self.STAFF]
-        instructors = set()
-
-        # In some old data files, multiple professors are in a single column
-        fixed_instructor_names = []
-        for name in instructor_names:
-            for split_name in name.split(","):
-                stripped = split_name.strip()
-                if stripped != "":
-                    fixed_instructor_names.append(stripped)
-
-        for name in fixed_instructor_names:
-            if name in {"Staff", "Faculty Staff", "Faculty"} or name.isspace():
-                instructors.add(self.STAFF)
-            else:
-                names = name.split()
-                try:
-                    first, last = names[0], names[-1]
-                except IndexError as e:
-                    print(f"Instructor named '{name}'")
-                    print(e)
-                    raise e
-                if self.verbose:
-                    print(first, last)
-
-                instructor, created = Instructor.objects.get_or_create(
-                    first_name=first,
-                    last_name=last,
-                )
-                if self.verbose:
-                    if created:
-                        print(f"Created {instructor}")
-                    else:
-                        print(f"Retrieved {instructor}")
-                instructors.add(instructor)
-        return instructors
-
-    def parse_section_catalog_units(self, raw):
-        """Whole credits (min, max) from CSV Units; (0, 0) if missing or unparseable."""
-        if raw is None or (isinstance(raw, float) and math.isnan(raw)):
-            return 0, 0
-        try:
-            if pd.isna(raw):
-                return 0, 0
-        except (TypeError, ValueError):
-            pass
-        s = str(raw).strip()
-        if not s or s.lower() == "nan":
-            return 0, 0
-        for ch in ("\u2013", "\u2014", "\u2212"):
-            s = s.replace(ch, "-")
-
-        parts = re.split(r"\s*-\s*", s, maxsplit=1)
-        if len(parts) == 2:
-            try:
-                lo = int(round(float(parts[0].strip())))
-                hi = int(round(float(parts[1].strip())))
-                return min(lo, hi), max(lo, hi)
-            except ValueError:
-                pass
-        try:
-            n = int(round(float(s)))
-            return n, n
-        except ValueError:
-            pass
-
-        nums = re.findall(r"\d+\.?\d*|\.\d+", s)
-        if len(nums) >= 2:
-            try:
-                lo = int(round(float(nums[0])))
-                hi = int(round(float(nums[1])))
-                return min(lo, hi), max(lo, hi)
-            except ValueError:
-                pass
-        if len(nums) == 1:
-            try:
-                n = int(round(float(nums[0])))
-                return n, n
-            except ValueError:
-                pass
-        return 0, 0
-
-    def load_section(
-        self,
-        sis_section_number,
-        instructors,
-        semester,
-        course,
-        topic,
-        units,
-        units_min,
-        units_max,
-        section_type,
-        section_times,
-        cost,
-    ):
-
-        # Separating out unique fields lets us search for a given section number in
-        # a semester (which are unique) and then update it with new fields as necessary.
-        # Could maybe use `update_or_create`, but I couldn't resolve some
-        # errors.
-
-        unique_params = {}
-        params = {}
-
-        unique_fields = {
-            "sis_section_number",
-            "semester",
-        }
-        fields = {
-            "course",
-            "topic",
-            "units",
-            "units_min",
-            "units_max",
-            "section_type",
-            "section_times",
-            "cost",
-        }
-
-        for key, value in locals().items():
-            if key in unique_fields and not pd.isnull(value):
-                unique_params[key] = value
-            if key in fields and not pd.isnull(value):
-                params[key] = value
-
-        section = None
-        created = False
-        try:
-            section = Section.objects.get(**unique_params)
-            for key, value in params.items():
-                setattr(section, key, value)
-            section.save()
-        except Section.DoesNotExist:
-            params |= unique_params
-            section = Section.objects.create(**params)
-            created = True
-
-        for instructor in instructors:
-            section.instructors.add(instructor)
-
-        if self.verbose:
-            if created:
-                print(f"Created/updated {section}")
-            else:
-                print(f"Retrieved {section}")
-
-        def parse_section_times(section_times_str):
-            if not section_times_str:
-                return []
-
-            times = []
-            for time_block in section_times_str.split(","):
-                if not time_block.strip():
-                    continue
-                try:
-                    days_part, time_part = time_block.strip().split(" ", 1)
-                    start_time, end_time = time_part.split(" - ")
-
-                    # Create time block with boolean fields
-                    time_data = {
-                        "monday": "Mo" in days_part,
-                        "tuesday": "Tu" in days_part,
-                        "wednesday": "We" in days_part,
-                        "thursday": "Th" in days_part,
-                        "friday": "Fr" in days_part,
-                        "start_time": datetime.strptime(start_time, "%I:%M%p").time(),
-                        "end_time": datetime.strptime(end_time, "%I:%M%p").time(),
-                    }
-                    times.append(time_data)
-
-                except (ValueError, IndexError):
-                    continue
-
-            return times
-
-        # Clear existing section times
-        section.sectiontime_set.all().delete()
-
-        # Create new section times
-        times = parse_section_times(section_times)
-        for time_data in times:
-            SectionTime.objects.create(section=section, **time_data)
-
-        return section
@@ -0,0 +1,158 @@
+"""Backfill the course stats read models and verify them against live aggregates.
+
+Covers ``CourseStats`` (one row per course) and ``CourseInstructorStats``
+(one row per course–instructor pair with reviews or grades).
+
+Usage:
+  # Recompute every course and pair, then check the stored rows
+  python manage.py rebuild_course_stats
+
+  # Only compare stored rows with live aggregates (no writes)
+  python manage.py rebuild_course_stats --check-only
+"""
+
+import math
+
+from cachalot.api import invalidate
+from django.core.management.base import BaseCommand, CommandError
+from tqdm import tqdm
+
+from tcf_website.models import (
+    Course,
+    CourseInstructorGrade,
+    CourseInstructorStats,
+    CourseStats,
+    Review,
+)
+from tcf_website.stats import (
+    compute_course_stats,
+    compute_pair_stats,
+    refresh_course_stats,
+    refresh_pair_stats,
+)
+from tcf_website.stats.services import COURSE_STATS_FIELDS, PAIR_STATS_FIELDS
+
+BATCH_SIZE = 1000
+
+# Float averages are recomputed in SQL both ways; allow for rounding noise only.
+TOLERANCE = 1e-6
+
+
+def _matches(stored, live) -> bool:
+    if stored is None or live is None:
+        return stored is None and live is None
+    return math.isclose(stored, live, abs_tol=TOLERANCE)
+
+
+def _batches(items):
+    return [
+        items[start : start + BATCH_SIZE] for start in range(0, len(items), BATCH_SIZE)
+    ]
+
+
+def _all_pairs():
+    """Every pair that has, or should have, a CourseInstructorStats row."""
+    pairs = set(
+        Review.objects.filter(course__isnull=False, instructor__isnull=False)
+        .values_list("course_id", "instructor_id")
+        .distinct()
+    )
+    pairs.update(
+        CourseInstructorGrade.objects.filter(
+            course__isnull=False, instructor__isnull=False
+        )
+        .values_list("course_id", "instructor_id")
+        .distinct()
+    )
+    pairs.update(
+        CourseInstructorStats.objects.values_list("course_id", "instructor_id")
+    )
+    return sorted(pairs)
+
+
+class Command(BaseCommand):
+    help = "Rebuild precomputed course stats and verify them against live aggregates"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check-only",
+            action="store_true",
+            help="Skip the rebuild and only report mismatches",
+        )
+        parser.add_argument(
+            "--suppress-tqdm",
+            action="store_true",
+            help="Suppress the tqdm loading bar",
+        )
+
+    def handle(self, *args, **options):
+        self.disable_tqdm = options["suppress_tqdm"]
+        course_batches = _batches(
+            list(Course.objects.order_by("pk").values_list("pk", flat=True))
+        )
+        pair_batches = _batches(_all_pairs())
+
+        if not options["check_only"]:
+            courses = sum(
+                refresh_course_stats(batch)
+                for batch in tqdm(
+                    course_batches, desc="Courses", disable=self.disable_tqdm
+                )
+            )
+            pairs = sum(
+                refresh_pair_stats(batch)
+                for batch in tqdm(pair_batches, desc="Pairs", disable=self.disable_tqdm)
+            )
+            invalidate(CourseStats, CourseInstructorStats)
+            self.stdout.write(f"Rebuilt stats for {courses} courses and {pairs} pairs.")
+
+        mismatches = self._verify_courses(course_batches) + self._verify_pairs(
+            pair_batches
+        )
+        for line in mismatches[:20]:
+            self.stderr.write(line)
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} stats mismatches.")
+        self.stdout.write(self.style.SUCCESS("Verified course and pair stats."))
+
+    def _verify_courses(self, batches):
+        mismatches = []
+        for batch in tqdm(batches, desc="Verifying courses", disable=self.disable_tqdm):
+            stored = {
+                row["course_id"]: row
+                for row in CourseStats.objects.filter(course_id__in=batch).values(
+                    "course_id", *COURSE_STATS_FIELDS
+                )
+            }
+            for pk, live in compute_course_stats(batch).items():
+                row = stored.get(pk)
+                if row is None:
+                    mismatches.append(f"course {pk}: missing stats row")
+                    continue
+                mismatches.extend(
+                    f"course {pk}: {field} stored={row[field]} live={live[field]}"
+                    for field in COURSE_STATS_FIELDS
+                    if not _matches(row[field], live[field])
+                )
+        return mismatches
+
+    def _verify_pairs(self, batches):
+        mismatches = []
+        for batch in tqdm(batches, desc="Verifying pairs", disable=self.disable_tqdm):
+            stored = CourseInstructorStats.for_pairs(batch)
+            live_stats = compute_pair_stats(batch)
+            for pair in batch:
+                row, live = stored.get(pair), live_stats.get(pair)
+                if row is None and live is None:
+                    continue
+                if row is None or live is None:
+                    state = "missing" if row is None else "stale"
+                    mismatches.append(f"pair {pair}: {state} stats row")
+                    continue
+                mismatches.extend(
+                    f"pair {pair}: {field} stored={getattr(row, field)} "
+                    f"live={live[field]}"
+                    for field in PAIR_STATS_FIELDS
+                    if not _matches(getattr(row, field), live[field])
+                )
+        return mismatches
@@ -0,0 +1,103 @@
+"""Run background jobs from the PostgreSQL job queue (``tcf_website.jobs``).
+
+Jobs are queued by review saves and hides (stats refreshes), grade loads and
+semester loads (stats refreshes and cache version bumps). Any number of
+workers can run at once; each claims due jobs with ``SKIP LOCKED``.
+
+A database error (e.g. during a failover) is logged and the round retried
+after a growing pause; the worker only exits when told to stop.
+
+Usage:
+  python manage.py run_worker                  # poll until stopped (SIGTERM/SIGINT)
+  python manage.py run_worker --once           # run every due job, then exit
+  python manage.py run_worker --queue stats.refresh_courses
+"""
+
+import logging
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from tcf_website.jobs import run_batch
+
+logger = logging.getLogger(__name__)
+
+# Longest pause between rounds while the database keeps failing.
+MAX_ERROR_BACKOFF = 30.0
+
+
+class Command(BaseCommand):
+    """Management command: claim and run queued jobs."""
+
+    help = "Runs queued background jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no job is due instead of polling",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Jobs claimed per round; same-name jobs run as one batch",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait when no job is due (default: 2)",
+        )
+        parser.add_argument(
+            "--queue",
+            action="append",
+            dest="names",
+            help="Only run jobs with this name (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        stopping = []
+
+        def stop(signum, frame):
+            stopping.append(signum)
+
+        if not options["once"]:
+            signal.signal(signal.SIGTERM, stop)
+            signal.signal(signal.SIGINT, stop)
+
+        totals = [0, 0, 0]
+        errors = 0
+        while not stopping:
+            # Like a request boundary: drop broken or expired connections.
+            close_old_connections()
+            try:
+                result = run_batch(options["batch_size"], names=options["names"])
+            except DatabaseError:
+                if options["once"]:
+                    raise
+                errors += 1
+                delay = min(
+                    options["poll_interval"] * 2 ** min(errors, 8), MAX_ERROR_BACKOFF
+                )
+                logger.exception("Job round failed; retrying in %.1fs", delay)
+                close_old_connections()
+                time.sleep(delay)
+                continue
+            errors = 0
+            totals = [a + b for a, b in zip(totals, result, strict=True)]
+            if options["verbosity"] > 1 and any(result):
+                self.stdout.write(
+                    f"{result.done} done, {result.retried} retrying, "
+                    f"{result.failed} failed"
+                )
+            if sum(result):
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["poll_interval"])
+        self.stdout.write(
+            f"Ran {totals[0]} job(s); {totals[1]} to retry, {totals[2]} failed"
+        )
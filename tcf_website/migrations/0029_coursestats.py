@@ -0,0 +1,76 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_course_stats(apps, schema_editor):
+    """Seed CourseStats for every course from live review/grade aggregates."""
+    Course = apps.get_model("tcf_website", "Course")
+    CourseGrade = apps.get_model("tcf_website", "CourseGrade")
+    CourseStats = apps.get_model("tcf_website", "CourseStats")
+    Review = apps.get_model("tcf_website", "Review")
+
+    reviews = {
+        row["course_id"]: row
+        for row in Review.objects.filter(hidden=False)
+        .values("course_id")
+        .annotate(
+            rating=models.Avg(
+                (
+                    models.F("instructor_rating")
+                    + models.F("enjoyability")
+                    + models.F("recommendability")
+                )
+                / models.Value(3.0),
+                output_field=models.FloatField(),
+            ),
+            difficulty=models.Avg("difficulty"),
+            count=models.Count("id"),
+        )
+        .order_by()
+    }
+    gpas = dict(
+        CourseGrade.objects.values("course_id")
+        .annotate(gpa=models.Avg("average"))
+        .order_by()
+        .values_list("course_id", "gpa")
+    )
+    rows = []
+    for pk in Course.objects.values_list("pk", flat=True).iterator():
+        review = reviews.get(pk, {})
+        rows.append(
+            CourseStats(
+                course_id=pk,
+                average_rating=review.get("rating"),
+                average_difficulty=review.get("difficulty"),
+                average_gpa=gpas.get(pk),
+                review_count=review.get("count", 0),
+            )
+        )
+    CourseStats.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tcf_website', '0028_schedule_share_token_schedulebookmark_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseStats',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='tcf_website.course')),
+                ('average_rating', models.FloatField(blank=True, null=True)),
+                ('average_difficulty', models.FloatField(blank=True, null=True)),
+                ('average_gpa', models.FloatField(blank=True, null=True)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['average_rating'], name='tcf_website_average_602bde_idx'), models.Index(fields=['average_difficulty'], name='tcf_website_average_bb83d8_idx'), models.Index(fields=['average_gpa'], name='tcf_website_average_bb8657_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_course_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,141 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+_REVIEW_AVERAGES = {
+    "instructor_rating": "average_instructor_rating",
+    "enjoyability": "average_enjoyability",
+    "recommendability": "average_recommendability",
+    "difficulty": "average_difficulty",
+    "hours_per_week": "average_hours_per_week",
+    "amount_reading": "average_amount_reading",
+    "amount_writing": "average_amount_writing",
+    "amount_group": "average_amount_group",
+    "amount_homework": "average_amount_homework",
+}
+
+_GRADE_FIELDS = (
+    "a_plus",
+    "a",
+    "a_minus",
+    "b_plus",
+    "b",
+    "b_minus",
+    "c_plus",
+    "c",
+    "c_minus",
+    "dfw",
+    "total_enrolled",
+)
+
+
+def backfill_pair_stats(apps, schema_editor):
+    """Seed CourseInstructorStats for every pair with visible reviews or grades."""
+    CourseInstructorGrade = apps.get_model("tcf_website", "CourseInstructorGrade")
+    CourseInstructorStats = apps.get_model("tcf_website", "CourseInstructorStats")
+    Review = apps.get_model("tcf_website", "Review")
+
+    not_toxic = models.Q(toxicity_rating__lt=settings.TOXICITY_THRESHOLD)
+    stats = {}
+    review_rows = (
+        Review.objects.filter(
+            hidden=False, course__isnull=False, instructor__isnull=False
+        )
+        .values("course_id", "instructor_id")
+        .annotate(
+            **{column: models.Avg(field) for field, column in _REVIEW_AVERAGES.items()},
+            num_ratings=models.Count("id", filter=not_toxic),
+            num_reviews=models.Count("id", filter=not_toxic & ~models.Q(text="")),
+        )
+        .order_by()
+    )
+    for row in review_rows:
+        pair = (row.pop("course_id"), row.pop("instructor_id"))
+        components = (
+            row["average_instructor_rating"],
+            row["average_enjoyability"],
+            row["average_recommendability"],
+        )
+        row["average_rating"] = sum(components) / 3 if all(components) else None
+        stats.setdefault(pair, {}).update(row)
+
+    grade_rows = (
+        CourseInstructorGrade.objects.filter(
+            course__isnull=False, instructor__isnull=False
+        )
+        .values("course_id", "instructor_id")
+        .annotate(
+            average_gpa=models.Avg("average"),
+            grade_count=models.Count("id"),
+            **{f"sum_{field}": models.Sum(field) for field in _GRADE_FIELDS},
+        )
+        .order_by()
+    )
+    for row in grade_rows:
+        values = stats.setdefault((row["course_id"], row["instructor_id"]), {})
+        values["average_gpa"] = row["average_gpa"]
+        values["grade_count"] = row["grade_count"]
+        for field in _GRADE_FIELDS:
+            values[field] = row[f"sum_{field}"] or 0
+
+    CourseInstructorStats.objects.bulk_create(
+        [
+            CourseInstructorStats(course_id=course_id, instructor_id=instructor_id, **values)
+            for (course_id, instructor_id), values in stats.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tcf_website', '0029_coursestats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseInstructorStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('average_rating', models.FloatField(blank=True, null=True)),
+                ('average_instructor_rating', models.FloatField(blank=True, null=True)),
+                ('average_enjoyability', models.FloatField(blank=True, null=True)),
+                ('average_recommendability', models.FloatField(blank=True, null=True)),
+                ('average_difficulty', models.FloatField(blank=True, null=True)),
+                ('average_hours_per_week', models.FloatField(blank=True, null=True)),
+                ('average_amount_reading', models.FloatField(blank=True, null=True)),
+                ('average_amount_writing', models.FloatField(blank=True, null=True)),
+                ('average_amount_group', models.FloatField(blank=True, null=True)),
+                ('average_amount_homework', models.FloatField(blank=True, null=True)),
+                ('num_ratings', models.PositiveIntegerField(default=0)),
+                ('num_reviews', models.PositiveIntegerField(default=0)),
+                ('average_gpa', models.FloatField(blank=True, null=True)),
+                ('grade_count', models.PositiveIntegerField(default=0)),
+                ('a_plus', models.IntegerField(default=0)),
+                ('a', models.IntegerField(default=0)),
+                ('a_minus', models.IntegerField(default=0)),
+                ('b_plus', models.IntegerField(default=0)),
+                ('b', models.IntegerField(default=0)),
+                ('b_minus', models.IntegerField(default=0)),
+                ('c_plus', models.IntegerField(default=0)),
+                ('c', models.IntegerField(default=0)),
+                ('c_minus', models.IntegerField(default=0)),
+                ('dfw', models.IntegerField(default=0)),
+                ('total_enrolled', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='instructor_stats', to='tcf_website.course')),
+                ('instructor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_stats', to='tcf_website.instructor')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['instructor', 'course'], name='tcf_website_instruc_323249_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='courseinstructorstats',
+            constraint=models.UniqueConstraint(fields=('course', 'instructor'), name='unique_course_instructor_stats'),
+        ),
+        migrations.RunPython(backfill_pair_stats, migrations.RunPython.noop),
+    ]
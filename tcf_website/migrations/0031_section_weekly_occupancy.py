@@ -0,0 +1,108 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:34
+
+import re
+from datetime import datetime
+
+from django.db import migrations
+import tcf_website.occupancy
+
+# Frozen copy of the bitmap layout and meeting parsing as of this migration, so
+# later edits to tcf_website.occupancy / schedule.calendar do not change it.
+_DAYS = (
+    ("MON", "monday", "mo"),
+    ("TUE", "tuesday", "tu"),
+    ("WED", "wednesday", "we"),
+    ("THU", "thursday", "th"),
+    ("FRI", "friday", "fr"),
+)
+_SLOT_MINUTES = 5
+_SLOTS_PER_DAY = 24 * 60 // _SLOT_MINUTES
+_DAY_OFFSETS = {code: i * _SLOTS_PER_DAY for i, (code, _, _) in enumerate(_DAYS)}
+_DAY_TOKENS = {token: code for code, _, token in _DAYS}
+_DAY_TOKEN_PATTERN = re.compile(r"(mo|tu|we|th|fr)", flags=re.IGNORECASE)
+_MEETING_TIME = r"\d{1,2}:\d{2}\s*[APMapm]{2}"
+_MEETING_BLOCK_PATTERN = re.compile(
+    rf"(?P<days>[A-Za-z]+)\s+(?P<start>{_MEETING_TIME})\s*-\s*(?P<end>{_MEETING_TIME})"
+)
+
+
+def _blocks_to_mask(blocks):
+    mask = 0
+    for day_code, start_minutes, end_minutes in blocks:
+        offset = _DAY_OFFSETS.get(day_code)
+        if offset is None or end_minutes <= start_minutes:
+            continue
+        first = max(0, start_minutes // _SLOT_MINUTES)
+        last = min(_SLOTS_PER_DAY, -(-end_minutes // _SLOT_MINUTES))
+        mask |= ((1 << (last - first)) - 1) << (offset + first)
+    return mask
+
+
+def _clock_to_minutes(raw_clock):
+    try:
+        parsed = datetime.strptime(raw_clock.replace(" ", "").upper(), "%I:%M%p")
+    except ValueError:
+        return None
+    return parsed.hour * 60 + parsed.minute
+
+
+def _fallback_blocks(raw_times):
+    blocks = []
+    for block in (raw_times or "").split(","):
+        match = _MEETING_BLOCK_PATTERN.search(block.strip())
+        if not match:
+            continue
+        start = _clock_to_minutes(match.group("start"))
+        end = _clock_to_minutes(match.group("end"))
+        if start is None or end is None or end <= start:
+            continue
+        for token in _DAY_TOKEN_PATTERN.findall(match.group("days")):
+            blocks.append((_DAY_TOKENS[token.lower()], start, end))
+    return blocks
+
+
+def _section_time_blocks(section_times):
+    blocks = []
+    for section_time in section_times:
+        start = section_time.start_time.hour * 60 + section_time.start_time.minute
+        end = section_time.end_time.hour * 60 + section_time.end_time.minute
+        if end <= start:
+            continue
+        for code, day_field, _ in _DAYS:
+            if getattr(section_time, day_field):
+                blocks.append((code, start, end))
+    return blocks
+
+
+def backfill_weekly_occupancy(apps, schema_editor):
+    """Build the occupancy bitmap of every existing section."""
+    Section = apps.get_model("tcf_website", "Section")
+    batch = []
+    for section in Section.objects.prefetch_related("sectiontime_set").iterator(
+        chunk_size=2000
+    ):
+        blocks = _section_time_blocks(section.sectiontime_set.all())
+        if not blocks:
+            blocks = _fallback_blocks(section.section_times)
+        section.weekly_occupancy = _blocks_to_mask(blocks)
+        batch.append(section)
+        if len(batch) >= 2000:
+            Section.objects.bulk_update(batch, ["weekly_occupancy"])
+            batch = []
+    Section.objects.bulk_update(batch, ["weekly_occupancy"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tcf_website', '0030_courseinstructorstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='section',
+            name='weekly_occupancy',
+            field=tcf_website.occupancy.WeeklyOccupancyField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_weekly_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:50
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+# vote model -> (target model, foreign key)
+VOTE_TARGETS = {
+    "Vote": ("Review", "review"),
+    "VoteQuestion": ("Question", "question"),
+    "VoteAnswer": ("Answer", "answer"),
+}
+
+
+def _tally(vote_model, fk, value):
+    rows = (
+        vote_model.objects.filter(**{fk: models.OuterRef("pk"), "value": value})
+        .order_by()
+        .values(fk)
+        .annotate(n=models.Count("pk"))
+        .values("n")
+    )
+    return Coalesce(
+        models.Subquery(rows, output_field=models.IntegerField()), models.Value(0)
+    )
+
+
+def backfill_vote_counters(apps, schema_editor):
+    """Drop zero-valued votes, then count every target's votes once."""
+    for vote_name, (target_name, fk) in VOTE_TARGETS.items():
+        vote_model = apps.get_model("tcf_website", vote_name)
+        vote_model.objects.filter(value=0).delete()
+        apps.get_model("tcf_website", target_name).objects.update(
+            upvote_count=_tally(vote_model, fk, 1),
+            downvote_count=_tally(vote_model, fk, -1),
+            net_votes=_tally(vote_model, fk, 1) - _tally(vote_model, fk, -1),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tcf_website', '0031_section_weekly_occupancy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answer',
+            name='downvote_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='answer',
+            name='net_votes',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='answer',
+            name='upvote_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='downvote_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='net_votes',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='upvote_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='downvote_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='net_votes',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='upvote_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_vote_counters, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='vote',
+            constraint=models.CheckConstraint(check=models.Q(('value__in', (-1, 1))), name='review vote is up or down'),
+        ),
+        migrations.AddConstraint(
+            model_name='voteanswer',
+            constraint=models.CheckConstraint(check=models.Q(('value__in', (-1, 1))), name='answer vote is up or down'),
+        ),
+        migrations.AddConstraint(
+            model_name='votequestion',
+            constraint=models.CheckConstraint(check=models.Q(('value__in', (-1, 1))), name='question vote is up or down'),
+        ),
+    ]
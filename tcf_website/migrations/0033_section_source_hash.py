@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tcf_website', '0032_vote_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='section',
+            name='source_hash',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+    ]
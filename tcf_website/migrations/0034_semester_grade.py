@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tcf_website', '0033_section_source_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SemesterGrade',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mnemonic', models.CharField(max_length=255)),
+                ('number', models.IntegerField()),
+                ('first_name', models.CharField(max_length=255)),
+                ('last_name', models.CharField(max_length=255)),
+                ('a_plus', models.IntegerField(default=0)),
+                ('a', models.IntegerField(default=0)),
+                ('a_minus', models.IntegerField(default=0)),
+                ('b_plus', models.IntegerField(default=0)),
+                ('b', models.IntegerField(default=0)),
+                ('b_minus', models.IntegerField(default=0)),
+                ('c_plus', models.IntegerField(default=0)),
+                ('c', models.IntegerField(default=0)),
+                ('c_minus', models.IntegerField(default=0)),
+                ('dfw', models.IntegerField(default=0)),
+                ('total_enrolled', models.IntegerField(default=0)),
+                ('average', models.FloatField(null=True)),
+                ('gpa_enrolled', models.IntegerField(default=0)),
+                ('course', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='tcf_website.course')),
+                ('instructor', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='tcf_website.instructor')),
+                ('semester', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tcf_website.semester')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['mnemonic', 'number'], name='tcf_website_mnemoni_61d858_idx'), models.Index(fields=['course'], name='tcf_website_course__b4adaf_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='semestergrade',
+            constraint=models.UniqueConstraint(fields=('semester', 'mnemonic', 'number', 'first_name', 'last_name'), name='unique semester grades per course instructor'),
+        ),
+    ]
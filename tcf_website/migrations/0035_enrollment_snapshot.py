@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tcf_website', '0034_semester_grade'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnrollmentSnapshot',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField()),
+                ('resolution', models.SmallIntegerField(choices=[(0, 'Raw'), (1, 'Hourly'), (2, 'Daily')], default=0)),
+                ('enrollment_taken', models.IntegerField(null=True)),
+                ('enrollment_limit', models.IntegerField(null=True)),
+                ('waitlist_taken', models.IntegerField(null=True)),
+                ('waitlist_limit', models.IntegerField(null=True)),
+                ('course', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='tcf_website.course')),
+                ('section', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='tcf_website.section')),
+                ('semester', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tcf_website.semester')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['section', 'taken_at'], name='tcf_website_section_ef1e97_idx'), models.Index(fields=['course', 'semester', 'taken_at'], name='tcf_website_course__89dc08_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tcf_website', '0035_enrollment_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reviewllmsummary',
+            name='source_digest',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tcf_website', '0036_review_summary_digest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('payload', models.JSONField(default=dict)),
+                ('dedupe_key', models.CharField(blank=True, max_length=255, null=True)),
+                ('status', models.SmallIntegerField(choices=[(0, 'Queued'), (1, 'Running'), (2, 'Failed')], default=0)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5)),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status__in', [0, 1])), fields=['run_at', 'id'], name='job_due_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 0)), fields=('dedupe_key',), name='unique_queued_job_dedupe_key'),
+        ),
+    ]
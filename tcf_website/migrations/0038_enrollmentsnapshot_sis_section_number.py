@@ -0,0 +1,61 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_sis_section_number(apps, schema_editor):
+    """Copy each snapshot's section number from the section it points at."""
+    EnrollmentSnapshot = apps.get_model("tcf_website", "EnrollmentSnapshot")
+    Section = apps.get_model("tcf_website", "Section")
+    EnrollmentSnapshot.objects.update(
+        sis_section_number=models.Subquery(
+            Section.objects.filter(pk=models.OuterRef("section_id")).values(
+                "sis_section_number"
+            )[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tcf_website', '0037_job'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='enrollmentsnapshot',
+            name='tcf_website_section_ef1e97_idx',
+        ),
+        migrations.AddField(
+            model_name='enrollmentsnapshot',
+            name='sis_section_number',
+            field=models.IntegerField(null=True),
+        ),
+        migrations.RunPython(backfill_sis_section_number, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='enrollmentsnapshot',
+            name='sis_section_number',
+            field=models.IntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='enrollmentsnapshot',
+            name='course',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, to='tcf_website.course'),
+        ),
+        migrations.AlterField(
+            model_name='enrollmentsnapshot',
+            name='section',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='tcf_website.section'),
+        ),
+        migrations.AlterField(
+            model_name='enrollmentsnapshot',
+            name='semester',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='tcf_website.semester'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollmentsnapshot',
+            index=models.Index(fields=['semester', 'sis_section_number', 'taken_at'], name='tcf_website_semeste_f216f1_idx'),
+        ),
+    ]
@@ -11,9 +11,13 @@ from .models import (
     Course,
     CourseGrade,
     CourseInstructorGrade,
+    CourseInstructorStats,
+    CourseStats,
     Department,
     Discipline,
+    EnrollmentSnapshot,
     Instructor,
+    Job,
     Question,
     Review,
     ReviewLLMSummary,
@@ -24,7 +28,10 @@ from .models import (
     Section,
     SectionTime,
     Semester,
+    SemesterGrade,
     Subdepartment,
     User,
     Vote,
+    VoteAnswer,
+    VoteQuestion,
 )
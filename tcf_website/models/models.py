@@ -1,7 +1,5 @@
 """TCF Database models."""
 
-from typing import Any
-
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.contrib.postgres.indexes import GinIndex
@@ -9,7 +7,6 @@ from django.core.paginator import Page
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.db.models import (
-    Avg,
     CharField,
     Exists,
     ExpressionWrapper,
@@ -21,19 +18,50 @@ from django.db.models import (
     Q,
     QuerySet,
     Subquery,
-    Sum,
     Value,
     fields,
 )
-from django.db.models.functions import Abs, Coalesce, Concat, Round
+from django.db.models.functions import Coalesce, Concat, Round
 from django.utils import timezone
 
+from tcf_website.occupancy import WeeklyOccupancyField
 from tcf_website.pagination import SECTION_DAY_CODE_TO_SECTIONTIME_FIELD, paginate
 
 # Rolling window shared across catalog browse, search, and department pages.
 CATALOG_YEAR_WINDOW = 5
 
 
+def _latest_semester():
+    """Latest semester from the per-process registry (``tcf_website.semesters``)."""
+    # Imported here: the registry module imports this one.
+    from tcf_website.semesters import SemesterRegistry
+
+    return SemesterRegistry.latest()
+
+
+def _toggle_vote(target, user, value):
+    """``toggle_vote`` from ``tcf_website.votes``."""
+    # Imported here: the votes module imports this one.
+    from tcf_website.votes import toggle_vote
+
+    return toggle_vote(target, user, value)
+
+
+def _user_vote(model, user):
+    """``user_vote_subquery`` from ``tcf_website.votes``."""
+    from tcf_website.votes import user_vote_subquery
+
+    return user_vote_subquery(model, user)
+
+
+def _schedule_stats(schedule):
+    """``ScheduleStatsService`` for one schedule (``tcf_website.schedule.stats``)."""
+    # Imported here: the schedule package imports this module.
+    from tcf_website.schedule.stats import ScheduleStatsService
+
+    return ScheduleStatsService([schedule])
+
+
 class School(models.Model):
     """School model.
 
@@ -82,7 +110,7 @@ class Department(models.Model):
         if latest_only:
             qs_filter = {
                 "subdepartment__department": self,
-                "semester_last_taught": Semester.latest(),
+                "semester_last_taught": _latest_semester(),
             }
         else:
             qs_filter = {
@@ -118,24 +146,19 @@ class Department(models.Model):
                 return qs[::-1] if reverse else qs
             case "rating":
                 annotation = Coalesce(
-                    (
-                        Avg("review__recommendability")
-                        + Avg("review__instructor_rating")
-                        + Avg("review__enjoyability")
-                    )
-                    / 3,
+                    F("average_rating"),
                     Value(0) if reverse else Value(5.1),
                     output_field=FloatField(),
                 )
             case "difficulty":
                 annotation = Coalesce(
-                    Avg("review__difficulty"),
+                    F("average_difficulty"),
                     Value(0) if reverse else Value(5.1),
                     output_field=FloatField(),
                 )
             case "gpa":
                 annotation = Coalesce(
-                    Avg("coursegrade__average"),
+                    F("average_gpa"),
                     Value(0) if reverse else Value(4.1),
                     output_field=FloatField(),
                 )
@@ -185,7 +208,7 @@ class Subdepartment(models.Model):
 
     def has_current_course(self):
         """Return True if subdepartment has a course in current semester."""
-        return self.course_set.filter(section__semester=Semester.latest()).exists()
+        return self.course_set.filter(section__semester=_latest_semester()).exists()
 
     class Meta:
         indexes = [
@@ -275,15 +298,7 @@ class User(AbstractUser):
 
     def reviews(self):
         """Return user reviews sorted by creation date."""
-        return self.review_set.annotate(
-            sum_votes=models.functions.Coalesce(
-                models.Sum("vote__value"), models.Value(0)
-            ),
-            user_vote=models.functions.Coalesce(
-                models.Sum("vote__value", filter=models.Q(vote__user=self)),
-                models.Value(0),
-            ),
-        ).order_by("-created")
+        return Review.with_user_vote(self.review_set.all(), self).order_by("-created")
 
     def schedules(self):
         """Return user schedules"""
@@ -314,90 +329,64 @@ class Instructor(models.Model):
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})"
 
-    # this implementation is the same as average_rating in Course
-    # except with an extra
+    def stats_for_course(self, course):
+        """Precomputed ``CourseInstructorStats`` for this instructor and ``course``.
+
+        Returns None when the pair has no visible reviews and no grade data."""
+        return CourseInstructorStats.objects.filter(
+            course=course, instructor=self
+        ).first()
+
+    def _stat_for_course(self, course, field):
+        stats = self.stats_for_course(course)
+        return getattr(stats, field) if stats is not None else None
+
     def average_rating_for_course(self, course):
         """Compute average rating for course.
 
         Rating is defined as the average of recommendability,
         instructor rating, and enjoyability."""
-        ratings = Review.objects.filter(
-            course=course, instructor=self, hidden=False
-        ).aggregate(
-            models.Avg("recommendability"),
-            models.Avg("instructor_rating"),
-            models.Avg("enjoyability"),
-        )
-
-        recommendability = ratings.get("recommendability__avg")
-        instructor_rating = ratings.get("instructor_rating__avg")
-        enjoyability = ratings.get("enjoyability__avg")
-
-        # Return None if one component is absent.
-        if not recommendability or not instructor_rating or not enjoyability:
-            return None
-
-        return (recommendability + instructor_rating + enjoyability) / 3
+        return self._stat_for_course(course, "average_rating")
 
     def average_difficulty_for_course(self, course):
         """Compute average difficulty score."""
-        return Review.objects.filter(
-            course=course, instructor=self, hidden=False
-        ).aggregate(models.Avg("difficulty"))["difficulty__avg"]
+        return self._stat_for_course(course, "average_difficulty")
 
     def average_enjoyability_for_course(self, course):
         """Computer average enjoyability"""
-        return Review.objects.filter(
-            course=course, instructor=self, hidden=False
-        ).aggregate(models.Avg("enjoyability"))["enjoyability__avg"]
+        return self._stat_for_course(course, "average_enjoyability")
 
     def average_instructor_rating_for_course(self, course):
         """Computer average instructor rating"""
-        return Review.objects.filter(
-            course=course, instructor=self, hidden=False
-        ).aggregate(models.Avg("instructor_rating"))["instructor_rating__avg"]
+        return self._stat_for_course(course, "average_instructor_rating")
 
     def average_recommendability_for_course(self, course):
         """Computer average recommendability"""
-        return Review.objects.filter(
-            course=course, instructor=self, hidden=False
-        ).aggregate(models.Avg("recommendability"))["recommendability__avg"]
+        return self._stat_for_course(course, "average_recommendability")
 
     def average_hours_for_course(self, course):
         """Compute average hrs/wk."""
-        return Review.objects.filter(
-            course=course, instructor=self, hidden=False
-        ).aggregate(models.Avg("hours_per_week"))["hours_per_week__avg"]
+        return self._stat_for_course(course, "average_hours_per_week")
 
     def average_reading_hours_for_course(self, course):
         """Compute average reading hrs/wk."""
-        return Review.objects.filter(
-            course=course, instructor=self, hidden=False
-        ).aggregate(models.Avg("amount_reading"))["amount_reading__avg"]
+        return self._stat_for_course(course, "average_amount_reading")
 
     def average_writing_hours_for_course(self, course):
         """Compute average writing hrs/wk."""
-        return Review.objects.filter(
-            course=course, instructor=self, hidden=False
-        ).aggregate(models.Avg("amount_writing"))["amount_writing__avg"]
+        return self._stat_for_course(course, "average_amount_writing")
 
     def average_group_hours_for_course(self, course):
         """Compute average group work hrs/wk."""
-        return Review.objects.filter(
-            course=course, instructor=self, hidden=False
-        ).aggregate(models.Avg("amount_group"))["amount_group__avg"]
+        return self._stat_for_course(course, "average_amount_group")
 
     def average_other_hours_for_course(self, course):
         """Compute average other HW hrs/wk."""
-        return Review.objects.filter(
-            course=course, instructor=self, hidden=False
-        ).aggregate(models.Avg("amount_homework"))["amount_homework__avg"]
+        return self._stat_for_course(course, "average_amount_homework")
 
     def average_gpa_for_course(self, course):
         """Compute average GPA"""
-        return CourseInstructorGrade.objects.filter(
-            course=course, instructor=self
-        ).aggregate(models.Avg("average"))["average__avg"]
+        return self._stat_for_course(course, "average_gpa")
 
     def taught_courses(self):
         """Returns all sections taught by Instructor."""
@@ -445,7 +434,7 @@ class Instructor(models.Model):
         latest_only=True  → current semester only
         latest_only=False → last 5 years (catalog window)
         """
-        latest_semester = Semester.latest()
+        latest_semester = _latest_semester()
 
         if latest_only:
             section_scope = Section.objects.filter(
@@ -472,6 +461,11 @@ class Instructor(models.Model):
             Course.objects.filter(number__gte=1000)
             .annotate(taught_by=taught_by_exists)
             .filter(taught_by=True)
+            .annotate(
+                pair_stats=FilteredRelation(
+                    "instructor_stats", condition=Q(instructor_stats__instructor=self)
+                ),
+            )
             .annotate(
                 subdepartment_name=F("subdepartment__name"),
                 mnemonic=F("subdepartment__mnemonic"),
@@ -483,24 +477,10 @@ class Instructor(models.Model):
                     F("title"),
                     output_field=CharField(),
                 ),
-                # One aggregated expression for avg_rating across review rows
-                avg_rating=Avg(
-                    (
-                        F("review__instructor_rating")
-                        + F("review__enjoyability")
-                        + F("review__recommendability")
-                    )
-                    / Value(3.0),
-                    filter=Q(review__instructor=self, review__hidden=False),
-                ),
-                avg_difficulty=Avg(
-                    "review__difficulty",
-                    filter=Q(review__instructor=self, review__hidden=False),
-                ),
-                avg_gpa=Avg(
-                    "courseinstructorgrade__average",
-                    filter=Q(courseinstructorgrade__instructor=self),
-                ),
+                # One indexed (course, instructor) row instead of per-metric aggregates
+                avg_rating=F("pair_stats__average_rating"),
+                avg_difficulty=F("pair_stats__average_difficulty"),
+                avg_gpa=F("pair_stats__average_gpa"),
                 latest_semester_number=latest_semester_number_sq,
                 is_current=is_current_exists,
             )
@@ -706,7 +686,7 @@ class Course(models.Model):
 
     def is_recent(self):
         """Returns True if course was taught in current semester."""
-        return self.semester_last_taught == Semester.latest()
+        return self.semester_last_taught == _latest_semester()
 
     def average_rating(self):
         """Compute average rating.
@@ -749,44 +729,24 @@ class Course(models.Model):
     def with_stats(cls):
         """Base queryset annotated with display stats (rating, difficulty, GPA, mnemonic).
 
-        Uses a subquery for GPA to avoid a cartesian product between the review
-        and coursegrade tables (which would cause review rows to be multiplied
-        by the number of grade buckets before GROUP BY reduces them).
+        Stats come from the precomputed ``CourseStats`` row (LEFT JOIN, no GROUP BY),
+        so courses without reviews or grades simply get NULLs.
         """
-        avg_gpa_sq = Subquery(
-            CourseGrade.objects.filter(course=OuterRef("pk"))
-            .values("course")
-            .annotate(v=Avg("average"))
-            .values("v")
-        )
         return cls.objects.select_related(
             "subdepartment", "semester_last_taught"
         ).annotate(
             mnemonic=F("subdepartment__mnemonic"),
-            average_rating=Avg(
-                (
-                    F("review__instructor_rating")
-                    + F("review__enjoyability")
-                    + F("review__recommendability")
-                )
-                / Value(3.0),
-                output_field=FloatField(),
-                filter=Q(review__hidden=False),
-            ),
-            average_difficulty=Avg(
-                "review__difficulty", filter=Q(review__hidden=False)
-            ),
-            average_gpa=avg_gpa_sq,
+            average_rating=F("stats__average_rating"),
+            average_difficulty=F("stats__average_difficulty"),
+            average_gpa=F("stats__average_gpa"),
         )
 
     def get_instructors_and_data(self, latest_semester, latest_only=True):
         """Annotate instructors with ratings, difficulty, GPA, and semester last taught.
 
-        Uses FilteredRelation so the course condition moves into the JOIN ON clause
-        rather than a FILTER aggregate clause.  This lets PostgreSQL use the
-        (instructor_id, course_id) compound indexes on review and
-        courseinstructorgrade directly, and eliminates the cartesian product
-        between unrelated review and grade rows before GROUP BY.
+        Stats come from each instructor's precomputed ``CourseInstructorStats`` row,
+        joined through a FilteredRelation so the course condition sits in the
+        JOIN ON clause and hits the (instructor, course) index; no GROUP BY.
 
         Args:
             latest_semester: The most recent semester
@@ -818,25 +778,14 @@ class Course(models.Model):
             Instructor.objects.filter(hidden=False, **base_filter)
             .distinct()
             .annotate(
-                course_reviews=FilteredRelation(
-                    "review", condition=Q(review__course=self, review__hidden=False)
-                ),
-                course_grades=FilteredRelation(
-                    "courseinstructorgrade",
-                    condition=Q(courseinstructorgrade__course=self),
+                pair_stats=FilteredRelation(
+                    "course_stats", condition=Q(course_stats__course=self)
                 ),
             )
             .annotate(
-                rating=Avg(
-                    (
-                        F("course_reviews__instructor_rating")
-                        + F("course_reviews__enjoyability")
-                        + F("course_reviews__recommendability")
-                    )
-                    / Value(3.0)
-                ),
-                gpa=Avg("course_grades__average"),
-                difficulty=Avg("course_reviews__difficulty"),
+                rating=F("pair_stats__average_rating"),
+                gpa=F("pair_stats__average_gpa"),
+                difficulty=F("pair_stats__average_difficulty"),
                 semester_last_taught=semester_last_taught,
             )
         )
@@ -871,7 +820,7 @@ class Course(models.Model):
         query = cls.objects.all()
 
         # Get the latest semester
-        current_semester = Semester.latest()
+        current_semester = _latest_semester()
 
         section_conditions = Q(section__semester=current_semester)
 
@@ -974,6 +923,173 @@ class CourseInstructorGrade(models.Model):
         ]
 
 
+class SemesterGrade(models.Model):
+    """Grade distribution of one course and instructor in one semester.
+
+    The fact table ``load_grades`` upserts each term into; ``CourseGrade``
+    and ``CourseInstructorGrade`` are rolled up from it. Rows are keyed by
+    the course and instructor as the grade data names them, so grades for
+    courses or instructors we don't know yet are still kept.
+    """
+
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE)
+    # Course mnemonic and number as listed in the grade data. Required.
+    mnemonic = models.CharField(max_length=255)
+    number = models.IntegerField()
+    # Instructor name as listed in the grade data. Required.
+    first_name = models.CharField(max_length=255)
+    last_name = models.CharField(max_length=255)
+    # Matching Course and Instructor, if any.
+    course = models.ForeignKey(Course, on_delete=models.SET_NULL, null=True)
+    instructor = models.ForeignKey(Instructor, on_delete=models.SET_NULL, null=True)
+
+    a_plus = models.IntegerField(default=0)
+    a = models.IntegerField(default=0)
+    a_minus = models.IntegerField(default=0)
+    b_plus = models.IntegerField(default=0)
+    b = models.IntegerField(default=0)
+    b_minus = models.IntegerField(default=0)
+    c_plus = models.IntegerField(default=0)
+    c = models.IntegerField(default=0)
+    c_minus = models.IntegerField(default=0)
+    dfw = models.IntegerField(default=0)
+    total_enrolled = models.IntegerField(default=0)
+    # Enrollment-weighted GPA of the sections that reported one; NULL if redacted.
+    average = models.FloatField(null=True)
+    # Students in the sections that reported a GPA (the weight of ``average``).
+    gpa_enrolled = models.IntegerField(default=0)
+
+    def __str__(self):
+        return (
+            f"{self.mnemonic} {self.number} {self.first_name} {self.last_name} "
+            f"{self.semester} {self.average}"
+        )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["mnemonic", "number"]),
+            models.Index(fields=["course"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["semester", "mnemonic", "number", "first_name", "last_name"],
+                name="unique semester grades per course instructor",
+            )
+        ]
+
+
+class CourseStats(models.Model):
+    """Precomputed display stats for a Course (read model behind ``with_stats``).
+
+    Kept current by ``tcf_website.stats`` whenever reviews or grades change;
+    ``rebuild_course_stats`` backfills and verifies the whole table.
+    """
+
+    course = models.OneToOneField(
+        Course, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    # Mean of (instructor_rating + enjoyability + recommendability) / 3 over visible reviews.
+    average_rating = models.FloatField(null=True, blank=True)
+    average_difficulty = models.FloatField(null=True, blank=True)
+    # Mean of CourseGrade.average rows for the course.
+    average_gpa = models.FloatField(null=True, blank=True)
+    # Number of visible (non-hidden) reviews.
+    review_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for {self.course_id}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["average_rating"]),
+            models.Index(fields=["average_difficulty"]),
+            models.Index(fields=["average_gpa"]),
+        ]
+
+
+class CourseInstructorStats(models.Model):
+    """Precomputed review and grade rollup for one (course, instructor) pair.
+
+    Replaces per-metric aggregates on the course-instructor page, schedules and
+    instructor summaries. Kept current by ``tcf_website.stats`` alongside
+    ``CourseStats``; pairs with no reviews and no grades have no row.
+    """
+
+    course = models.ForeignKey(
+        Course, on_delete=models.CASCADE, related_name="instructor_stats"
+    )
+    instructor = models.ForeignKey(
+        Instructor, on_delete=models.CASCADE, related_name="course_stats"
+    )
+
+    # Mean of the three rating components; NULL if any component is missing.
+    average_rating = models.FloatField(null=True, blank=True)
+    average_instructor_rating = models.FloatField(null=True, blank=True)
+    average_enjoyability = models.FloatField(null=True, blank=True)
+    average_recommendability = models.FloatField(null=True, blank=True)
+    average_difficulty = models.FloatField(null=True, blank=True)
+    average_hours_per_week = models.FloatField(null=True, blank=True)
+    average_amount_reading = models.FloatField(null=True, blank=True)
+    average_amount_writing = models.FloatField(null=True, blank=True)
+    average_amount_group = models.FloatField(null=True, blank=True)
+    average_amount_homework = models.FloatField(null=True, blank=True)
+    # Visible reviews under the toxicity threshold, and those with written text.
+    num_ratings = models.PositiveIntegerField(default=0)
+    num_reviews = models.PositiveIntegerField(default=0)
+
+    # Mean of CourseInstructorGrade.average rows for the pair.
+    average_gpa = models.FloatField(null=True, blank=True)
+    # Number of CourseInstructorGrade rows; breakdown counts below are their sums.
+    grade_count = models.PositiveIntegerField(default=0)
+    a_plus = models.IntegerField(default=0)
+    a = models.IntegerField(default=0)
+    a_minus = models.IntegerField(default=0)
+    b_plus = models.IntegerField(default=0)
+    b = models.IntegerField(default=0)
+    b_minus = models.IntegerField(default=0)
+    c_plus = models.IntegerField(default=0)
+    c = models.IntegerField(default=0)
+    c_minus = models.IntegerField(default=0)
+    dfw = models.IntegerField(default=0)
+    total_enrolled = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for course {self.course_id}, instructor {self.instructor_id}"
+
+    @classmethod
+    def for_pairs(cls, pairs):
+        """Map (course_id, instructor_id) -> stats row for many pairs in one query.
+
+        Pairs without a row (no reviews, no grades) are absent from the result.
+        """
+        wanted = set(pairs)
+        if not wanted:
+            return {}
+        rows = cls.objects.filter(
+            course_id__in={course_id for course_id, _ in wanted},
+            instructor_id__in={instructor_id for _, instructor_id in wanted},
+        )
+        return {
+            (row.course_id, row.instructor_id): row
+            for row in rows
+            if (row.course_id, row.instructor_id) in wanted
+        }
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["course", "instructor"],
+                name="unique_course_instructor_stats",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["instructor", "course"]),
+        ]
+
+
 class Section(models.Model):
     """Section model.
 
@@ -1009,6 +1125,10 @@ class Section(models.Model):
 
     # Comma-separated list of times the section is taught.
     section_times = models.CharField(max_length=255, blank=True)
+    # Meeting slots as a bitmap (see ``tcf_website.occupancy``); NULL if not built.
+    weekly_occupancy = WeeklyOccupancyField(null=True, blank=True, editable=False)
+    # Digest of the CSV content the loader last wrote; blank if never reconciled.
+    source_hash = models.CharField(max_length=32, blank=True, editable=False)
 
     # Enrollment data fields
     # Total number of enrolled students. Optional.
@@ -1045,6 +1165,60 @@ class Section(models.Model):
         return self.units_min < self.units_max
 
 
+class EnrollmentSnapshot(models.Model):
+    """Enrollment numbers of a Section as of ``taken_at``.
+
+    Append-only history written by ``fetch_enrollment``: a row is added only
+    when a section's numbers differ from its previous snapshot, so each row
+    holds until the next one. Rows of past terms are thinned to the last
+    snapshot per hour, then per day (``resolution``); see
+    ``tcf_website.enrollment.history``.
+
+    A section's history is keyed by ``(semester, sis_section_number)``, not by
+    the Section row: a replace-mode ``load_semester`` deletes and recreates
+    the term's sections, which only clears ``section`` here.
+    """
+
+    class Resolution(models.IntegerChoices):
+        RAW = 0
+        HOURLY = 1
+        DAILY = 2
+
+    section = models.ForeignKey(Section, on_delete=models.SET_NULL, null=True)
+    # Denormalized from the section so course curves are one range scan; kept
+    # (unconstrained) if the course row goes away.
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+    )
+    # Covered by the (semester, sis_section_number, taken_at) index.
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE, db_index=False)
+    sis_section_number = models.IntegerField()
+    taken_at = models.DateTimeField()
+    resolution = models.SmallIntegerField(
+        choices=Resolution.choices, default=Resolution.RAW
+    )
+
+    enrollment_taken = models.IntegerField(null=True)
+    enrollment_limit = models.IntegerField(null=True)
+    waitlist_taken = models.IntegerField(null=True)
+    waitlist_limit = models.IntegerField(null=True)
+
+    def __str__(self):
+        return (
+            f"{self.section_id} @ {self.taken_at}: "
+            f"{self.enrollment_taken}/{self.enrollment_limit}"
+        )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["semester", "sis_section_number", "taken_at"]),
+            models.Index(fields=["course", "semester", "taken_at"]),
+        ]
+
+
 class SectionTime(models.Model):
     """Section meeting time model.
 
@@ -1105,7 +1279,58 @@ class SectionTime(models.Model):
         ]
 
 
-class Review(models.Model):
+class VotableModel(models.Model):
+    """Up/down vote counters kept in step with the vote rows (``tcf_website.votes``).
+
+    The counters are written only by vote toggles and recounts, never by
+    ``save()``, so editing a row cannot overwrite a concurrent vote.
+    """
+
+    # Number of +1 votes. Maintained by tcf_website.votes.
+    upvote_count = models.PositiveIntegerField(default=0, editable=False)
+    # Number of -1 votes. Maintained by tcf_website.votes.
+    downvote_count = models.PositiveIntegerField(default=0, editable=False)
+    # upvote_count - downvote_count, stored for "Most Helpful" sorting.
+    net_votes = models.IntegerField(default=0, editable=False)
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            skipped = {"upvote_count", "downvote_count", "net_votes"}
+            skipped |= self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                f.name
+                for f in self._meta.concrete_fields
+                if not f.primary_key and f.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
+
+    def count_votes(self):
+        """Current upvote and downvote totals (re-read from this row)."""
+        self.refresh_from_db(fields=["upvote_count", "downvote_count", "net_votes"])
+        return {"upvotes": self.upvote_count, "downvotes": self.downvote_count}
+
+    def upvote(self, user):
+        """Upvote, or undo the user's upvote. Returns the user's vote afterwards."""
+        return _toggle_vote(self, user, 1)
+
+    def downvote(self, user):
+        """Downvote, or undo the user's downvote. Returns the user's vote afterwards."""
+        return _toggle_vote(self, user, -1)
+
+    @classmethod
+    def with_user_vote(cls, queryset, user, name="user_vote"):
+        """Annotate ``name``: ``user``'s vote on each row (+1, -1 or 0)."""
+        return queryset.annotate(**{name: _user_vote(cls, user)})
+
+    class Meta:
+        abstract = True
+
+
+class Review(VotableModel):
     """Review model.
 
     Belongs to a User.
@@ -1193,92 +1418,20 @@ class Review(models.Model):
         """Average score for review."""
         return (self.instructor_rating + self.recommendability + self.enjoyability) / 3
 
-    def count_votes(self):
-        """Sum votes for review."""
-        return self.vote_set.aggregate(
-            upvotes=Coalesce(models.Sum("value", filter=models.Q(value=1)), 0),
-            downvotes=Coalesce(Abs(models.Sum("value", filter=models.Q(value=-1))), 0),
-        )
-
-    def upvote(self, user):
-        """Create an upvote."""
-
-        # Check if already upvoted.
-        upvoted = Vote.objects.filter(
-            user=user,
-            review=self,
-            value=1,
-        ).exists()
-
-        # Delete all prior votes.
-        Vote.objects.filter(
-            user=user,
-            review=self,
-        ).delete()
-
-        # Don't upvote again if previously upvoted.
-        if upvoted:
-            return
-
-        Vote.objects.create(
-            value=1,
-            user=user,
-            review=self,
-        )
-
-    def downvote(self, user):
-        """Create a downvote."""
-
-        # Check if already downvoted.
-        downvoted = Vote.objects.filter(
-            user=user,
-            review=self,
-            value=-1,
-        ).exists()
-
-        # Delete all prior votes.
-        Vote.objects.filter(
-            user=user,
-            review=self,
-        ).delete()
-
-        # Don't downvote again if previously downvoted.
-        if downvoted:
-            return
-
-        Vote.objects.create(
-            value=-1,
-            user=user,
-            review=self,
-        )
-
     @staticmethod
     def get_sorted_reviews(course_id, instructor_id, user, method=""):
         """Prepare review list for course-instructor page."""
 
         # Filter out reviews that are hidden, have no text, or are toxic.
-        reviews = (
-            Review.objects.filter(
-                instructor=instructor_id,
-                course=course_id,
-                toxicity_rating__lt=settings.TOXICITY_THRESHOLD,
-                hidden=False,
-            )
-            .exclude(text="")
-            .annotate(
-                sum_votes=models.functions.Coalesce(
-                    models.Sum("vote__value"), models.Value(0)
-                ),
-            )
-        )
+        reviews = Review.objects.filter(
+            instructor=instructor_id,
+            course=course_id,
+            toxicity_rating__lt=settings.TOXICITY_THRESHOLD,
+            hidden=False,
+        ).exclude(text="")
 
         if user.is_authenticated:
-            reviews = reviews.annotate(
-                user_vote=models.functions.Coalesce(
-                    models.Sum("vote__value", filter=models.Q(vote__user=user)),
-                    models.Value(0),
-                ),
-            )
+            reviews = Review.with_user_vote(reviews, user)
 
         return Review.sort(reviews, method)
 
@@ -1297,17 +1450,8 @@ class Review(models.Model):
     def sort(reviews: "QuerySet[Review]", method="") -> "QuerySet[Review]":
         """Sort reviews by given method - upvotes, rating (low or high), or recent."""
         match method:
-            case "Most Helpful":  # net votes
-                return reviews.annotate(
-                    upvotes=Coalesce(Sum("vote__value", filter=Q(vote__value=1)), 0),
-                    downvotes=Coalesce(
-                        Abs(Sum("vote__value", filter=Q(vote__value=-1))), 0
-                    ),
-                    helpful_score=ExpressionWrapper(
-                        F("upvotes") - F("downvotes"),
-                        output_field=fields.IntegerField(),
-                    ),
-                ).order_by("-helpful_score")
+            case "Most Helpful":
+                return reviews.order_by("-net_votes")
             case "Highest Rating":
                 return Review._annotate_average(reviews).order_by("-average")
             case "Lowest Rating":
@@ -1319,11 +1463,11 @@ class Review(models.Model):
 
     @staticmethod
     def get_paginated_reviews(
-        course_id, instructor_id, user, page_number=1, method=""
+        course_id, instructor_id, user, page_number=1, method="", cursor=None
     ) -> "Page[Review]":
         """Generate sorted, paginated reviews"""
         reviews = Review.get_sorted_reviews(course_id, instructor_id, user, method)
-        return paginate(reviews, page_number)
+        return paginate(reviews, page_number, keyset=True, cursor=cursor)
 
     def __str__(self):
         return f"Review by {self.user} for {self.course} taught by {self.instructor}"
@@ -1378,7 +1522,12 @@ class Vote(models.Model):
             models.UniqueConstraint(
                 fields=["user", "review"],
                 name="unique vote per user and review",
-            )
+            ),
+            # Undone votes are deleted, never stored as 0 (see tcf_website.votes).
+            models.CheckConstraint(
+                check=models.Q(value__in=(-1, 1)),
+                name="review vote is up or down",
+            ),
         ]
 
 
@@ -1390,6 +1539,9 @@ class ReviewLLMSummary(models.Model):
     summary_text = models.TextField()
     model_id = models.CharField(max_length=255)
     source_review_count = models.PositiveIntegerField()
+    # md5 of the visible review set the summary was written from (ids and edit
+    # times); blank for summaries written before it was recorded.
+    source_digest = models.CharField(max_length=32, blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -1405,7 +1557,7 @@ class ReviewLLMSummary(models.Model):
         ]
 
 
-class Question(models.Model):
+class Question(VotableModel):
     """Question model.
     Belongs to a User.
     Has a course and instructor.
@@ -1420,91 +1572,20 @@ class Question(models.Model):
     def __str__(self):
         return f"Question for {self.course}"
 
-    def count_votes(self):
-        """Sum votes for review."""
-        return self.votequestion_set.aggregate(
-            upvotes=Coalesce(models.Sum("value", filter=models.Q(value=1)), 0),
-            downvotes=Coalesce(Abs(models.Sum("value", filter=models.Q(value=-1))), 0),
-        )
-
-    def upvote(self, user):
-        """Create an upvote."""
-
-        # Check if already upvoted.
-        upvoted = VoteQuestion.objects.filter(
-            user=user,
-            question=self,
-            value=1,
-        ).exists()
-
-        # Delete all prior votes.
-        VoteQuestion.objects.filter(
-            user=user,
-            question=self,
-        ).delete()
-
-        # Don't upvote again if previously upvoted.
-        if upvoted:
-            return
-
-        VoteQuestion.objects.create(
-            value=1,
-            user=user,
-            question=self,
-        )
-
-    def downvote(self, user):
-        """Create a downvote."""
-
-        # Check if already downvoted.
-        downvoted = VoteQuestion.objects.filter(
-            user=user,
-            question=self,
-            value=-1,
-        ).exists()
-
-        # Delete all prior votes.
-        VoteQuestion.objects.filter(
-            user=user,
-            question=self,
-        ).delete()
-
-        # Don't downvote again if previously downvoted.
-        if downvoted:
-            return
-
-        VoteQuestion.objects.create(
-            value=-1,
-            user=user,
-            question=self,
-        )
-
     @staticmethod
     def display_activity(course_id, instructor_id, user):
         """Prepare review list for course-instructor page."""
         question = (
             Question.objects.filter(instructor=instructor_id, course=course_id)
             .exclude(text="")
-            .annotate(
-                sum_q_votes=models.functions.Coalesce(
-                    models.Sum("votequestion__value"), models.Value(0)
-                ),
-            )
+            .annotate(sum_q_votes=F("net_votes"))
         )
         if user.is_authenticated:
-            question = question.annotate(
-                user_q_vote=models.functions.Coalesce(
-                    models.Sum(
-                        "votequestion__value",
-                        filter=models.Q(votequestion__user=user),
-                    ),
-                    models.Value(0),
-                ),
-            )
+            question = Question.with_user_vote(question, user, "user_q_vote")
         return question.order_by("-created")
 
 
-class Answer(models.Model):
+class Answer(VotableModel):
     """Answer model.
     Belongs to a User.
     Has a question.
@@ -1519,87 +1600,16 @@ class Answer(models.Model):
     def __str__(self):
         return f"Answer for {self.question}"
 
-    def count_votes(self):
-        """Sum votes for answers."""
-        return self.voteanswer_set.aggregate(
-            upvotes=Coalesce(models.Sum("value", filter=models.Q(value=1)), 0),
-            downvotes=Coalesce(Abs(models.Sum("value", filter=models.Q(value=-1))), 0),
-        )
-
-    def upvote(self, user):
-        """Create an upvote."""
-
-        # Check if already upvoted.
-        upvoted = VoteAnswer.objects.filter(
-            user=user,
-            answer=self,
-            value=1,
-        ).exists()
-
-        # Delete all prior votes.
-        VoteAnswer.objects.filter(
-            user=user,
-            answer=self,
-        ).delete()
-
-        # Don't upvote again if previously upvoted.
-        if upvoted:
-            return
-
-        VoteAnswer.objects.create(
-            value=1,
-            user=user,
-            answer=self,
-        )
-
-    def downvote(self, user):
-        """Create a downvote."""
-
-        # Check if already downvoted.
-        downvoted = VoteAnswer.objects.filter(
-            user=user,
-            answer=self,
-            value=-1,
-        ).exists()
-
-        # Delete all prior votes.
-        VoteAnswer.objects.filter(
-            user=user,
-            answer=self,
-        ).delete()
-
-        # Don't downvote again if previously downvoted.
-        if downvoted:
-            return
-
-        VoteAnswer.objects.create(
-            value=-1,
-            user=user,
-            answer=self,
-        )
-
     @staticmethod
     def display_activity(question_id, user):
         """Prepare answers for course-instructor page."""
         answer = (
             Answer.objects.filter(question=question_id)
             .exclude(text="")
-            .annotate(
-                sum_a_votes=models.functions.Coalesce(
-                    models.Sum("voteanswer__value"), models.Value(0)
-                ),
-            )
+            .annotate(sum_a_votes=F("net_votes"))
         )
         if user.is_authenticated:
-            answer = answer.annotate(
-                user_a_vote=models.functions.Coalesce(
-                    models.Sum(
-                        "voteanswer__value",
-                        filter=models.Q(voteanswer__user=user),
-                    ),
-                    models.Value(0),
-                ),
-            )
+            answer = Answer.with_user_vote(answer, user, "user_a_vote")
         return answer.order_by("-created")
 
     class Meta:
@@ -1639,7 +1649,11 @@ class VoteQuestion(models.Model):
             models.UniqueConstraint(
                 fields=["user", "question"],
                 name="unique vote per user and question",
-            )
+            ),
+            models.CheckConstraint(
+                check=models.Q(value__in=(-1, 1)),
+                name="question vote is up or down",
+            ),
         ]
 
 
@@ -1671,7 +1685,11 @@ class VoteAnswer(models.Model):
             models.UniqueConstraint(
                 fields=["user", "answer"],
                 name="unique vote per user and answer",
-            )
+            ),
+            models.CheckConstraint(
+                check=models.Q(value__in=(-1, 1)),
+                name="answer vote is up or down",
+            ),
         ]
 
 
@@ -1697,228 +1715,18 @@ class Schedule(models.Model):
         ]
 
     def get_schedule(self):
-        """Get the schedule and all its related information"""
-        # NOTE: there may be a way to combine all of these methods into
-        #       one query, but it would be very complicated
-
-        total_grade_points = 0
-        total_course_credits = 0
-        courses = self.get_scheduled_courses()
-
-        # Heterogeneous aggregate: courses, units, ratings, difficulty, GPA.
-        ret: list[Any] = [0] * 5
-        ret[0] = courses  # list of courses in the schedule
-        ret[1] = sum(c.enrolled_units for c in ret[0])
-        ret[2] = (
-            self.average_rating_for_schedule()
-        )  # average rating for the courses in this schedule
-        ret[3] = (
-            self.average_schedule_difficulty()
-        )  # average difficulty for the courses in this schedule
-
-        # calculate weighted gpa based on credits
-        for course in courses:
-            course_gpa = course.gpa
-            course_credits = float(course.enrolled_units)
-
-            if not course_gpa:
-                continue  # pass a given course if there is no gpa for it
-            total_grade_points += course_gpa * course_credits
-            total_course_credits += course_credits
-
-        if total_course_credits:
-            ret[4] = total_grade_points / total_course_credits
-        else:
-            ret[4] = 0.0
-        return ret
+        """Courses, credits, rating, difficulty and weighted GPA for this schedule.
+
+        See ``ScheduleStatsService`` to compute these for many schedules at once.
+        """
+        return _schedule_stats(self).for_schedule(self)
 
     def get_scheduled_courses(self):
         """
         Return scheduled courses associated with this schedule,
         including details about the section and instructor.
         """
-
-        queryset = (
-            self.scheduledcourse_set.select_related("section", "instructor")
-            .annotate(
-                avg_recommendability=Coalesce(
-                    models.Avg(
-                        "section__course__review__recommendability",
-                        filter=models.Q(
-                            section__course__review__instructor=models.F("instructor")
-                        ),
-                    ),
-                    models.Value(0.0),
-                ),
-                avg_instructor_rating=Coalesce(
-                    models.Avg(
-                        "section__course__review__instructor_rating",
-                        filter=models.Q(
-                            section__course__review__instructor=models.F("instructor")
-                        ),
-                    ),
-                    models.Value(0.0),
-                ),
-                avg_enjoyability=Coalesce(
-                    models.Avg(
-                        "section__course__review__enjoyability",
-                        filter=models.Q(
-                            section__course__review__instructor=models.F("instructor")
-                        ),
-                    ),
-                    models.Value(0.0),
-                ),
-                difficulty=Coalesce(
-                    models.Avg(
-                        "section__course__review__difficulty",
-                        filter=models.Q(
-                            section__course__review__instructor_id=models.F(
-                                "instructor"
-                            )
-                        ),
-                    ),
-                    models.Value(0.0),
-                ),
-                title=Concat(
-                    models.F("section__course__subdepartment__mnemonic"),
-                    models.Value(" "),
-                    models.F("section__course__number"),
-                    output_field=models.CharField(),
-                ),
-            )
-            .annotate(
-                total_rating=models.ExpressionWrapper(
-                    (
-                        models.F("avg_recommendability")
-                        + models.F("avg_instructor_rating")
-                        + models.F("avg_enjoyability")
-                    )
-                    / models.Value(3),
-                    output_field=models.FloatField(),
-                )
-            )
-        )
-
-        # Convert queryset to list to allow modifying each instance
-        scheduled_courses = list(queryset)
-
-        for scheduled_course in scheduled_courses:
-            # Use the average_gpa_for_course method to get the GPA
-            gpa = scheduled_course.instructor.average_gpa_for_course(
-                scheduled_course.section.course
-            )
-            # Store the GPA in an attribute of the ScheduledCourse instance
-            scheduled_course.gpa = gpa
-            scheduled_course.credits = scheduled_course.enrolled_units
-
-        return scheduled_courses
-
-    def calculate_total_rating(self, rating):
-        """Calculate the average rating across all categories"""
-        total, count = 0, 0
-        if rating["avg_recommendability"] is not None:
-            total += rating["avg_recommendability"]
-            count += 1
-        if rating["avg_instructor_rating"] is not None:
-            total += rating["avg_instructor_rating"]
-            count += 1
-        if rating["avg_enjoyability"] is not None:
-            total += rating["avg_enjoyability"]
-            count += 1
-        return total / count if count > 0 else None
-
-    def average_rating_for_schedule(self):
-        """Compute average rating for all courses in a schedule.
-
-        Rating is defined as the average of recommendability,
-        instructor rating, and enjoyability."""
-        # Aggregate average ratings for each instructor-section pair
-        aggregated_ratings = (
-            ScheduledCourse.objects.filter(schedule=self)
-            .annotate(
-                related_course_id=models.F("section__course_id"),
-                related_instructor_id=models.F("instructor_id"),
-                related_section_id=models.F("section_id"),
-            )
-            .values("related_course_id", "related_instructor_id", "related_section_id")
-            .annotate(
-                avg_recommendability=models.Avg(
-                    "section__course__review__recommendability",
-                    filter=models.Q(
-                        section__course__review__instructor=models.F(
-                            "related_instructor_id"
-                        )
-                    ),
-                ),
-                avg_instructor_rating=models.Avg(
-                    "section__course__review__instructor_rating",
-                    filter=models.Q(
-                        section__course__review__instructor=models.F(
-                            "related_instructor_id"
-                        )
-                    ),
-                ),
-                avg_enjoyability=models.Avg(
-                    "section__course__review__enjoyability",
-                    filter=models.Q(
-                        section__course__review__instructor=models.F(
-                            "related_instructor_id"
-                        )
-                    ),
-                ),
-            )
-        )
-
-        # Compute the overall average across all instructor-section pairs
-        total_ratings = 0
-        count = 0
-
-        for rating in aggregated_ratings:
-            if all(
-                key in rating
-                for key in [
-                    "avg_recommendability",
-                    "avg_instructor_rating",
-                    "avg_enjoyability",
-                ]
-            ):
-                summed_ratings = self.calculate_total_rating(rating)
-                # if summed_ratings is zero, just continue
-                # in order to provide better UX, could return some indication that courses
-                # were skipped in the calculation
-                if not summed_ratings:
-                    continue
-                total_ratings += summed_ratings
-                count += 1  # Since we're summing three ratings for each course
-
-        return total_ratings / count if count > 0 else 0.00
-
-    def average_schedule_difficulty(self):
-        """Compute average difficulty score."""
-
-        result = (
-            ScheduledCourse.objects.filter(schedule=self)
-            .annotate(
-                course_id=models.F("section__course_id"),  # Reference to the course
-                related_instructor_id=models.F(
-                    "instructor_id"
-                ),  # Reference to the instructor
-            )
-            .values("course_id", "related_instructor_id")
-            .annotate(
-                avg_difficulty=models.Avg(
-                    "section__course__review__difficulty",
-                    filter=models.Q(
-                        section__course__review__instructor_id=models.F(
-                            "related_instructor_id"
-                        )
-                    ),
-                )
-            )
-            .aggregate(overall_avg_difficulty=models.Avg("avg_difficulty"))
-        )
-        final_result = result.get("overall_avg_difficulty")
-        return final_result if final_result else 0.00
+        return self.get_schedule()[0]
 
     def average_schedule_gpa(self):
         """Compute the average GPA for this schedule"""
@@ -1978,3 +1786,50 @@ class ScheduledCourse(models.Model):
 
     def __str__(self):
         return f"{self.section.course} | {self.instructor}"
+
+
+class Job(models.Model):
+    """Background job for ``run_worker`` (see ``tcf_website.jobs``).
+
+    Workers claim due rows with ``FOR UPDATE SKIP LOCKED``. A claimed row stays
+    RUNNING with ``run_at`` pushed out by the lease, so a crashed worker's jobs
+    become due again (or FAILED, on their last attempt). Finished jobs are
+    deleted; failed ones are kept.
+    """
+
+    class Status(models.IntegerChoices):
+        QUEUED = 0
+        RUNNING = 1
+        FAILED = 2
+
+    # Handler name registered with tcf_website.jobs.register.
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    # At most one QUEUED job per key; enqueueing a duplicate is a no-op.
+    dedupe_key = models.CharField(max_length=255, null=True, blank=True)
+    status = models.SmallIntegerField(choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    # When the job is due: first run, retry after backoff, or lease expiry.
+    run_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.get_status_display()})"
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["run_at", "id"],
+                condition=Q(status__in=[0, 1]),
+                name="job_due_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dedupe_key"],
+                condition=Q(status=0),
+                name="unique_queued_job_dedupe_key",
+            ),
+        ]
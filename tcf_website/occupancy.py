@@ -0,0 +1,93 @@
+"""Weekly occupancy bitmaps for sections and schedules.
+
+A week (Monday–Friday) is cut into 5-minute slots; bit ``day * SLOTS_PER_DAY +
+slot`` is set when a meeting covers any part of that slot. Two meeting sets
+conflict exactly when their bitmaps share a bit, so a conflict check is one
+integer AND in Python and one ``bit`` AND in PostgreSQL.
+
+Kept free of model imports so ``models`` can use ``WeeklyOccupancyField``.
+"""
+
+from django.db import models
+
+OCCUPANCY_DAYS = ("MON", "TUE", "WED", "THU", "FRI")
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+OCCUPANCY_BITS = len(OCCUPANCY_DAYS) * SLOTS_PER_DAY
+
+_DAY_OFFSETS = {day: i * SLOTS_PER_DAY for i, day in enumerate(OCCUPANCY_DAYS)}
+
+
+def blocks_to_mask(blocks) -> int:
+    """OR of ``(day_code, start_minutes, end_minutes)`` blocks as a bitmap.
+
+    Slots are rounded outwards, so meetings that only share a partial
+    5-minute slot count as overlapping; back-to-back meetings do not.
+    """
+    mask = 0
+    for day_code, start_minutes, end_minutes in blocks:
+        offset = _DAY_OFFSETS.get(day_code)
+        if offset is None or end_minutes <= start_minutes:
+            continue
+        first = max(0, start_minutes // SLOT_MINUTES)
+        last = min(SLOTS_PER_DAY, -(-end_minutes // SLOT_MINUTES))
+        mask |= ((1 << (last - first)) - 1) << (offset + first)
+    return mask
+
+
+def mask_to_blocks(mask: int) -> list[tuple[str, int, int]]:
+    """Contiguous occupied runs of ``mask`` as ``(day_code, start, end)`` minutes."""
+    blocks = []
+    day_mask = (1 << SLOTS_PER_DAY) - 1
+    for day_code, offset in _DAY_OFFSETS.items():
+        bits = (mask >> offset) & day_mask
+        slot = 0
+        while bits:
+            if not bits & 1:
+                skip = (bits & -bits).bit_length() - 1
+                bits >>= skip
+                slot += skip
+                continue
+            run = (~bits & (bits + 1)).bit_length() - 1
+            blocks.append((day_code, slot * SLOT_MINUTES, (slot + run) * SLOT_MINUTES))
+            bits >>= run
+            slot += run
+    return blocks
+
+
+class WeeklyOccupancyField(models.Field):
+    """``bit(OCCUPANCY_BITS)`` column exposed to Python as an ``int`` bitmap.
+
+    ``filter(<field>__overlaps=mask)`` finds rows sharing a slot with ``mask``.
+    """
+
+    description = "Weekly occupancy bitmap"
+
+    def db_type(self, connection):
+        return f"bit({OCCUPANCY_BITS})"
+
+    def from_db_value(self, value, expression, connection):
+        return self.to_python(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, int):
+            return value
+        return int(value, 2)
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        return format(int(value), f"0{OCCUPANCY_BITS}b")
+
+
+@WeeklyOccupancyField.register_lookup
+class Overlaps(models.Lookup):
+    """``(lhs & rhs) <> 0``: the two bitmaps share at least one slot."""
+
+    lookup_name = "overlaps"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        empty = self.lhs.output_field.get_prep_value(0)
+        return f"({lhs} & {rhs}) <> %s", [*lhs_params, *rhs_params, empty]
@@ -4,7 +4,16 @@ Kept separate from ``utils`` so model modules can import these without pulling i
 ``utils`` (which references models in ``browsable_course_queryset``).
 """
 
-from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+import base64
+import binascii
+import datetime
+import json
+import math
+from decimal import Decimal
+
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
 
 # SectionTime weekday flags (forms / advanced search / Course.filter_by_time).
 SECTION_DAY_CODE_TO_SECTIONTIME_FIELD = {
@@ -15,9 +24,28 @@ SECTION_DAY_CODE_TO_SECTIONTIME_FIELD = {
     "FRI": "friday",
 }
 
+# Below this planner estimate an exact COUNT(*) is cheap enough to just run.
+EXACT_COUNT_BELOW = 10_000
+
+
+def paginate(
+    items, page_number, per_page=10, *, keyset=False, cursor=None, estimate_total=False
+):
+    """Paginate a queryset or list. Returns a Page object.
+
+    With ``keyset=True`` a queryset ordered by plain field/annotation names is
+    paged by seeking past the last row seen (``cursor``, from the Next/Prev
+    links) instead of by OFFSET; see ``KeysetPaginator``. ``estimate_total``
+    takes ``paginator.count`` from the query planner for large results.
+    """
+    if keyset and isinstance(items, QuerySet):
+        ordering = keyset_ordering(items)
+        if ordering is not None:
+            paginator = KeysetPaginator(
+                items, per_page, ordering, estimate_total=estimate_total
+            )
+            return paginator.page(page_number, cursor)
 
-def paginate(items, page_number, per_page=10):
-    """Paginate a queryset or list. Returns a Page object."""
     paginator = Paginator(items, per_page)
     try:
         return paginator.page(page_number)
@@ -25,3 +53,219 @@ def paginate(items, page_number, per_page=10):
         return paginator.page(1)
     except EmptyPage:
         return paginator.page(paginator.num_pages)
+
+
+def keyset_ordering(queryset: QuerySet) -> list[tuple[str, bool]] | None:
+    """``[(name, descending), ...]`` ending in ``pk``, or None if not seekable.
+
+    Only plain names (fields, ``__`` lookups, annotations) can be compared
+    against a cursor; expressions and random ordering fall back to OFFSET.
+    """
+    terms = queryset.query.order_by or queryset.model._meta.ordering
+    ordering = []
+    for term in terms:
+        if not isinstance(term, str) or term == "?":
+            return None
+        name = term.removeprefix("-")
+        ordering.append(("pk" if name == "id" else name, term.startswith("-")))
+    if not ordering or ordering[-1][0] != "pk":
+        # Ties on the sort key are broken by primary key in the same direction.
+        ordering.append(("pk", ordering[-1][1] if ordering else False))
+    return ordering
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """Row count from the planner (``EXPLAIN``), exact when small or off PostgreSQL."""
+    if connections[queryset.db].vendor != "postgresql":
+        return queryset.count()
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    estimate = int(plan[0]["Plan"]["Plan Rows"])
+    if estimate < EXACT_COUNT_BELOW:
+        return queryset.count()
+    return estimate
+
+
+def _json_default(value):
+    # Full precision: DjangoJSONEncoder drops microseconds, which breaks the seek.
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(values: list, forward: bool) -> str:
+    """Opaque URL-safe token for the sort key of a boundary row."""
+    payload = json.dumps(
+        {"d": "n" if forward else "p", "k": values},
+        default=_json_default,
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token) -> tuple[list, bool] | None:
+    """``(values, forward)`` from ``encode_cursor``, or None if malformed."""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values, direction = payload["k"], payload["d"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        return None
+    if not isinstance(values, list) or direction not in ("n", "p"):
+        return None
+    return values, direction == "n"
+
+
+def _key_value(obj, name: str):
+    if isinstance(obj, dict):
+        return obj["id"] if name == "pk" and "pk" not in obj else obj[name]
+    for attr in name.split("__"):
+        if obj is None:
+            return None
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _seek_filter(ordering, values, forward: bool) -> Q:
+    """Rows strictly after (or before) ``values`` in lexicographic ``ordering``."""
+    condition = None
+    for (name, descending), value in reversed(list(zip(ordering, values, strict=True))):
+        lookup = "lt" if descending == forward else "gt"
+        after = Q(**{f"{name}__{lookup}": value})
+        condition = (
+            after if condition is None else after | (Q(**{name: value}) & condition)
+        )
+    return Q() if condition is None else condition
+
+
+class KeysetPaginator(Paginator):
+    """Cursor (seek) pagination with the interface of Django's ``Paginator``.
+
+    A page reached through a Next/Prev cursor filters on the sort key of the
+    boundary row, so deep pages cost the same as the first one and rows
+    inserted meanwhile do not shift the page. Jumping straight to a page
+    number (or a missing/invalid cursor) still uses OFFSET. Sort keys must
+    be non-null; a NULL key on a boundary row also falls back to OFFSET.
+    """
+
+    def __init__(self, object_list, per_page, ordering, estimate_total=False):
+        names = [f"-{name}" if descending else name for name, descending in ordering]
+        super().__init__(object_list.order_by(*names), per_page)
+        self.ordering = ordering
+        self.estimate_total = estimate_total
+        # Page numbers proven to exist by the page that was actually fetched.
+        self._known_pages = None
+
+    @property
+    def count(self):
+        if "_count" not in self.__dict__:
+            self._count = (
+                estimate_count(self.object_list)
+                if self.estimate_total
+                else self.object_list.count()
+            )
+        return self._count
+
+    def _counted_pages(self):
+        return max(1, math.ceil(self.count / self.per_page))
+
+    @property
+    def num_pages(self):
+        estimated = self._counted_pages()
+        if self._known_pages is None:
+            return estimated
+        number, has_next = self._known_pages
+        # The fetched page knows better than an estimate where the end is.
+        return max(estimated, number + 1) if has_next else number
+
+    @property
+    def page_range(self):
+        return range(1, self.num_pages + 1)
+
+    def page(self, number, cursor=None):
+        """Page ``number``, seeking from ``cursor`` when it is usable."""
+        try:
+            number = max(1, int(number))
+        except (TypeError, ValueError):
+            number = 1
+
+        decoded = decode_cursor(cursor)
+        if (
+            decoded is not None
+            and len(decoded[0]) == len(self.ordering)
+            and None not in decoded[0]
+        ):
+            values, forward = decoded
+            rows, has_next, has_previous = self._seek(values, forward)
+            if rows or number == 1:
+                return self._build_page(rows, number, has_next, has_previous)
+
+        rows, has_next = self._offset(number)
+        if not rows and number > 1:
+            # Past the end: show the last page, like ``paginate`` always has.
+            number = self._counted_pages()
+            rows, has_next = self._offset(number)
+        return self._build_page(rows, number, has_next, number > 1)
+
+    def _seek(self, values, forward):
+        queryset = self.object_list.filter(_seek_filter(self.ordering, values, forward))
+        if not forward:
+            queryset = queryset.reverse()
+        rows = list(queryset[: self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if forward:
+            return rows, more, True
+        rows.reverse()
+        return rows, True, more
+
+    def _offset(self, number):
+        offset = (number - 1) * self.per_page
+        rows = list(self.object_list[offset : offset + self.per_page + 1])
+        return rows[: self.per_page], len(rows) > self.per_page
+
+    def _build_page(self, rows, number, has_next, has_previous):
+        self._known_pages = (number, has_next)
+        return KeysetPage(rows, number, self, has_next, has_previous)
+
+
+class KeysetPage(Page):
+    """A ``Page`` that also carries cursors for its Next/Prev neighbours."""
+
+    def __init__(self, object_list, number, paginator, has_next, has_previous):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+    def _cursor(self, obj, forward):
+        values = [_key_value(obj, name) for name, _ in self.paginator.ordering]
+        return encode_cursor(values, forward) if None not in values else ""
+
+    @property
+    def next_cursor(self) -> str:
+        """Token for the page after this one ("" when there is none)."""
+        if not (self._has_next and self.object_list):
+            return ""
+        return self._cursor(self.object_list[-1], forward=True)
+
+    @property
+    def previous_cursor(self) -> str:
+        """Token for the page before this one ("" when there is none)."""
+        if not (self._has_previous and self.object_list):
+            return ""
+        return self._cursor(self.object_list[0], forward=False)
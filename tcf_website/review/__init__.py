@@ -1,4 +1,4 @@
-"""Review domain: forms and query helpers."""
+"""Review domain: forms, query helpers and the AI summary pipeline."""
 
 from .forms import ReviewForm
 from .services import (
@@ -7,11 +7,33 @@ from .services import (
     is_duplicate_review_for_user,
     recent_semester_id_set,
 )
+from .summaries import (
+    PairContext,
+    Staleness,
+    SummaryWriter,
+    TokenBucket,
+    build_messages,
+    plan_refresh,
+    prefetch_pairs,
+    staleness,
+    summarizable_reviews,
+    summary_candidates,
+)
 
 __all__ = [
+    "PairContext",
     "ReviewForm",
+    "Staleness",
+    "SummaryWriter",
+    "TokenBucket",
+    "build_messages",
     "club_semester_choices_payload",
     "instructors_for_course_semester",
     "is_duplicate_review_for_user",
+    "plan_refresh",
+    "prefetch_pairs",
     "recent_semester_id_set",
+    "staleness",
+    "summarizable_reviews",
+    "summary_candidates",
 ]
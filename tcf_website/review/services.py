@@ -1,17 +1,17 @@
 """Review-related queries and small pure helpers."""
 
 from ..models import Instructor
-from ..utils import recent_semesters
+from ..semesters import SemesterRegistry
 
 
 def recent_semester_id_set() -> set[int]:
     """Primary keys of semesters in the recent-catalog window."""
-    return set(recent_semesters().values_list("pk", flat=True))
+    return {s.pk for s in SemesterRegistry.recent()}
 
 
 def club_semester_choices_payload():
     """JSON-serializable term rows for club-mode review (inline club pick)."""
-    return [{"id": s.id, "label": str(s)} for s in recent_semesters()]
+    return [{"id": s.id, "label": str(s)} for s in SemesterRegistry.recent()]
 
 
 def instructors_for_course_semester(course_id: int, semester_id: int):
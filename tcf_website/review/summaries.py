@@ -0,0 +1,388 @@
+"""Pipeline behind ``generate_ai_summaries``.
+
+1. ``prefetch_pairs`` loads the courses, instructors and newest reviews (with
+   their semesters) of every selected pair up front: three queries per chunk
+   of pairs instead of four per pair, and no database access in the workers.
+2. Workers only call the chat completions API. ``TokenBucket`` paces request
+   starts across them; a worker reserves its slot under the lock and sleeps
+   outside it, so waiting workers do not serialize on one another.
+3. ``SummaryWriter`` upserts finished summaries in batches.
+
+Which pairs to send is decided by ``plan_refresh``: a pair's summary is
+stale when its source reviews changed (new, edited or removed reviews change
+``source_digest``) or when it is older than ``MAX_SUMMARY_AGE``. Stale pairs
+are ranked by how stale they are, weighted by how many readers they have,
+and the top ``budget`` pairs are refreshed.
+"""
+
+import heapq
+import math
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.db.models import (
+    CharField,
+    Count,
+    Exists,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    Window,
+)
+from django.db.models.functions import MD5, Cast, Coalesce, Concat, RowNumber
+from django.utils import timezone
+
+from tcf_website.models import (
+    Course,
+    Instructor,
+    Review,
+    ReviewLLMSummary,
+    ScheduledCourse,
+    Section,
+)
+
+MAX_REVIEW_CHARS = 1000
+MIN_REVIEW_COUNT = 5  # minimum number of reviews to create summary
+MAX_REVIEW_COUNT = 50  # maximum number of reviews to include in the prompt
+MAX_SUMMARY_AGE = timedelta(days=180)
+PREFETCH_CHUNK = 500
+WRITE_BATCH = 50
+
+
+def summarizable_reviews():
+    """Reviews that may be shown to the model: visible, non-empty, non-toxic."""
+    return Review.objects.exclude(text="").filter(
+        hidden=False, toxicity_rating__lt=settings.TOXICITY_THRESHOLD
+    )
+
+
+def summary_candidates(semester=None):
+    """Pairs with at least ``MIN_REVIEW_COUNT`` summarizable reviews.
+
+    Each row has ``course_id``, ``instructor_id``, ``review_count``,
+    ``source_digest`` (md5 over the ids and edit times of those reviews) and
+    ``readers``: votes on the pair's reviews plus schedules that include the
+    pair, standing in for page views, which are not tracked.
+    """
+    qs = summarizable_reviews()
+    if semester is not None:
+        qs = qs.filter(
+            Exists(
+                Section.objects.filter(
+                    course_id=OuterRef("course_id"),
+                    semester=semester,
+                    instructors=OuterRef("instructor_id"),
+                )
+            )
+        )
+    scheduled = (
+        ScheduledCourse.objects.filter(
+            section__course_id=OuterRef("course_id"),
+            instructor_id=OuterRef("instructor_id"),
+        )
+        .order_by()
+        .values("instructor_id")
+        .annotate(n=Count("*"))
+        .values("n")
+    )
+    return (
+        qs.values("course_id", "instructor_id")
+        .annotate(
+            review_count=Count("id"),
+            source_digest=MD5(
+                StringAgg(
+                    Concat(
+                        Cast("id", CharField()),
+                        Value(":"),
+                        Cast("modified", CharField()),
+                    ),
+                    delimiter=",",
+                    ordering="id",
+                )
+            ),
+            readers=Sum(F("upvote_count") + F("downvote_count"))
+            + Coalesce(Subquery(scheduled, output_field=IntegerField()), 0),
+        )
+        .filter(review_count__gte=MIN_REVIEW_COUNT)
+        .order_by()
+    )
+
+
+@dataclass(frozen=True)
+class Staleness:
+    """How far a pair's summary lags its reviews; ``age`` is None if missing."""
+
+    new_reviews: int
+    changed: bool
+    age: timedelta | None
+
+    def is_current(self, max_age=MAX_SUMMARY_AGE) -> bool:
+        """True if the summary was written from the current reviews recently."""
+        return self.age is not None and not self.changed and self.age <= max_age
+
+    def score(self, source_review_count, max_age=MAX_SUMMARY_AGE) -> float:
+        """Relative review growth, plus 1 for any change, plus age in ``max_age``s."""
+        growth = max(self.new_reviews, 0) / max(source_review_count, 1)
+        age = (self.age or timedelta()) / max_age
+        return growth + self.changed + age
+
+
+def staleness(row, summary, now) -> Staleness:
+    """``Staleness`` of candidate ``row`` given its summary's values (or None).
+
+    Summaries without a recorded digest count as changed only when the number
+    of reviews differs.
+    """
+    if summary is None:
+        return Staleness(row["review_count"], True, None)
+    new_reviews = row["review_count"] - summary["source_review_count"]
+    if summary["source_digest"]:
+        changed = summary["source_digest"] != row["source_digest"]
+    else:
+        changed = new_reviews != 0
+    return Staleness(new_reviews, changed, now - summary["updated_at"])
+
+
+def plan_refresh(candidates, budget, *, max_age=MAX_SUMMARY_AGE, force=False):
+    """Pick up to ``budget`` candidate rows to regenerate, most urgent first.
+
+    Priority is the staleness score times ``1 + log(1 + readers)``. Returns
+    ``(rows, report)`` where ``report`` counts candidates as ``current``,
+    ``stale`` or ``missing``. With ``force``, current pairs are eligible too.
+    """
+    candidates = list(candidates)
+    summaries = {
+        (s["course_id"], s["instructor_id"]): s
+        for s in ReviewLLMSummary.objects.values(
+            "course_id",
+            "instructor_id",
+            "source_review_count",
+            "source_digest",
+            "updated_at",
+        )
+    }
+    now = timezone.now()
+    report = Counter(current=0, stale=0, missing=0)
+    queue = []
+    for i, row in enumerate(candidates):
+        summary = summaries.get((row["course_id"], row["instructor_id"]))
+        state = staleness(row, summary, now)
+        if summary is None:
+            report["missing"] += 1
+        elif state.is_current(max_age):
+            report["current"] += 1
+            if not force:
+                continue
+        else:
+            report["stale"] += 1
+        source = summary["source_review_count"] if summary else 0
+        priority = state.score(source, max_age) * (1 + math.log1p(row["readers"]))
+        queue.append((priority, -i, row))
+    chosen = heapq.nlargest(budget, queue, key=lambda item: item[:2])
+    return [row for _, _, row in chosen], report
+
+
+@dataclass
+class PairContext:
+    """Everything needed to prompt for one course-instructor pair."""
+
+    course: Course
+    instructor: Instructor
+    reviews: list
+    review_count: int
+    source_digest: str = ""
+
+    def label(self) -> str:
+        """``CS 1420 / Ada Lovelace`` style name for progress output."""
+        return f"{self.course.code()} / {self.instructor.full_name}"
+
+
+def prefetch_pairs(pairs, max_reviews=MAX_REVIEW_COUNT):
+    """``PairContext`` per row of ``pairs`` (dicts with ``course_id``,
+    ``instructor_id`` and ``review_count``), or None where the course or
+    instructor no longer exists.
+
+    Reviews are the ``max_reviews`` newest per pair, picked with a
+    ``ROW_NUMBER()`` window so each chunk of pairs is one query.
+    """
+    courses = Course.objects.select_related("subdepartment").in_bulk(
+        {row["course_id"] for row in pairs}
+    )
+    instructors = Instructor.objects.in_bulk({row["instructor_id"] for row in pairs})
+    reviews = {}
+    for start in range(0, len(pairs), PREFETCH_CHUNK):
+        chunk = pairs[start : start + PREFETCH_CHUNK]
+        selected = Q()
+        for row in chunk:
+            selected |= Q(
+                course_id=row["course_id"], instructor_id=row["instructor_id"]
+            )
+        ranked = (
+            summarizable_reviews()
+            .filter(selected)
+            .select_related("semester")
+            .only(
+                "course_id",
+                "instructor_id",
+                "text",
+                "instructor_rating",
+                "difficulty",
+                "recommendability",
+                "created",
+                "semester__season",
+                "semester__year",
+            )
+            .annotate(
+                rank=Window(
+                    RowNumber(),
+                    partition_by=[F("course_id"), F("instructor_id")],
+                    order_by=F("created").desc(),
+                )
+            )
+            .filter(rank__lte=max_reviews)
+            .order_by("course_id", "instructor_id", "rank")
+        )
+        for review in ranked:
+            reviews.setdefault((review.course_id, review.instructor_id), []).append(
+                review
+            )
+
+    contexts = []
+    for row in pairs:
+        course = courses.get(row["course_id"])
+        instructor = instructors.get(row["instructor_id"])
+        if course is None or instructor is None:
+            contexts.append(None)
+            continue
+        contexts.append(
+            PairContext(
+                course=course,
+                instructor=instructor,
+                reviews=reviews.get((course.pk, instructor.pk), []),
+                review_count=row["review_count"],
+                source_digest=row.get("source_digest", ""),
+            )
+        )
+    return contexts
+
+
+def build_messages(course, instructor, reviews):
+    """Chat messages asking for a summary of ``reviews``."""
+    bullets = []
+    for r in reviews:
+        text = (r.text or "").strip()[:MAX_REVIEW_CHARS]
+        bullets.append(
+            f"- ({r.semester.season} {r.semester.year},"
+            f" {r.instructor_rating}/5 instructor, {r.difficulty}/5 difficulty,"
+            f" {r.recommendability}/5 recommend): {text}"
+        )
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You summarize university course reviews into clear, honest guidance. "
+                "Write 3-5 sentences. Do not use headings or bullet points. "
+                "Do not restate the course or instructor name. Do not invent details."
+                "Match the tone and style of the reviews. Get straight to the point."
+                f"Today's date is {datetime.now().strftime('%B %d, %Y')}."
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                f"Course: {course.code()} — {course.title}\n"
+                f"Instructor: {instructor.full_name}\n\n"
+                "Summarize these student reviews:\n" + "\n".join(bullets)
+            ),
+        },
+    ]
+
+
+class TokenBucket:
+    """Thread-safe rate limiter: ``rate`` tokens per second, at most ``capacity``.
+
+    ``acquire`` takes a token, waiting for one if the bucket is empty. The
+    lock only guards the bookkeeping: a caller reserves the next token (the
+    balance may go negative) and then sleeps without holding it.
+    """
+
+    def __init__(self, rate, capacity=1.0, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = capacity
+        self._updated = clock()
+
+    def reserve(self) -> float:
+        """Take a token; return how many seconds to wait before using it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        """Block until the caller may go ahead."""
+        delay = self.reserve()
+        if delay > 0:
+            self._sleep(delay)
+
+
+class SummaryWriter:
+    """Collects summaries and upserts them ``batch_size`` at a time."""
+
+    def __init__(self, model_id, batch_size=WRITE_BATCH):
+        self.model_id = model_id
+        self.batch_size = batch_size
+        self.pending = []
+        self.written = 0
+
+    def add(self, context: PairContext, summary_text: str) -> None:
+        """Queue the summary of ``context``; writes when a batch is full."""
+        self.pending.append(
+            ReviewLLMSummary(
+                course=context.course,
+                instructor=context.instructor,
+                summary_text=summary_text,
+                model_id=self.model_id,
+                source_review_count=context.review_count,
+                source_digest=context.source_digest,
+            )
+        )
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write queued summaries, replacing existing ones for the same pair."""
+        if not self.pending:
+            return
+        ReviewLLMSummary.objects.bulk_create(
+            self.pending,
+            update_conflicts=True,
+            unique_fields=["course", "instructor"],
+            update_fields=[
+                "summary_text",
+                "model_id",
+                "source_review_count",
+                "source_digest",
+                "updated_at",
+            ],
+        )
+        self.written += len(self.pending)
+        self.pending = []
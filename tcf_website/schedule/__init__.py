@@ -4,12 +4,13 @@ from .calendar import (
     build_merged_weekly_calendar,
     build_weekly_calendar,
     empty_weekly_calendar,
-    existing_schedule_blocks,
     has_schedule_conflict,
     is_lecture_section,
+    schedule_occupancy,
     scheduled_courses_for_calendar,
 )
 from .forms import ScheduleForm
+from .generator import SchedulePreferences, generate_schedules
 from .services import (
     resolve_builder_semester,
     resolve_compare_schedule,
@@ -19,17 +20,21 @@ from .services import (
     schedule_visible_q,
     schedules_for_user,
 )
+from .stats import ScheduleStatsService
 
 __all__ = [
     "ScheduleForm",
+    "SchedulePreferences",
+    "ScheduleStatsService",
     "build_merged_weekly_calendar",
     "build_weekly_calendar",
     "empty_weekly_calendar",
-    "existing_schedule_blocks",
+    "generate_schedules",
     "has_schedule_conflict",
     "is_lecture_section",
     "resolve_builder_semester",
     "resolve_compare_schedule",
+    "schedule_occupancy",
     "scheduled_courses_for_calendar",
     "schedule_builder_return_url",
     "schedule_data_helper",
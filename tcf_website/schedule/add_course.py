@@ -7,10 +7,9 @@ from django.shortcuts import redirect
 from ..models import Course, Instructor, Schedule, ScheduledCourse, Section
 from ..utils import safe_next_url
 from .calendar import (
-    existing_schedule_blocks,
     is_lecture_section,
-    parse_fallback_meeting_blocks,
-    section_time_rows_to_blocks,
+    schedule_occupancy,
+    section_occupancy,
 )
 from .services import schedule_page_url
 
@@ -99,26 +98,11 @@ def parse_schedule_add_selection(
     return section_id, instructor_id, None
 
 
-def candidate_blocks_for_section(section: Section) -> list[tuple[str, int, int]]:
-    """Return meeting blocks for one section."""
-    candidate_blocks = section_time_rows_to_blocks(list(section.sectiontime_set.all()))
-    if not candidate_blocks:
-        candidate_blocks = parse_fallback_meeting_blocks(section.section_times)
-    return candidate_blocks
-
-
-def blocks_conflict(
-    existing_blocks: list[tuple[str, int, int]],
-    candidate_blocks: list[tuple[str, int, int]],
-) -> bool:
-    """Return True when any block in two sets overlaps."""
-    for existing_day, existing_start, existing_end in existing_blocks:
-        for candidate_day, candidate_start, candidate_end in candidate_blocks:
-            if existing_day != candidate_day:
-                continue
-            if candidate_start < existing_end and candidate_end > existing_start:
-                return True
-    return False
+def candidate_occupancy_for_section(section: Section) -> int:
+    """Return the weekly occupancy bitmap for one section."""
+    if section.weekly_occupancy is not None:
+        return int(section.weekly_occupancy)
+    return section_occupancy(list(section.sectiontime_set.all()), section.section_times)
 
 
 def resolve_schedule_add_request(
@@ -145,9 +129,13 @@ def add_course_to_schedule(
     request,
     schedule,
     resolved_selection: tuple[Section, Instructor, int],
-    existing_blocks: list[tuple[str, int, int]],
-) -> bool:
-    """Attempt to add one selected section and emit user-facing messages."""
+    occupied: int,
+) -> int | None:
+    """Attempt to add one selected section and emit user-facing messages.
+
+    Returns the schedule's occupancy including the new section, or None when
+    nothing was added.
+    """
     section, instructor, enrolled_units = resolved_selection
     if ScheduledCourse.objects.filter(
         schedule=schedule, section=section, instructor=instructor
@@ -156,16 +144,16 @@ def add_course_to_schedule(
             request,
             f"Section {section.sis_section_number} is already in this schedule.",
         )
-        return False
+        return None
 
-    candidate_blocks = candidate_blocks_for_section(section)
-    if blocks_conflict(existing_blocks, candidate_blocks):
+    candidate = candidate_occupancy_for_section(section)
+    if occupied & candidate:
         msg = (
             f"Section {section.sis_section_number} conflicts with another meeting "
             "in the selected schedule."
         )
         messages.error(request, msg)
-        return False
+        return None
 
     ScheduledCourse.objects.create(
         schedule=schedule,
@@ -174,8 +162,7 @@ def add_course_to_schedule(
         time=(section.section_times or "").rstrip(","),
         enrolled_units=enrolled_units,
     )
-    existing_blocks.extend(candidate_blocks)
-    return True
+    return occupied | candidate
 
 
 def enrolled_units_from_schedule_add_post(
@@ -257,7 +244,7 @@ def handle_add_course_post(
         return None
 
     schedule, unique_options = resolved_request
-    blocks = existing_schedule_blocks(schedule)
+    occupied = schedule_occupancy(schedule)
     with transaction.atomic():
         for selected_option in unique_options:
             resolved = resolve_schedule_add_post(
@@ -268,12 +255,8 @@ def handle_add_course_post(
                 transaction.set_rollback(True)
                 return None
 
-            if not add_course_to_schedule(
-                request,
-                schedule,
-                resolved,
-                blocks,
-            ):
+            occupied = add_course_to_schedule(request, schedule, resolved, occupied)
+            if occupied is None:
                 transaction.set_rollback(True)
                 return None
     course_label = f"{course.subdepartment.mnemonic} {course.number}"
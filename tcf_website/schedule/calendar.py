@@ -6,6 +6,7 @@ from datetime import datetime, time
 from django.urls import reverse
 
 from ..models import ScheduledCourse, SectionTime
+from ..occupancy import blocks_to_mask
 
 DAY_FIELDS = (
     ("MON", "Mon", "monday"),
@@ -101,6 +102,14 @@ def section_time_rows_to_blocks(
     return blocks
 
 
+def section_occupancy(section_time_rows: list[SectionTime], section_times: str) -> int:
+    """Occupancy bitmap from SectionTime rows, else the legacy time string."""
+    blocks = section_time_rows_to_blocks(section_time_rows)
+    if not blocks:
+        blocks = parse_fallback_meeting_blocks(section_times)
+    return blocks_to_mask(blocks)
+
+
 def _format_minutes(minutes: int) -> str:
     """Format minutes since midnight as a 12-hour clock label."""
     hour = minutes // 60
@@ -331,23 +340,28 @@ def scheduled_courses_for_calendar(schedule):
     return schedule.get_scheduled_courses()
 
 
-def existing_schedule_blocks(schedule) -> list[tuple[str, int, int]]:
-    """All meeting blocks already on this schedule (for conflict checks)."""
+def schedule_occupancy(schedule) -> int:
+    """OR of the occupancy bitmaps of every section on this schedule."""
     existing_courses = list(
         ScheduledCourse.objects.filter(schedule=schedule).select_related("section")
     )
-    if not existing_courses:
-        return []
-
-    section_ids = {course.section_id for course in existing_courses}
-    section_time_map = _build_section_time_map(section_ids)
-
-    existing_blocks: list[tuple[str, int, int]] = []
+    mask = 0
+    missing = []
     for existing_course in existing_courses:
-        existing_blocks.extend(
-            _meeting_blocks_for_schedule_course(existing_course, section_time_map)
-        )
-    return existing_blocks
+        section_mask = existing_course.section.weekly_occupancy
+        if section_mask is None:
+            missing.append(existing_course)
+        else:
+            mask |= section_mask
+
+    # Sections loaded before bitmaps existed: parse their meeting times.
+    if missing:
+        section_time_map = _build_section_time_map({c.section_id for c in missing})
+        for existing_course in missing:
+            mask |= blocks_to_mask(
+                _meeting_blocks_for_schedule_course(existing_course, section_time_map)
+            )
+    return mask
 
 
 def has_schedule_conflict(
@@ -355,18 +369,7 @@ def has_schedule_conflict(
     candidate_blocks: list[tuple[str, int, int]],
 ) -> bool:
     """True when any candidate block overlaps an existing block on the same day."""
-    if not candidate_blocks:
+    candidate_mask = blocks_to_mask(candidate_blocks)
+    if not candidate_mask:
         return False
-
-    blocks = existing_schedule_blocks(schedule)
-    if not blocks:
-        return False
-
-    for candidate_day, candidate_start, candidate_end in candidate_blocks:
-        for existing_day, existing_start, existing_end in blocks:
-            if candidate_day != existing_day:
-                continue
-            if candidate_start < existing_end and candidate_end > existing_start:
-                return True
-
-    return False
+    return bool(schedule_occupancy(schedule) & candidate_mask)
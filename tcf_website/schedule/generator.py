@@ -0,0 +1,308 @@
+"""Automatic schedule generation: non-conflicting section combinations, ranked.
+
+Every wanted course contributes one *component* per kind of section it
+offers (lecture, lab, discussion, ...), and a schedule picks exactly one
+section from each component. All sections of the term for those courses are
+loaded up front with their occupancy bitmaps and course–instructor rollups,
+so the search itself runs in memory: a depth-first walk that ANDs bitmaps to
+reject conflicts and skips branches whose best possible score cannot beat
+the current top-K.
+"""
+
+import heapq
+from dataclasses import dataclass, field
+
+from ..models import CourseInstructorStats, Section, Semester
+from ..occupancy import OCCUPANCY_DAYS, SLOTS_PER_DAY, blocks_to_mask
+from .calendar import is_lecture_section, section_occupancy
+
+MAX_COURSES = 8
+MAX_RESULTS = 25
+# Search nodes visited before returning the best schedules found so far.
+MAX_NODES = 200_000
+
+# Stand-ins for pairs with no reviews or grades, so unknown is not worst.
+NEUTRAL_RATING = 3.0
+NEUTRAL_GPA = 3.0
+NEUTRAL_DIFFICULTY = 3.0
+
+_DAY_MASKS = {
+    day: ((1 << SLOTS_PER_DAY) - 1) << (i * SLOTS_PER_DAY)
+    for i, day in enumerate(OCCUPANCY_DAYS)
+}
+
+
+@dataclass(frozen=True)
+class SchedulePreferences:
+    """Ranking weights and time preferences for generated schedules."""
+
+    # Minutes since midnight; meetings outside the window are penalised.
+    earliest_start: int | None = None
+    latest_end: int | None = None
+    # Weekdays the student would like to keep free.
+    free_days: tuple[str, ...] = ()
+    rating_weight: float = 1.0
+    gpa_weight: float = 1.0
+    difficulty_weight: float = 0.5
+    time_weight: float = 1.0
+    free_day_weight: float = 1.0
+
+    def outside_window_mask(self) -> int:
+        """Bitmap of every slot before ``earliest_start`` or after ``latest_end``."""
+        blocks = []
+        for day in OCCUPANCY_DAYS:
+            if self.earliest_start is not None:
+                blocks.append((day, 0, self.earliest_start))
+            if self.latest_end is not None:
+                blocks.append((day, self.latest_end, 24 * 60))
+        return blocks_to_mask(blocks)
+
+
+@dataclass(frozen=True)
+class SectionOption:
+    """One pickable (section, instructor) with its bitmap and precomputed score."""
+
+    section: Section
+    instructor_id: int
+    instructor_name: str
+    occupancy: int
+    rating: float | None
+    gpa: float | None
+    difficulty: float | None
+    score: float
+
+
+@dataclass(order=True)
+class GeneratedSchedule:
+    """A conflict-free pick of one option per component."""
+
+    score: float
+    options: tuple[SectionOption, ...] = field(compare=False)
+    occupancy: int = field(compare=False)
+
+    def free_days(self) -> list[str]:
+        """Weekdays with no meetings."""
+        return [day for day, mask in _DAY_MASKS.items() if not self.occupancy & mask]
+
+    def as_dict(self) -> dict:
+        """JSON-ready payload; ``selection`` values match the add-course form."""
+        return {
+            "score": round(self.score, 4),
+            "credits": sum(o.section.units_min for o in self.options),
+            "rating": _mean(o.rating for o in self.options),
+            "gpa": _mean(o.gpa for o in self.options),
+            "difficulty": _mean(o.difficulty for o in self.options),
+            "free_days": self.free_days(),
+            "sections": [
+                {
+                    "course_id": o.section.course_id,
+                    "course": o.section.course.code(),
+                    "section_id": o.section.pk,
+                    "section_number": o.section.sis_section_number,
+                    "section_type": o.section.section_type or "Lecture",
+                    "times": (o.section.section_times or "").rstrip(","),
+                    "instructor_id": o.instructor_id,
+                    "instructor": o.instructor_name,
+                    "selection": f"{o.section.pk}:{o.instructor_id}",
+                }
+                for o in self.options
+            ],
+        }
+
+
+def _mean(values) -> float | None:
+    values = [value for value in values if value is not None]
+    return round(sum(values) / len(values), 2) if values else None
+
+
+def _option_score(stats, occupancy: int, prefs: SchedulePreferences, outside: int):
+    rating = gpa = difficulty = None
+    if stats is not None:
+        rating = stats.average_rating
+        gpa = stats.average_gpa
+        difficulty = stats.average_difficulty
+    score = (
+        prefs.rating_weight * (rating or NEUTRAL_RATING) / 5
+        + prefs.gpa_weight * (gpa or NEUTRAL_GPA) / 4
+        + prefs.difficulty_weight * (1 - (difficulty or NEUTRAL_DIFFICULTY) / 5)
+    )
+    if occupancy & outside:
+        score -= prefs.time_weight
+    return rating, gpa, difficulty, score
+
+
+def _component_key(section: Section) -> str:
+    if is_lecture_section(section.section_type):
+        return "lecture"
+    return section.section_type.strip().lower()
+
+
+def load_components(
+    semester: Semester, course_ids: list[int], prefs: SchedulePreferences
+) -> list[list[SectionOption]]:
+    """Options grouped into components, each sorted best score first.
+
+    Team-taught sections keep only their best-scoring instructor: every
+    instructor shares the section's times, so the others can never rank higher.
+    """
+    sections = list(
+        Section.objects.filter(semester=semester, course_id__in=course_ids)
+        .select_related("course__subdepartment")
+        .prefetch_related("instructors", "sectiontime_set")
+        .order_by("course_id", "sis_section_number")
+    )
+    stats = CourseInstructorStats.for_pairs(
+        (section.course_id, instructor.pk)
+        for section in sections
+        for instructor in section.instructors.all()
+    )
+    outside = prefs.outside_window_mask()
+
+    components: dict[tuple[int, str], list[SectionOption]] = {}
+    for section in sections:
+        occupancy = section.weekly_occupancy
+        if occupancy is None:
+            occupancy = section_occupancy(
+                list(section.sectiontime_set.all()), section.section_times
+            )
+        best = None
+        for instructor in section.instructors.all():
+            if instructor.hidden:
+                continue
+            rating, gpa, difficulty, score = _option_score(
+                stats.get((section.course_id, instructor.pk)), occupancy, prefs, outside
+            )
+            if best is None or score > best.score:
+                best = SectionOption(
+                    section=section,
+                    instructor_id=instructor.pk,
+                    instructor_name=instructor.full_name
+                    or f"{instructor.first_name} {instructor.last_name}".strip(),
+                    occupancy=occupancy,
+                    rating=rating,
+                    gpa=gpa,
+                    difficulty=difficulty,
+                    score=score,
+                )
+        if best is not None:
+            key = (section.course_id, _component_key(section))
+            components.setdefault(key, []).append(best)
+
+    for options in components.values():
+        options.sort(key=lambda o: (-o.score, o.section.sis_section_number))
+    return list(components.values())
+
+
+class _Search:
+    """Branch-and-bound over components, keeping the ``limit`` best schedules."""
+
+    def __init__(
+        self,
+        components: list[list[SectionOption]],
+        prefs: SchedulePreferences,
+        limit: int,
+    ):
+        # Fewest options first: conflicts prune the tree as early as possible.
+        self.components = list(components)
+        self.components.sort(key=len)
+        self.prefs = prefs
+        self.limit = limit
+        self.free_day_masks = [
+            _DAY_MASKS[day] for day in prefs.free_days if day in _DAY_MASKS
+        ]
+        # Best score still reachable from component i onwards.
+        self.best_rest = [0.0] * (len(self.components) + 1)
+        for i in range(len(self.components) - 1, -1, -1):
+            self.best_rest[i] = self.best_rest[i + 1] + self.components[i][0].score
+        self.heap: list[tuple[float, tuple[int, ...], GeneratedSchedule]] = []
+        self.nodes = 0
+        self.exhausted = True
+
+    def _free_day_bonus(self, occupancy: int) -> float:
+        free = sum(1 for mask in self.free_day_masks if not occupancy & mask)
+        return self.prefs.free_day_weight * free
+
+    def _threshold(self) -> float | None:
+        return self.heap[0][0] if len(self.heap) >= self.limit else None
+
+    def run(self) -> list[GeneratedSchedule]:
+        self._visit(0, 0, 0.0, [])
+        return [entry[2] for entry in sorted(self.heap, reverse=True)]
+
+    def _visit(self, depth, occupancy, score, picked):
+        self.nodes += 1
+        if self.nodes > MAX_NODES:
+            self.exhausted = False
+            return
+        if depth == len(self.components):
+            total = score + self._free_day_bonus(occupancy)
+            # Stable ordering among equal scores: lower section ids first.
+            tiebreak = tuple(-o.section.pk for o in picked)
+            entry = (
+                total,
+                tiebreak,
+                GeneratedSchedule(total, tuple(picked), occupancy),
+            )
+            if len(self.heap) < self.limit:
+                heapq.heappush(self.heap, entry)
+            elif entry[:2] > self.heap[0][:2]:
+                heapq.heapreplace(self.heap, entry)
+            return
+
+        for option in self.components[depth]:
+            if occupancy & option.occupancy:
+                continue
+            next_occupancy = occupancy | option.occupancy
+            next_score = score + option.score
+            # Free days only disappear as sections are added: bonus is an upper bound.
+            bound = (
+                next_score
+                + self.best_rest[depth + 1]
+                + self._free_day_bonus(next_occupancy)
+            )
+            threshold = self._threshold()
+            if threshold is not None and bound <= threshold:
+                continue
+            picked.append(option)
+            self._visit(depth + 1, next_occupancy, next_score, picked)
+            picked.pop()
+            if not self.exhausted:
+                return
+
+
+@dataclass
+class GenerationResult:
+    """Ranked schedules plus what the search could not satisfy."""
+
+    schedules: list[GeneratedSchedule]
+    # Wanted courses with no (visible) sections this term.
+    missing_course_ids: list[int]
+    # False when the node budget ran out before the search finished.
+    exhausted: bool
+
+
+def generate_schedules(
+    semester: Semester,
+    course_ids: list[int],
+    prefs: SchedulePreferences | None = None,
+    limit: int = 10,
+) -> GenerationResult:
+    """Top ``limit`` conflict-free schedules covering every wanted course.
+
+    Raises ValueError for more than ``MAX_COURSES`` distinct courses.
+    """
+    prefs = prefs or SchedulePreferences()
+    course_ids = list(dict.fromkeys(course_ids))
+    if len(course_ids) > MAX_COURSES:
+        raise ValueError(f"at most {MAX_COURSES} courses can be combined")
+    limit = max(1, min(limit, MAX_RESULTS))
+
+    components = load_components(semester, course_ids, prefs)
+    covered = {options[0].section.course_id for options in components}
+    missing = [pk for pk in course_ids if pk not in covered]
+    if missing or not components:
+        return GenerationResult([], missing, True)
+
+    search = _Search(components, prefs, limit)
+    schedules = search.run()
+    return GenerationResult(schedules, [], search.exhausted)
@@ -6,6 +6,8 @@ from django.db.models import Prefetch, Q
 from django.urls import reverse
 
 from ..models import Schedule, ScheduledCourse, Semester
+from ..semesters import SemesterRegistry
+from .stats import ScheduleStatsService
 
 
 def schedule_visible_q(user):
@@ -71,9 +73,13 @@ def resolve_builder_semester(request, user) -> Semester | None:
     may still point at the previous term until the client syncs; inferring the term
     from schedule would ignore the user's new semester and show the wrong courses.
     """
+    semesters = SemesterRegistry.snapshot()
     raw_sem = request.GET.get("semester") or request.POST.get("semester")
     if raw_sem:
-        sem = Semester.objects.filter(pk=raw_sem).first()
+        try:
+            sem = semesters.get(int(raw_sem))
+        except (TypeError, ValueError):
+            sem = None
         if sem is not None:
             return sem
 
@@ -91,7 +97,7 @@ def resolve_builder_semester(request, user) -> Semester | None:
         except (TypeError, ValueError):
             pass
 
-    return Semester.latest()
+    return semesters.latest
 
 
 def schedules_for_user(user, semester: Semester | None):
@@ -123,8 +129,9 @@ def schedule_data_helper(request, semester: Semester | None):
     credits_context = {}
     gpa_context = {}
 
+    schedule_stats = ScheduleStatsService(schedules).results()
     for s in schedules:
-        s_data = s.get_schedule()
+        s_data = schedule_stats[s.id]
         courses_context[s.id] = s_data[0]
         credits_context[s.id] = s_data[1]
         ratings_context[s.id] = s_data[2]
@@ -138,4 +145,5 @@ def schedule_data_helper(request, semester: Semester | None):
         "difficulty": difficulty_context,
         "credits": credits_context,
         "schedules_gpa": gpa_context,
+        "schedule_stats": schedule_stats,
     }
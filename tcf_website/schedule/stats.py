@@ -0,0 +1,148 @@
+"""Batched schedule aggregates: courses, credits, rating, difficulty, weighted GPA."""
+
+from collections.abc import Iterable
+from typing import Any
+
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Concat
+
+from ..models import CourseInstructorStats, Schedule, ScheduledCourse
+
+
+def _decorate(scheduled_course, stats) -> None:
+    """Attach the per-row stats the schedule list and calendar templates read."""
+    scheduled_course.avg_recommendability = (
+        stats and stats.average_recommendability
+    ) or 0.0
+    scheduled_course.avg_instructor_rating = (
+        stats and stats.average_instructor_rating
+    ) or 0.0
+    scheduled_course.avg_enjoyability = (stats and stats.average_enjoyability) or 0.0
+    scheduled_course.difficulty = (stats and stats.average_difficulty) or 0.0
+    scheduled_course.total_rating = (
+        scheduled_course.avg_recommendability
+        + scheduled_course.avg_instructor_rating
+        + scheduled_course.avg_enjoyability
+    ) / 3
+    scheduled_course.gpa = stats.average_gpa if stats else None
+    scheduled_course.credits = scheduled_course.enrolled_units
+
+
+def _pair_rating(stats) -> float | None:
+    """Mean of the three rating components that have a value."""
+    if stats is None:
+        return None
+    components = [
+        value
+        for value in (
+            stats.average_recommendability,
+            stats.average_instructor_rating,
+            stats.average_enjoyability,
+        )
+        if value is not None
+    ]
+    return sum(components) / len(components) if components else None
+
+
+def _summarize(courses: list, stats_by_pair: dict) -> list[Any]:
+    """``[courses, credits, rating, difficulty, gpa]`` for one schedule."""
+    # Rating counts each scheduled section, difficulty each course–instructor
+    # pair, as the per-schedule aggregates always have.
+    ratings = []
+    for course_id, instructor_id, _ in {
+        (c.section.course_id, c.instructor_id, c.section_id) for c in courses
+    }:
+        rating = _pair_rating(stats_by_pair.get((course_id, instructor_id)))
+        if rating:
+            ratings.append(rating)
+
+    difficulties = []
+    for pair in {(c.section.course_id, c.instructor_id) for c in courses}:
+        stats = stats_by_pair.get(pair)
+        if stats is not None and stats.average_difficulty is not None:
+            difficulties.append(stats.average_difficulty)
+    difficulty = sum(difficulties) / len(difficulties) if difficulties else None
+
+    total_grade_points = 0
+    total_course_credits = 0
+    for course in courses:
+        if not course.gpa:
+            continue
+        course_credits = float(course.enrolled_units)
+        total_grade_points += course.gpa * course_credits
+        total_course_credits += course_credits
+
+    return [
+        courses,
+        sum(c.enrolled_units for c in courses),
+        sum(ratings) / len(ratings) if ratings else 0.00,
+        difficulty or 0.00,
+        total_grade_points / total_course_credits if total_course_credits else 0.0,
+    ]
+
+
+def _schedule_id(schedule: Schedule | int) -> int:
+    """Primary key of ``schedule``, whether given as a model or an id."""
+    return int(schedule.pk if isinstance(schedule, Schedule) else schedule)
+
+
+class ScheduleStatsService:
+    """Aggregates for many schedules in a constant number of queries.
+
+    One query loads every scheduled course of every schedule and one loads the
+    ``CourseInstructorStats`` rows for their (course, instructor) pairs, each
+    pair fetched once however many schedules share it. Results have the shape
+    of ``Schedule.get_schedule()``: ``[courses, credits, rating, difficulty, gpa]``.
+    """
+
+    def __init__(self, schedules: Iterable[Schedule | int]):
+        self.schedule_ids: list[int] = list(
+            dict.fromkeys(_schedule_id(s) for s in schedules)
+        )
+        self._results: dict[int, list[Any]] | None = None
+
+    def results(self) -> dict[int, list[Any]]:
+        """Schedule id -> ``[courses, credits, rating, difficulty, gpa]``."""
+        if self._results is None:
+            self._results = self._compute()
+        return self._results
+
+    def for_schedule(self, schedule: Schedule | int) -> list[Any]:
+        """Aggregates for one of the schedules this service was built with."""
+        return self.results()[_schedule_id(schedule)]
+
+    def _compute(self) -> dict[int, list[Any]]:
+        courses_by_schedule: dict[int, list] = {pk: [] for pk in self.schedule_ids}
+        if not self.schedule_ids:
+            return {}
+
+        scheduled_courses = list(
+            ScheduledCourse.objects.filter(schedule_id__in=self.schedule_ids)
+            .select_related("section", "instructor")
+            .annotate(
+                title=Concat(
+                    F("section__course__subdepartment__mnemonic"),
+                    Value(" "),
+                    F("section__course__number"),
+                    output_field=CharField(),
+                ),
+            )
+            .order_by("pk")
+        )
+        stats_by_pair = CourseInstructorStats.for_pairs(
+            (sc.section.course_id, sc.instructor_id) for sc in scheduled_courses
+        )
+
+        for scheduled_course in scheduled_courses:
+            _decorate(
+                scheduled_course,
+                stats_by_pair.get(
+                    (scheduled_course.section.course_id, scheduled_course.instructor_id)
+                ),
+            )
+            courses_by_schedule[scheduled_course.schedule_id].append(scheduled_course)
+
+        return {
+            pk: _summarize(courses, stats_by_pair)
+            for pk, courses in courses_by_schedule.items()
+        }
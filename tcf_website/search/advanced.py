@@ -2,8 +2,9 @@
 
 from django.db.models import Exists, F, OuterRef, Q
 
-from ..models import Club, Section, Semester
+from ..models import Club, Course, CourseGrade, Section
 from ..pagination import SECTION_DAY_CODE_TO_SECTIONTIME_FIELD
+from ..semesters import SemesterRegistry
 from ..utils import browsable_course_queryset
 
 _SORT_MAP = {
@@ -61,11 +62,19 @@ def _apply_course_filters(qs, filters):
     if description := filters.get("description"):
         course_q &= Q(description__icontains=description)
 
+    # Multi-valued relations go through EXISTS: with_stats() no longer groups by
+    # course, so a JOIN here would repeat a course once per matching row.
     if discipline := filters.get("discipline"):
-        course_q &= Q(disciplines__name__in=discipline)
+        course_q &= Exists(
+            Course.disciplines.through.objects.filter(
+                course_id=OuterRef("pk"), discipline__name__in=discipline
+            )
+        )
 
     if min_gpa := filters.get("min_gpa"):
-        course_q &= Q(coursegrade__average__gte=min_gpa)
+        course_q &= Exists(
+            CourseGrade.objects.filter(course_id=OuterRef("pk"), average__gte=min_gpa)
+        )
 
     if course_q:
         qs = qs.filter(course_q)
@@ -168,7 +177,7 @@ def _apply_section_filters(qs, filters):
             Exists(
                 Section.objects.filter(
                     course=OuterRef("pk"),
-                    semester=Semester.latest(),
+                    semester=SemesterRegistry.latest(),
                     enrollment_taken__lt=F("enrollment_limit"),
                 )
             )
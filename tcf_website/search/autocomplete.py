@@ -0,0 +1,377 @@
+"""Per-worker in-memory index for search-bar autocomplete.
+
+Every keystroke in the search bar used to run two or three trigram queries for
+at most a handful of rows. ``AutocompleteIndex`` keeps the searched columns
+(course codes and titles, instructor names, club names) in compact
+array-backed trigram posting lists in each worker and scores queries with the
+same rules as pg_trgm's ``similarity()``, so the dropdown is answered without
+touching PostgreSQL.
+
+The index is rebuilt when the shared catalog version in the cache changes
+(courses, instructors, clubs or their labels saved or deleted anywhere) and is
+dropped if it would grow past ``AUTOCOMPLETE_INDEX_MAX_BYTES``. Whenever it
+cannot answer — not built yet, over budget, inside a transaction, or a query
+pg_trgm might split differently — callers get None and use the database path.
+"""
+
+import logging
+import re
+import sys
+import threading
+import uuid
+from array import array
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+
+from ..jobs import register_invalidation
+from ..models import Club, ClubCategory, Course, Instructor, Subdepartment
+from ..utils import browsable_course_queryset, min_catalog_semester_year
+
+logger = logging.getLogger(__name__)
+
+# Shared-cache key holding the current catalog version.
+VERSION_KEY = "tcf:autocomplete-index:version"
+INVALIDATE_JOB = "autocomplete.invalidate"
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Same cut-offs as the database path in ``views.catalog.search``.
+COURSE_THRESHOLD = 0.15
+INSTRUCTOR_THRESHOLD = 0.5
+CLUB_THRESHOLD = 0.15
+
+# pg_trgm word characters: letters and digits; everything else separates words.
+_WORD = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: str) -> set[str]:
+    """pg_trgm's trigram set: lowercased words padded with two spaces before, one after."""
+    grams = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a: str, b: str) -> float:
+    """Python equivalent of pg_trgm ``similarity(a, b)``."""
+    left, right = trigrams(a), trigrams(b)
+    shared = len(left & right)
+    union = len(left) + len(right) - shared
+    return shared / union if union else 0.0
+
+
+def _round_score(score: float) -> float:
+    # Round(..., 2) in SQL rounds halves away from zero.
+    return int(score * 100 + 0.5) / 100
+
+
+class _TrigramPostings:
+    """Trigram -> document posting lists over one or more text columns.
+
+    Each (row, column) pair is a document; ``best_scores`` returns the highest
+    similarity of any of a row's columns, like ``Greatest(TrigramSimilarity...)``.
+    """
+
+    def __init__(self, columns: Iterable[tuple[int, str]]):
+        postings: dict[str, array] = {}
+        self.rows = array("I")
+        self.sizes = array("H")
+        for row, text in columns:
+            grams = trigrams(text)
+            if not grams:
+                continue
+            doc = len(self.rows)
+            self.rows.append(row)
+            self.sizes.append(min(len(grams), 0xFFFF))
+            for gram in grams:
+                postings.setdefault(gram, array("I")).append(doc)
+        self.postings = postings
+
+    def best_scores(self, grams: set[str]) -> dict[int, float]:
+        hits: Counter = Counter()
+        for gram in grams:
+            docs = self.postings.get(gram)
+            if docs is not None:
+                hits.update(docs)
+        best: dict[int, float] = {}
+        for doc, shared in hits.items():
+            score = shared / (len(grams) + self.sizes[doc] - shared)
+            row = self.rows[doc]
+            if score > best.get(row, 0.0):
+                best[row] = score
+        return best
+
+    def nbytes(self) -> int:
+        return (
+            sys.getsizeof(self.postings)
+            + sum(
+                sys.getsizeof(gram) + sys.getsizeof(docs)
+                for gram, docs in self.postings.items()
+            )
+            + sys.getsizeof(self.rows)
+            + sys.getsizeof(self.sizes)
+        )
+
+
+def _rows_nbytes(rows: list[tuple]) -> int:
+    return sys.getsizeof(rows) + sum(
+        sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) for row in rows
+    )
+
+
+@dataclass(frozen=True)
+class AutocompleteSnapshot:
+    """Immutable index of one catalog version.
+
+    Result dicts carry the keys the autocomplete dropdown renders plus
+    ``max_similarity`` (used by ``decide_order``), not full search rows.
+    """
+
+    version: tuple
+    # (id, mnemonic, number, title)
+    courses: list[tuple]
+    course_postings: _TrigramPostings
+    # (id, first_name, last_name, email)
+    instructors: list[tuple]
+    instructor_postings: _TrigramPostings
+    # (id, name, category_slug, category_name)
+    clubs: list[tuple]
+    club_postings: _TrigramPostings
+
+    @classmethod
+    def build(cls, version: tuple) -> "AutocompleteSnapshot":
+        """Load every searchable row (three queries) and index it."""
+        courses = list(
+            browsable_course_queryset()
+            .order_by("subdepartment__mnemonic", "number", "id")
+            .values_list(
+                "id",
+                "subdepartment__mnemonic",
+                "number",
+                "title",
+                "combined_mnemonic_number",
+            )
+        )
+        instructors = list(
+            Instructor.objects.order_by("last_name", "first_name", "id").values_list(
+                "id", "first_name", "last_name", "email", "full_name"
+            )
+        )
+        clubs = list(
+            Club.objects.order_by("name", "id").values_list(
+                "id", "name", "category__slug", "category__name", "combined_name"
+            )
+        )
+        return cls(
+            version=version,
+            courses=[row[:4] for row in courses],
+            course_postings=_TrigramPostings(
+                (i, text) for i, row in enumerate(courses) for text in (row[4], row[3])
+            ),
+            instructors=[row[:4] for row in instructors],
+            instructor_postings=_TrigramPostings(
+                (i, text)
+                for i, row in enumerate(instructors)
+                for text in (row[1], row[2], row[4])
+            ),
+            clubs=[row[:4] for row in clubs],
+            club_postings=_TrigramPostings((i, row[4]) for i, row in enumerate(clubs)),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the snapshot, in bytes."""
+        return (
+            _rows_nbytes(self.courses)
+            + _rows_nbytes(self.instructors)
+            + _rows_nbytes(self.clubs)
+            + self.course_postings.nbytes()
+            + self.instructor_postings.nbytes()
+            + self.club_postings.nbytes()
+        )
+
+    @staticmethod
+    def _ranked(postings, query, threshold, limit, *, rounded=False):
+        scores = postings.best_scores(trigrams(query))
+        if rounded:
+            scores = {row: _round_score(score) for row, score in scores.items()}
+        hits = [(score, row) for row, score in scores.items() if score >= threshold]
+        # Ties keep catalog order (rows were loaded sorted).
+        hits.sort(key=lambda hit: (-hit[0], hit[1]))
+        return hits[:limit]
+
+    def courses_for(self, query: str, limit: int) -> list[dict]:
+        """Top ``limit`` courses, like ``fetch_courses(query)[:limit]``."""
+        return [
+            {
+                "id": pk,
+                "mnemonic": mnemonic,
+                "number": number,
+                "title": title,
+                "max_similarity": score,
+            }
+            for score, row in self._ranked(
+                self.course_postings, query, COURSE_THRESHOLD, limit, rounded=True
+            )
+            for pk, mnemonic, number, title in (self.courses[row],)
+        ]
+
+    def instructors_for(self, query: str, limit: int) -> list[dict]:
+        """Top ``limit`` instructors, like ``fetch_instructors(query)[:limit]``."""
+        return [
+            {
+                "id": pk,
+                "first_name": first_name,
+                "last_name": last_name,
+                "email": email,
+                "max_similarity": score,
+            }
+            for score, row in self._ranked(
+                self.instructor_postings, query, INSTRUCTOR_THRESHOLD, limit
+            )
+            for pk, first_name, last_name, email in (self.instructors[row],)
+        ]
+
+    def clubs_for(self, query: str, limit: int) -> list[dict]:
+        """Top ``limit`` clubs, like ``fetch_clubs(query)[:limit]``."""
+        if query:
+            hits = self._ranked(self.club_postings, query, CLUB_THRESHOLD, limit)
+        else:
+            hits = [(1.0, row) for row in range(min(limit, len(self.clubs)))]
+        return [
+            {
+                "id": pk,
+                "name": name,
+                "max_similarity": score,
+                "category_slug": category_slug,
+                "category_name": category_name,
+            }
+            for score, row in hits
+            for pk, name, category_slug, category_name in (self.clubs[row],)
+        ]
+
+
+class AutocompleteIndex:
+    """Holds the current worker's ``AutocompleteSnapshot``."""
+
+    _lock = threading.Lock()
+    _snapshot: AutocompleteSnapshot | None = None
+    # Version whose snapshot was over the memory budget; not retried until it changes.
+    _rejected: tuple | None = None
+    _stale = True
+
+    @staticmethod
+    def current_version() -> tuple:
+        """Shared catalog version plus the catalog year window it was built for."""
+        return (cache.get(VERSION_KEY), min_catalog_semester_year())
+
+    @staticmethod
+    def answerable(query: str) -> bool:
+        """False for queries the database might tokenize differently (non-ASCII)."""
+        return query.isascii()
+
+    @classmethod
+    def snapshot(cls) -> AutocompleteSnapshot | None:
+        """Current snapshot, or None if the caller should query the database.
+
+        A worker that finds the version changed rebuilds the snapshot itself;
+        concurrent requests keep using the old one (or the database) meanwhile.
+        """
+        if connection.in_atomic_block:
+            return None
+
+        snapshot = cls._snapshot
+        if snapshot is not None and not cls._stale:
+            return snapshot
+
+        version = cls.current_version()
+        cls._stale = False
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        if version == cls._rejected:
+            return None
+        if not cls._lock.acquire(blocking=False):
+            return None
+        try:
+            return cls._rebuild(version)
+        finally:
+            cls._lock.release()
+
+    @classmethod
+    def _rebuild(cls, version: tuple) -> AutocompleteSnapshot | None:
+        snapshot = AutocompleteSnapshot.build(version)
+        nbytes = snapshot.nbytes
+        limit = getattr(settings, "AUTOCOMPLETE_INDEX_MAX_BYTES", DEFAULT_MAX_BYTES)
+        if nbytes > limit:
+            logger.warning(
+                "Autocomplete index needs %d bytes (limit %d); using the database",
+                nbytes,
+                limit,
+            )
+            cls._snapshot, cls._rejected = None, version
+            return None
+        logger.info(
+            "Autocomplete index built: %d courses, %d instructors, %d clubs, %d bytes",
+            len(snapshot.courses),
+            len(snapshot.instructors),
+            len(snapshot.clubs),
+            nbytes,
+        )
+        cls._snapshot, cls._rejected = snapshot, None
+        return snapshot
+
+    @classmethod
+    def warm_in_background(cls) -> None:
+        """Build the first snapshot on a daemon thread (called at worker startup)."""
+
+        def build():
+            try:
+                cls.snapshot()
+            except Exception:
+                logger.exception("Autocomplete index warm-up failed")
+            finally:
+                connection.close()
+
+        threading.Thread(target=build, name="autocomplete-warm", daemon=True).start()
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Drop this worker's snapshot and bump the shared version for the others."""
+        cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        cls._snapshot = None
+        cls._rejected = None
+
+    @classmethod
+    def mark_stale(cls, **kwargs) -> None:
+        """``request_started`` receiver: recheck the version on next access."""
+        cls._stale = True
+
+
+register_invalidation(INVALIDATE_JOB, AutocompleteIndex.invalidate)
+
+
+def _catalog_changed(sender, **kwargs):
+    transaction.on_commit(AutocompleteIndex.invalidate)
+
+
+def connect_signals() -> None:
+    """Wire index invalidation; called from ``TcfWebsiteConfig.ready()``."""
+    request_started.connect(
+        AutocompleteIndex.mark_stale, dispatch_uid="autocomplete_index_request"
+    )
+    for model in (Course, Instructor, Club, ClubCategory, Subdepartment):
+        name = model._meta.model_name
+        post_save.connect(
+            _catalog_changed, sender=model, dispatch_uid=f"autocomplete_{name}_save"
+        )
+        post_delete.connect(
+            _catalog_changed, sender=model, dispatch_uid=f"autocomplete_{name}_delete"
+        )
@@ -0,0 +1,55 @@
+"""Index-assisted trigram matching with the pg_trgm ``%`` operator.
+
+Comparing ``TrigramSimilarity(...)`` against a threshold has to score every
+row. ``a % b`` means the same thing (similarity at or above the session's
+``pg_trgm.similarity_threshold``) but can be answered from a ``gin_trgm_ops``
+index, so searches filter with ``TrigramMatch`` first and only score the
+candidates it returns.
+"""
+
+from django.db.backends.signals import connection_created
+from django.db.models import BooleanField, F, Func, Value
+
+# Session threshold for ``%``: the lowest similarity any search keeps (0.15),
+# less half a rounding step because course scores are Round(..., 2) first.
+TRIGRAM_MATCH_THRESHOLD = 0.145
+
+
+class TrigramMatch(Func):
+    """``expression % query`` (pg_trgm similarity at or above the session threshold)."""
+
+    template = "%(expressions)s"
+    arg_joiner = " %% "
+    output_field = BooleanField()
+
+    def __init__(self, expression, query, **extra):
+        if isinstance(expression, str):
+            expression = F(expression)
+        super().__init__(expression, Value(query), **extra)
+
+
+def trigram_match_any(fields, query):
+    """Rows where any of ``fields`` trigram-matches ``query`` (OR of ``TrigramMatch``)."""
+    condition = None
+    for name in fields:
+        match = TrigramMatch(name, query)
+        condition = match if condition is None else condition | match
+    return condition
+
+
+def set_trigram_threshold(sender, connection, **kwargs):
+    """``connection_created`` receiver: set ``pg_trgm.similarity_threshold``."""
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT set_config('pg_trgm.similarity_threshold', %s, false)",
+            [str(TRIGRAM_MATCH_THRESHOLD)],
+        )
+
+
+def connect_signals() -> None:
+    """Wire the session threshold; called from ``TcfWebsiteConfig.ready()``."""
+    connection_created.connect(
+        set_trigram_threshold, dispatch_uid="trigram_similarity_threshold"
+    )
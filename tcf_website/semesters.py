@@ -0,0 +1,131 @@
+"""Process-wide semester registry.
+
+Semesters change a few times a year (``load_semester``) but are read on almost
+every request: the base context processor, course/department pages, search
+forms and the schedule builder. ``SemesterRegistry`` keeps an immutable,
+ordered snapshot of them in each worker and revalidates it against a version
+token in the shared cache (Redis in prod) once per request, so every worker
+picks up a newly loaded term on its next request.
+"""
+
+import threading
+import uuid
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .jobs import register_invalidation
+from .models import CATALOG_YEAR_WINDOW, Semester
+
+# Shared-cache key holding the current semester catalog version.
+VERSION_KEY = "tcf:semester-registry:version"
+INVALIDATE_JOB = "semesters.invalidate"
+
+
+@dataclass(frozen=True)
+class SemesterSnapshot:
+    """Immutable view of every semester, newest SIS number first.
+
+    The Semester instances are shared between requests; treat them as read-only.
+    """
+
+    version: str | None
+    semesters: tuple[Semester, ...]
+    _by_pk: dict[int, Semester] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_by_pk", {s.pk: s for s in self.semesters})
+
+    @property
+    def latest(self) -> Semester | None:
+        """Semester with the highest SIS number, or None if none are loaded."""
+        return self.semesters[0] if self.semesters else None
+
+    @property
+    def recent(self) -> tuple[Semester, ...]:
+        """Semesters in the catalog year window (same as ``utils.recent_semesters``)."""
+        min_year = timezone.now().year - CATALOG_YEAR_WINDOW
+        return tuple(s for s in self.semesters if s.year >= min_year)
+
+    def get(self, pk) -> Semester | None:
+        """Semester by primary key, or None."""
+        return self._by_pk.get(pk)
+
+
+class SemesterRegistry:
+    """Holds the current worker's ``SemesterSnapshot``."""
+
+    _lock = threading.Lock()
+    _snapshot: SemesterSnapshot | None = None
+    # Set at the start of each request; the next access rechecks the version.
+    _stale = True
+
+    @classmethod
+    def snapshot(cls) -> SemesterSnapshot:
+        """Current snapshot, rebuilt if another process bumped the version.
+
+        Inside a transaction the snapshot could include uncommitted (or later
+        rolled back) semesters, so it is built fresh and not kept.
+        """
+        if connection.in_atomic_block:
+            return SemesterSnapshot(None, tuple(Semester.objects.order_by("-number")))
+
+        snapshot = cls._snapshot
+        if snapshot is not None and not cls._stale:
+            return snapshot
+
+        version = cache.get(VERSION_KEY)
+        if snapshot is None or snapshot.version != version:
+            with cls._lock:
+                snapshot = SemesterSnapshot(
+                    version, tuple(Semester.objects.order_by("-number"))
+                )
+                cls._snapshot = snapshot
+        cls._stale = False
+        return snapshot
+
+    @classmethod
+    def latest(cls) -> Semester | None:
+        """Shortcut for ``snapshot().latest``."""
+        return cls.snapshot().latest
+
+    @classmethod
+    def recent(cls) -> tuple[Semester, ...]:
+        """Shortcut for ``snapshot().recent``."""
+        return cls.snapshot().recent
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Drop this worker's snapshot and bump the shared version for the others."""
+        cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        cls._snapshot = None
+
+    @classmethod
+    def mark_stale(cls, **kwargs) -> None:
+        """``request_started`` receiver: recheck the version on next access."""
+        cls._stale = True
+
+
+register_invalidation(INVALIDATE_JOB, SemesterRegistry.invalidate)
+
+
+def _semester_changed(sender, **kwargs):
+    # Wait for commit so other workers never rebuild from uncommitted rows.
+    transaction.on_commit(SemesterRegistry.invalidate)
+
+
+def connect_signals() -> None:
+    """Wire registry invalidation; called from ``TcfWebsiteConfig.ready()``."""
+    request_started.connect(
+        SemesterRegistry.mark_stale, dispatch_uid="semester_registry_request"
+    )
+    post_save.connect(
+        _semester_changed, sender=Semester, dispatch_uid="semester_registry_save"
+    )
+    post_delete.connect(
+        _semester_changed, sender=Semester, dispatch_uid="semester_registry_delete"
+    )
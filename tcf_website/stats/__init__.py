@@ -0,0 +1,21 @@
+"""Precomputed catalog stats: read models and the helpers that keep them current."""
+
+from .services import (
+    compute_course_stats,
+    compute_pair_stats,
+    deferred_course_stats,
+    mark_course_stats_dirty,
+    mark_pair_stats_dirty,
+    refresh_course_stats,
+    refresh_pair_stats,
+)
+
+__all__ = [
+    "compute_course_stats",
+    "compute_pair_stats",
+    "deferred_course_stats",
+    "mark_course_stats_dirty",
+    "mark_pair_stats_dirty",
+    "refresh_course_stats",
+    "refresh_pair_stats",
+]
@@ -0,0 +1,338 @@
+"""Compute and persist precomputed catalog stats (``CourseStats``, ``CourseInstructorStats``)."""
+
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.models import Avg, Count, F, FloatField, Q, Sum, Value
+
+from ..jobs import enqueue_many, register
+from ..models import (
+    Course,
+    CourseGrade,
+    CourseInstructorGrade,
+    CourseInstructorStats,
+    CourseStats,
+    Review,
+)
+
+# (course_id, instructor_id)
+Pair = tuple[int, int]
+
+# Course ids and pairs waiting for a refresh while inside ``deferred_course_stats()``.
+_PENDING: ContextVar[tuple[set[int], set[Pair]] | None] = ContextVar(
+    "pending_course_stats", default=None
+)
+
+_BATCH_SIZE = 1000
+
+# Job names for stats refreshes (see tcf_website.jobs)
+COURSE_STATS_JOB = "stats.refresh_courses"
+PAIR_STATS_JOB = "stats.refresh_pairs"
+
+COURSE_STATS_FIELDS = (
+    "average_rating",
+    "average_difficulty",
+    "average_gpa",
+    "review_count",
+)
+
+# Review field -> CourseInstructorStats column
+_PAIR_REVIEW_AVERAGES = {
+    "instructor_rating": "average_instructor_rating",
+    "enjoyability": "average_enjoyability",
+    "recommendability": "average_recommendability",
+    "difficulty": "average_difficulty",
+    "hours_per_week": "average_hours_per_week",
+    "amount_reading": "average_amount_reading",
+    "amount_writing": "average_amount_writing",
+    "amount_group": "average_amount_group",
+    "amount_homework": "average_amount_homework",
+}
+
+GRADE_BREAKDOWN_FIELDS = (
+    "a_plus",
+    "a",
+    "a_minus",
+    "b_plus",
+    "b",
+    "b_minus",
+    "c_plus",
+    "c",
+    "c_minus",
+    "dfw",
+    "total_enrolled",
+)
+
+_PAIR_COUNT_FIELDS = ("num_ratings", "num_reviews", "grade_count")
+
+PAIR_STATS_FIELDS = (
+    "average_rating",
+    *_PAIR_REVIEW_AVERAGES.values(),
+    "average_gpa",
+    *_PAIR_COUNT_FIELDS,
+    *GRADE_BREAKDOWN_FIELDS,
+)
+
+
+def _batched(items: list, size: int = _BATCH_SIZE) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _known_pairs(pairs: Iterable[tuple[int | None, int | None]]) -> set[Pair]:
+    return {(c, i) for c, i in pairs if c is not None and i is not None}
+
+
+def compute_course_stats(course_ids: Iterable[int]) -> dict[int, dict]:
+    """Live aggregates for ``course_ids`` straight from Review and CourseGrade.
+
+    Courses with no visible reviews and no grades still get a row of NULLs
+    (and a zero count), matching what the old per-request aggregate returned.
+    """
+    ids = list(
+        Course.objects.filter(pk__in=set(course_ids)).values_list("pk", flat=True)
+    )
+    stats = {
+        pk: {
+            "average_rating": None,
+            "average_difficulty": None,
+            "average_gpa": None,
+            "review_count": 0,
+        }
+        for pk in ids
+    }
+    if not ids:
+        return stats
+
+    review_rows = (
+        Review.objects.filter(course_id__in=ids, hidden=False)
+        .values("course_id")
+        .annotate(
+            rating=Avg(
+                (F("instructor_rating") + F("enjoyability") + F("recommendability"))
+                / Value(3.0),
+                output_field=FloatField(),
+            ),
+            difficulty=Avg("difficulty"),
+            count=Count("id"),
+        )
+        .order_by()
+    )
+    for row in review_rows:
+        stats[row["course_id"]].update(
+            average_rating=row["rating"],
+            average_difficulty=row["difficulty"],
+            review_count=row["count"],
+        )
+
+    grade_rows = (
+        CourseGrade.objects.filter(course_id__in=ids)
+        .values("course_id")
+        .annotate(gpa=Avg("average"))
+        .order_by()
+    )
+    for row in grade_rows:
+        stats[row["course_id"]]["average_gpa"] = row["gpa"]
+
+    return stats
+
+
+def refresh_course_stats(course_ids: Iterable[int | None]) -> int:
+    """Recompute and upsert the ``CourseStats`` rows for ``course_ids``.
+
+    Returns the number of rows written. Unknown/deleted course ids are skipped.
+    """
+    ids = sorted({pk for pk in course_ids if pk is not None})
+    written = 0
+    for batch in _batched(ids):
+        rows = [
+            CourseStats(course_id=pk, **values)
+            for pk, values in compute_course_stats(batch).items()
+        ]
+        CourseStats.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["course"],
+            update_fields=[*COURSE_STATS_FIELDS, "updated_at"],
+        )
+        written += len(rows)
+    return written
+
+
+def _empty_pair_stats() -> dict:
+    stats = dict.fromkeys(PAIR_STATS_FIELDS)
+    stats.update(dict.fromkeys(_PAIR_COUNT_FIELDS, 0))
+    stats.update(dict.fromkeys(GRADE_BREAKDOWN_FIELDS, 0))
+    return stats
+
+
+def compute_pair_stats(pairs: Iterable[Pair]) -> dict[Pair, dict]:
+    """Live aggregates for each (course_id, instructor_id) in ``pairs``.
+
+    Only pairs with at least one visible review or grade row are returned.
+    """
+    wanted = set(pairs)
+    if not wanted:
+        return {}
+    course_ids = {course_id for course_id, _ in wanted}
+    instructor_ids = {instructor_id for _, instructor_id in wanted}
+    not_toxic = Q(toxicity_rating__lt=settings.TOXICITY_THRESHOLD)
+    stats: dict[Pair, dict] = {}
+
+    review_rows = (
+        Review.objects.filter(
+            course_id__in=course_ids, instructor_id__in=instructor_ids, hidden=False
+        )
+        .values("course_id", "instructor_id")
+        .annotate(
+            **{column: Avg(field) for field, column in _PAIR_REVIEW_AVERAGES.items()},
+            num_ratings=Count("id", filter=not_toxic),
+            num_reviews=Count("id", filter=not_toxic & ~Q(text="")),
+        )
+        .order_by()
+    )
+    for row in review_rows:
+        pair = (row.pop("course_id"), row.pop("instructor_id"))
+        if pair not in wanted:
+            continue
+        components = (
+            row["average_instructor_rating"],
+            row["average_enjoyability"],
+            row["average_recommendability"],
+        )
+        # Same rule as the old average_rating_for_course: all three or nothing.
+        row["average_rating"] = sum(components) / 3 if all(components) else None
+        stats.setdefault(pair, _empty_pair_stats()).update(row)
+
+    grade_rows = (
+        CourseInstructorGrade.objects.filter(
+            course_id__in=course_ids, instructor_id__in=instructor_ids
+        )
+        .values("course_id", "instructor_id")
+        .annotate(
+            average_gpa=Avg("average"),
+            grade_count=Count("id"),
+            # Prefixed: annotations may not shadow CourseInstructorGrade fields.
+            **{f"sum_{field}": Sum(field) for field in GRADE_BREAKDOWN_FIELDS},
+        )
+        .order_by()
+    )
+    for row in grade_rows:
+        pair = (row["course_id"], row["instructor_id"])
+        if pair not in wanted:
+            continue
+        pair_stats = stats.setdefault(pair, _empty_pair_stats())
+        pair_stats["average_gpa"] = row["average_gpa"]
+        pair_stats["grade_count"] = row["grade_count"]
+        for field in GRADE_BREAKDOWN_FIELDS:
+            pair_stats[field] = row[f"sum_{field}"] or 0
+
+    return stats
+
+
+def refresh_pair_stats(pairs: Iterable[tuple[int | None, int | None]]) -> int:
+    """Recompute ``CourseInstructorStats`` rows for ``pairs``.
+
+    Pairs left with no reviews and no grades lose their row. Returns the number
+    of rows written.
+    """
+    written = 0
+    for batch in _batched(sorted(_known_pairs(pairs))):
+        computed = compute_pair_stats(batch)
+        stale = Q()
+        for course_id, instructor_id in set(batch) - computed.keys():
+            stale |= Q(course_id=course_id, instructor_id=instructor_id)
+        if stale:
+            CourseInstructorStats.objects.filter(stale).delete()
+
+        rows = [
+            CourseInstructorStats(course_id=c, instructor_id=i, **values)
+            for (c, i), values in computed.items()
+        ]
+        CourseInstructorStats.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["course", "instructor"],
+            update_fields=[*PAIR_STATS_FIELDS, "updated_at"],
+        )
+        written += len(rows)
+    return written
+
+
+@register(COURSE_STATS_JOB)
+def _run_course_stats_jobs(payloads: list[dict]) -> None:
+    refresh_course_stats(payload["course_id"] for payload in payloads)
+
+
+@register(PAIR_STATS_JOB)
+def _run_pair_stats_jobs(payloads: list[dict]) -> None:
+    refresh_pair_stats(
+        (payload["course_id"], payload["instructor_id"]) for payload in payloads
+    )
+
+
+def _enqueue_course_stats(course_ids: Iterable[int | None]) -> None:
+    enqueue_many(
+        COURSE_STATS_JOB,
+        [
+            {"course_id": pk}
+            for pk in sorted({pk for pk in course_ids if pk is not None})
+        ],
+        dedupe_key=COURSE_STATS_JOB + ":{course_id}",
+    )
+
+
+def _enqueue_pair_stats(pairs: Iterable[tuple[int | None, int | None]]) -> None:
+    enqueue_many(
+        PAIR_STATS_JOB,
+        [
+            {"course_id": course_id, "instructor_id": instructor_id}
+            for course_id, instructor_id in sorted(_known_pairs(pairs))
+        ],
+        dedupe_key=PAIR_STATS_JOB + ":{course_id}:{instructor_id}",
+    )
+
+
+def mark_course_stats_dirty(course_ids: Iterable[int | None]) -> None:
+    """Queue a stats refresh for ``course_ids``, or add them to the enclosing batch.
+
+    The refresh runs inline when ``settings.JOBS_EAGER`` is on.
+    """
+    pending = _PENDING.get()
+    if pending is not None:
+        pending[0].update(pk for pk in course_ids if pk is not None)
+        return
+    _enqueue_course_stats(course_ids)
+
+
+def mark_pair_stats_dirty(pairs: Iterable[tuple[int | None, int | None]]) -> None:
+    """Queue a refresh of (course_id, instructor_id) ``pairs``, or batch them."""
+    pending = _PENDING.get()
+    if pending is not None:
+        pending[1].update(_known_pairs(pairs))
+        return
+    _enqueue_pair_stats(pairs)
+
+
+@contextmanager
+def deferred_course_stats():
+    """Collect courses/pairs touched inside the block and queue each once on exit.
+
+    Use around bulk writes (grade loads, review imports, mass deletes) so a
+    thousand saved reviews cost one batched refresh instead of a thousand.
+    Nested blocks share the outermost batch.
+    """
+    if _PENDING.get() is not None:
+        yield
+        return
+
+    pending: tuple[set[int], set[Pair]] = (set(), set())
+    token = _PENDING.set(pending)
+    try:
+        yield
+    finally:
+        _PENDING.reset(token)
+    _enqueue_course_stats(pending[0])
+    _enqueue_pair_stats(pending[1])
@@ -0,0 +1,110 @@
+"""Signal receivers keeping precomputed stats in sync with reviews and grades."""
+
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+
+from ..models import (
+    Course,
+    CourseGrade,
+    CourseInstructorGrade,
+    Department,
+    Instructor,
+    Review,
+    School,
+    Semester,
+    Subdepartment,
+)
+from .services import mark_course_stats_dirty, mark_pair_stats_dirty
+
+# Deleting one of these cascades into Course; the stats rows go with it.
+# Semester also takes the reviews of courses that survive it; see
+# ``_remember_semester_reviews``.
+_COURSE_CASCADE_ORIGINS = (School, Department, Subdepartment, Semester, Course)
+# Pair rows also cascade away with their Instructor.
+_PAIR_CASCADE_ORIGINS = (*_COURSE_CASCADE_ORIGINS, Instructor)
+
+
+def _origin_model(origin):
+    return getattr(origin, "model", None) or type(origin)
+
+
+def _remember_review_target(sender, instance, update_fields=None, **kwargs):
+    """Stash the pre-edit (course, instructor) so a moved review refreshes both."""
+    instance._stats_previous_target = None
+    if instance.pk is None:
+        return
+    if update_fields is not None and not {"course", "instructor"} & set(update_fields):
+        return
+    instance._stats_previous_target = (
+        Review.objects.filter(pk=instance.pk)
+        .values_list("course_id", "instructor_id")
+        .first()
+    )
+
+
+def _previous_target(instance):
+    return getattr(instance, "_stats_previous_target", None) or (None, None)
+
+
+def _remember_semester_reviews(sender, instance, **kwargs):
+    """Stash the pairs whose reviews go with the semester but whose course stays."""
+    instance._stats_review_pairs = set(
+        Review.objects.filter(semester=instance)
+        .exclude(course__semester_last_taught=instance)
+        .values_list("course_id", "instructor_id")
+        .distinct()
+    )
+
+
+def _semester_deleted(sender, instance, **kwargs):
+    pairs = getattr(instance, "_stats_review_pairs", set())
+    mark_course_stats_dirty(course_id for course_id, _ in pairs)
+    mark_pair_stats_dirty(pairs)
+
+
+def _course_row_saved(sender, instance, **kwargs):
+    mark_course_stats_dirty([instance.course_id, _previous_target(instance)[0]])
+
+
+def _course_row_deleted(sender, instance, origin=None, **kwargs):
+    if origin is not None and issubclass(
+        _origin_model(origin), _COURSE_CASCADE_ORIGINS
+    ):
+        return
+    mark_course_stats_dirty([instance.course_id])
+
+
+def _pair_row_saved(sender, instance, **kwargs):
+    mark_pair_stats_dirty(
+        [(instance.course_id, instance.instructor_id), _previous_target(instance)]
+    )
+
+
+def _pair_row_deleted(sender, instance, origin=None, **kwargs):
+    if origin is not None and issubclass(_origin_model(origin), _PAIR_CASCADE_ORIGINS):
+        return
+    mark_pair_stats_dirty([(instance.course_id, instance.instructor_id)])
+
+
+def connect_signals() -> None:
+    """Wire stats receivers; called from ``TcfWebsiteConfig.ready()``."""
+    receivers = (
+        (Review, _course_row_saved, _course_row_deleted, "course"),
+        (CourseGrade, _course_row_saved, _course_row_deleted, "course"),
+        (Review, _pair_row_saved, _pair_row_deleted, "pair"),
+        (CourseInstructorGrade, _pair_row_saved, _pair_row_deleted, "pair"),
+    )
+    pre_save.connect(
+        _remember_review_target, sender=Review, dispatch_uid="review_stats_pre_save"
+    )
+    pre_delete.connect(
+        _remember_semester_reviews,
+        sender=Semester,
+        dispatch_uid="semester_stats_pre_delete",
+    )
+    post_delete.connect(
+        _semester_deleted, sender=Semester, dispatch_uid="semester_stats_delete"
+    )
+    for model, on_save, on_delete, kind in receivers:
+        uid = f"{kind}_stats_{model.__name__}"
+        post_save.connect(on_save, sender=model, dispatch_uid=f"{uid}_save")
+        post_delete.connect(on_delete, sender=model, dispatch_uid=f"{uid}_delete")
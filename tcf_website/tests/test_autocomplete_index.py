@@ -0,0 +1,124 @@
+"""Tests for the in-memory search autocomplete index."""
+
+import logging
+
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from ..models import Club, ClubCategory, Course
+from ..search.autocomplete import AutocompleteIndex, similarity
+from ..views.catalog.search import (
+    _serialize_courses,
+    fetch_clubs,
+    fetch_courses,
+    fetch_instructors,
+)
+from .test_utils import setup
+
+_QUERIES = ("CS 1420", "algorithms", "intro programming", "tom", "Software Tes")
+
+
+def _autocomplete(client, query, **params):
+    return client.get(
+        reverse("search"),
+        {"q": query, **params},
+        HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+    )
+
+
+class AutocompleteIndexTestCase(TransactionTestCase):
+    """Runs outside a wrapping transaction so the index is actually used."""
+
+    def setUp(self):
+        # Build reports are logged at INFO; keep test output quiet.
+        logger = logging.getLogger("tcf_website.search.autocomplete")
+        self.addCleanup(logger.setLevel, logger.level)
+        logger.setLevel(logging.ERROR)
+        AutocompleteIndex.invalidate()
+        setup(self)
+        category = ClubCategory.objects.create(name="Arts", slug="ARTS")
+        self.club = Club.objects.create(name="Dance Team", category=category)
+
+    def test_similarity_matches_pg_trgm(self):
+        """Python scoring reproduces pg_trgm ``similarity()``."""
+        pairs = [
+            ("CS 1420", "cs1420"),
+            ("Software Testing", "soft test"),
+            ("Program & Data Structures", "data-structures!"),
+            ("O'Brien", "obrien"),
+            ("a", "abc"),
+            ("", "anything"),
+        ]
+        with connection.cursor() as cursor:
+            for left, right in pairs:
+                cursor.execute("SELECT similarity(%s, %s)", [left, right])
+                self.assertAlmostEqual(
+                    similarity(left, right), cursor.fetchone()[0], places=6
+                )
+
+    def test_matches_database_results(self):
+        """The index returns the same rows and scores as the database path."""
+        index = AutocompleteIndex.snapshot()
+        for query in _QUERIES:
+            db_courses = _serialize_courses(fetch_courses(query)[:5])
+            mem_courses = index.courses_for(query, 5)
+            self.assertEqual(
+                {(c["id"], c["max_similarity"]) for c in mem_courses},
+                {(c["id"], c["max_similarity"]) for c in db_courses},
+                query,
+            )
+            self.assertEqual(
+                [i["id"] for i in index.instructors_for(query, 3)],
+                [i["id"] for i in fetch_instructors(query)[:3]],
+                query,
+            )
+        self.assertEqual(
+            [c["id"] for c in index.clubs_for("dance", 5)],
+            [c["id"] for c in fetch_clubs("dance")[:5]],
+        )
+
+    def test_autocomplete_skips_database(self):
+        """Once built, dropdown requests run no queries."""
+        AutocompleteIndex.snapshot()
+        with self.assertNumQueries(0):
+            response = _autocomplete(self.client, "Software Testing")
+        self.assertContains(response, "Software Testing")
+        with self.assertNumQueries(0):
+            response = _autocomplete(self.client, "dance", mode="clubs")
+        self.assertContains(response, "Dance Team")
+
+    def test_catalog_change_rebuilds(self):
+        """Saving a course bumps the version and the next request sees it."""
+        AutocompleteIndex.snapshot()
+        Course.objects.create(
+            title="Quantum Basket Weaving",
+            number=1999,
+            subdepartment=self.subdepartment,
+            semester_last_taught=self.semester,
+        )
+        AutocompleteIndex.mark_stale()
+        titles = [
+            c["title"]
+            for c in AutocompleteIndex.snapshot().courses_for("quantum basket", 5)
+        ]
+        self.assertEqual(titles, ["Quantum Basket Weaving"])
+
+    def test_non_ascii_query_uses_database(self):
+        """Queries pg_trgm may tokenize differently are not answered in memory."""
+        AutocompleteIndex.snapshot()
+        self.assertFalse(AutocompleteIndex.answerable("café"))
+        with self.assertNumQueries(2):
+            response = _autocomplete(self.client, "café")
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(AUTOCOMPLETE_INDEX_MAX_BYTES=1024)
+    def test_over_budget_falls_back(self):
+        """An index past the memory budget is dropped and not rebuilt per request."""
+        with self.assertLogs("tcf_website.search.autocomplete", "WARNING"):
+            self.assertIsNone(AutocompleteIndex.snapshot())
+        AutocompleteIndex.mark_stale()
+        with self.assertNumQueries(0):
+            self.assertIsNone(AutocompleteIndex.snapshot())
+        response = _autocomplete(self.client, "Software Testing")
+        self.assertContains(response, "Software Testing")
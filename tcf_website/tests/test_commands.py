@@ -1,13 +1,22 @@
 """Tests for Django management commands"""
 
+import os
+import tempfile
 from io import StringIO
 
 from django.core import management
 from django.core.management import call_command
 from django.core.management.base import CommandError
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
+from pandas.testing import assert_frame_equal
 
-from tcf_website.models import CourseGrade, CourseInstructorGrade
+from tcf_website.management.commands.load_grades import (
+    DATA_DIR,
+    convert_grade_file,
+    load_grade_file,
+    parse_grade_file,
+)
+from tcf_website.models import CourseGrade, CourseInstructorGrade, SemesterGrade
 
 from .test_utils import setup
 
@@ -150,6 +159,55 @@ def _run(stdout=None, **kwargs):
     return out.getvalue()
 
 
+class LoadGradesIncrementalTestCase(TestCase):
+    """Loading single terms upserts SemesterGrade facts and rolls them up."""
+
+    def setUp(self):
+        setup(self)
+        CourseGrade.objects.all().delete()
+        CourseInstructorGrade.objects.all().delete()
+
+    def load(self, term):
+        management.call_command("load_grades", term, "--suppress-tqdm", verbosity=0)
+
+    def test_new_term_adds_to_existing_rollup(self):
+        """A second term updates the course's one CourseGrade row."""
+        self.load("test/test_data")
+        self.load("test/next_term")
+
+        self.assertEqual(SemesterGrade.objects.filter(course=self.course).count(), 2)
+        cg = CourseGrade.objects.get()
+        cig = CourseInstructorGrade.objects.get()
+        self.assertEqual(cg.total_enrolled, 40)
+        self.assertEqual(cig.a_plus, 3)
+        # Enrollment-weighted across both terms: (2.71 * 15 + 2.87 * 9 + 3.5 * 16) / 40
+        self.assertAlmostEqual(cg.average, 3.062)
+        self.assertAlmostEqual(cig.average, 3.062)
+        self.assertEqual(cig.instructor, self.instructor)
+
+    def test_reloading_a_term_replaces_it(self):
+        """Loading the same term twice does not duplicate rows."""
+        self.load("test/test_data")
+        self.load("test/test_data")
+
+        fact = SemesterGrade.objects.get()
+        self.assertEqual((fact.semester.year, fact.semester.season), (2009, "FALL"))
+        self.assertEqual((fact.total_enrolled, fact.gpa_enrolled), (24, 24))
+        self.assertEqual(CourseGrade.objects.get().total_enrolled, 24)
+        self.assertEqual(CourseInstructorGrade.objects.count(), 1)
+
+
+class GradeTableTestCase(SimpleTestCase):
+    """Columnar grade tables load the same frame as their CSV."""
+
+    def test_table_matches_csv(self):
+        path = os.path.join(DATA_DIR, "test/next_term.csv")
+        with tempfile.TemporaryDirectory() as tmp:
+            table = os.path.join(tmp, "next_term")
+            convert_grade_file(path, table)
+            assert_frame_equal(load_grade_file(table), parse_grade_file(path))
+
+
 class ListReviewsHelperMethodTests(TestCase):
     """Unit tests for Command helper methods — no DB required."""
 
@@ -0,0 +1,207 @@
+"""Tests for the precomputed CourseStats read model."""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from ..models import (
+    Course,
+    CourseGrade,
+    CourseInstructorGrade,
+    CourseInstructorStats,
+    CourseStats,
+    Review,
+)
+from ..stats import deferred_course_stats
+from .test_utils import setup
+
+
+class CourseStatsTestCase(TestCase):
+    """CourseStats stays in sync with reviews and grades."""
+
+    def setUp(self):
+        setup(self)
+
+    def _stats(self, course=None):
+        return CourseStats.objects.get(course=course or self.course)
+
+    def test_with_stats_matches_live_aggregates(self):
+        """with_stats() reads the same numbers the per-course methods compute."""
+        course = Course.with_stats().get(pk=self.course.pk)
+        self.assertAlmostEqual(course.average_rating, self.course.average_rating(), 6)
+        self.assertAlmostEqual(
+            course.average_difficulty, self.course.average_difficulty(), 6
+        )
+        self.assertAlmostEqual(course.average_gpa, self.course.average_gpa(), 6)
+        self.assertEqual(self._stats().review_count, 2)
+
+    def test_review_edit_updates_stats(self):
+        """Editing a review refreshes the course's averages."""
+        self.review1.difficulty = 1
+        self.review1.save()
+        self.assertAlmostEqual(
+            self._stats().average_difficulty, (1 + self.review2.difficulty) / 2, 6
+        )
+
+    def test_hidden_review_excluded(self):
+        """Hiding a review drops it from the averages and the count."""
+        self.review1.hidden = True
+        self.review1.save(update_fields=["hidden"])
+        stats = self._stats()
+        self.assertEqual(stats.review_count, 1)
+        self.assertAlmostEqual(stats.average_rating, self.review2.average(), 6)
+
+    def test_review_delete_clears_stats(self):
+        """Deleting every review leaves NULL averages, not stale ones."""
+        self.review1.delete()
+        self.review2.delete()
+        stats = self._stats()
+        self.assertIsNone(stats.average_rating)
+        self.assertIsNone(stats.average_difficulty)
+        self.assertEqual(stats.review_count, 0)
+
+    def test_grade_change_updates_gpa(self):
+        """New grade rows are folded into the course GPA."""
+        CourseGrade.objects.create(course=self.course, average=3.9)
+        self.assertAlmostEqual(self._stats().average_gpa, (2.9 + 3.9) / 2, 6)
+
+    def test_deferred_refresh_runs_once_on_exit(self):
+        """Inside deferred_course_stats() rows are only written when the block ends."""
+        before = self._stats().average_gpa
+        with deferred_course_stats():
+            CourseGrade.objects.create(course=self.course, average=3.9)
+            self.assertEqual(self._stats().average_gpa, before)
+        self.assertAlmostEqual(self._stats().average_gpa, (2.9 + 3.9) / 2, 6)
+
+    def test_course_delete_cascades(self):
+        """Deleting a course with reviews removes its stats row cleanly."""
+        course_id = self.course.pk
+        self.course.delete()
+        self.assertFalse(CourseStats.objects.filter(course_id=course_id).exists())
+        # FKs are deferred; make sure no receiver re-inserted an orphan row.
+        connection.check_constraints()
+
+    def test_semester_delete_refreshes_surviving_courses(self):
+        """Reviews cascaded away with an older semester leave the course stats."""
+        Review.objects.create(
+            user=self.user3,
+            course=self.course,
+            semester=self.past_semester,
+            instructor=self.instructor,
+            instructor_rating=3,
+            difficulty=3,
+            recommendability=3,
+            enjoyability=3,
+            hours_per_week=4,
+            amount_reading=1,
+            amount_writing=1,
+            amount_group=1,
+            amount_homework=1,
+        )
+        self.assertEqual(self._stats().review_count, 3)
+        pair = CourseInstructorStats.objects.get(
+            course=self.course, instructor=self.instructor
+        )
+        self.assertEqual(pair.num_ratings, 3)
+
+        self.past_semester.delete()
+        self.assertEqual(self._stats().review_count, 2)
+        pair.refresh_from_db()
+        self.assertEqual(pair.num_ratings, 2)
+        connection.check_constraints()
+
+    def test_rebuild_command_repairs_drift(self):
+        """rebuild_course_stats rewrites stale rows; --check-only reports them."""
+        CourseStats.objects.filter(course=self.course).update(average_gpa=1.0)
+        with self.assertRaises(CommandError):
+            call_command(
+                "rebuild_course_stats",
+                "--check-only",
+                "--suppress-tqdm",
+                stdout=StringIO(),
+                stderr=StringIO(),
+            )
+
+        call_command("rebuild_course_stats", "--suppress-tqdm", stdout=StringIO())
+        self.assertAlmostEqual(self._stats().average_gpa, 2.9, 6)
+        self.assertTrue(CourseStats.objects.filter(course=self.course5).exists())
+
+
+class CourseInstructorStatsTestCase(TestCase):
+    """CourseInstructorStats rolls up reviews and grades per (course, instructor)."""
+
+    def setUp(self):
+        setup(self)
+
+    def _stats(self):
+        return CourseInstructorStats.objects.get(
+            course=self.course, instructor=self.instructor
+        )
+
+    def test_pair_rollup(self):
+        """Averages, counts and summed grade breakdown for the pair."""
+        stats = self._stats()
+        self.assertAlmostEqual(
+            stats.average_rating,
+            (self.review1.average() + self.review2.average()) / 2,
+            6,
+        )
+        self.assertAlmostEqual(
+            stats.average_hours_per_week,
+            (self.review1.hours_per_week + self.review2.hours_per_week) / 2,
+            6,
+        )
+        self.assertEqual(stats.num_ratings, 2)
+        self.assertEqual(stats.num_reviews, 2)
+        self.assertAlmostEqual(stats.average_gpa, (3.8 + 3.2) / 2, 6)
+        self.assertEqual(stats.grade_count, 2)
+
+    def test_moved_review_refreshes_both_pairs(self):
+        """Reassigning a review's instructor updates the old and the new pair."""
+        self.review2.delete()
+        self.review1.instructor = self.instructor2
+        self.review1.save()
+
+        stats = self._stats()
+        self.assertEqual(stats.num_ratings, 0)
+        self.assertIsNone(stats.average_rating)
+        moved = CourseInstructorStats.objects.get(
+            course=self.course, instructor=self.instructor2
+        )
+        self.assertEqual(moved.num_ratings, 1)
+
+    def test_pair_row_removed_without_data(self):
+        """A pair with no reviews or grades left has no stats row."""
+        self.review1.delete()
+        self.review2.delete()
+        CourseInstructorGrade.objects.filter(
+            course=self.course, instructor=self.instructor
+        ).delete()
+        self.assertFalse(
+            CourseInstructorStats.objects.filter(
+                course=self.course, instructor=self.instructor
+            ).exists()
+        )
+
+    def test_for_pairs_batches_lookup(self):
+        """for_pairs() returns every requested pair that has data in one query."""
+        pairs = [
+            (self.course.pk, self.instructor.pk),
+            (self.course2.pk, self.instructor.pk),
+            (self.course.pk, self.instructor2.pk),
+        ]
+        with self.assertNumQueries(1):
+            stats = CourseInstructorStats.for_pairs(pairs)
+        self.assertEqual(set(stats), set(pairs[:2]))
+
+    def test_instructor_delete_cascades(self):
+        """Deleting an instructor removes its pair rows without re-creating them."""
+        instructor_id = self.instructor.pk
+        self.instructor.delete()
+        self.assertFalse(
+            CourseInstructorStats.objects.filter(instructor_id=instructor_id).exists()
+        )
+        connection.check_constraints()
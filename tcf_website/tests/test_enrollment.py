@@ -1,12 +1,19 @@
 """Tests for enrollment data updates."""
 
+import json
+from http.server import BaseHTTPRequestHandler
+from io import StringIO
 from unittest.mock import MagicMock
+from urllib.parse import parse_qs, urlparse
 
+from django.core.management import call_command
 from django.test import TestCase
 
+from tcf_website.enrollment import EnrollmentPoller, PollSchedule
 from tcf_website.management.commands.fetch_enrollment import fetch_one
 
-from .test_utils import setup
+from ..models import EnrollmentSnapshot, Section
+from .test_utils import setup, stub_server
 
 
 def _mock_json_response(payload):
@@ -18,6 +25,55 @@ def _mock_json_response(payload):
     return mock_resp
 
 
+class _StubSIS(BaseHTTPRequestHandler):
+    """Class search stub: CS lists two pages; one section only answers by number."""
+
+    pages = {
+        1: [
+            {
+                "class_nbr": 312312,
+                "enrollment_total": 40,
+                "class_capacity": 50,
+                "wait_tot": 2,
+                "wait_cap": 5,
+            }
+        ],
+        2: [{"class_nbr": 99999, "enrollment_total": 1}],
+    }
+    by_number = {
+        "31232": {
+            "class_nbr": 31232,
+            "enrollment_total": 7,
+            "class_capacity": 30,
+            "wait_tot": 0,
+            "wait_cap": 0,
+        }
+    }
+
+    def do_GET(self):
+        params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        self.server.requests.append(params)
+        if "class_nbr" in params:
+            cls = self.by_number.get(params["class_nbr"])
+            payload = {"classes": [cls] if cls else []}
+        elif params.get("subject") == "CS":
+            payload = {
+                "classes": self.pages.get(int(params["page"]), []),
+                "pageCount": len(self.pages),
+            }
+        else:
+            payload = {"classes": [], "pageCount": 0}
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
 class TestEnrollment(TestCase):
     """Test cases for enrollment data updates."""
 
@@ -79,3 +135,196 @@ class TestEnrollment(TestCase):
         self.assertEqual(self.section.enrollment_limit, 25)
         self.assertEqual(self.section.waitlist_taken, 3)
         self.assertEqual(self.section.waitlist_limit, 8)
+
+
+class FetchEnrollmentCommandTests(TestCase):
+    """fetch_enrollment against a local stub of the SIS class search."""
+
+    def setUp(self):
+        setup(self)
+        self.server = stub_server(self, _StubSIS)
+        self.server.requests = []
+
+    def test_subject_pages_with_per_class_fallback(self):
+        """Listed sections come from subject pages; only the miss is fetched alone."""
+        out = StringIO()
+        call_command(
+            "fetch_enrollment",
+            "--semester",
+            str(self.semester.number),
+            "--api-url",
+            f"http://127.0.0.1:{self.server.server_port}/",
+            stdout=out,
+            stderr=StringIO(),
+        )
+
+        self.section_course.refresh_from_db()
+        self.assertEqual(self.section_course.enrollment_taken, 40)
+        self.assertEqual(self.section_course.enrollment_limit, 50)
+        self.assertEqual(self.section_course.waitlist_taken, 2)
+        self.assertEqual(self.section_course.waitlist_limit, 5)
+        self.section_course2.refresh_from_db()
+        self.assertEqual(self.section_course2.enrollment_taken, 7)
+        self.assertEqual(self.section_course2.enrollment_limit, 30)
+
+        requests = self.server.requests
+        self.assertEqual(
+            sorted(r["page"] for r in requests if r.get("subject") == "CS"),
+            ["1", "2"],
+        )
+        self.assertEqual(
+            [r["class_nbr"] for r in requests if "class_nbr" in r], ["31232"]
+        )
+        self.assertIn("1 from subject listings, 1 one by one", out.getvalue())
+
+    def test_poll_round(self):
+        """--poll fetches sections one by one and writes the ones that changed."""
+        out = StringIO()
+        call_command(
+            "fetch_enrollment",
+            "--semester",
+            str(self.semester.number),
+            "--api-url",
+            f"http://127.0.0.1:{self.server.server_port}/",
+            "--poll",
+            "--rounds",
+            "1",
+            stdout=out,
+        )
+
+        self.section_course2.refresh_from_db()
+        self.assertEqual(self.section_course2.enrollment_taken, 7)
+        self.assertIn("polled 2, changed 1", out.getvalue())
+
+
+class EnrollmentPollerTests(TestCase):
+    """Priority scheduling, adaptive concurrency and delta writes."""
+
+    def setUp(self):
+        setup(self)
+        self.now = 0.0
+        self.section_course.enrollment_taken = 20
+        self.section_course.enrollment_limit = 20
+        self.section_course.waitlist_taken = 3
+        self.section_course.waitlist_limit = 10
+        self.section_course.save()
+        self.section_course2.enrollment_taken = 1
+        self.section_course2.enrollment_limit = 100
+        self.section_course2.waitlist_taken = 0
+        self.section_course2.waitlist_limit = 0
+        self.section_course2.save()
+        self.responses = {
+            312312: {
+                "enrollment_taken": 20,
+                "enrollment_limit": 20,
+                "waitlist_taken": 4,
+                "waitlist_limit": 10,
+            },
+            31232: {
+                "enrollment_taken": 1,
+                "enrollment_limit": 100,
+                "waitlist_taken": 0,
+                "waitlist_limit": 0,
+            },
+        }
+        self.fetched = []
+
+    def fetch(self, sis_number):
+        self.fetched.append(sis_number)
+        values = self.responses.get(sis_number)
+        return (dict(values), False) if values else (None, True)
+
+    def poller(self, **kwargs):
+        return EnrollmentPoller(
+            self.semester,
+            self.fetch,
+            schedule=PollSchedule(min_interval=60, max_interval=3600),
+            clock=lambda: self.now,
+            **kwargs,
+        )
+
+    def test_only_changed_sections_are_written(self):
+        """A round writes the section whose numbers moved and nothing else."""
+        poller = self.poller()
+        # Section lookup, section update, latest snapshots, new snapshots
+        with self.assertNumQueries(4):
+            result = poller.poll_once()
+        self.assertEqual((result.polled, result.changed), (2, 1))
+        self.section_course.refresh_from_db()
+        self.assertEqual(self.section_course.waitlist_taken, 4)
+        # Both sections start their history
+        self.assertEqual(EnrollmentSnapshot.objects.count(), 2)
+
+    def test_hot_sections_are_polled_more_often(self):
+        """The waitlisted section comes due again long before the empty one."""
+        poller = self.poller()
+        poller.poll_once()
+        self.fetched.clear()
+
+        self.now = 60
+        poller.poll_once()
+        self.assertEqual(self.fetched, [312312])
+
+        self.now = 3600
+        poller.poll_once()
+        self.assertIn(31232, self.fetched)
+
+    def test_replaced_sections_are_followed(self):
+        """A reload that recreates the term's sections is polled by SIS number."""
+        poller = self.poller()
+        poller.poll_once()
+
+        # What a replace-mode load_semester does: new rows, new primary keys
+        old_pk = self.section_course.pk
+        Section.objects.filter(semester=self.semester).delete()
+        replaced = Section.objects.create(
+            course=self.course,
+            semester=self.semester,
+            sis_section_number=312312,
+            enrollment_taken=0,
+        )
+        added = Section.objects.create(
+            course=self.course, semester=self.semester, sis_section_number=40001
+        )
+        self.responses[40001] = {
+            "enrollment_taken": 9,
+            "enrollment_limit": 10,
+            "waitlist_taken": 0,
+            "waitlist_limit": 0,
+        }
+        self.fetched.clear()
+
+        self.now = 3600
+        result = poller.poll_once()
+        self.assertNotEqual(replaced.pk, old_pk)
+        self.assertEqual(sorted(self.fetched), [31232, 40001, 312312])
+        self.assertEqual(result.changed, 2)
+        replaced.refresh_from_db()
+        self.assertEqual(replaced.enrollment_taken, 20)
+        added.refresh_from_db()
+        self.assertEqual(added.enrollment_taken, 9)
+        # The removed section is dropped rather than polled forever
+        self.assertEqual(poller.sections, {312312, 40001})
+        self.assertTrue(EnrollmentSnapshot.objects.filter(section=added).exists())
+
+    def test_throttling_halves_concurrency(self):
+        """Throttled responses shrink concurrency and pause; clean rounds grow it."""
+        del self.responses[31232]
+        poller = self.poller(max_workers=8)
+        self.assertEqual(poller.concurrency, 4)
+        result = poller.poll_once()
+        self.assertEqual(result.throttled, 1)
+        self.assertEqual(poller.concurrency, 2)
+        self.assertGreater(poller.pause, 0)
+
+        self.responses[31232] = {
+            "enrollment_taken": 2,
+            "enrollment_limit": 100,
+            "waitlist_taken": 0,
+            "waitlist_limit": 0,
+        }
+        self.now = 60
+        result = poller.poll_once()
+        self.assertEqual(result.throttled, 0)
+        self.assertEqual(poller.concurrency, 3)
+        self.assertEqual(poller.pause, 0)
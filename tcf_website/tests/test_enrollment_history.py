@@ -0,0 +1,105 @@
+"""Tests for the append-only enrollment history."""
+
+from datetime import UTC, datetime, timedelta
+
+from django.test import TestCase
+
+from ..enrollment import (
+    compact_history,
+    course_fill_curve,
+    record_snapshots,
+    section_fill_curve,
+)
+from ..models import EnrollmentSnapshot, Section, Semester
+from .test_utils import setup
+
+T0 = datetime(2025, 8, 1, 9, 0, tzinfo=UTC)
+
+
+def _values(taken, limit=30, waitlist=0):
+    return {
+        "enrollment_taken": taken,
+        "enrollment_limit": limit,
+        "waitlist_taken": waitlist,
+        "waitlist_limit": 10,
+    }
+
+
+class EnrollmentHistoryTests(TestCase):
+    """record_snapshots, fill curves and compaction."""
+
+    def setUp(self):
+        setup(self)
+        self.section = self.section_course
+        self.other = Section.objects.create(
+            course=self.course, semester=self.semester, sis_section_number=312313
+        )
+
+    def test_only_changes_are_appended(self):
+        """Repeating the same numbers adds nothing; a change adds one row."""
+        self.assertEqual(record_snapshots([(self.section.pk, _values(5))], T0), 1)
+        self.assertEqual(
+            record_snapshots(
+                [(self.section.pk, _values(5))], T0 + timedelta(minutes=5)
+            ),
+            0,
+        )
+        self.assertEqual(
+            record_snapshots(
+                [(self.section.pk, _values(6))], T0 + timedelta(minutes=10)
+            ),
+            1,
+        )
+        snapshot = EnrollmentSnapshot.objects.latest("taken_at")
+        self.assertEqual(snapshot.course, self.course)
+        self.assertEqual(snapshot.semester, self.semester)
+        self.assertEqual(snapshot.sis_section_number, self.section.sis_section_number)
+        self.assertEqual(
+            [p.enrollment_taken for p in section_fill_curve(self.section.pk)], [5, 6]
+        )
+
+    def test_course_curve_carries_sections_forward(self):
+        """Each point sums every section's latest numbers."""
+        record_snapshots(
+            [(self.section.pk, _values(5)), (self.other.pk, _values(2))], T0
+        )
+        record_snapshots([(self.other.pk, _values(4))], T0 + timedelta(hours=1))
+        record_snapshots([(self.section.pk, _values(9))], T0 + timedelta(hours=2))
+
+        curve = course_fill_curve(self.course.pk, self.semester.pk)
+        self.assertEqual([p.enrollment_taken for p in curve], [7, 9, 13])
+        self.assertEqual(curve[0].enrollment_limit, 60)
+        self.assertEqual(curve[0].taken_at, T0)
+
+        only = course_fill_curve(
+            self.course.pk, self.semester.pk, section_ids=[self.other.pk]
+        )
+        self.assertEqual([p.enrollment_taken for p in only], [2, 4])
+
+    def test_old_terms_are_thinned(self):
+        """Past terms keep the last snapshot per hour, then per day."""
+        for minutes, taken in ((0, 1), (20, 2), (40, 3), (70, 4), (26 * 60, 5)):
+            record_snapshots(
+                [(self.section.pk, _values(taken))], T0 + timedelta(minutes=minutes)
+            )
+        for number, season in ((1262, "SPRING"), (1268, "FALL")):
+            Semester.objects.create(year=2026, season=season, number=number)
+
+        # 1258 is now the third newest term: hourly
+        removed = compact_history(raw_terms=2, hourly_terms=1)
+        self.assertEqual(removed[self.semester], 2)
+        self.assertEqual(
+            [p.enrollment_taken for p in section_fill_curve(self.section.pk)],
+            [3, 4, 5],
+        )
+        self.assertFalse(
+            EnrollmentSnapshot.objects.filter(
+                resolution=EnrollmentSnapshot.Resolution.RAW
+            ).exists()
+        )
+
+        # and daily once it ages further
+        compact_history(raw_terms=1, hourly_terms=1)
+        self.assertEqual(
+            [p.enrollment_taken for p in section_fill_curve(self.section.pk)], [4, 5]
+        )
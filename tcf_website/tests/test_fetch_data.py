@@ -0,0 +1,181 @@
+"""Tests for fetch_data's response cache and resumable crawl."""
+
+import csv
+import io
+import json
+import os
+import tempfile
+from contextlib import redirect_stderr, redirect_stdout
+from http.server import BaseHTTPRequestHandler
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from tcf_website.management.commands import fetch_data
+from tcf_website.management.commands.fetch_data import (
+    retrieve_and_write_semester_courses,
+)
+
+from .test_utils import stub_server
+
+
+def _details(class_nbr, enrolled):
+    return {
+        "section_info": {
+            "class_details": {
+                "subject": "CS",
+                "catalog_nbr": "1110",
+                "class_section": f"{class_nbr % 100:03d}",
+                "component": "LEC",
+                "units": "3 units",
+                "course_title": "Introduction to Programming",
+                "topic": "",
+                "status": "Open",
+            },
+            "enrollment_information": {"class_attributes": ""},
+            "meetings": [
+                {
+                    "instructors": [{"name": "Ada Lovelace"}],
+                    "meets": "MoWe 10:00AM - 10:50AM",
+                    "room": "Rice Hall 130",
+                    "date_range": "08/26/2025 - 12/09/2025",
+                }
+            ],
+            "class_availability": {
+                "enrollment_total": enrolled,
+                "class_capacity": 100,
+                "wait_list_total": 0,
+                "wait_list_capacity": 10,
+            },
+            "catalog_descr": {"crse_catalog_description": "Programming."},
+        }
+    }
+
+
+class _StubSIS(BaseHTTPRequestHandler):
+    """Class search listing in two pages plus class details."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        state = self.server.state
+        if url.path.endswith("IScript_ClassSearch"):
+            page = int(params["page"])
+            state["pages"].append(page)
+            payload = {
+                "pageCount": len(state["listing"]),
+                "classes": [
+                    {"class_nbr": nbr, "enrollment_total": state["enrolled"][nbr]}
+                    for nbr in state["listing"][page - 1]
+                ],
+            }
+        else:
+            nbr = int(params["class_nbr"])
+            state["details"].append(nbr)
+            if nbr in state["failing"]:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.end_headers()
+                self.wfile.write(b"<html>Sign in</html>")
+                return
+            payload = _details(nbr, state["enrolled"][nbr])
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FetchDataCacheTests(SimpleTestCase):
+    """Re-runs skip unchanged classes; --resume skips finished pages."""
+
+    def setUp(self):
+        self.server = stub_server(self, _StubSIS)
+        self.server.state = {
+            "listing": [[10001, 10002], [10003]],
+            "enrolled": {10001: 5, 10002: 7, 10003: 9},
+            "failing": set(),
+            "pages": [],
+            "details": [],
+        }
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.csv_path = os.path.join(tmp.name, "2025_fall.csv")
+        self.cache_dir = os.path.join(tmp.name, "cache")
+
+    def crawl(self, resume=False):
+        state = self.server.state
+        state["pages"].clear()
+        state["details"].clear()
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            return retrieve_and_write_semester_courses(
+                self.csv_path,
+                1258,
+                cache_dir=self.cache_dir,
+                resume=resume,
+                api_url=f"http://127.0.0.1:{self.server.server_port}/script",
+            )
+
+    def rows(self):
+        with open(self.csv_path, encoding="utf-8") as file:
+            return {
+                int(row["ClassNumber"]): int(row["Enrollment"])
+                for row in csv.DictReader(file)
+            }
+
+    def test_rerun_only_fetches_changed_classes(self):
+        """Classes whose listing entry is unchanged come from the cache."""
+        self.crawl()
+        self.assertEqual(sorted(self.server.state["details"]), [10001, 10002, 10003])
+        self.assertEqual(self.rows(), {10001: 5, 10002: 7, 10003: 9})
+
+        self.server.state["enrolled"][10002] = 8
+        results = self.crawl()
+        self.assertTrue(all(result.complete for result in results))
+        self.assertEqual(self.server.state["details"], [10002])
+        self.assertEqual(self.rows(), {10001: 5, 10002: 8, 10003: 9})
+
+    def test_resume_skips_finished_pages(self):
+        """A failed crawl keeps the old CSV; --resume only redoes the failed page."""
+        self.server.state["failing"].add(10003)
+        results = self.crawl()
+        self.assertEqual([r.page for r in results if not r.complete], [2])
+        self.assertFalse(os.path.exists(self.csv_path))
+
+        self.server.state["failing"].clear()
+        self.crawl(resume=True)
+        # Page 1 is only read for the page count
+        self.assertEqual(sorted(self.server.state["pages"]), [1, 2])
+        self.assertEqual(self.server.state["details"], [10003])
+        self.assertEqual(self.rows(), {10001: 5, 10002: 7, 10003: 9})
+
+    def test_term_without_classes_is_not_converted(self):
+        """An empty listing writes no CSV and the command still succeeds."""
+        self.server.state["listing"] = [[]]
+        data_dir = os.path.dirname(self.csv_path)
+        columnar_dir = os.path.join(data_dir, "columnar")
+        out = io.StringIO()
+        with (
+            mock.patch.object(fetch_data, "COURSE_DATA_DIR", data_dir),
+            mock.patch.object(fetch_data, "COLUMNAR_DIR", columnar_dir),
+            redirect_stdout(io.StringIO()),
+            redirect_stderr(io.StringIO()),
+        ):
+            call_command(
+                "fetch_data",
+                "2025_fall",
+                "--cache-dir",
+                self.cache_dir,
+                "--api-url",
+                f"http://127.0.0.1:{self.server.server_port}/script",
+                stdout=out,
+            )
+        self.assertIn("nothing to convert", out.getvalue())
+        self.assertFalse(os.path.exists(self.csv_path))
+        self.assertFalse(os.path.exists(columnar_dir))
@@ -0,0 +1,193 @@
+"""Tests for the generate_ai_summaries pipeline."""
+
+import io
+import json
+from contextlib import redirect_stderr
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..models import Review, ReviewLLMSummary
+from ..review.summaries import (
+    Staleness,
+    TokenBucket,
+    plan_refresh,
+    prefetch_pairs,
+    staleness,
+    summary_candidates,
+)
+from .test_utils import setup, stub_server
+
+
+class _StubChat(BaseHTTPRequestHandler):
+    """Chat completions endpoint that echoes the course line of the prompt."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(body)
+        prompt = body["messages"][1]["content"]
+        payload = {
+            "choices": [
+                {"message": {"content": f"  Summary of {prompt.splitlines()[0]}  "}}
+            ]
+        }
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TokenBucketTests(TestCase):
+    """Reservations are spaced by 1/rate once the burst is spent."""
+
+    def test_reservations(self):
+        now = [0.0]
+        bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+        self.assertEqual([bucket.reserve() for _ in range(4)], [0.0, 0.0, 0.5, 1.0])
+        now[0] = 3.0
+        # Refilled to capacity, minus the two tokens reserved ahead
+        self.assertEqual(bucket.reserve(), 0.0)
+
+    def test_acquire_sleeps_for_reservation(self):
+        slept = []
+        bucket = TokenBucket(rate=4, clock=lambda: 0.0, sleep=slept.append)
+        bucket.acquire()
+        bucket.acquire()
+        self.assertEqual(slept, [0.25])
+
+
+@override_settings(OPENROUTER_API_KEY="test-key")
+class GenerateAISummariesTests(TestCase):
+    """Pairs are prefetched in bulk and summaries written in batches."""
+
+    def setUp(self):
+        setup(self)
+        self.add_reviews(self.course)
+        self.server = stub_server(self, _StubChat)
+        self.server.requests = []
+
+    def add_reviews(self, course, count=3):
+        """``count`` more reviews of ``course`` with the default instructor."""
+        for user in (self.user1, self.user2, self.user3, self.user4)[:count]:
+            Review.objects.create(
+                user=user,
+                course=course,
+                semester=self.semester,
+                instructor=self.instructor,
+                text="Solid course.",
+                instructor_rating=4,
+                difficulty=3,
+                recommendability=4,
+                enjoyability=4,
+                hours_per_week=5,
+                amount_group=0,
+                amount_reading=2,
+                amount_writing=1,
+                amount_homework=2,
+            )
+
+    def generate(self, **options):
+        self.server.requests.clear()
+        out = io.StringIO()
+        with redirect_stderr(io.StringIO()):
+            call_command(
+                "generate_ai_summaries",
+                model="test/model",
+                api_url=f"http://127.0.0.1:{self.server.server_port}/v1/chat",
+                requests_per_minute=6000,
+                stdout=out,
+                **options,
+            )
+        return out.getvalue()
+
+    def test_prefetch_queries_do_not_grow_with_pairs(self):
+        """Courses, instructors and top reviews with semesters take three queries."""
+        pairs = [
+            {
+                "course_id": course.pk,
+                "instructor_id": self.instructor.pk,
+                "review_count": 2,
+            }
+            for course in (self.course, self.course2, self.course3)
+        ]
+        with self.assertNumQueries(3):
+            contexts = prefetch_pairs(pairs, max_reviews=2)
+            labels = [
+                f"{r.semester.season} {r.text}"
+                for context in contexts
+                for r in context.reviews
+            ]
+            codes = [context.label() for context in contexts]
+        self.assertEqual([len(c.reviews) for c in contexts], [2, 2, 1])
+        self.assertEqual(contexts[0].reviews[0].text, "Solid course.")
+        self.assertEqual(len(labels), 5)
+        self.assertEqual(codes[0], f"CS 1420 / {self.instructor.full_name}")
+
+    def test_command_writes_summaries(self):
+        """Each qualifying pair gets one request and an upserted summary."""
+        ReviewLLMSummary.objects.create(
+            course=self.course,
+            instructor=self.instructor,
+            summary_text="old",
+            model_id="old-model",
+            source_review_count=1,
+        )
+        self.generate()
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.server.requests[0]["model"], "test/model")
+        summary = ReviewLLMSummary.objects.get()
+        self.assertEqual(
+            summary.summary_text, f"Summary of Course: CS 1420 — {self.course.title}"
+        )
+        self.assertEqual(summary.model_id, "test/model")
+        self.assertEqual(summary.source_review_count, 5)
+
+    def test_only_stale_pairs_are_regenerated(self):
+        """A second run skips current pairs; edits and age make them stale."""
+        self.add_reviews(self.course2)
+        self.generate()
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertIn("2/2 pair(s) current, 0 stale, 0 missing", self.generate())
+        self.assertEqual(self.server.requests, [])
+        self.assertIn("2/2 pair(s) current", self.generate(report=True))
+
+        self.review3.text = "Edited after the summary."
+        self.review3.save()
+        ReviewLLMSummary.objects.filter(course=self.course).update(
+            updated_at=timezone.now() - timedelta(days=400)
+        )
+        self.assertIn("0/2 pair(s) current, 2 stale", self.generate(limit=1))
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_plan_refresh_prefers_stale_and_read_pairs(self):
+        """Equally stale pairs are ordered by readers; current ones are skipped."""
+        self.add_reviews(self.course2)
+        # course3 already has one review, course2 two
+        self.add_reviews(self.course3, count=4)
+        for course, count in ((self.course, 5), (self.course2, 1), (self.course3, 1)):
+            ReviewLLMSummary.objects.create(
+                course=course,
+                instructor=self.instructor,
+                summary_text="old",
+                model_id="old-model",
+                source_review_count=count,
+            )
+        Review.objects.filter(course=self.course3).update(upvote_count=10)
+
+        pairs, report = plan_refresh(summary_candidates(), budget=2)
+        self.assertEqual(
+            [row["course_id"] for row in pairs], [self.course3.pk, self.course2.pk]
+        )
+        self.assertEqual(report, {"current": 1, "stale": 2, "missing": 0})
+        self.assertEqual(
+            staleness(pairs[0], None, timezone.now()),
+            Staleness(new_reviews=5, changed=True, age=None),
+        )
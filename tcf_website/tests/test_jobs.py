@@ -0,0 +1,206 @@
+"""Tests for the PostgreSQL job queue and run_worker."""
+
+import os
+import signal
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from ..jobs import BatchResult, backoff, claim, enqueue, register, run_batch
+from ..management.commands import run_worker
+from ..models import CourseStats, Job
+from ..stats.services import COURSE_STATS_JOB, PAIR_STATS_JOB
+from .test_utils import setup
+
+_calls = []
+
+
+@register("test.record")
+def _record(payloads):
+    _calls.append(sorted(payload["n"] for payload in payloads))
+
+
+@register("test.fail")
+def _fail(payloads):
+    raise RuntimeError("boom")
+
+
+@register("test.picky")
+def _picky(payloads):
+    if any(payload.get("bad") for payload in payloads):
+        raise ValueError("bad payload")
+    _calls.append(sorted(payload["n"] for payload in payloads))
+
+
+@override_settings(JOBS_EAGER=False)
+class JobQueueTests(TestCase):
+    """Jobs are deduplicated, claimed once, retried with backoff."""
+
+    def setUp(self):
+        _calls.clear()
+
+    def test_dedupe_key_collapses_queued_jobs(self):
+        """A second job with a queued key is dropped; same-name jobs run together."""
+        for n in (1, 2, 1):
+            enqueue("test.record", {"n": n}, dedupe_key="record:{n}")
+        self.assertEqual(Job.objects.count(), 2)
+        self.assertEqual(run_batch(), (2, 0, 0))
+        self.assertEqual(_calls, [[1, 2]])
+        self.assertFalse(Job.objects.exists())
+
+    def test_claimed_jobs_are_leased(self):
+        """A RUNNING job is not claimed again until its lease runs out."""
+        enqueue("test.record", {"n": 1})
+        (job,) = claim(10, lease=timedelta(minutes=5))
+        self.assertEqual((job.status, job.attempts), (Job.Status.RUNNING, 1))
+        self.assertEqual(claim(10), [])
+        Job.objects.update(run_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual([j.pk for j in claim(10)], [job.pk])
+
+    def test_names_filter(self):
+        """Workers can be limited to some job names."""
+        enqueue("test.record", {"n": 1})
+        enqueue("test.fail")
+        self.assertEqual(
+            [j.name for j in claim(10, names=["test.record"])], ["test.record"]
+        )
+
+    def test_failures_back_off_then_fail(self):
+        """A failing job is requeued later, then kept as FAILED with its error."""
+        enqueue("test.fail", max_attempts=2)
+        with self.assertLogs("tcf_website.jobs.queue", "ERROR"):
+            self.assertEqual(run_batch(), (0, 1, 0))
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.Status.QUEUED, 1))
+        self.assertGreater(job.run_at, timezone.now() + backoff(1) - timedelta(5))
+        self.assertEqual(job.last_error, "RuntimeError: boom")
+        self.assertEqual(run_batch(), (0, 0, 0))  # not due yet
+
+        Job.objects.update(run_at=timezone.now())
+        with self.assertLogs("tcf_website.jobs.queue", "ERROR"):
+            self.assertEqual(run_batch(), (0, 0, 1))
+        self.assertEqual(Job.objects.get().status, Job.Status.FAILED)
+
+    def test_failed_group_is_retried_job_by_job(self):
+        """One bad payload fails alone; the rest of its group still runs."""
+        for n in (1, 2, 3):
+            enqueue("test.picky", {"n": n, "bad": n == 2})
+        with self.assertLogs("tcf_website.jobs.queue", "WARNING"):
+            self.assertEqual(run_batch(), (2, 1, 0))
+        self.assertEqual(_calls, [[1], [3]])
+        job = Job.objects.get()
+        self.assertEqual((job.payload["n"], job.attempts), (2, 1))
+        self.assertEqual(job.last_error, "ValueError: bad payload")
+
+    def test_lost_job_fails_after_last_attempt(self):
+        """A job whose worker died on its last attempt is not claimed again."""
+        enqueue("test.record", {"n": 1}, max_attempts=2)
+        for _ in range(2):
+            self.assertEqual(len(claim(10)), 1)
+            Job.objects.update(run_at=timezone.now() - timedelta(seconds=1))
+        with self.assertLogs("tcf_website.jobs.queue", "ERROR"):
+            self.assertEqual(claim(10), [])
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 2))
+        self.assertIn("Lease expired", job.last_error)
+
+    def test_backoff_doubles_up_to_cap(self):
+        """Each retry waits twice as long as the last, up to an hour."""
+        self.assertEqual(backoff(2), 2 * backoff(1))
+        self.assertEqual(backoff(30), timedelta(hours=1))
+
+    def test_eager_runs_inline(self):
+        """With JOBS_EAGER the handler runs at enqueue time and nothing is stored."""
+        with self.settings(JOBS_EAGER=True):
+            enqueue("test.record", {"n": 3})
+        self.assertEqual(_calls, [[3]])
+        self.assertFalse(Job.objects.exists())
+
+
+@override_settings(JOBS_EAGER=False)
+class StatsJobTests(TestCase):
+    """Review saves queue stats refreshes for the worker instead of running them."""
+
+    def setUp(self):
+        with self.settings(JOBS_EAGER=True):
+            setup(self)
+
+    def test_review_hide_is_refreshed_by_worker(self):
+        """Hiding a review queues one deduplicated job per rollup."""
+        self.review1.hidden = True
+        self.review1.save(update_fields=["hidden"])
+        self.review2.save()
+        self.assertEqual(CourseStats.objects.get(course=self.course).review_count, 2)
+        self.assertEqual(
+            sorted(Job.objects.values_list("name", "dedupe_key")),
+            [
+                (COURSE_STATS_JOB, f"{COURSE_STATS_JOB}:{self.course.pk}"),
+                (
+                    PAIR_STATS_JOB,
+                    f"{PAIR_STATS_JOB}:{self.course.pk}:{self.instructor.pk}",
+                ),
+            ],
+        )
+
+        out = StringIO()
+        call_command("run_worker", once=True, stdout=out)
+        self.assertIn("Ran 2 job(s)", out.getvalue())
+        self.assertEqual(CourseStats.objects.get(course=self.course).review_count, 1)
+        self.assertFalse(Job.objects.exists())
+
+
+class RunWorkerLoopTests(SimpleTestCase):
+    """The polling worker survives database errors until it is told to stop."""
+
+    def setUp(self):
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            self.addCleanup(signal.signal, signum, signal.getsignal(signum))
+
+    def test_database_error_backs_off_and_continues(self):
+        """A failed round is logged, slept off, and the next round runs."""
+        rounds = iter(
+            [
+                OperationalError("server closed the connection"),
+                OperationalError("server closed the connection"),
+                BatchResult(3, 0, 0),
+            ]
+        )
+
+        def fake_run_batch(limit, names=None):
+            outcome = next(rounds, None)
+            if outcome is None:
+                os.kill(os.getpid(), signal.SIGTERM)
+                return BatchResult(0, 0, 0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        out = StringIO()
+        with (
+            mock.patch.object(run_worker, "run_batch", fake_run_batch),
+            mock.patch.object(run_worker.time, "sleep") as sleep,
+            mock.patch.object(run_worker, "close_old_connections") as close,
+            self.assertLogs(run_worker.logger, "ERROR") as logs,
+        ):
+            call_command("run_worker", poll_interval=1, stdout=out)
+
+        self.assertIn("Ran 3 job(s)", out.getvalue())
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual([c.args[0] for c in sleep.call_args_list[:2]], [2, 4])
+        # Once per round, plus once after each failure
+        self.assertEqual(close.call_count, 4 + 2)
+
+    def test_once_raises_database_errors(self):
+        """A one-shot run reports a database error instead of retrying."""
+        with (
+            mock.patch.object(
+                run_worker, "run_batch", side_effect=OperationalError("down")
+            ),
+            self.assertRaises(OperationalError),
+        ):
+            call_command("run_worker", once=True, stdout=StringIO())
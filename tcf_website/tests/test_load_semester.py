@@ -0,0 +1,403 @@
+"""Tests for the bulk semester loader (``load_semester``)."""
+
+import csv
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+
+from ..enrollment import record_snapshots, section_fill_curve
+from ..ingest.semester import (
+    convert_term,
+    parse_instructor_names,
+    parse_term,
+    parse_units,
+)
+from ..models import (
+    Course,
+    Discipline,
+    EnrollmentSnapshot,
+    Instructor,
+    Schedule,
+    ScheduledCourse,
+    Section,
+    Subdepartment,
+)
+from .test_utils import setup
+
+_COLUMNS = [
+    "ClassNumber",
+    "Mnemonic",
+    "Number",
+    "Section",
+    "Type",
+    "Units",
+    "Instructor1",
+    "Days1",
+    "Instructor2",
+    "Days2",
+    "Title",
+    "Topic",
+    "Description",
+    "Disciplines",
+    "Cost",
+]
+
+
+def _row(class_number, mnemonic, number, **values):
+    return {
+        "ClassNumber": class_number,
+        "Mnemonic": mnemonic,
+        "Number": number,
+        "Section": "001",
+        **values,
+    }
+
+
+class LoadSemesterTestCase(TestCase):
+    """Loads a small hand-written CSV through the management command."""
+
+    def setUp(self):
+        setup(self)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.data_dir = tmp.name
+
+    def _write_csv(self, rows, name):
+        with open(os.path.join(self.data_dir, f"{name}.csv"), "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def _load(self, rows, name="2026_spring", *options):
+        self._write_csv(rows, name)
+        out = StringIO()
+        call_command(
+            "load_semester",
+            name,
+            "--data-dir",
+            self.data_dir,
+            "--chunk-size",
+            "2",
+            *options,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def test_loads_sections_courses_and_instructors(self):
+        """One pass creates every row, staged across chunks."""
+        output = self._load(
+            [
+                _row(
+                    20001,
+                    "CS",
+                    "1420",
+                    Type="Lecture",
+                    Units="3",
+                    Instructor1="Tom Jefferson",
+                    Days1="MoWe 9:00am - 9:50am",
+                    Title="Software Testing II",
+                    Disciplines="Quantitative$Science",
+                ),
+                _row(
+                    20002,
+                    "NEWD",
+                    "2000T",
+                    Type="Seminar",
+                    Units="1 - 3",
+                    Instructor1="Ada B. Lovelace, Grace Hopper",
+                    Days1="TuTh 2:00pm - 3:15pm",
+                    Days2="Fr 10:00am - 10:50am",
+                    Title="New Things",
+                ),
+                _row(20003, "NEWD", "2000", Instructor1="Staff", Title="Ignored"),
+                _row(20004, "CS", "", Title="No course number"),
+            ]
+        )
+        self.assertIn("4 rows -> 3 sections", output)
+        self.assertIn("rows/s", output)
+
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.title, "Software Testing II")
+        self.assertEqual(self.course.semester_last_taught.number, 1262)
+        self.assertEqual(
+            set(self.course.disciplines.values_list("name", flat=True)),
+            {"Quantitative", "Science"},
+        )
+
+        new_course = Course.objects.get(combined_mnemonic_number="NEWD 2000")
+        self.assertEqual(new_course.title, "New Things")
+        self.assertEqual(
+            Subdepartment.objects.get(mnemonic="NEWD").department.name,
+            "Miscellaneous",
+        )
+        seminar = Section.objects.get(sis_section_number=20002)
+        self.assertEqual((seminar.units_min, seminar.units_max), (1, 3))
+        self.assertEqual(seminar.sectiontime_set.count(), 2)
+        self.assertNotEqual(seminar.weekly_occupancy, 0)
+        self.assertEqual(
+            {i.full_name for i in seminar.instructors.all()},
+            {"Ada Lovelace", "Grace Hopper"},
+        )
+        staff = Section.objects.get(sis_section_number=20003).instructors.get()
+        self.assertEqual(staff.last_name, "Staff")
+        lecture = Section.objects.get(sis_section_number=20001)
+        self.assertEqual(lecture.instructors.get(), self.instructor)
+
+    def test_reload_replaces_sections(self):
+        """Loading a term again replaces its sections and merges duplicates."""
+        self._load([_row(20001, "CS", "1420", Instructor1="Tom Jefferson")])
+        self._load(
+            [
+                _row(20005, "CS", "1420", Instructor1="Tom Jefferson", Topic="A"),
+                _row(20005, "CS", "1420", Instructor1="Jane Doe", Cost="Low Cost"),
+            ]
+        )
+        section = Section.objects.get(semester__number=1262)
+        self.assertEqual(section.sis_section_number, 20005)
+        self.assertEqual((section.topic, section.cost), ("A", "Low Cost"))
+        self.assertEqual(section.instructors.count(), 2)
+        self.assertEqual(Instructor.objects.filter(last_name="Doe").count(), 1)
+
+    def test_reload_keeps_enrollment_history(self):
+        """Replacing a term's sections leaves its enrollment history intact."""
+        self._load([_row(20001, "CS", "1420")])
+        section = Section.objects.get(sis_section_number=20001)
+        values = {
+            "enrollment_taken": 5,
+            "enrollment_limit": 30,
+            "waitlist_taken": 0,
+            "waitlist_limit": 10,
+        }
+        record_snapshots([(section.pk, values)])
+
+        self._load([_row(20001, "CS", "1420")])
+        snapshot = EnrollmentSnapshot.objects.get()
+        self.assertIsNone(snapshot.section)
+        self.assertEqual(snapshot.sis_section_number, 20001)
+
+        reloaded = Section.objects.get(sis_section_number=20001)
+        self.assertNotEqual(reloaded.pk, section.pk)
+        self.assertEqual(
+            [p.enrollment_taken for p in section_fill_curve(reloaded.pk)], [5]
+        )
+        # Unchanged numbers continue the history instead of restarting it.
+        self.assertEqual(record_snapshots([(reloaded.pk, values)]), 0)
+
+    def test_older_term_keeps_newer_course_info(self):
+        """An older term fills blanks but does not overwrite newer titles."""
+        self._load(
+            [_row(30001, "CS", "1420", Title="Old Title", Disciplines="History")],
+            name="2020_fall",
+        )
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.title, "Software Testing")
+        self.assertEqual(self.course.semester_last_taught, self.semester)
+        self.assertTrue(Discipline.objects.filter(name="History").exists())
+
+    def test_reconcile_keeps_unchanged_sections_and_schedules(self):
+        """Only changed rows are rewritten; scheduled sections survive."""
+        rows = [
+            _row(
+                20001,
+                "CS",
+                "1420",
+                Instructor1="Tom Jefferson",
+                Days1="Mo 9:00am - 9:50am",
+            ),
+            _row(20002, "CS", "1421", Instructor1="Tom Jefferson"),
+            _row(20003, "CS", "1422", Instructor1="Tom Jefferson"),
+        ]
+        self._load(rows, "2026_spring", "--reconcile")
+        kept, changed, dropped = (
+            Section.objects.get(sis_section_number=n) for n in (20001, 20002, 20003)
+        )
+        Section.objects.filter(pk=kept.pk).update(enrollment_taken=40)
+        schedule = Schedule.objects.create(
+            name="Spring", user=self.user1, semester=kept.semester
+        )
+        scheduled = ScheduledCourse.objects.create(
+            schedule=schedule, section=kept, instructor=self.instructor, time=""
+        )
+
+        rows[1] = _row(20002, "CS", "1421", Instructor1="Jane Doe", Topic="New")
+        output = self._load(
+            [*rows[:2], _row(20004, "CS", "1423")], "2026_spring", "--reconcile"
+        )
+        self.assertIn("1 inserted, 1 updated, 1 deleted, 1 unchanged", output)
+
+        self.assertTrue(ScheduledCourse.objects.filter(pk=scheduled.pk).exists())
+        kept.refresh_from_db()
+        self.assertEqual(kept.enrollment_taken, 40)
+        self.assertEqual(kept.sectiontime_set.count(), 1)
+        changed.refresh_from_db()
+        self.assertEqual(changed.topic, "New")
+        self.assertEqual(changed.instructors.get().last_name, "Doe")
+        self.assertFalse(Section.objects.filter(pk=dropped.pk).exists())
+        self.assertEqual(
+            Section.objects.get(sis_section_number=20004).instructors.get().last_name,
+            "Staff",
+        )
+
+    def test_reconcile_clears_removed_values(self):
+        """A cell that became blank resets the column instead of keeping it."""
+        self._load(
+            [_row(20001, "CS", "1420", Topic="Old", Days1="Mo 9:00am - 9:50am")],
+            "2026_spring",
+            "--reconcile",
+        )
+        self._load([_row(20001, "CS", "1420")], "2026_spring", "--reconcile")
+        section = Section.objects.get(sis_section_number=20001)
+        self.assertEqual((section.topic, section.section_times), ("", ""))
+        self.assertFalse(section.sectiontime_set.exists())
+        self.assertEqual(section.weekly_occupancy, 0)
+
+    def _catalog(self):
+        sections = {
+            (
+                s.semester.number,
+                s.sis_section_number,
+                s.course.code(),
+                s.topic,
+                s.section_times,
+                tuple(sorted(i.full_name for i in s.instructors.all())),
+                s.sectiontime_set.count(),
+            )
+            for s in Section.objects.select_related("course", "semester")
+        }
+        courses = {
+            (
+                c.code(),
+                c.title,
+                c.description,
+                c.semester_last_taught.number,
+                tuple(sorted(c.disciplines.values_list("name", flat=True))),
+            )
+            for c in Course.objects.select_related("semester_last_taught")
+        }
+        return sections, courses
+
+    def test_parallel_rebuild_matches_serial_loads(self):
+        """ALL_DANGEROUS with workers gives the same catalog as per-file loads."""
+        terms = {
+            "2025_spring": [
+                _row(1, "CS", "1420", Title="", Description="First", Disciplines="A"),
+                _row(2, "NEWD", "1000", Title="New", Instructor1="Ada Lovelace"),
+            ],
+            "2026_spring": [
+                _row(3, "CS", "1420", Title="Newest", Disciplines="B$C"),
+                _row(3, "CS", "1420", Instructor1="Grace Hopper", Topic="T"),
+                _row(4, "NEWD", "1000", Description="Desc", Days1="Fr 1:00pm - 2:00pm"),
+            ],
+            "2020_fall": [
+                _row(5, "NEWD", "1000", Title="Old", Instructor1="Ada Lovelace"),
+                _row(6, "CS", "1421", Title="Older", Disciplines="D"),
+            ],
+        }
+        for name, rows in terms.items():
+            self._write_csv(rows, name)
+
+        with transaction.atomic():
+            for name in sorted(terms):
+                call_command(
+                    "load_semester",
+                    name,
+                    "--data-dir",
+                    self.data_dir,
+                    stdout=StringIO(),
+                )
+            serial = self._catalog()
+            transaction.set_rollback(True)
+
+        out = StringIO()
+        call_command(
+            "load_semester",
+            "ALL_DANGEROUS",
+            "--data-dir",
+            self.data_dir,
+            "--workers",
+            "2",
+            stdout=out,
+        )
+        self.assertEqual(self._catalog(), serial)
+        self.assertIn("3 files, 7 rows: parse", out.getvalue())
+        self.assertEqual(
+            Course.objects.get(combined_mnemonic_number="NEWD 1000").title, "New"
+        )
+
+    def test_columnar_table_replaces_csv(self):
+        """A converted term parses identically and is loaded while up to date."""
+        rows = [
+            _row(
+                20001,
+                "CS",
+                "1420",
+                Type="Lecture",
+                Units="1 - 3",
+                Instructor1="Ada B. Lovelace, Staff",
+                Days1="MoWe 9:00am - 9:50am",
+                Days2="Fr 1:00pm - 2:15pm",
+                Title="Software Testing II",
+                Disciplines="Quantitative$Science",
+            ),
+            _row(20001, "CS", "1420", Instructor1="Grace Hopper", Cost="Low Cost"),
+            _row(20002, "NEWD", "2000T", Topic="Topic", Description="Desc"),
+            _row(20003, "CS", "", Title="No course number"),
+        ]
+        self._write_csv(rows, "2026_spring")
+        csv_path = os.path.join(self.data_dir, "2026_spring.csv")
+        columnar_dir = os.path.join(self.data_dir, "columnar")
+        table = os.path.join(columnar_dir, "2026_spring")
+        self.assertEqual(convert_term(csv_path, table), 3)
+
+        from_csv = parse_term(csv_path, 2026, "SPRING")
+        from_table = parse_term(table, 2026, "SPRING")
+        for attr in ("rows", "skipped_rows", "courses", "sections"):
+            self.assertEqual(getattr(from_table, attr), getattr(from_csv, attr))
+        self.assertEqual(list(from_table.instructors), list(from_csv.instructors))
+
+        def load():
+            out = StringIO()
+            call_command(
+                "load_semester",
+                "2026_spring",
+                "--data-dir",
+                self.data_dir,
+                "--columnar-dir",
+                columnar_dir,
+                stdout=out,
+            )
+            return out.getvalue()
+
+        self.assertIn("Peak RSS", load())
+        section = Section.objects.get(sis_section_number=20001)
+        self.assertEqual(section.instructors.count(), 3)
+        self.assertEqual(section.section_type, "Lecture")
+        self.assertEqual(section.cost, "Low Cost")
+
+        # An edited CSV is newer than its table: the CSV wins
+        rows[2] = _row(20002, "NEWD", "2000T", Topic="Edited")
+        self._write_csv(rows, "2026_spring")
+        load()
+        self.assertEqual(Section.objects.get(sis_section_number=20002).topic, "Edited")
+
+
+class LoadSemesterParsingTestCase(TestCase):
+    """Pure CSV cell parsing."""
+
+    def test_parse_units(self):
+        """Ranges, single values and blanks."""
+        self.assertEqual(parse_units("1 - 4"), (1, 4))
+        self.assertEqual(parse_units("3"), (3, 3))
+        self.assertEqual(parse_units(float("nan")), (0, 0))
+
+    def test_parse_instructor_names(self):
+        """Comma-joined cells split; staff names collapse to the placeholder."""
+        self.assertEqual(
+            parse_instructor_names(["Ada B. Lovelace, Faculty Staff"]),
+            {("Ada", "Lovelace"), ("", "Staff")},
+        )
+        self.assertEqual(parse_instructor_names([]), {("", "Staff")})
@@ -0,0 +1,126 @@
+"""Tests for weekly occupancy bitmaps and bitmap conflict checks."""
+
+from datetime import time
+
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Schedule, ScheduledCourse, Section, SectionTime
+from ..occupancy import blocks_to_mask, mask_to_blocks
+from ..schedule import has_schedule_conflict, schedule_occupancy
+from ..schedule.calendar import section_occupancy
+from .test_utils import setup
+
+
+class OccupancyMaskTestCase(TestCase):
+    """Pure bitmap helpers."""
+
+    def test_overlap_matches_interval_rule(self):
+        """Same-day overlapping meetings share a bit; back-to-back ones do not."""
+        mwf_10 = blocks_to_mask([("MON", 600, 650), ("WED", 600, 650)])
+        self.assertTrue(mwf_10 & blocks_to_mask([("WED", 620, 700)]))
+        self.assertFalse(mwf_10 & blocks_to_mask([("MON", 650, 700)]))
+        self.assertFalse(mwf_10 & blocks_to_mask([("TUE", 600, 650)]))
+
+    def test_round_trip(self):
+        """Slot-aligned blocks come back unchanged."""
+        blocks = [("MON", 540, 590), ("THU", 0, 5), ("FRI", 1380, 1440)]
+        self.assertEqual(mask_to_blocks(blocks_to_mask(blocks)), blocks)
+
+    def test_partial_slots_round_outwards(self):
+        """Unaligned times occupy every slot they touch."""
+        self.assertEqual(
+            mask_to_blocks(blocks_to_mask([("TUE", 602, 648)])), [("TUE", 600, 650)]
+        )
+
+
+class SectionOccupancyTestCase(TestCase):
+    """Stored bitmaps, the SQL lookup and the schedule conflict checks."""
+
+    def setUp(self):
+        setup(self)
+        self.section_course.section_times = "MoWe 10:00AM - 10:50AM,"
+        self.section_course.weekly_occupancy = section_occupancy(
+            [], self.section_course.section_times
+        )
+        self.section_course.save()
+        self.schedule = Schedule.objects.create(
+            name="Plan", user=self.user1, semester=self.semester
+        )
+        ScheduledCourse.objects.create(
+            schedule=self.schedule,
+            section=self.section_course,
+            instructor=self.instructor,
+            time=self.section_course.section_times,
+        )
+
+    def test_bitmap_round_trips_through_database(self):
+        """The bit(n) column reads back as the same int."""
+        stored = Section.objects.get(pk=self.section_course.pk).weekly_occupancy
+        self.assertEqual(stored, blocks_to_mask([("MON", 600, 650), ("WED", 600, 650)]))
+
+    def test_overlaps_lookup(self):
+        """``weekly_occupancy__overlaps`` ANDs bitmaps in SQL."""
+        clash = blocks_to_mask([("WED", 630, 700)])
+        free = blocks_to_mask([("WED", 650, 700)])
+        self.assertTrue(
+            Section.objects.filter(weekly_occupancy__overlaps=clash).exists()
+        )
+        self.assertFalse(
+            Section.objects.filter(weekly_occupancy__overlaps=free).exists()
+        )
+
+    def test_sections_without_bitmap_fall_back_to_times(self):
+        """Sections loaded before bitmaps existed still count."""
+        SectionTime.objects.create(
+            section=self.section_course2,
+            tuesday=True,
+            start_time=time(14),
+            end_time=time(15, 15),
+        )
+        ScheduledCourse.objects.create(
+            schedule=self.schedule,
+            section=self.section_course2,
+            instructor=self.instructor,
+            time="",
+        )
+        self.assertEqual(
+            schedule_occupancy(self.schedule),
+            blocks_to_mask([("MON", 600, 650), ("WED", 600, 650), ("TUE", 840, 915)]),
+        )
+        self.assertTrue(has_schedule_conflict(self.schedule, [("TUE", 900, 960)]))
+        self.assertFalse(has_schedule_conflict(self.schedule, [("TUE", 915, 960)]))
+
+    def test_add_course_rejects_conflicting_section(self):
+        """The add flow refuses a section whose bitmap overlaps the schedule."""
+        clash = Section.objects.create(
+            course=self.course2,
+            semester=self.semester,
+            sis_section_number=4242,
+            section_times="We 10:30AM - 11:45AM,",
+        )
+        clash.instructors.set([self.instructor])
+        later = Section.objects.create(
+            course=self.course2,
+            semester=self.semester,
+            sis_section_number=4243,
+            section_times="We 10:50AM - 11:45AM,",
+        )
+        later.instructors.set([self.instructor])
+        self.client.force_login(self.user1)
+        for section in (clash, later):
+            self.client.post(
+                reverse("schedule_add_course", args=[self.course2.pk]),
+                {
+                    "schedule_id": str(self.schedule.pk),
+                    "selection": f"{section.pk}:{self.instructor.pk}",
+                    "next": reverse("schedule"),
+                },
+            )
+        added = set(
+            ScheduledCourse.objects.filter(schedule=self.schedule).values_list(
+                "section_id", flat=True
+            )
+        )
+        self.assertNotIn(clash.pk, added)
+        self.assertIn(later.pk, added)
@@ -0,0 +1,142 @@
+"""Tests for keyset (cursor) pagination."""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Course, Review, Vote
+from ..pagination import KeysetPage, decode_cursor, estimate_count, paginate
+from .test_utils import setup
+
+
+class KeysetPaginationTestCase(TestCase):
+    """Cursor pages must match the OFFSET pages they replace."""
+
+    def setUp(self):
+        setup(self)
+        for number in range(2000, 2023):
+            Course.objects.create(
+                title="Seminar",
+                number=number,
+                subdepartment=self.subdepartment,
+                # Alternate terms so the sort key has many ties.
+                semester_last_taught=(
+                    self.semester if number % 2 else self.past_semester
+                ),
+            )
+        self.courses = Course.objects.order_by("-semester_last_taught__number")
+
+    def _offset_pages(self, queryset, per_page):
+        ordered = list(queryset.order_by(*queryset.query.order_by, "-pk"))
+        return [
+            ordered[start : start + per_page]
+            for start in range(0, len(ordered), per_page)
+        ]
+
+    def test_following_next_cursors_walks_the_offset_order(self):
+        """Next links visit every row once, in the same order as OFFSET pages."""
+        expected = self._offset_pages(self.courses, 4)
+        page = paginate(self.courses, 1, per_page=4, keyset=True)
+        self.assertIsInstance(page, KeysetPage)
+        seen = [list(page)]
+        while page.has_next():
+            page = paginate(
+                self.courses,
+                page.next_page_number(),
+                per_page=4,
+                keyset=True,
+                cursor=page.next_cursor,
+            )
+            seen.append(list(page))
+        self.assertEqual(seen, expected)
+        self.assertEqual(page.number, len(expected))
+        self.assertEqual(page.paginator.num_pages, len(expected))
+        self.assertEqual(page.next_cursor, "")
+
+    def test_previous_cursor_returns_the_previous_page(self):
+        """Prev links seek backwards to exactly the rows of the page before."""
+        first = paginate(self.courses, 1, per_page=5, keyset=True)
+        second = paginate(
+            self.courses, 2, per_page=5, keyset=True, cursor=first.next_cursor
+        )
+        back = paginate(
+            self.courses, 1, per_page=5, keyset=True, cursor=second.previous_cursor
+        )
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_seek_does_not_use_offset(self):
+        """Pages reached by cursor filter on the sort key instead of skipping rows."""
+        first = paginate(self.courses, 1, per_page=5, keyset=True)
+        with CaptureQueriesContext(connection) as queries:
+            list(
+                paginate(
+                    self.courses, 2, per_page=5, keyset=True, cursor=first.next_cursor
+                )
+            )
+        self.assertTrue(queries.captured_queries)
+        for query in queries.captured_queries:
+            self.assertNotIn("OFFSET", query["sql"])
+
+    def test_page_jump_and_bad_cursor_fall_back_to_offset(self):
+        """A page number without a (valid) cursor behaves like ``Paginator``."""
+        expected = self._offset_pages(self.courses, 5)
+        jumped = paginate(self.courses, 3, per_page=5, keyset=True)
+        self.assertEqual(list(jumped), expected[2])
+        garbage = paginate(self.courses, 3, per_page=5, keyset=True, cursor="%%%")
+        self.assertEqual(list(garbage), expected[2])
+        past_end = paginate(self.courses, 99, per_page=5, keyset=True)
+        self.assertEqual(past_end.number, len(expected))
+        self.assertEqual(list(past_end), expected[-1])
+        self.assertIsNone(decode_cursor("not-a-cursor"))
+
+    def test_unseekable_ordering_uses_plain_paginator(self):
+        """Lists and expression orderings keep the classic Page."""
+        page = paginate(list(self.courses), 1, per_page=5, keyset=True)
+        self.assertNotIsInstance(page, KeysetPage)
+        page = paginate(Course.objects.order_by("?"), 1, per_page=5, keyset=True)
+        self.assertNotIsInstance(page, KeysetPage)
+
+    def test_aggregate_sort_key(self):
+        """Most Helpful (an aggregate annotation) pages through every review."""
+        Vote.objects.create(value=1, user=self.user2, review=self.review3)
+        Vote.objects.create(value=-1, user=self.user2, review=self.review2)
+        reviews = Review.sort(Review.objects.all(), "Most Helpful")
+        expected = self._offset_pages(reviews, 2)
+        page = paginate(reviews, 1, per_page=2, keyset=True)
+        seen = [list(page)]
+        while page.has_next():
+            page = paginate(
+                reviews,
+                page.number + 1,
+                per_page=2,
+                keyset=True,
+                cursor=page.next_cursor,
+            )
+            seen.append(list(page))
+        self.assertEqual(seen, expected)
+
+    def test_estimate_count_is_exact_for_small_results(self):
+        """Small planner estimates are replaced by a real count."""
+        self.assertEqual(estimate_count(self.courses), self.courses.count())
+        page = paginate(self.courses, 1, per_page=5, keyset=True, estimate_total=True)
+        self.assertEqual(page.paginator.count, self.courses.count())
+
+    def test_department_page_links_carry_cursor(self):
+        """Next keeps the cursor; numbered links drop it."""
+        response = self.client.get(
+            reverse("department", args=[self.department.pk]), {"latest": "false"}
+        )
+        page = response.context["page_obj"]
+        self.assertTrue(page.has_next())
+        self.assertContains(response, f"cursor={page.next_cursor}")
+
+        response = self.client.get(
+            reverse("department", args=[self.department.pk]),
+            {"latest": "false", "page": 2, "cursor": page.next_cursor},
+        )
+        second = response.context["page_obj"]
+        self.assertEqual(second.number, 2)
+        self.assertFalse(set(page) & set(second))
@@ -0,0 +1,145 @@
+"""Tests for the automatic schedule generator."""
+
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Section
+from ..schedule import SchedulePreferences, generate_schedules
+from ..schedule.calendar import section_occupancy
+from ..schedule.generator import MAX_COURSES
+from .test_utils import setup, suppress_request_warnings
+
+
+class ScheduleGeneratorTestCase(TestCase):
+    """Backtracking search over preloaded sections."""
+
+    def setUp(self):
+        setup(self)
+        Section.objects.all().delete()
+        self.cs_mwf9 = self._section(
+            self.course, 1, "Lecture", "MoWeFr 9:00AM - 9:50AM"
+        )
+        self.cs_tr11 = self._section(
+            self.course, 2, "Lecture", "TuTh 11:00AM - 12:15PM"
+        )
+        self.cs_lab = self._section(self.course, 3, "Laboratory", "Fr 9:00AM - 10:50AM")
+        self.algo_mw9 = self._section(
+            self.course2, 4, "Lecture", "MoWe 9:00AM - 10:15AM"
+        )
+        self.algo_tr2 = self._section(
+            self.course2, 5, "Lecture", "TuTh 2:00PM - 3:15PM"
+        )
+
+    def _section(self, course, number, section_type, times):
+        section = Section.objects.create(
+            course=course,
+            semester=self.semester,
+            sis_section_number=number,
+            section_type=section_type,
+            section_times=times,
+            units_min=3,
+            units_max=3,
+        )
+        section.weekly_occupancy = section_occupancy([], times)
+        section.save()
+        section.instructors.set([self.instructor])
+        return section
+
+    def _picked(self, schedule):
+        return {option.section.pk for option in schedule.options}
+
+    def test_only_conflict_free_combinations(self):
+        """Every result takes one lecture per course plus the lab, with no overlap."""
+        result = generate_schedules(
+            self.semester, [self.course.pk, self.course2.pk], limit=10
+        )
+        self.assertTrue(result.exhausted)
+        picks = [self._picked(s) for s in result.schedules]
+        # MWF 9 clashes with the Friday lab and with MoWe 9 Algorithms.
+        self.assertCountEqual(
+            picks,
+            [
+                {self.cs_tr11.pk, self.cs_lab.pk, self.algo_mw9.pk},
+                {self.cs_tr11.pk, self.cs_lab.pk, self.algo_tr2.pk},
+            ],
+        )
+
+    def test_preferences_rank_results(self):
+        """Early meetings are penalised and wanted free days rewarded."""
+        result = generate_schedules(
+            self.semester,
+            [self.course.pk, self.course2.pk],
+            SchedulePreferences(earliest_start=10 * 60),
+        )
+        self.assertEqual(
+            self._picked(result.schedules[0]),
+            {self.cs_tr11.pk, self.cs_lab.pk, self.algo_tr2.pk},
+        )
+
+    def test_top_k_and_missing_courses(self):
+        """``limit`` caps results; courses with no sections are reported."""
+        result = generate_schedules(
+            self.semester, [self.course.pk, self.course2.pk], limit=1
+        )
+        self.assertEqual(len(result.schedules), 1)
+
+        result = generate_schedules(self.semester, [self.course.pk, self.course3.pk])
+        self.assertEqual(result.schedules, [])
+        self.assertEqual(result.missing_course_ids, [self.course3.pk])
+
+    @suppress_request_warnings
+    def test_endpoint(self):
+        """The JSON endpoint returns ranked schedules with add-form selections."""
+        self.client.force_login(self.user1)
+        response = self.client.get(
+            reverse("schedule_generate"),
+            {
+                "semester": self.semester.pk,
+                "course": [self.course.pk, self.course2.pk],
+                "earliest": "10:00",
+                "free": "mon",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertTrue(payload["ok"])
+        best = payload["schedules"][0]
+        self.assertEqual(best["credits"], 9)
+        self.assertIn("MON", best["free_days"])
+        self.assertIn(
+            f"{self.algo_tr2.pk}:{self.instructor.pk}",
+            [s["selection"] for s in best["sections"]],
+        )
+
+        response = self.client.get(reverse("schedule_generate"), {"course": "x"})
+        self.assertEqual(response.status_code, 400)
+
+    @suppress_request_warnings
+    def test_endpoint_weights(self):
+        """Every weight is accepted; non-finite or negative weights are a 400."""
+        self.client.force_login(self.user1)
+        params = {"semester": self.semester.pk, "course": [self.course.pk]}
+        response = self.client.get(
+            reverse("schedule_generate"), {**params, "free_day_weight": "2.5"}
+        )
+        self.assertEqual(response.status_code, 200)
+        for raw in ("nan", "inf", "-1", "abc"):
+            response = self.client.get(
+                reverse("schedule_generate"), {**params, "gpa_weight": raw}
+            )
+            self.assertEqual(response.status_code, 400, raw)
+
+    @suppress_request_warnings
+    def test_too_many_courses_rejected(self):
+        """Courses beyond MAX_COURSES are an error, not silently dropped."""
+        course_ids = [self.course.pk, *range(-1, -MAX_COURSES - 1, -1)]
+        with self.assertRaises(ValueError):
+            generate_schedules(self.semester, course_ids)
+
+        self.client.force_login(self.user1)
+        response = self.client.get(
+            reverse("schedule_generate"),
+            {"semester": self.semester.pk, "course": course_ids},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(MAX_COURSES), response.json()["error"])
@@ -0,0 +1,123 @@
+"""Tests for batched schedule aggregates."""
+
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import CourseInstructorStats, Schedule, ScheduledCourse
+from ..schedule import ScheduleStatsService
+from .test_utils import setup
+
+
+class ScheduleStatsServiceTestCase(TestCase):
+    """ScheduleStatsService against the per-pair rollups it reads."""
+
+    def setUp(self):
+        setup(self)
+        self.both = Schedule.objects.create(
+            name="Both", user=self.user1, semester=self.semester
+        )
+        self.one = Schedule.objects.create(
+            name="One", user=self.user1, semester=self.semester
+        )
+        self.empty = Schedule.objects.create(
+            name="Empty", user=self.user1, semester=self.semester
+        )
+        for schedule, section, units in (
+            (self.both, self.section_course, 3),
+            (self.both, self.section_course2, 4),
+            (self.one, self.section_course2, 4),
+        ):
+            ScheduledCourse.objects.create(
+                schedule=schedule,
+                section=section,
+                instructor=self.instructor,
+                time="",
+                enrolled_units=units,
+            )
+        self.stats = CourseInstructorStats.for_pairs(
+            [
+                (self.course.pk, self.instructor.pk),
+                (self.course2.pk, self.instructor.pk),
+            ]
+        )
+
+    def _pair(self, course):
+        return self.stats[(course.pk, self.instructor.pk)]
+
+    def _rating(self, course):
+        stats = self._pair(course)
+        return (
+            stats.average_recommendability
+            + stats.average_instructor_rating
+            + stats.average_enjoyability
+        ) / 3
+
+    def test_aggregates(self):
+        """Credits, mean rating/difficulty and credit-weighted GPA per schedule."""
+        results = ScheduleStatsService([self.both, self.one, self.empty]).results()
+
+        courses, credits, rating, difficulty, gpa = results[self.both.pk]
+        self.assertEqual(len(courses), 2)
+        self.assertEqual(credits, 7)
+        self.assertAlmostEqual(
+            rating, (self._rating(self.course) + self._rating(self.course2)) / 2
+        )
+        self.assertAlmostEqual(
+            difficulty,
+            (
+                self._pair(self.course).average_difficulty
+                + self._pair(self.course2).average_difficulty
+            )
+            / 2,
+        )
+        self.assertAlmostEqual(
+            gpa,
+            (
+                self._pair(self.course).average_gpa * 3
+                + self._pair(self.course2).average_gpa * 4
+            )
+            / 7,
+        )
+
+        courses, credits, rating, _, gpa = results[self.one.pk]
+        self.assertEqual({c.title for c in courses}, {f"CS {self.course2.number}"})
+        self.assertEqual(credits, 4)
+        self.assertAlmostEqual(rating, self._rating(self.course2))
+        self.assertAlmostEqual(gpa, self._pair(self.course2).average_gpa)
+
+        self.assertEqual(results[self.empty.pk], [[], 0, 0.0, 0.0, 0.0])
+
+    def test_matches_get_schedule(self):
+        """The single-schedule model method returns the same values."""
+        batched = ScheduleStatsService([self.both, self.one]).for_schedule(self.both)
+        single = self.both.get_schedule()
+        self.assertEqual([c.pk for c in single[0]], [c.pk for c in batched[0]])
+        self.assertEqual(single[1:], batched[1:])
+
+    def test_models_and_ids_share_keys(self):
+        """Schedules given as models or ids key the results by integer id."""
+        service = ScheduleStatsService([self.both, self.one.pk, self.empty])
+        self.assertEqual(
+            list(service.results()), [self.both.pk, self.one.pk, self.empty.pk]
+        )
+        self.assertIs(service.for_schedule(self.one), service.for_schedule(self.one.pk))
+
+    def test_query_count_is_constant(self):
+        """Two queries whether one schedule or many are summarised."""
+        with self.assertNumQueries(2):
+            ScheduleStatsService([self.one]).results()
+        with self.assertNumQueries(2):
+            ScheduleStatsService([self.both, self.one, self.empty]).results()
+
+    def test_builder_context(self):
+        """The sidebar dicts and the selected schedule share one batch."""
+        self.client.force_login(self.user1)
+        response = self.client.get(
+            reverse("schedule"),
+            {"semester": self.semester.pk, "schedule": self.both.pk},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["credits"][self.both.pk], 7)
+        self.assertEqual(response.context["credits"][self.one.pk], 4)
+        self.assertEqual(response.context["selected_schedule_stats"]["credits"], 7)
+        self.assertEqual(len(response.context["selected_courses"]), 2)
@@ -0,0 +1,63 @@
+"""Tests for the process-wide SemesterRegistry."""
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import transaction
+from django.test import RequestFactory, TransactionTestCase
+
+from tcf_core.context_processors import base
+
+from ..models import Semester
+from ..semesters import VERSION_KEY, SemesterRegistry
+
+
+class SemesterRegistryTestCase(TransactionTestCase):
+    """Runs outside a wrapping transaction so snapshots are actually kept."""
+
+    def setUp(self):
+        SemesterRegistry.invalidate()
+        self.old = Semester.objects.create(year=2024, season="FALL", number=1248)
+        self.new = Semester.objects.create(year=2025, season="SPRING", number=1252)
+
+    def test_snapshot_is_ordered_and_reused(self):
+        """Newest first, and repeat lookups hit no database."""
+        self.assertEqual(SemesterRegistry.latest(), self.new)
+        with self.assertNumQueries(0):
+            snapshot = SemesterRegistry.snapshot()
+            self.assertEqual(list(snapshot.semesters), [self.new, self.old])
+            self.assertEqual(snapshot.get(self.old.pk), self.old)
+
+    def test_save_invalidates_local_snapshot(self):
+        """Saving a semester in this process drops the snapshot immediately."""
+        SemesterRegistry.snapshot()
+        newest = Semester.objects.create(year=2025, season="FALL", number=1258)
+        self.assertEqual(SemesterRegistry.latest(), newest)
+
+    def test_version_bump_from_another_process(self):
+        """A changed shared version is noticed on the next request."""
+        SemesterRegistry.snapshot()
+        # Another worker loads a term: rows change without signals here.
+        Semester.objects.bulk_create([Semester(year=2025, season="FALL", number=1258)])
+        cache.set(VERSION_KEY, "bumped-elsewhere", timeout=None)
+        self.assertEqual(SemesterRegistry.latest(), self.new)
+
+        SemesterRegistry.mark_stale()
+        self.assertEqual(SemesterRegistry.latest().number, 1258)
+
+    def test_uncommitted_semesters_are_not_kept(self):
+        """Snapshots taken inside a transaction are not published."""
+        SemesterRegistry.snapshot()
+        with transaction.atomic():
+            Semester.objects.create(year=2025, season="FALL", number=1258)
+            self.assertEqual(SemesterRegistry.latest().number, 1258)
+            transaction.set_rollback(True)
+        self.assertEqual(SemesterRegistry.latest(), self.new)
+
+    def test_context_processor_is_lazy(self):
+        """LATEST_SEMESTER is only resolved when used."""
+        SemesterRegistry.invalidate()
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        with self.assertNumQueries(0):
+            ctx = base(request)
+        self.assertEqual(ctx["LATEST_SEMESTER"].pk, self.new.pk)
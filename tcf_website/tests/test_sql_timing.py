@@ -0,0 +1,80 @@
+"""Tests for the per-request SQL timing middleware."""
+
+import json
+from contextlib import redirect_stdout
+from io import StringIO
+
+from cachalot import monkey_patch
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tcf_core.settings.sql_timing_middleware import _CURRENT, RequestStats
+
+from .test_utils import setup
+
+
+@override_settings(SQL_TIMING_ENABLED=True, SQL_TIMING_SLOW_MS=60_000)
+class SQLTimingMiddlewareTests(TestCase):
+    """Each request logs one JSON line and sets Server-Timing."""
+
+    def setUp(self):
+        setup(self)
+        self.url = reverse("instructor", args=[self.instructor.pk])
+
+    def get(self, url):
+        out = StringIO()
+        with redirect_stdout(out), CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        (line,) = [json.loads(row) for row in out.getvalue().splitlines()]
+        return response, line, queries
+
+    def test_counts_queries_and_template_time(self):
+        """The log line and header agree with the queries actually run."""
+        response, line, queries = self.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(line["type"], "request")
+        self.assertEqual(line["path"], self.url)
+        self.assertEqual(line["status"], 200)
+        self.assertEqual(line["db_queries"], len(queries))
+        self.assertGreater(line["template_ms"], 0)
+        self.assertNotIn("slow_sql", line)
+        self.assertRegex(
+            response["Server-Timing"],
+            rf'^db;dur=[\d.]+;desc="{len(queries)} queries", tpl;dur=[\d.]+, ',
+        )
+
+    @override_settings(SQL_TIMING_SLOW_MS=0)
+    def test_slow_request_logs_grouped_sql(self):
+        """Slow requests list their statements with execution counts."""
+        _, line, queries = self.get(self.url)
+        sampled = line["slow_sql"]
+        self.assertTrue(sampled)
+        self.assertEqual(sampled, sorted(sampled, key=lambda s: -s["ms"]))
+        self.assertLessEqual(sum(s["count"] for s in sampled), len(queries))
+
+    def test_counts_cachalot_hits(self):
+        """Lookups answered from cachalot's cache are hits; the rest are misses."""
+        self.get(self.url)  # installs the wrappers
+        cache = LocMemCache("sql-timing-test", {})
+        stats = RequestStats()
+        token = _CURRENT.set(stats)
+        try:
+            for _ in range(3):
+                monkey_patch._get_result_or_execute_query(
+                    lambda: [(1,)], cache, "query", ["table"]
+                )
+        finally:
+            _CURRENT.reset(token)
+        self.assertEqual((stats.cache_hits, stats.cache_misses), (2, 1))
+
+    @override_settings(SQL_TIMING_ENABLED=False)
+    def test_disabled(self):
+        """SQL_TIMING_ENABLED=False leaves responses and stdout untouched."""
+        out = StringIO()
+        with redirect_stdout(out):
+            response = self.client.get(self.url)
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(out.getvalue(), "")
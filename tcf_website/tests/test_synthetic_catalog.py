@@ -0,0 +1,178 @@
+"""Tests for generate_synthetic_catalog and benchmark_views."""
+
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Sum
+from django.test import TestCase
+
+from ..bench import CatalogSize, SyntheticCatalog, compare, percentile
+from ..models import (
+    Course,
+    CourseGrade,
+    CourseStats,
+    Review,
+    Schedule,
+    ScheduledCourse,
+    Section,
+    Semester,
+    User,
+    Vote,
+)
+from .test_utils import setup
+
+SIZES = {
+    "semesters": 4,
+    "courses": 30,
+    "sections": 90,
+    "instructors": 15,
+    "users": 40,
+    "reviews": 300,
+    "votes": 600,
+    "schedules": 20,
+}
+
+
+def generate(**options):
+    out = StringIO()
+    call_command(
+        "generate_synthetic_catalog", end_year=2024, stdout=out, **SIZES, **options
+    )
+    return out.getvalue()
+
+
+class GenerateSyntheticCatalogTests(TestCase):
+    """The generator fills every table consistently at the requested sizes."""
+
+    def test_generates_requested_sizes(self):
+        """Row counts match the options and derived tables are populated."""
+        out = generate(seed=3)
+        self.assertIn("300 reviews", out)
+        self.assertEqual(Semester.objects.count(), 4)
+        self.assertEqual(Course.objects.count(), 30)
+        self.assertEqual(Section.objects.count(), 90)
+        self.assertEqual(User.objects.count(), 40)
+        self.assertEqual(Review.objects.count(), 300)
+        self.assertEqual(Schedule.objects.count(), 20)
+        self.assertTrue(ScheduledCourse.objects.exists())
+        self.assertTrue(CourseGrade.objects.exists())
+        self.assertEqual(CourseStats.objects.count(), 30)
+        self.assertEqual(
+            CourseStats.objects.aggregate(n=Sum("review_count"))["n"],
+            Review.objects.filter(hidden=False).count(),
+        )
+
+    def test_vote_counters_match_votes(self):
+        """Review vote counters agree with the vote rows inserted with them."""
+        generate()
+        votes = Vote.objects.count()
+        self.assertGreater(votes, 500)
+        self.assertEqual(
+            Review.objects.aggregate(
+                up=Sum("upvote_count"), down=Sum("downvote_count")
+            ),
+            {
+                "up": Vote.objects.filter(value=1).count(),
+                "down": Vote.objects.filter(value=-1).count(),
+            },
+        )
+
+    def test_plan_is_seeded(self):
+        """The same seed gives the same catalog plan; another seed does not."""
+        size = CatalogSize(**SIZES)
+
+        def titles(seed):
+            _, courses = SyntheticCatalog(size, seed=seed)._plan_catalog()
+            return [(c.subject.mnemonic, c.number, c.title) for c in courses]
+
+        self.assertEqual(titles(1), titles(1))
+        self.assertNotEqual(titles(1), titles(2))
+
+    def test_refuses_non_empty_database(self):
+        """Existing courses stop the command before it writes anything."""
+        setup(self)
+        with self.assertRaisesMessage(CommandError, "already has courses"):
+            generate()
+        self.assertEqual(Review.objects.count(), 6)
+
+    def test_scaled_sizes(self):
+        """--scale multiplies every count except semesters."""
+        size = CatalogSize().scaled(0.01)
+        self.assertEqual((size.semesters, size.reviews, size.votes), (60, 5000, 10000))
+
+
+class BenchmarkViewsTests(TestCase):
+    """benchmark_views requests every hot view and writes a comparable report."""
+
+    def test_writes_and_compares_report(self):
+        """Every probe answers 200; comparing a report with itself is clean."""
+        generate()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            call_command(
+                "benchmark_views", repeat=2, warmup=0, output=path, stdout=StringIO()
+            )
+            with open(path, encoding="utf-8") as handle:
+                report = json.load(handle)
+            out = StringIO()
+            call_command(
+                "benchmark_views",
+                repeat=1,
+                warmup=0,
+                only=["course"],
+                compare=path,
+                tolerance=100,
+                fail_on_regression=True,
+                stdout=out,
+            )
+        self.assertEqual(
+            set(report["views"]),
+            {
+                "search_code",
+                "search_title",
+                "autocomplete",
+                "course",
+                "browse_search",
+                "browse_advanced",
+                "course_instructor",
+                "instructor",
+                "department",
+                "schedule_builder",
+            },
+        )
+        for view in report["views"].values():
+            self.assertEqual(view["status"], 200)
+            self.assertLessEqual(view["p50_ms"], view["p95_ms"])
+        self.assertEqual(report["rows"]["review"], 300)
+        self.assertIn("course ", out.getvalue())
+        self.assertNotIn("REGRESSION", out.getvalue())
+
+    def test_compare_flags_slower_and_chattier_views(self):
+        """More queries, or a p95 over the tolerance, count as regressions."""
+
+        def report(**views):
+            return {
+                "rows": {},
+                "views": {
+                    name: {"p95_ms": p95, "queries": queries}
+                    for name, (p95, queries) in views.items()
+                },
+            }
+
+        baseline = report(a=(10.0, 5), b=(10.0, 5), c=(10.0, 5), gone=(1.0, 1))
+        current = report(a=(11.0, 5), b=(10.0, 6), c=(20.0, 5), new=(1.0, 1))
+        lines, regressions = compare(baseline, current, tolerance=0.2)
+        self.assertEqual(regressions, ["b", "c"])
+        self.assertIn("new                new", lines)
+        self.assertIn("gone               missing", lines)
+
+    def test_percentile(self):
+        """Nearest-rank percentiles."""
+        values = [float(n) for n in range(1, 21)]
+        self.assertEqual(percentile(values, 50), 10.0)
+        self.assertEqual(percentile(values, 95), 19.0)
+        self.assertEqual(percentile([3.0], 95), 3.0)
@@ -0,0 +1,44 @@
+"""Tests for index-assisted trigram matching (``search.trigram``)."""
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connection, transaction
+from django.test import TestCase
+
+from ..models import Club, ClubCategory
+from ..search.trigram import TRIGRAM_MATCH_THRESHOLD, TrigramMatch
+
+
+class TrigramMatchTestCase(TestCase):
+    """``%`` filtering uses the configured session threshold."""
+
+    def setUp(self):
+        category = ClubCategory.objects.create(name="Arts", slug="ARTS")
+        self.weak = Club.objects.create(
+            name="Virginia Club Dance Team", category=category
+        )
+        self.other = Club.objects.create(name="Chess Society", category=category)
+
+    def test_session_threshold_is_set(self):
+        """New connections lower pg_trgm's 0.3 default to the search threshold."""
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW pg_trgm.similarity_threshold")
+            self.assertAlmostEqual(float(cursor.fetchone()[0]), TRIGRAM_MATCH_THRESHOLD)
+
+    def test_keeps_weak_matches(self):
+        """Scores the views accept (>= 0.15) but below 0.3 still match."""
+        score = (
+            Club.objects.annotate(score=TrigramSimilarity("combined_name", "dance"))
+            .get(pk=self.weak.pk)
+            .score
+        )
+        self.assertTrue(0.15 <= score < 0.3, score)
+        matched = Club.objects.filter(TrigramMatch("combined_name", "dance"))
+        self.assertEqual(list(matched), [self.weak])
+
+    def test_uses_trigram_index(self):
+        """The ``%`` filter can be answered from the gin_trgm_ops index."""
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = Club.objects.filter(TrigramMatch("combined_name", "dance")).explain()
+        self.assertIn("club_combined_name", plan)
+        self.assertIn("Bitmap Index Scan", plan)
@@ -1,6 +1,8 @@
 """Common testing utilities."""
 
 import logging
+import threading
+from http.server import ThreadingHTTPServer
 from random import randint
 
 from ..models import *
@@ -291,3 +293,12 @@ def suppress_request_warnings(original_function):
             logger.setLevel(previous_logging_level)
 
     return new_function
+
+
+def stub_server(testcase, handler):
+    """Serve ``handler`` on a free local port until ``testcase`` finishes."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    testcase.addCleanup(server.server_close)
+    testcase.addCleanup(server.shutdown)
+    return server
@@ -0,0 +1,140 @@
+"""Tests for denormalized vote counters (``tcf_website.votes``)."""
+
+import threading
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from ..models import Answer, Question, Review, User, Vote
+from ..votes import refresh_vote_counts
+from .test_utils import setup
+
+
+def _counters(obj):
+    obj.refresh_from_db()
+    return obj.upvote_count, obj.downvote_count, obj.net_votes
+
+
+class VoteCounterTests(TestCase):
+    """Toggle semantics and counter upkeep."""
+
+    def setUp(self):
+        setup(self)
+
+    def test_setup_votes_are_counted(self):
+        """ORM-created votes recount their review."""
+        self.assertEqual(_counters(self.review1), (2, 1, 1))
+
+    def test_toggle_cycle(self):
+        """Vote, switch, then undo; counters and return values follow."""
+        self.assertEqual(self.review2.upvote(self.user4), 1)
+        self.assertEqual((self.review2.upvote_count, self.review2.net_votes), (1, 1))
+        self.assertEqual(self.review2.downvote(self.user4), -1)
+        self.assertEqual(_counters(self.review2), (0, 1, -1))
+        self.assertEqual(self.review2.downvote(self.user4), 0)
+        self.assertEqual(_counters(self.review2), (0, 0, 0))
+        self.assertFalse(Vote.objects.filter(review=self.review2).exists())
+
+    def test_toggle_is_one_statement(self):
+        """A vote click is a single round trip."""
+        with self.assertNumQueries(1):
+            self.review1.upvote(self.user4)
+
+    def test_question_and_answer_counters(self):
+        """Questions and answers share the same toggle."""
+        question = Question.objects.create(
+            text="Is it curved?",
+            course=self.course,
+            instructor=self.instructor,
+            user=self.user1,
+        )
+        answer = Answer.objects.create(
+            text="Yes.", question=question, user=self.user2, semester=self.semester
+        )
+        question.upvote(self.user3)
+        answer.downvote(self.user3)
+        answer.downvote(self.user4)
+        self.assertEqual(_counters(question), (1, 0, 1))
+        self.assertEqual(_counters(answer), (0, 2, -2))
+
+    def test_save_keeps_counters(self):
+        """Saving a stale instance does not overwrite counters."""
+        stale = Review.objects.get(pk=self.review1.pk)
+        self.review1.upvote(self.user4)
+        stale.text = "Edited."
+        stale.save()
+        self.assertEqual(_counters(self.review1), (3, 1, 2))
+        self.assertEqual(self.review1.text, "Edited.")
+
+    def test_listing_reads_counters(self):
+        """Review listings need no join or GROUP BY on votes."""
+        reviews = Review.get_sorted_reviews(
+            self.course.pk, self.instructor.pk, self.user1, "Most Helpful"
+        )
+        sql = str(reviews.query).upper()
+        self.assertNotIn("GROUP BY", sql)
+        review = next(r for r in reviews if r.pk == self.review1.pk)
+        self.assertEqual((review.net_votes, review.user_vote), (1, 1))
+
+    def test_vote_endpoint_payload(self):
+        """The JSON endpoint returns the counters written by the vote."""
+        self.client.force_login(self.user4)
+        response = self.client.post(
+            reverse("vote_review", args=[self.review1.pk]), {"action": "down"}
+        )
+        self.assertEqual(response.json(), {"ok": True, "sum_votes": 0, "user_vote": -1})
+
+    def test_refresh_vote_counts_repairs_drift(self):
+        """Recounting restores counters edited out of band."""
+        Review.objects.filter(pk=self.review1.pk).update(upvote_count=9, net_votes=9)
+        refresh_vote_counts(Review, [self.review1.pk])
+        self.assertEqual(_counters(self.review1), (2, 1, 1))
+
+
+class ConcurrentVoteTests(TransactionTestCase):
+    """Parallel clicks on one review keep the counters exact."""
+
+    def setUp(self):
+        setup(self)
+        self.voters = [
+            User.objects.create(username=f"voter{i}", computing_id=f"vt{i}")
+            for i in range(8)
+        ]
+
+    def _in_parallel(self, calls):
+        barrier = threading.Barrier(len(calls))
+
+        def run(call):
+            try:
+                barrier.wait()
+                call()
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(call,)) for call in calls]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_parallel_votes(self):
+        """Every voter and every repeated click is accounted for."""
+        review = self.review2
+        calls = [
+            *(lambda u=user: review.upvote(u) for user in self.voters),
+            # A racing double click may collapse into one vote, but never drifts.
+            *[lambda: review.downvote(self.user4)] * 2,
+        ]
+        self._in_parallel(calls)
+
+        votes = Vote.objects.filter(review=review)
+        self.assertEqual(
+            _counters(review),
+            (
+                votes.filter(value=1).count(),
+                votes.filter(value=-1).count(),
+                votes.filter(value=1).count() - votes.filter(value=-1).count(),
+            ),
+        )
+        self.assertEqual(review.upvote_count, len(self.voters))
@@ -98,6 +98,11 @@ urlpatterns = [
         views.duplicate_schedule,
         name="duplicate_schedule",
     ),
+    path(
+        "schedule/generate/",
+        views.generate_schedules_view,
+        name="schedule_generate",
+    ),
     path(
         "schedule/share/",
         views.schedule_share,
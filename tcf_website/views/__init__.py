@@ -30,6 +30,7 @@ from .schedule import (
     delete_schedule,
     duplicate_schedule,
     edit_schedule,
+    generate_schedules_view,
     new_schedule,
     remove_scheduled_course,
     schedule_add_course,
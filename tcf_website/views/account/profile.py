@@ -7,7 +7,8 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
 from django.core.exceptions import PermissionDenied
-from django.db.models import Avg, Count, Q
+from django.db.models import Avg, Count, Sum
+from django.db.models.functions import Coalesce
 from django.forms import ModelForm
 from django.http import HttpResponseRedirect
 from django.shortcuts import render
@@ -22,7 +23,7 @@ from ...utils import safe_next_url, safe_round
 def _review_stats_for_user(user):
     """Build review stats for a given user."""
     stats = Review.objects.filter(user=user).aggregate(
-        total_review_upvotes=Count("vote", filter=Q(vote__value=1)),
+        total_review_upvotes=Coalesce(Sum("upvote_count"), 0),
         total_reviews_written=Count("id"),
         average_review_rating=(
             Avg("instructor_rating") + Avg("enjoyability") + Avg("recommendability")
@@ -66,7 +67,12 @@ def profile(request):
 def reviews(request):
     """User reviews view."""
     page_number = request.GET.get("page", 1)
-    paginated_reviews = paginate(request.user.reviews(), page_number)
+    paginated_reviews = paginate(
+        request.user.reviews(),
+        page_number,
+        keyset=True,
+        cursor=request.GET.get("cursor"),
+    )
 
     context = _review_stats_for_user(request.user)
     context["paginated_reviews"] = paginated_reviews
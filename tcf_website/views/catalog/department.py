@@ -20,6 +20,8 @@ def department(request, dept_id: int):
         dept.fetch_recent_courses(latest_only=latest_only),
         request.GET.get("page", 1),
         per_page=_PAGE_SIZE,
+        keyset=True,
+        cursor=request.GET.get("cursor"),
     )
 
     return render(
@@ -14,11 +14,13 @@ from django.utils.http import url_has_allowed_host_and_scheme
 
 from ...models import Club, Instructor
 from ...pagination import paginate
+from ...search.autocomplete import AutocompleteIndex
 from ...search.course_display import (
     course_to_row_dict,
     group_by_club_category,
     group_by_dept,
 )
+from ...search.trigram import TrigramMatch, trigram_match_any
 from ...utils import browsable_course_queryset, parse_mode
 
 # --- Constants ----------------------------------------------------------------
@@ -50,6 +52,8 @@ def fetch_courses(query: str):
     search_query = normalize_search_query(query)
     return (
         browsable_course_queryset()
+        # Index-assisted candidate filter; the exact threshold is applied below.
+        .filter(trigram_match_any(("combined_mnemonic_number", "title"), search_query))
         .annotate(
             mnemonic_similarity=TrigramSimilarity(
                 "combined_mnemonic_number", search_query
@@ -70,6 +74,7 @@ def fetch_instructors(query: str) -> list[dict]:
     """Instructor dicts with similarity scores, capped for autocomplete-scale use upstream."""
     results = (
         Instructor.objects.only("first_name", "last_name", "email")
+        .filter(trigram_match_any(("first_name", "last_name", "full_name"), query))
         .annotate(
             similarity_first=TrigramSimilarity("first_name", query),
             similarity_last=TrigramSimilarity("last_name", query),
@@ -122,15 +127,21 @@ def fetch_clubs(query: str) -> list[dict]:
             "category_slug": c.category_slug,
             "category_name": c.category_name,
         }
-        for c in Club.objects.annotate(
-            max_similarity=TrigramSimilarity("combined_name", query)
-        )
+        for c in Club.objects.filter(TrigramMatch("combined_name", query))
+        .annotate(max_similarity=TrigramSimilarity("combined_name", query))
         .filter(max_similarity__gte=_SIMILARITY_THRESHOLD)
         .annotate(**category_annotations)
         .order_by("-max_similarity")
     ]
 
 
+def _autocomplete_snapshot(query: str):
+    """In-memory autocomplete index if it can answer ``query``, else None."""
+    if not AutocompleteIndex.answerable(query):
+        return None
+    return AutocompleteIndex.snapshot()
+
+
 def decide_order(courses: list[dict], instructors: list[dict]) -> bool:
     """Return True if courses should be listed before instructors."""
 
@@ -193,7 +204,11 @@ def search(request):
 
     if is_club:
         if is_ajax:
-            clubs = fetch_clubs(query)[:_AUTOCOMPLETE_CLUB_LIMIT]
+            index = _autocomplete_snapshot(query)
+            if index is not None:
+                clubs = index.clubs_for(query, _AUTOCOMPLETE_CLUB_LIMIT)
+            else:
+                clubs = fetch_clubs(query)[:_AUTOCOMPLETE_CLUB_LIMIT]
             return _render_autocomplete(
                 request,
                 mode,
@@ -211,10 +226,19 @@ def search(request):
             return redirect("browse")
 
         if is_ajax:
-            courses = _serialize_courses(
-                fetch_courses(query)[:_AUTOCOMPLETE_COURSE_LIMIT]
-            )
-            instructors = fetch_instructors(query)[:_AUTOCOMPLETE_INSTRUCTOR_LIMIT]
+            index = _autocomplete_snapshot(query)
+            if index is not None:
+                courses = index.courses_for(
+                    normalize_search_query(query), _AUTOCOMPLETE_COURSE_LIMIT
+                )
+                instructors = index.instructors_for(
+                    query, _AUTOCOMPLETE_INSTRUCTOR_LIMIT
+                )
+            else:
+                courses = _serialize_courses(
+                    fetch_courses(query)[:_AUTOCOMPLETE_COURSE_LIMIT]
+                )
+                instructors = fetch_instructors(query)[:_AUTOCOMPLETE_INSTRUCTOR_LIMIT]
             return _render_autocomplete(
                 request,
                 mode,
@@ -226,7 +250,12 @@ def search(request):
 
         instructors = fetch_instructors(query)
         page_obj = paginate(
-            fetch_courses(query), request.GET.get("page", 1), per_page=_SEARCH_PAGE_SIZE
+            fetch_courses(query),
+            request.GET.get("page", 1),
+            per_page=_SEARCH_PAGE_SIZE,
+            keyset=True,
+            cursor=request.GET.get("cursor"),
+            estimate_total=True,
         )
         total = page_obj.paginator.count
         courses = _serialize_courses(page_obj)
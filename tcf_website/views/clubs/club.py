@@ -1,8 +1,6 @@
 """Club category and club detail views."""
 
 from django.conf import settings
-from django.db.models import Q, Sum, Value
-from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
 
@@ -11,7 +9,9 @@ from ...pagination import paginate
 from ...utils import with_mode
 
 
-def _get_paginated_club_reviews(club: Club, user, page_number=1, method=""):
+def _get_paginated_club_reviews(
+    club: Club, user, page_number=1, method="", cursor=None
+):
     """Build sorted/paginated club reviews with vote annotations."""
     reviews = Review.objects.filter(
         club=club,
@@ -19,17 +19,12 @@ def _get_paginated_club_reviews(club: Club, user, page_number=1, method=""):
         hidden=False,
     ).exclude(text="")
 
-    reviews = reviews.annotate(sum_votes=Coalesce(Sum("vote__value"), Value(0)))
-
     if user.is_authenticated:
-        reviews = reviews.annotate(
-            user_vote=Coalesce(
-                Sum("vote__value", filter=Q(vote__user=user)),
-                Value(0),
-            ),
-        )
+        reviews = Review.with_user_vote(reviews, user)
 
-    return paginate(Review.sort(reviews, method), page_number)
+    return paginate(
+        Review.sort(reviews, method), page_number, keyset=True, cursor=cursor
+    )
 
 
 def _build_club_page_context(request, club: Club, mode: str):
@@ -37,7 +32,7 @@ def _build_club_page_context(request, club: Club, mode: str):
     sort_method = request.GET.get("sort", "")
     page_number = request.GET.get("page", 1)
     paginated_reviews = _get_paginated_club_reviews(
-        club, request.user, page_number, sort_method
+        club, request.user, page_number, sort_method, request.GET.get("cursor")
     )
 
     breadcrumbs = [
@@ -4,6 +4,7 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 
 from ...models import Course, Section, Semester
+from ...semesters import SemesterRegistry
 
 
 def is_lecture_section(section_type: str | None) -> bool:
@@ -67,7 +68,8 @@ def course_view(request, mnemonic: str, course_number: int):
         number=course_number,
     )
 
-    latest_semester = Semester.latest()
+    semesters = SemesterRegistry.snapshot()
+    latest_semester = semesters.latest
     latest_only = request.GET.get("latest", "true") != "false"
     sortby = request.GET.get("sortby", "last_taught")
     order = request.GET.get("order", "desc")
@@ -80,10 +82,8 @@ def course_view(request, mnemonic: str, course_number: int):
         build_section_times_maps_by_instructor(course.id, latest_semester)
     )
 
-    sem_ids = {i.semester_last_taught for i in instructors if i.semester_last_taught}
-    sems = {s.pk: s for s in Semester.objects.filter(pk__in=sem_ids)}
     for instructor in instructors:
-        sem = sems.get(instructor.semester_last_taught)
+        sem = semesters.get(instructor.semester_last_taught)
         instructor.semester_last_taught = str(sem) if sem else "Unknown"
         instructor.times = lecture_times_by_instructor.get(instructor.id, {})
         instructor.all_times = all_times_by_instructor.get(instructor.id, {})
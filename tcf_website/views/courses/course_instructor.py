@@ -2,16 +2,33 @@
 
 import json
 
-from django.conf import settings
-from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Avg, Count, Q
 from django.http import Http404
 from django.shortcuts import render
 from django.urls import reverse
 
-from ...models import CourseInstructorGrade, Review, ReviewLLMSummary, Section, Semester
+from ...models import (
+    CourseInstructorStats,
+    Review,
+    ReviewLLMSummary,
+    Section,
+)
+from ...semesters import SemesterRegistry
 from .course import is_lecture_section
 
+# JSON key expected by the page script -> CourseInstructorStats column
+_CHART_FIELDS = {
+    "average_rating": "average_rating",
+    "instructor": "average_instructor_rating",
+    "enjoyability": "average_enjoyability",
+    "difficulty": "average_difficulty",
+    "recommendability": "average_recommendability",
+    "hours": "average_hours_per_week",
+    "amount_reading": "average_amount_reading",
+    "amount_writing": "average_amount_writing",
+    "amount_group": "average_amount_group",
+    "amount_homework": "average_amount_homework",
+}
+
 _GRADE_BREAKDOWN_FIELDS = (
     "a_plus",
     "a",
@@ -43,54 +60,33 @@ def _fetch_pair_section_anchor(course_id, instructor_id):
     return section_last_taught, course, instructor
 
 
-def _pair_review_counts(course_id, instructor_id):
-    """Counts for ratings vs written reviews (toxicity filter matches main queryset)."""
-    row = Review.objects.filter(
-        instructor=instructor_id,
-        course=course_id,
-        toxicity_rating__lt=settings.TOXICITY_THRESHOLD,
-        hidden=False,
-    ).aggregate(
-        num_ratings=Count("id"),
-        num_reviews=Count("id", filter=~Q(text="")),
-    )
-    return row["num_reviews"], row["num_ratings"]
+def _pair_stats(course_id, instructor_id):
+    """Precomputed rollup for the pair, or None when it has no reviews or grades."""
+    return CourseInstructorStats.objects.filter(
+        course_id=course_id, instructor_id=instructor_id
+    ).first()
 
 
-def _pair_aggregate_chart_data(course, instructor, course_id, instructor_id):
+def _pair_review_counts(stats):
+    """Counts for written reviews vs ratings (toxicity filter matches main queryset)."""
+    if stats is None:
+        return 0, 0
+    return stats.num_reviews, stats.num_ratings
+
+
+def _pair_aggregate_chart_data(stats):
     """Averages and optional grade breakdown for the instructor page JSON blob."""
-    data = Review.objects.filter(
-        course=course_id, instructor=instructor_id, hidden=False
-    ).aggregate(
-        average_rating=(
-            Avg("instructor_rating") + Avg("enjoyability") + Avg("recommendability")
-        )
-        / 3,
-        instructor=Avg("instructor_rating"),
-        enjoyability=Avg("enjoyability"),
-        difficulty=Avg("difficulty"),
-        recommendability=Avg("recommendability"),
-        hours=Avg("hours_per_week"),
-        amount_reading=Avg("amount_reading"),
-        amount_writing=Avg("amount_writing"),
-        amount_group=Avg("amount_group"),
-        amount_homework=Avg("amount_homework"),
-    )
     # Pass raw floats to JS; each display call (toFixed) rounds to the needed precision.
     # Pre-rounding here would cause double-rounding divergence from Django's floatformat.
+    data = {
+        key: getattr(stats, field) if stats is not None else None
+        for key, field in _CHART_FIELDS.items()
+    }
 
-    try:
-        grades_data = CourseInstructorGrade.objects.get(
-            instructor=instructor, course=course
-        )
-    except ObjectDoesNotExist:
-        pass
-    else:
-        data["average_gpa"] = (
-            round(grades_data.average, 2) if grades_data.average else None
-        )
+    if stats is not None and stats.grade_count:
+        data["average_gpa"] = round(stats.average_gpa, 2) if stats.average_gpa else None
         for field in _GRADE_BREAKDOWN_FIELDS:
-            data[field] = getattr(grades_data, field)
+            data[field] = getattr(stats, field)
 
     return data
 
@@ -153,19 +149,25 @@ def course_instructor(request, course_id, instructor_id, method="Default"):
         course_id, instructor_id
     )
 
-    num_reviews, num_ratings = _pair_review_counts(course_id, instructor_id)
+    stats = _pair_stats(course_id, instructor_id)
+    num_reviews, num_ratings = _pair_review_counts(stats)
 
     sort_method = request.GET.get("sort", method)
     page_number = request.GET.get("page", 1)
     paginated_reviews = Review.get_paginated_reviews(
-        course_id, instructor_id, request.user, page_number, sort_method
+        course_id,
+        instructor_id,
+        request.user,
+        page_number,
+        sort_method,
+        cursor=request.GET.get("cursor"),
     )
 
     breadcrumbs = _course_instructor_breadcrumbs(course, instructor)
-    data = _pair_aggregate_chart_data(course, instructor, course_id, instructor_id)
+    data = _pair_aggregate_chart_data(stats)
     review_summary = _get_review_summary(course_id, instructor_id)
 
-    latest_semester = Semester.latest()
+    latest_semester = SemesterRegistry.latest()
     is_current_semester = section_last_taught.semester.number == latest_semester.number
 
     if is_current_semester:
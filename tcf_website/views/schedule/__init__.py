@@ -9,12 +9,14 @@ from .crud import (
     new_schedule,
     remove_scheduled_course,
 )
+from .generate import generate_schedules_view
 from .sharing import schedule_share, schedule_unbookmark
 
 __all__ = [
     "delete_schedule",
     "duplicate_schedule",
     "edit_schedule",
+    "generate_schedules_view",
     "new_schedule",
     "remove_scheduled_course",
     "schedule_add_course",
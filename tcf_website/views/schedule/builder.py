@@ -12,7 +12,6 @@ from ...models import Schedule, ScheduleBookmark
 from ...schedule.calendar import (
     build_merged_weekly_calendar,
     build_weekly_calendar,
-    scheduled_courses_for_calendar,
 )
 from ...schedule.services import (
     resolve_builder_semester,
@@ -20,7 +19,7 @@ from ...schedule.services import (
     schedule_builder_return_url,
     schedule_data_helper,
 )
-from ...utils import recent_semesters
+from ...semesters import SemesterRegistry
 from .json_helpers import (
     is_schedule_compare_pick_partial_request,
     is_schedule_grid_partial_request,
@@ -68,7 +67,7 @@ def view_schedules(
         return redirect(f"{reverse('schedule')}?{bookmark_q}")
 
     active_semester = resolve_builder_semester(request, request.user)
-    all_semesters = recent_semesters()
+    all_semesters = SemesterRegistry.recent()
     semester_choices = [(sem.pk, str(sem)) for sem in all_semesters]
     semester_combo_selected = active_semester.pk if active_semester else ""
     schedule_context = schedule_data_helper(request, active_semester)
@@ -81,7 +80,9 @@ def view_schedules(
         selected_schedule = (
             next((s for s in schedules if str(s.id) == wanted), None) or schedules[0]
         )
-        selected_schedule_data = selected_schedule.get_schedule()
+        selected_schedule_data = schedule_context["schedule_stats"][
+            selected_schedule.id
+        ]
 
     selected_courses = selected_schedule_data[0] if selected_schedule_data else []
     calendar = build_weekly_calendar(selected_courses)
@@ -121,8 +122,10 @@ def view_schedules(
 
     compare_schedule_stats = None
     if compare_schedule is not None:
-        compare_courses = scheduled_courses_for_calendar(compare_schedule)
-        compare_data = compare_schedule.get_schedule()
+        compare_data = schedule_context["schedule_stats"].get(compare_schedule.id)
+        if compare_data is None:
+            compare_data = compare_schedule.get_schedule()
+        compare_courses = compare_data[0]
         compare_schedule_stats = {
             "credits": compare_data[1] if compare_data else 0,
             "rating": compare_data[2] if compare_data else 0,
@@ -0,0 +1,91 @@
+"""Schedule generator JSON endpoint."""
+
+import math
+from datetime import datetime
+
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from ...schedule.generator import (
+    MAX_COURSES,
+    SchedulePreferences,
+    generate_schedules,
+)
+from ...schedule.services import resolve_builder_semester
+
+_WEIGHT_PARAMS = (
+    "rating_weight",
+    "gpa_weight",
+    "difficulty_weight",
+    "time_weight",
+    "free_day_weight",
+)
+
+
+def _clock_param(raw: str | None) -> int | None:
+    """``HH:MM`` (24-hour) as minutes since midnight; raises ValueError."""
+    if not raw:
+        return None
+    parsed = datetime.strptime(raw.strip(), "%H:%M")
+    return parsed.hour * 60 + parsed.minute
+
+
+def _weight_param(raw: str) -> float:
+    """Finite, non-negative ranking weight; raises ValueError otherwise."""
+    weight = float(raw)
+    # Bounds in the branch-and-bound search assume every weight is in [0, inf).
+    if not math.isfinite(weight) or weight < 0:
+        raise ValueError(f"invalid weight {raw!r}")
+    return weight
+
+
+def _preferences_from_request(request) -> SchedulePreferences:
+    """Build preferences from query params; raises ValueError on bad input."""
+    weights = {
+        name: _weight_param(request.GET[name])
+        for name in _WEIGHT_PARAMS
+        if name in request.GET
+    }
+    return SchedulePreferences(
+        earliest_start=_clock_param(request.GET.get("earliest")),
+        latest_end=_clock_param(request.GET.get("latest")),
+        free_days=tuple(day.upper() for day in request.GET.getlist("free")),
+        **weights,
+    )
+
+
+@login_required
+@require_GET
+def generate_schedules_view(request):
+    """Top conflict-free schedules for ``?course=<id>&course=<id>...`` in a term."""
+    semester = resolve_builder_semester(request, request.user)
+    if semester is None:
+        return JsonResponse({"ok": False, "error": "No term available."}, status=400)
+
+    try:
+        course_ids = [int(raw) for raw in request.GET.getlist("course")]
+        prefs = _preferences_from_request(request)
+        limit = int(request.GET.get("limit", 10))
+    except ValueError:
+        return JsonResponse({"ok": False, "error": "Invalid parameters."}, status=400)
+    if not course_ids:
+        return JsonResponse(
+            {"ok": False, "error": "Choose at least one course."}, status=400
+        )
+    if len(set(course_ids)) > MAX_COURSES:
+        return JsonResponse(
+            {"ok": False, "error": f"Choose at most {MAX_COURSES} courses."},
+            status=400,
+        )
+
+    result = generate_schedules(semester, course_ids, prefs, limit)
+    return JsonResponse(
+        {
+            "ok": True,
+            "semester": semester.pk,
+            "schedules": [schedule.as_dict() for schedule in result.schedules],
+            "missing_course_ids": result.missing_course_ids,
+            "complete": result.exhausted,
+        }
+    )
@@ -0,0 +1,151 @@
+"""Denormalized vote counters on reviews, questions and answers.
+
+``Review``, ``Question`` and ``Answer`` store ``upvote_count``,
+``downvote_count`` and ``net_votes`` so listings, "Most Helpful" sorting and
+the vote endpoints never join and group their vote tables. A click is one
+statement (``toggle_vote``): an ``INSERT ... ON CONFLICT`` on the
+(user, target) unique constraint, a delete when the click undoes the current
+vote, and the counter update, all applied atomically.
+
+Votes written through the ORM instead (admin, fixtures, scripts) recount
+their target from the vote table in ``post_save``/``post_delete``.
+"""
+
+from django.db import connection
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+
+from .models import Answer, Question, Review, Vote, VoteAnswer, VoteQuestion
+
+VOTE_COUNTER_FIELDS = ("upvote_count", "downvote_count", "net_votes")
+
+# Vote model -> (target model, vote foreign key to the target)
+VOTE_TARGETS = {
+    Vote: (Review, "review"),
+    VoteQuestion: (Question, "question"),
+    VoteAnswer: (Answer, "answer"),
+}
+
+# upsert:  new vote, or a switch from the opposite value (xmax = 0 on insert);
+#          an identical existing vote is locked but left alone.
+# removed: the identical vote, deleted (clicking the active button undoes it).
+# changes: +1/-1 per vote value added or taken away, applied to the counters.
+_TOGGLE_SQL = """
+WITH upsert AS (
+    INSERT INTO {votes} (user_id, {fk}, value)
+    VALUES (%(user)s, %(target)s, %(value)s)
+    ON CONFLICT (user_id, {fk}) DO UPDATE SET value = EXCLUDED.value
+    WHERE {votes}.value <> EXCLUDED.value
+    RETURNING (xmax = 0) AS inserted
+), removed AS (
+    DELETE FROM {votes}
+    WHERE user_id = %(user)s AND {fk} = %(target)s AND value = %(value)s
+        AND NOT EXISTS (SELECT 1 FROM upsert)
+    RETURNING value
+), changes (value, delta) AS (
+    SELECT %(value)s, 1 FROM upsert
+    UNION ALL SELECT %(opposite)s, -1 FROM upsert WHERE NOT inserted
+    UNION ALL SELECT value, -1 FROM removed
+)
+UPDATE {targets} SET
+    upvote_count = upvote_count
+        + COALESCE((SELECT SUM(delta) FROM changes WHERE value = 1), 0),
+    downvote_count = downvote_count
+        + COALESCE((SELECT SUM(delta) FROM changes WHERE value = -1), 0),
+    net_votes = net_votes
+        + COALESCE((SELECT SUM(delta * value) FROM changes), 0)
+WHERE id = %(target)s
+RETURNING
+    upvote_count,
+    downvote_count,
+    net_votes,
+    CASE WHEN EXISTS (SELECT 1 FROM removed) THEN 0 ELSE %(value)s END
+"""
+
+
+def _vote_relation(target_model):
+    for vote_model, (model, fk) in VOTE_TARGETS.items():
+        if model is target_model:
+            return vote_model, fk
+    raise TypeError(f"{target_model.__name__} has no vote counters")
+
+
+def toggle_vote(target, user, value: int) -> int:
+    """Cast, switch or undo ``user``'s ``value`` (+1/-1) vote on ``target``.
+
+    Updates the counters on ``target`` in place and returns the user's vote
+    afterwards (0 when the click undid it).
+    """
+    vote_model, fk = _vote_relation(type(target))
+    quote = connection.ops.quote_name
+    sql = _TOGGLE_SQL.format(
+        votes=quote(vote_model._meta.db_table),
+        fk=quote(vote_model._meta.get_field(fk).column),
+        targets=quote(type(target)._meta.db_table),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql,
+            {"user": user.pk, "target": target.pk, "value": value, "opposite": -value},
+        )
+        row = cursor.fetchone()
+    if row is None:
+        raise type(target).DoesNotExist
+    target.upvote_count, target.downvote_count, target.net_votes, user_vote = row
+    return user_vote
+
+
+def vote_count_expressions(vote_model, fk: str) -> dict:
+    """``update()`` kwargs recounting a target's counters from ``vote_model``."""
+
+    def tally(value):
+        rows = (
+            vote_model.objects.filter(**{fk: OuterRef("pk"), "value": value})
+            .order_by()
+            .values(fk)
+            .annotate(n=Count("pk"))
+            .values("n")
+        )
+        return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+    return {
+        "upvote_count": tally(1),
+        "downvote_count": tally(-1),
+        "net_votes": tally(1) - tally(-1),
+    }
+
+
+def refresh_vote_counts(target_model, pks) -> int:
+    """Recount the vote counters of ``target_model`` rows ``pks``."""
+    vote_model, fk = _vote_relation(target_model)
+    return target_model.objects.filter(pk__in=pks).update(
+        **vote_count_expressions(vote_model, fk)
+    )
+
+
+def user_vote_subquery(target_model, user):
+    """Expression for ``user``'s vote (+1/-1, or 0) on each row of ``target_model``."""
+    vote_model, fk = _vote_relation(target_model)
+    vote = vote_model.objects.filter(**{fk: OuterRef("pk"), "user": user}).values(
+        "value"
+    )[:1]
+    return Coalesce(Subquery(vote, output_field=IntegerField()), Value(0))
+
+
+def _vote_changed(sender, instance, **kwargs):
+    target_model, fk = VOTE_TARGETS[sender]
+    target_id = getattr(instance, f"{fk}_id")
+    refresh_vote_counts(target_model, [target_id])
+
+
+def connect_signals() -> None:
+    """Wire counter recounts for ORM vote writes; called from ``TcfWebsiteConfig.ready()``."""
+    for vote_model in VOTE_TARGETS:
+        name = vote_model._meta.model_name
+        post_save.connect(
+            _vote_changed, sender=vote_model, dispatch_uid=f"vote_counts_{name}_save"
+        )
+        post_delete.connect(
+            _vote_changed, sender=vote_model, dispatch_uid=f"vote_counts_{name}_delete"
+        )